@@ -1,2224 +1,3465 @@
-import pandas as pd
-import numpy as np
-import pyodbc
-import datetime
-
-db_list = ['CINRE_LC', 'CINRE_DealSheet', 'CINRE_SAP',
-           'CINRE_PRICING_AIRv10', 'CorpAct_Reserving']
-
-
-def constr(
-        database_name: str,
-        server_name: str = "Corpsqlhqpcf060\HS1,4911",
-        driver_name: str = "SQL Server", trusted_connection:
-        str = "yes") -> str:
-    """
-    # Description: 
-        Function to build the connection string for the database
-
-    # Parameters:
-        database_name:
-            string, name of the database (e.g. 'CINRE_LC')
-        server_name:
-            string, name of the server (e.g. 'Corpsqlhqpcf060\HS1,4911')
-            default: "Corpsqlhqpcf060\HS1,4911"
-        driver_name:
-            string, name of the driver (e.g. 'SQL Server')
-            default: "SQL Server"
-        trusted_connection:
-            string, name of the trusted connection (e.g. 'yes')
-            default: "yes"
-
-    # Output:
-        connection string for the database
-        of the form:
-
-    # Example:
-        constr('CINRE_LC')
-        > 'Driver={SQL Server};Server=Corpsqlhqpcf060\HS1,4911;
-           Database=CINRE_LC;Trusted_Connection=yes;'
-
-        constr("CorpAct_Reserving", "different_server", "Fake Driver", "no")
-        > 'Driver={Fake Driver};Server=different_server;
-           Database=CorpAct_Reserving;Trusted_Connection=no;'
-    """
-    # return the connection string
-    return (r'Driver={};'r'Server={};'r'Database={};'r'Trusted_Connection={};'
-            .format(driver_name, server_name, database_name, trusted_connection))
-
-
-def connect_to_dbs(*args: str) -> dict():
-    """
-    # Description:
-        Function that takes an arbitrary number of database names and returns
-        a dictionary of connection strings whose keys are the database names and
-        whose values are the connection strings
-
-        If no arguments are passed, the function will use the global variable db_list
-        as the list of databases to connect to
-
-    # Parameters:
-        args:
-            string, name of the database (e.g. 'CINRE_LC')
-
-    # Output:
-        dictionary of connection strings for the databases
-        of the form:
-            {'CINRE_LC': <pyodbc.Connection object at 0x0000020B1B0F0C88>,
-            'CINRE_DealSheet': <pyodbc.Connection object at 0x0000020B1B0F0C88>,
-            'CINRE_SAP': <pyodbc.Connection object at 0x0000020B1B0F0C88>,
-            'CINRE_PRICING_AIRv10': <pyodbc.Connection object at 0x0000020B1B0F0C88>,
-            'CorpAct_Reserving': <pyodbc.Connection object at 0x0000020B1B0F0C88>}
-
-    # Example:
-        connect_to_dbs()
-        > {'CINRE_LC': <pyodbc.Connection object at 0x0000020B1B0F0C88>,
-            'CINRE_DealSheet': <pyodbc.Connection object at 0x0000020B1B0F0C88>,
-            'CINRE_SAP': <pyodbc.Connection object at 0x0000020B1B0F0C88>,
-            'CINRE_PRICING_AIRv10': <pyodbc.Connection object at 0x0000020B1B0F0C88>,
-            'CorpAct_Reserving': <pyodbc.Connection object at 0x0000020B1B0F0C88>}
-
-        connect_to_dbs('CINRE_LC', 'CINRE_DealSheet')
-        > {'CINRE_LC': <pyodbc.Connection object at 0x0000020B1B0F0C88>,
-            'CINRE_DealSheet': <pyodbc.Connection object at 0x0000020B1B0F0C88>}
-        """
-
-    # if no arguments are passed, use the global variable db_list
-    if len(args) == 0:
-        args = db_list
-
-    # loop through the args and build the dictionary
-    out = {}
-    for x in args:
-        out[x] = pyodbc.connect(constr(x))
-        
-    return out
-
-
-def readtbl(table_name: str, conn: pyodbc.Connection) -> pd.DataFrame:
-    """
-    # Description:
-        Function that takes a table name and a connection object and returns a dataframe
-        containing the data from the table
-
-    # Parameters:
-        table_name:
-            string, name of the table (e.g. 'CINRE_LC.dbo.CINRE_LC')
-        conn:
-            pyodbc.Connection object, connection to the database
-
-    # Output:
-        dataframe containing the data from the table
-
-    # Example:
-        # assume the table CINRE_LC.dbo.Layer exists in the database CINRE_LC
-        # and is 3 rows two columns with A, B, C, D, E, F as the data and the columns
-        # are named col1 and col2
-        conn = connect_to_dbs()['CINRE_LC']
-        readtbl('CINRE_LC.dbo.Layer', conn)
-        >  col1 col2
-        0    A    B
-        1    C    D
-        2    E    F
-    """
-    # read the table into a dataframe using the connection
-    return pd.read_sql_query('select * from [{}]'.format(table_name), conn)
-
-
-def build_timestamp(nearest: int = 10) -> datetime.datetime:
-    """
-    # Description:
-        Function that takes a number of minutes and returns a timestamp rounded to the nearest
-        number of minutes. The default is 10 minutes.
-
-    # Parameters:
-        nearest:
-            int, number of minutes to round to (e.g. 10)
-            default: 10
-
-    # Output:
-        timestamp rounded to the nearest number of minutes
-
-    # Example:
-        # assume the time is 10:03:00, on 3/2/2027
-        build_timestamp()
-        > datetime.datetime(2027, 3, 2, 10, 0) # 10:00:00 is the nearest 10 minutes
-    """
-    # build the timstamp for when the data are pulled rounded to 10 minutes
-    # this is done by:
-    # subtracting the current time from
-    # the minimum time and then
-    # rounding to the nearest 10 minutes
-    now = datetime.datetime.now()
-    return (now - (now - datetime.datetime.min) % datetime.timedelta(minutes=nearest))
-
-
-def raw_lookup_tbl(
-        df: pd.DataFrame,
-        id_col_name: str,
-        col_list: list,
-        nearest: int = 10) -> pd.DataFrame:
-    """
-    # Description:
-        Function that takes a dataframe, a column name, and a list of columns and returns a dataframe
-        containing the unique values of the columns in the list and the index of the unique values
-        in the column name
-
-    # Parameters:
-        df:
-            dataframe, dataframe containing the data
-        id_col_name:
-            string, name of the column to use as the index
-        col_list:
-            list, list of columns to use as the values
-
-    # Output:
-        dataframe containing the unique values of the columns in the list and the index of the unique values
-        in the column name. this is used to build lookup tables and set up a star schema so that the
-        data can be normalized
-
-    # Example:
-        # assume the dataframe df is 3 rows two columns first A, A, A, B, B, B, second 1,2,3,4,5,6, 
-        # and third X1, X2, X3, X3, X2, X1
-        # with columns named col1, col2, col3
-        raw_lookup_tbl(df, 'col1_id', ['col1'])
-        >   timestamp col1_id col1
-        0 2020-03-02       0    A
-        1 2020-03-02       1    B
-
-        raw_lookup_tbl(df, 'col3_id', ['col3'])
-        >   timestamp col3_id col3  
-        0 2020-03-02       0    X1
-        1 2020-03-02       1    X2
-        2 2020-03-02       2    X3
-    """
-
-    # build the lookup table for the column names
-    col_df = (
-        # select the columns in the `col_list`
-        df[col_list]
-
-        # drop duplicates, sort, reset the index, and rename the index
-        .drop_duplicates()
-        .sort_values(col_list)
-        .reset_index(drop=True)
-        .reset_index()
-        .rename(columns=dict(index=id_col_name))
-    )
-
-    # build the timstamp for when the data are pulled rounded to
-    # `nearest` minutes using `build_timestamp()`
-    col_df['timestamp'] = build_timestamp(nearest=nearest)
-
-    # reorder columns so that timestamp is first
-    col_df = col_df[['timestamp', id_col_name] + col_list]
-
-    # return the dataframe
-    return (col_df)
-
-
-def raw_lookup_dict(
-        df: pd.DataFrame, id_col_names: list, col_lists: list) -> dict:
-    """
-    # Description:
-        Function that takes a dataframe, a list of column names, and
-        a list of lists of columns and returns a dictionary containing
-        the unique values of the columns in the list and the index of
-        the unique values in the column name for each column name
-
-    # Parameters:
-        df:
-            dataframe, dataframe containing the data
-        id_col_names:
-            list, list of column names to use as the index
-        col_lists:
-            list, list of lists of columns to use as the values
-
-    """
-    # initialize the output dictionary
-    out = {}
-
-    # loop through the column names and build the lookup table:
-    # note that zip() is used to loop through two lists at the same time
-    for id_col, cols in zip(id_col_names, col_lists):
-        out[id_col] = raw_lookup_tbl(df=df, id_col_name=id_col, col_list=cols)
-
-    # return the dictionary
-    return (out)
-
-
-def all4hierarchy(*args: pd.Series) -> pd.Series:
-    """
-    # Description:
-        Function that takes an arbitrary number of series and
-        returns a series with the first non-null value from the 
-        series
-
-    # Parameters:
-        *args:
-            pd.Series, series to use to build the hierarchy
-
-    # Output:
-        pd.Series, series with the first non-null value from the
-        series
-
-    # Example:
-        # assume the series are:
-        # ds: Null, 2, 3, 4, 5, 6, 7, 8, 9, 10
-        # lc: Null, 2, 3, 4, 5, 6, 7, 8, 9, 10
-        # air: 2, 2, 3, 4, 5, 6, 7, 8, 9, 10
-        # sap: 1, 2, 3, 4, 5, 6, 7, 8, 9, 10 
-        all4hierarchy(ds, lc, air, sap)
-        > 0     2
-    """
-    # build the dataframe from the series
-    # example: if we have 4 series, ds, lc, air, sap, then
-    # df = pd.DataFrame(dict(ds=ds, lc=lc, air=air, sap=sap))
-    # we can use the *args to do this as well, and it is more
-    # flexible. use the zip() function to build the dictionary
-    # and the dict() function to build the dataframe
-    df = pd.DataFrame(dict(zip(args)))
-
-    # filter the dataframe to get the first non-null value
-    # with an effect similar to the COALESCE function in SQL
-    # use apply to get the first non-null value, using the `first_valid_index()`
-    # method, that comes from the pandas documentation
-    return (df.apply(lambda x: x.first_valid_index(), axis=1))
-
-
-def cinre_lc_contract(
-        lc_conn: pyodbc.Connection,
-        earliest_inception: str = '2020-01-01') -> pd.DataFrame:
-    """
-    # Description:
-        Function that reads in the contract table from the loss cost database
-
-    # Parameters:
-        lc_conn:
-            pyodbc.Connection, connection to the loss cost database
-        earliest_inception:
-            string, earliest inception date to use in the query
-            must be in the format 'YYYY-MM-DD'
-            default is '2020-01-01'
-
-    # Output:
-        dataframe, dataframe containing the contract table from the loss cost database
-
-    # Example:
-        cinre_lc_contract(lc_conn)
-        >   CrmGroupID MgtRptLine  ... LossEvalDate crm_id_lc
-        0       10000          1  ...   2020-01-01         0
-        1       10000          2  ...   2020-01-01         1
-        2       10000          3  ...   2020-01-01         2
-        3       10000          4  ...   2020-01-01         3
-        ...       ...        ...  ...          ...       ...
-    """
-    # print statement that the function is running
-    print('reading Contract table from loss cost DB')
-
-    # read in table
-    contract_lc = readtbl("Contract", lc_conn)
-
-    # recode date columns to datetime
-    contract_lc[['Inception', 'Expiration', 'LossEvalDate']] = contract_lc[
-        'Inception Expiration LossEvalDate'.split()].apply(pd.to_datetime)
-
-    # we only take inception dates after the `earliest_inception` date
-    contract_lc = contract_lc.loc[contract_lc.Inception >= datetime.datetime.fromisoformat(
-        earliest_inception), :].reset_index(drop=True)
-
-    # add in CRM_ID, which is a combination of CrmGroupID and MgtRptLine
-    # which takes the first character of CrmGroupID and adds MgtRptLine
-    contract_lc['crm_id_lc'] = contract_lc['CrmGroupID MgtRptLine'.split()].apply(
-        lambda x: x[1][0] + str(x[0]), axis=1)
-
-    # change column names to be more descriptive, and add in the `_lc` suffix
-    # to indicate that the column comes from the loss cost database
-    # these are the current column names:
-    contract_lc_curcols = ['CrmGroupID', 'Account', 'MgtRptLine', 'Description', 'Program', 'Inception', 'Expiration', 'TreatyBasis',
-                           'AlaeBasis', 'LossEvalDate', 'Status', 'CatModelVersion', 'Note', 'UserID', 'LastUpdated', 'Region', 'Currency', 'SourceFile']
-    contract_lc_newcols = ['crm_gp_id', 'account', 'mrl', 'account_desc', 'program', 'eff_date', 'exp_date', 'treaty_basis', 'alae_basis',
-                           'loss_eval_date', 'status', 'cat_model_version', 'note', 'user_id', 'last_updated', 'region', 'currency', 'source_file']
-    contract_lc.rename(columns=dict(zip(contract_lc_curcols, [
-                       c + '_lc' for c in contract_lc_newcols])), inplace=True)
-
-    # filter out declined statuses, as well as WIP and NTU
-    lc_stats_to_filter_out = ['Declined', 'DECLINED', 'declined',
-                              'Decline', 'DECLINE', 'decline', 'wip', 'WIP', 'Wip', 'ntu', 'NTU']
-    contract_lc = contract_lc.query('status_lc != @lc_stats_to_filter_out')
-
-    # return table
-    return (contract_lc)
-
-
-def cinre_dealsheet_contract(ds_conn: pyodbc.Connection, earliest_inception: str = '2020-01-01') -> pd.DataFrame:
-    """
-    # Description:
-        Function that reads in the contract table from the deal sheet database
-
-    # Parameters:
-        ds_conn:
-            pyodbc.Connection, connection to the deal sheet database
-        earliest_inception:
-            string, earliest inception date to use in the query
-            must be in the format 'YYYY-MM-DD'
-            default is '2020-01-01'
-
-    # Output:
-        pd.DataFrame, dataframe containing the contract table from the deal sheet database
-
-    # Example:
-        cinre_dealsheet_contract(ds_conn)
-        >   CinReId CRMID  ... DominantType timestamp_ds
-        0        1     0  ...         None   2020-01-01
-        1        2     1  ...         None   2020-01-01
-        2        3     2  ...         None   2020-01-01
-        ...      ...   ...  ...          ...          ...
-    """
-    # print statement that the function is running
-
-    print('reading Contract table from deal sheet DB')
-
-    # read in table using `readtbl` function
-    contract_ds = readtbl("Contract", ds_conn)
-
-    # recode date columns to datetime
-    # the most efficient way to do this is to use a list comprehension:
-    contract_ds[['Inception', 'Expiration', 'LastUpdated']] = [pd.to_datetime(
-        contract_ds[c]) for c in 'Inception Expiration LastUpdated'.split()]
-
-    # but this is not as readable, so we will include this method for reference:
-    # for c in 'Inception Expiration LastUpdated'.split():
-    #     contract_ds[c] = pd.to_datetime(contract_ds[c])
-
-    # we only take inception dates after the `earliest_inception` date
-    contract_ds = contract_ds.loc[contract_ds.Inception >= datetime.datetime.fromisoformat(
-        earliest_inception), :].reset_index(drop=True)
-
-    # change column names to be more descriptive, and add in the `_ds` suffix
-    # to indicate that the column comes from the deal sheet database
-    # these are the current column names:
-    contract_ds_curcols = ['CinReId', 'CRMID', 'ClientName', 'Reassured', 'Inception', 'Expiration', 'ContractName', 'DominantType', 'MGA', 'Broker', 'BrokerNum', 'TreatyCategory', 'Line', 'UltCinRePrem', 'ExpectedLoss', 'ExpenseRatio', 'TechUWRatio', 'UWProfit', 'NPVUWProfit', 'ChgRateAdequacy', 'ROEChange',
-                           'RateChange', 'ProgramRateChange', 'StandaloneTVaR250', 'StandaloneROC250', 'DiversifiedTVaR250', 'DiversifiedROC250', 'LossCV', 'Status', 'SourceFile', 'SharePointFile', 'Note', 'LastUpdated', 'CyberExposure', 'CyberAggLimit', 'Subline', 'CompanyID', 'DepositPrem', 'ModelExpectedLoss', 'AnnualValues']
-
-    # these are the new column names:
-    contract_ds_newcols = ['crm_gp_id', 'crm_id', 'client_name', 'reassured', 'eff_date', 'exp_date', 'contract_name', 'dominant_type', 'mga', 'broker', 'broker_numb', 'treaty_category', 'line', 'ult_cre_prem', 'expected_loss', 'expense_ratio', 'tech_uw_ratio', 'uw_profit', 'npv_uw_profit', 'chg_rate_adequacy', 'roe_change',
-                           'rate_change', 'program_rate_change', 'standalone_tvar_250', 'standalone_roc_250', 'diversified_tvar_250', 'diversified_roc_250', 'loss_cv', 'status', 'source_file', 'share_point_file', 'note', 'last_updated', 'cyber_exposure', 'cyber_agg_limit', 'subline', 'company_id', 'deposit_prem', 'model_expected_loss', 'annual_values']
-
-    # rename the columns
-    contract_ds.rename(columns=dict(zip(contract_ds_curcols, [
-                       c + '_ds' for c in contract_ds_newcols])), inplace=True)
-
-    # want to bring in some columns from the `Layer` table, but we need to rename them
-    # so that they don't conflict with the column names in the `contract_ds` table
-
-    # define the dictionary that will be used to rename the columns:
-    layer_rename = dict(
-        CinReId='crm_gp_id_ds',
-        Inception='eff_date_ds',
-        Expiration='exp_date_ds',
-        Trigger='trigger_ds',
-        ContractType='contract_type_ds',
-        Currency='currency_ds',
-        Territory='terr_ds')
-
-    # read in the `Layer` table, only keep the columns we need, rename them, and drop duplicates
-    layer = (readtbl('Layer', ds_conn)[list(layer_rename.keys())]
-
-             # rename columns & drop duplicates
-             .rename(columns=layer_rename)
-             .drop_duplicates())
-
-    # recode date columns to datetime as above
-    layer[['eff_date_ds', 'exp_date_ds']] = [
-        pd.to_datetime(layer[c]) for c in 'eff_date_ds exp_date_ds'.split()]
-
-    # merge the `contract_ds` and `layer` tables, using the `crm_gp_id_ds`,
-    # `eff_date_ds`, and `exp_date_ds` columns
-    contract_ds = contract_ds.merge(
-        layer, how='left', on='crm_gp_id_ds eff_date_ds exp_date_ds'.split())
-
-    # return table
-    return (contract_ds)
-
-
-def cinre_air_contract(air_conn: pyodbc.Connection, earliest_inception: str = "2020-01-01") -> pd.DataFrame:
-    """
-    # Description
-        Read in the `Contract` table from the AIR database, and return it as a pandas DataFrame.
-
-    # Parameters
-        air_conn: pyodbc.Connection
-            Connection to the AIR database.
-        earliest_inception: str
-            Earliest inception date to include in the returned table.
-            Must be in ISO format (e.g. '2020-01-01').
-
-    # Output
-        contract_air: pd.DataFrame
-            `Contract` table from the AIR database.
-
-    # Example
-        >>> contract_air = cinre_air_contract(air_conn)
-        >>> contract_air.head()
-        #  client_name client_id_numb   eff_date   ... crm_gp_id template_source
-        # 0  Client 1        1234567 2020-01-01   ...  1234567   template name
-        # 1  Client 2        2345678 2020-01-01   ...  2345678   template name
-        # 2  Client 3        3456789 2020-01-01   ...  3456789   template name
-        # 3  Client 4        4567890 2020-01-01   ...  4567890   template name
-        # 4  Client 5        5678901 2020-01-01   ...  5678901   template name
-        # [5 rows x 25 columns]
-    """
-
-    # print status message
-    print('reading Contract table from AIR DB')
-
-    # list of new column names
-    air_new_cols = ['client_name', 'client_id_numb', 'eff_date', 'exp_date',
-                    'program', 'crm_gp_id2', 'wp_contract', 'occ_limit_contract', 'agg_limit_contract',
-                    'status', 'region', 'note', 'last_updated', 'has_pc', 'user_name', 'file_location',
-                    'broker', 'executive_summary', 'currency', 'crm_id', 'fx_rate_id', 'template_altered',
-                    'crm_gp_id', 'template_source']
-
-    # list of statuses to exclude
-    air_status_excl = ["Not Bound", "reference", "not bound",
-                       "Declined", "wip", "Wip", "NTU", "ntu", "started"]
-
-    # read in table
-    contract_air = readtbl('Contract_New', air_conn)
-
-    # rename columns
-    contract_air.rename(columns=dict(zip(contract_air.columns.tolist(), [
-                        c + '_air' for c in air_new_cols])), inplace=True)
-
-    # recode dates using the `pd.to_datetime` function
-    # for c in ['eff_date_air', 'exp_date_air']:
-    #     contract_air[c] = pd.to_datetime(contract_air[c])
-    contract_air[['eff_date_air', 'exp_date_air']] = [pd.to_datetime(
-        contract_air[c]) for c in 'eff_date_air exp_date_air'.split()]
-
-    # drop rows with dates before `earliest_inception`
-    contract_air = contract_air.loc[contract_air.eff_date_air >=
-                                    datetime.datetime.fromisoformat(earliest_inception), :]
-
-    # drop some columns I don't want to carry forward
-    colstodrop = ['crm_gp_id2_air', 'wp_contract_air', 'occ_limit_contract_air', 'agg_limit_contract_air',
-                  'template_altered_air', 'has_pc_air', 'fx_rate_id_air', 'template_source_air']
-    contract_air.drop(columns=colstodrop, inplace=True)
-
-    # drop treaties not bound
-    contract_air = contract_air.query('status_air != @air_status_excl')
-
-    # return table
-    return (contract_air)
-
-# RESTART HERE
-
-
-def cinre_sap_contract(sap_conn: pyodbc.Connection, earliest_date: str = "2020-01-01") -> pd.DataFrame:
-    """
-    # Description
-        Read in the `Contract` table from the SAP database, and return it as a pandas DataFrame.
-
-    # Parameters
-        sap_conn: pyodbc.Connection
-            Connection to the SAP database.
-        earliest_date: str
-            Earliest inception date to include in the returned table.
-            Must be in ISO format (e.g. '2020-01-01').
-            Default is '2020-01-01' (this is about the earliest date that
-            the data quality is good enough to use).
-    
-    # Output
-        contract_sap: pd.DataFrame
-            `Contract` table from the SAP database.
-
-    # Example
-        >>> contract_sap = cinre_sap_contract(sap_conn)
-        >>> contract_sap.head()
-        #  Company Code Deal Number Contract Number  ... Cancel Date End of Acct Period
-        # 0         1000  1000000001      1000000001  ...  2020-12-31         2020-12-31
-        # 1         1000  1000000002      1000000002  ...  2020-12-31         2020-12-31
-        # 2         1000  1000000003      1000000003  ...  2020-12-31         2020-12-31
-        # 3         1000  1000000004      1000000004  ...  2020-12-31         2020-12-31
-        # 4         1000  1000000005      1000000005  ...  2020-12-31         2020-12-31
-        # [5 rows x 16 columns]
-    """
-
-    # print status message so I know it's working
-    print('reading Contract table from SAP DB')
-
-    # read in table from the SAP database
-    contract_sap = readtbl('Treaty$', sap_conn)
-
-    # recode dates using the `pd.to_datetime` function
-    contract_sap[['Effective Date', 'Cancel Date', 'End of Acct Period']] = [
-        pd.to_datetime(contract_sap[c]) for c in ['Effective Date', 'Cancel Date', 'End of Acct Period']]
-
-
-    # filter inception date to be after `earliest_date`
-    contract_sap = contract_sap.loc[contract_sap['Effective Date'] >=
-                                    datetime.datetime.fromisoformat(earliest_date), :].reset_index(drop=True)
-
-    # change column names to be easier to work with (eg remove spaces) and make them lowercase, and add `_sap`
-    # to the end to compare with different databases that in theory have the same values
-    contract_sap_curcols = ['Company Code', 'Deal Number', 'Contract Number', 'CRM Submission ID', 'Treaty Text', 'Cedent',
-                            'Cedent Name', 'Underwriter for Treaty', 'Nature of Treaty', 'Treaty Category', 'Accounting Freq# No#',
-                            'Account Level', 'Cancel Date', 'End of Acctg Year', 'Spec# Retro Allowed', 'Specific Retro Treaty',
-                            'Effective Date', 'Expiration Date', 'Contract Status', 'Renewal', 'Exposure Territory',
-                            'Retro Treaty Number', 'Retro Section Number', 'Cession Percentage', 'Reported Data Placement %',
-                            'CinciRe Share/participation', 'Section', 'Text for Section', 'Contract Type', 'Layer', 'UW Area',
-                            'Business Type Number', 'Contract Trigger', 'Cancel Type', 'Days Runoff', 'XPL Limit', 'ECO Limit',
-                            'Peril','COB(UOBG)', 'CoB (UOBG) %', 'Segment', 'Subsegment', 'Quota Share %', 'Maximum Liability',
-                            'Retained Line', 'No# of Lines', 'Limit', 'Retention', 'Cat Occurrence Retention', 'Cat Occurrence Limit',
-                            'Terror Occurrence Limit', 'AAD', 'AAL', 'Loss Corridor Floor', 'Loss Corridor Ceiling', 'ALAE Treatment',
-                            'Protected Share', 'Subject Premium', 'Base Rate', 'Min Rate for swing', 'Max Rate for swing', 'Deposit Premium', 'Reinstatement Cover %', 'Reinstatem# Time %', 'Flat Commission%', 'Provisional Commission%', 'Overriding Commission%', 'Brokerage%', 'Provisional Loss Ratio', 'Dev Pattern', 'LR at Min Commission', 'LR at Max Commission', 'Commission at Min', 'Commission at Max', 'Profit Commission %', 'Profit Commission Expense']
-    contract_sap_newcols = ['company_code', 'deal_numb', 'contract_numb', 'crm_id', 'treaty_text', 'cedent', 'cedent_name', 'uw_for_treaty', 'nature_of_treaty', 'treaty_category', 'acct_freq_numb', 'acct_level', 'cancel_date', 'end_of_acct_year', 'specific_numb_retro_allowed', 'specific_retro_treaty', 'eff_date', 'exp_date', 'contract_status', 'renewal', 'exposure_terr', 'retro_treaty_numb', 'retro_section_numb', 'cession_pct', 'reported_data_placement_pct', 'cre_share_participation', 'section', 'text_for_section', 'contract_type', 'layer', 'uw_area', 'business_type_numb', 'contract_trigger', 'cancel_type', 'days_runoff', 'xpl_limit', 'eco_limit',
-                            'peril', 'uobg', 'uobg_pct', 'segment', 'subsegment', 'qs_pct', 'max_liab', 'retained_line', 'number_of_lines', 'limit', 'retention', 'cat_occ_retention', 'cat_occ_limit', 'terror_occ_limit', 'aad', 'aal', 'loss_corridor_floor', 'loss_corridor_ceiling', 'alae_treatment', 'protected_share', 'subject_prem', 'base_rate', 'min_rate_for_swing', 'max_rate_for_swing', 'deposit_prem', 'reinstatement_cover_pct', 'reinstatement_time_pct', 'flat_comm_pct', 'provisional_comm_pct', 'overriding_comm_pct', 'brokerage_pct', 'provisional_loss_ratio', 'dev_pattern', 'lr_at_min_comm', 'lr_at_max_comm', 'comm_at_min', 'comm_at_max', 'profit_comm_pct', 'profit_comm']
-    contract_sap.rename(columns=dict(zip(contract_sap_curcols, [
-                        c + '_sap' for c in contract_sap_newcols])), inplace=True)
-
-    # drop these columns that are more "layer" than "contract"
-    contract_sap = contract_sap.drop('limit_sap retention_sap'.split(), 1)
-
-    # drop these columns that are use numbers that I have found may not be correct
-    contract_sap = contract_sap.drop('uobg_sap uobg_pct_sap layer_sap section_sap text_for_section_sap base_rate_sap min_rate_for_swing_sap max_rate_for_swing_sap reinstatement_cover_pct_sap reinstatement_time_pct_sap flat_comm_pct_sap provisional_comm_pct_sap overriding_comm_pct_sap brokerage_pct_sap provisional_loss_ratio_sap lr_at_min_comm_sap lr_at_max_comm_sap comm_at_min_sap comm_at_max_sap profit_comm_pct_sap profit_comm_sap cat_occ_retention_sap cat_occ_limit_sap terror_occ_limit_sap aad_sap aal_sap subject_prem_sap cedent_sap cedent_name_sap contract_status_sap'.split(), 1)
-    contract_sap = contract_sap.drop(
-        'deposit_prem_sap cre_share_participation_sap max_liab_sap segment_sap subsegment_sap contract_numb_sap treaty_text_sap contract_type_sap deal_numb_sap qs_pct_sap retained_line_sap number_of_lines_sap uw_area_sap'.split(), 1)
-    contract_sap = contract_sap.drop(
-        'retro_treaty_numb_sap retro_section_numb_sap cession_pct_sap reported_data_placement_pct_sap days_runoff_sap renewal_sap contract_trigger_sap alae_treatment_sap treaty_category_sap dev_pattern_sap xpl_limit_sap eco_limit_sap loss_corridor_floor_sap loss_corridor_ceiling_sap protected_share_sap'.split(), 1)
-    contract_sap = contract_sap.drop_duplicates()
-    contract_sap = contract_sap.reset_index(drop=True)
-
-    # return table
-    return (contract_sap)
-
-
-def raw_contracts(lc_conn : pyodbc.Connection,
-    ds_conn: pyodbc.Connection,
-    sap_conn: pyodbc.Connection,
-    air_conn: pyodbc.Connection,
-    delete_once_renamed: bool = False ) -> pd.DataFrame:
-    """
-    # Description
-    This function builds the raw contracts table from the individual contract tables.
-    Reads data from the `Contracts` table (or similar) from four specific databases:
-    - Loss Cost
-    - Deal Sheet
-    - SAP
-    - AIR
-    
-    # Parameters 
-    Note that all these connections are made in the above functions.  
-
-    lc_conn: pyodbc.Connection
-        Connection to the loss cost database.
-    ds_conn: pyodbc.Connection
-        Connection to the deal sheet database.
-    sap_conn: pyodbc.Connection
-        Connection to the SAP database.
-    air_conn: pyodbc.Connection
-        Connection to the AIR database.
-    delete_once_renamed: bool
-        If True, the columns that are compared to get the final column names are deleted.
-        This is useful if you want to save memory, and should be implemented in the future.
-        For now, it is set to False, and the columns are not deleted, so that the user can
-        see the columns that were used to get the final column names and make sure they are
-        correct.
-
-    # Returns
-    contract: pd.DataFrame
-        The raw contracts table.
-
-    # Example
-    >>> contract = raw_contracts(lc_conn, ds_conn, sap_conn, air_conn)
-    >>> contract.head()
-    # crm_id_lc eff_date_lc crm_id_ds eff_date_ds crm_id_sap eff_date_sap crm_id_air eff_date_air
-    .............................................
-
-    """
-
-    # build individual contract tables
-    # tables are built from the individual contract tables
-    # from each individual database
-    contract_lc = cinre_lc_contract(lc_conn)
-    contract_ds = cinre_dealsheet_contract(ds_conn)
-    contract_sap = cinre_sap_contract(sap_conn)
-    contract_air = cinre_air_contract(air_conn)
-
-    # merge the contract tables together
-    # this is done by joining on the `crm_id` and `eff_date` fields
-    # these have been the most reliable fields in my brief testing
-    print('joining contract tables from each database on crm_id and eff_date...')
-    contract = (
-                # loss cost database: crm_id_lc, eff_date_lc
-                contract_lc
-
-                # deal sheet database: crm_id_ds, eff_date_ds
-                .merge(contract_ds, how='outer', left_on='crm_id_lc eff_date_lc'.split(), right_on='crm_id_ds eff_date_ds'.split())
-
-                # sap database: crm_id_sap, eff_date_sap
-                .merge(contract_sap, how='outer', left_on='crm_id_ds eff_date_ds'.split(), right_on='crm_id_sap eff_date_sap'.split())
-
-                # air database: crm_id_air, eff_date_air
-                .merge(contract_air, how='outer', left_on='crm_id_ds eff_date_ds'.split(), right_on='crm_id_air eff_date_air'.split())
-                )
-
-    # update the user that the join is complete
-    print('updating contract table columns')
-    
-    # add timestamp column
-    contract['timestamp'] = build_timestamp()
-
-    # add columns for a join to contract table
-    # this is done using the `all4hierarchy` function, which is designed to
-    # take the values from the four databases and return the first non-null value
-    # in this order:
-    # 1. loss cost
-    # 2. deal sheet
-    # 3. air
-    # 4. sap
-    # this order is fairly arbitrary, but I have found that the loss cost database
-    # is the most reliable, so I have placed it first, followed by the deal sheet,
-    # air, and sap
-    # note also that the columns start as names with the database name, and are then
-    # renamed to the final column name
-    contract['crm_gp_id'] = all4hierarchy(ds=contract.crm_gp_id_ds, lc=contract.crm_gp_id_lc, air=contract.crm_gp_id_air, sap=[
-                                          0 for r in range(contract.shape[0])]).astype(int)
-    contract['crm_id'] = all4hierarchy(ds=contract.crm_id_ds, lc=contract.crm_id_lc, air=contract.crm_id_air, sap=[
-                                       'M0' for r in range(contract.shape[0])])
-    contract['eff_date'] = all4hierarchy(ds=contract.eff_date_ds, lc=contract.eff_date_lc, air=contract.eff_date_air, sap=[
-                                         datetime.datetime.fromisoformat('2200-12-31') for r in range(contract.shape[0])])
-    contract['exp_date'] = all4hierarchy(ds=contract.exp_date_ds, lc=contract.exp_date_lc, air=contract.exp_date_air, sap=[
-                                         datetime.datetime.fromisoformat('2201-12-31') for r in range(contract.shape[0])])
-
-    # convert dates to datetime
-    for c in 'eff_date exp_date'.split():
-        contract[c] = pd.to_datetime(contract[c])
-
-    # In this next portion, I am using the `all4hierarchy` function to
-    # return the first non-null value from the four databases in the above order,
-    # and then renaming the columns to the final column names
-    # If the `delete_once_renamed` parameter is set to True, then the columns
-    # that are used to get the final column names are deleted, to save memory
-
-    # build `client_name`
-    contract['client_name'] = all4hierarchy(
-        ds=contract.client_name_ds, lc=contract.client_name_air, air=contract.account_lc, sap=contract.reassured_ds)
-
-    # delete all four input columns if `delete_once_renamed` is True
-    if delete_once_renamed:
-        contract = contract.drop(columns='client_name_ds client_name_air account_lc reassured_ds'.split())
-
-    # build `mrl` first by getting the `mrl` from the `crm_id` column
-    contract['crm_id_mrl'] = contract.crm_id.apply(lambda x: x[0]).map(
-        {'C': 'Casualty', 'P': 'Property', 'S': 'Specialty'})
-    
-    # build `line` - note that line_ds is repeated twice, because this column is not 
-    # available in the SAP database
-    contract['line'] = all4hierarchy(
-        ds=contract.line_ds, lc=contract.mrl_lc, air=contract.crm_id_mrl, sap=contract.line_ds)
-
-    # delete all four input columns if `delete_once_renamed` is True
-    if delete_once_renamed:
-        contract = contract.drop(columns='line_ds mrl_lc crm_id_mrl'.split())
-
-    # contract name
-    contract['contract_name'] = all4hierarchy(
-        ds=contract.contract_name_ds, lc=contract.account_desc_lc, air=contract.contract_name_ds, sap=contract.contract_name_ds)
-
-    # delete all four input columns if `delete_once_renamed` is True
-    if delete_once_renamed:
-        contract = contract.drop(columns='contract_name_ds account_desc_lc'.split())
-
-    # some recoding on the contract name:
-    # 1. if the contract name is 0, then replace with 'temp'
-    # 2. if the contract name is blank, then replace with 'temp'
-    # 3. if the contract name is ' ', then replace with 'temp'
-    # the contracts whose names are set to 'temp' will be given a name later
-    contract['contract_name'] = (contract['contract_name']
-                                 .mask(contract['contract_name'].eq(0), other='temp')
-                                 .mask(contract['contract_name'].eq(''), other='temp')
-                                 .mask(contract['contract_name'].eq(' '), other='temp')
-                                 )
-
-    # program
-    # this next line is a bit complicated, but what it does is:
-    # 1. if the contract_type_ds is NOT 0, then replace with the program_lc
-    # 2. if the contract_type_ds is NOT '0', then replace with the program_lc
-
-    contract['contract_type_ds'] = contract['contract_type_ds'].where(contract['contract_type_ds'].ne(
-        0), other=contract.program_lc).where(contract['contract_type_ds'].ne('0'), other=contract.program_lc)
-    contract['program'] = all4hierarchy(ds=contract.contract_type_ds.where(contract.contract_type_ds.ne(
-        0), other=contract.program_lc), lc=contract.program_lc, air=contract.program_air, sap=contract.contract_type_ds)
-    contract['program'] = contract.program.mask(contract.program.eq('0'), other='').mask(
-        contract.program.eq(''), other='').mask(contract.program.eq(' '), other='')
-
-    # WC Catastrophe Excess of Loss
-    # 'Per Occurrence Cat XOL'
-    # This is to recode one specific program name
-    contract['program'] = (contract.program
-                           # missing WC Cat XOL is per occ cat xol
-                           .mask(
-                                # if program is 0 or blank and contract name is WC Cat XOL
-                                np.logical_and(
-                                    np.logical_or(
-                                        contract.program.eq(0), contract.program.eq('')
-                                    )
-                                    , contract.contract_name.eq('WC Catastrophe Excess of Loss')
-                                )
-                            # then program is Per Occ Cat XOL
-                            , other='Per Occurrence Cat XOL'
-                            )
-                        )
-
-    # here are a few additional programs that need to be recoded:
-    # 1. if the program is 0, then replace with ''
-    # 2. if the program is blank, then replace with ''
-    # 3. if the program is ' ', then replace with ''
-
-    # use the np.select function to recode the program column
-    # this starts by defining conditions and choices
-    cond = [
-        # Condition 1: does the contract name contain 'Per Policy XOL' anywhere?
-        contract.contract_name.str.contains("Per Policy XOL")
-        
-        # Condition 2: does the contract name contain 'WC Catastrophe Excess of Loss' anywhere?
-        , contract.contract_name.str.contains("WC Catastrophe Excess of Loss")
-        ]
-
-    # if the program has either of these two substrings,
-    # then replace with the corresponding choice general options
-    choices = [
-        # Choice 1: if the contract name contains 'Per Policy XOL',
-        # then replace the entire program column with 'Per Policy XOL'
-        'Per Policy XOL'
-        
-        # Choice 2: if the contract name contains 'WC Catastrophe Excess of Loss',
-        # then replace the entire program column with 'Per Occurrence Cat XOL'
-        , 'Per Occurrence Cat XOL'
-        ]
-
-    # now use the np.select function to recode the program column, but 
-    # only if the program column is blank (this is why we did the recoding before)
-    contract['program'] = (
-        contract['program']
-        .where(
-            contract['program'].notna()
-            , other=np.select(cond, choices, '')
-        )
-    )
-
-    # trigger is one of three values: RA, LO, or LD, which stand for
-    # "Risks Attaching", "Losses Occurring", and "Losses Discovered"
-    # this section uses the all4hierarchy function to recode the trigger column
-    # so that it is consistent
-    contract['trigger_long'] = all4hierarchy(ds=contract.trigger_ds, lc=contract.treaty_basis_lc
-
-        # this line defines that the trigger equals "Risks Attaching"
-        # if the contract name is "Freddie Mac"
-        , air=contract.trigger_ds.mask(
-            contract.contract_name.eq('Freddie Mac'), other='Risks Attaching'
-            )
-
-            , sap=contract.trigger_ds)
-
-    # recode the trigger column so that NA values are replaced with the treaty basis
-    # from the loss cost DB
-    contract['trigger_long'] = (
-        contract['trigger_long']
-        .where(
-            contract['trigger_long'].notna()
-            , other=contract.treaty_basis_lc
-        )
-    )
-
-    # define a `trigger` column that is the same as the `trigger_long` column,
-    # but with the values recoded to RA, LO, or LD
-    contract['trigger'] = contract['trigger_long'].map(
-        {'Risks Attaching': 'RA', 'Losses Occurring': 'LO', 'Losses Discovered': 'LD'}
-    )
-
-    # treaty category 
-    contract['treaty_category'] = contract['treaty_category_ds'].mask(
-        contract['treaty_category_ds'].isna(), other='Missing')
-
-    # currency
-    contract['currency'] = all4hierarchy(
-        ds=contract.currency_ds, lc=contract.currency_lc, air=contract.currency_air, sap=contract.currency_ds)
-
-    # create something if contract name is missing
-    temp_name = (
-        # start with the line, eff_date, and program columns
-        contract['line program eff_date'.split()]
-        
-        # join them together with a space after converting the final column to
-        # the year instead of the full date
-        .apply(lambda x: '{} {} {}'.format(x[0], x[1], x[2].year), axis=1)
-    )
-
-    # replace missing contract names with the temp_name
-    contract['contract_name'] = (
-        contract.contract_name
-        
-        # use the `mask` function to replace contract names 'temp' with the
-        # actual value defined as `temp_name`
-        .mask(contract.contract_name.eq('temp'), other=temp_name)
-        
-        # use the `mask` function to replace contract names ' ' with the
-        # actual value defined as `temp_name`
-        .mask(contract.contract_name.eq(' '), other=temp_name)
-
-        # otherwise, just use the contract name
-    )
-
-
-    # territory
-    contract['territory'] = all4hierarchy(
-        ds=contract.terr_ds, lc=contract.region_lc, air=contract.region_air, sap=contract.terr_ds)
-
-    # replace missing values with 'Missing' so that they can be grouped together
-    # or filtered out, etc
-    contract['territory'] = contract['territory'].mask(
-        contract['territory'].eq(0), other='Missing')
-
-    # broker
-    contract['broker'] = all4hierarchy(
-        ds=contract.broker_ds, lc=contract.broker_air, air=contract.broker_ds, sap=contract.broker_ds)
-    
-    # replace missing values with 'Missing' so that they can be grouped together
-    # or filtered out, etc
-    contract['broker'] = contract['broker'].mask(
-        contract['broker'].eq(0), other='Missing')
-
-    # last updated date
-    # replace missing values with 1/1/1900, so that they can be grouped together
-    # or filtered out, etc
-    contract['last_updated_lc'] = contract['last_updated_lc'].mask(
-        contract['last_updated_lc'].isna(), other=datetime.datetime.fromisoformat('1990-01-01'))
-    contract['last_updated_ds'] = contract['last_updated_ds'].mask(
-        contract['last_updated_ds'].isna(), other=datetime.datetime.fromisoformat('1990-01-01'))
-    contract['last_updated_air'] = contract['last_updated_air'].mask(
-        contract['last_updated_air'].isna(), other=datetime.datetime.fromisoformat('1990-01-01'))
-
-    # max of the 3 `last_updated` columns:
-    # should work like this, but faster:
-    # contract['last_updated'] = contract['last_updated_lc last_updated_ds last_updated_air'.split(
-    # )].apply(lambda x: max(x[0], x[1], x[2]), axis=1)
-
-    # first try to use the loss cost last updated date,
-    # then the DS last updated date, then the AIR last updated date
-    contract['last_updated'] = contract['last_updated_lc'].mask(
-        contract['last_updated_lc'] > contract['last_updated_ds'], other=contract['last_updated_ds'])
-    contract['last_updated'] = contract['last_updated'].mask(
-        contract['last_updated'] > contract['last_updated_air'], other=contract['last_updated_air'])
-
-
-    # drop out all ceded_retro contracts
-    contract = contract.copy().query('treaty_category_ds != "Ceded Retrocession"')
-
-    # return sorted contract table with only the columns we want
-    contract = contract[['timestamp',
-                         'crm_gp_id', 'crm_id', 'eff_date', 'exp_date',
-
-                         'client_name',
-                         # 'client_name_ds', 'client_name_air', 'account_lc','reassured_ds',
-
-                         'line',
-                         # 'mrl_lc','line_ds','crm_id_mrl',
-                         'subline_ds',
-
-                         'contract_name',
-                         # 'account_desc_lc','contract_name_ds',
-
-                         'program',
-                         # 'contract_type_ds', 'program_lc','program_air',
-
-                         'trigger', 'trigger_long',
-                         # 'trigger_ds','treaty_basis_lc',
-
-                         'alae_basis_lc',
-                         'dominant_type_ds',
-
-                         'treaty_category',
-                         # 'treaty_category_ds',
-
-                         # 'nature_of_treaty_sap',
-                         # 'mga_ds',
-
-                         'broker',
-                         # 'broker_ds','broker_air',
-                         # 'broker_numb_ds',
-
-                         'cyber_agg_limit_ds', 'cyber_exposure_ds',
-                         # 'uw_for_treaty_sap',
-                         # 'acct_freq_numb_sap','acct_level_sap',
-
-                         'territory',
-                         # 'terr_ds','region_lc','region_air',
-                         # 'exposure_terr_sap',
-                         # 'business_type_numb_sap',
-                         # 'cancel_date_sap','cancel_type_sap',
-                         # 'peril_sap',
-                         # 'loss_eval_date_lc',
-                         'status_lc', 'status_ds', 'status_air',
-                         # 'cat_model_version_lc',
-                         'user_id_lc', 'user_name_air',
-
-                         'last_updated',
-                         'last_updated_ds', 'last_updated_lc', 'last_updated_air',
-
-                         'currency',
-                         # 'currency_ds','currency_lc','currency_air',
-
-                         'source_file_ds', 'source_file_lc',
-                         'share_point_file_ds', 'file_location_air',
-
-                         # 'note_lc','note_ds','note_air',
-
-                         'ult_cre_prem_ds', 'deposit_prem_ds',
-                         'expected_loss_ds', 'model_expected_loss_ds',
-                         'expense_ratio_ds',
-                         'tech_uw_ratio_ds', 'uw_profit_ds', 'npv_uw_profit_ds', 'roe_change_ds',
-                         'standalone_tvar_250_ds', 'standalone_roc_250_ds', 'diversified_tvar_250_ds', 'diversified_roc_250_ds', 'loss_cv_ds',
-                         'chg_rate_adequacy_ds', 'rate_change_ds', 'program_rate_change_ds',
-                         # 'company_id_ds','annual_values_ds','company_code_sap','end_of_acct_year_sap','specific_numb_retro_allowed_sap',
-                         'executive_summary_air'
-                         ]]
-    ################################################################################################################################################################ MAYBE CHECK THIS
-    ################################################################################################################################################################ MAYBE CHECK THIS
-    ################################################################################################################################################################ MAYBE CHECK THIS
-    contract.query('crm_id != "M0"', inplace=True)
-
-    return (contract)
-
-    ### NOW, after going through that entire process to clean the contract table,
-    ### we can do almost the exact same thing to clean the layer terms table
-    ### of course, we will not be able to reuse almost any of the code, but
-    ### it's good to keep in mind that this is the same general process 
-
-
-def cinre_lc_layers(lc_conn : pyodbc.Connection, earliest_eff_date : datetime.date = datetime.date.fromisoformat('2020-01-01')):
-    """
-    # Description:
-        Read in the layer terms table from the loss cost DB
-    # Parameters:
-        lc_conn: pyodbc.Connection object
-            connection to the loss cost DB
-        earliest_eff_date: datetime.date object
-            earliest effective date to include in the table
-            Default: 2020-01-01
-    # Returns:
-        layer_lc: pandas.DataFrame
-    """
-    # print 
-    print('reading layer terms table from loss cost DB')
-
-    # read in table
-    layer_lc = readtbl('LayerTerms', lc_conn)
-
-    # need contract table for filtering out effective dates
-    contract = cinre_lc_contract(lc_conn)
-
-
-    # change column names
-    layer_lc_curcols = ['CrmGroupID', 'CrmID', 'Layer', 'SubjectPremium', 'RiskLimit', 'RiskRetention', 'OccLimit', 'ReinstStrg', 'Aad', 'AggLimit', 'LossCorrStart', 'LossCorrStop', 'Brokerage', 'RpBrokerage', 'Rate', 'SwingMinRate', 'SwingMaxRate', 'SwingLoad', 'UlaeRatio', 'ProfitComm', 'MaxPc', 'ReinsExpLoad', 'Comm', 'SsLrMin', 'SsSlide1', 'SsLrMid', 'SsSlide2', 'SsLrMax', 'ReinsPremium100', 'NonCatAvgLossAlae', 'MdlCatAvgLossAlae', 'MdlHuEqCatAvgLossAlae', 'MdlAOCatAvgLossAlae', 'NmdCatAvgLossAlae', 'RawNonCatCV', 'NonCatParmRisk', 'NonCatCV', 'RawNmdCatCV',
-                        'NmdCatParmRisk', 'NmdCatCV', 'InterestRate', 'Bound', 'AuthorizedShare', 'FotRate', 'QuoteRate', 'SignedShare', 'CreProPrem', 'CreDepPrem', 'CreUltPrem', 'CreCedComm', 'CreBrokExp', 'CreAoExp', 'CreUw', 'CreNpvUw', 'ClashType', 'ClashCoverage', 'CyberSublimit', 'TerrorCoverage', 'TerrorSublimit', 'CatCoverageType', 'CatExperienceLoad', 'CyberCoverage', 'Placement', 'EcoXpl', 'DJ', 'TrapValExpLim', 'MarginalTvar50', 'MarginalTvar250', 'LayerMinCapital', 'CurrencyByLayer', 'TotCasAggLim', 'PricingType', 'OccRet', 'GrNetAggRet', 'GrNetAggLim', 'Maol']
-    layer_lc_newcols = ['crm_gp_id', 'crm_id', 'layer', 'subject_premium', 'risk_limit', 'risk_retention', 'occ_limit', 'reinstatement_string', 'aad', 'agg_limit', 'loss_corr_start', 'loss_corr_stop', 'brokerage', 'rp_brokerage', 'rate', 'swing_min_rate', 'swing_max_rate', 'swing_load', 'ulae_ratio', 'profit_comm', 'max_pc', 'reins_exp_load', 'comm', 'ss_lr_min', 'ss_slide1', 'ss_lr_mid', 'ss_slide2', 'ss_lr_max', 'reins_premium_100', 'non_cat_ave_loss_alae', 'mdl_cat_ave_loss_alae', 'mdl_hu_eq_cat_ave_loss_alae', 'mdl_ao_cat_ave_loss_alae', 'nmd_cat_ave_loss_alae', 'raw_non_cat_cv', 'non_cat_param_risk', 'non_cat_cv', 'raw_nmd_cat_cv',
-                        'nmd_cat_param_risk', 'nmd_cat_cv', 'interest_rate', 'bound', 'authorized_share', 'fot_rate', 'quote_rate', 'signed_share', 'cre_pro_prem', 'cre_deposit_prem', 'cre_ult_prem', 'cre_ceded_comm', 'cre_brok_exp', 'cre_ao_exp', 'cre_uw', 'cre_npv_uw', 'clash_type', 'clash_coverage', 'cyber_sublimit', 'terror_coverage', 'terror_sublimit', 'cat_coverage_type', 'cat_experience_load', 'cyber_coverage', 'placement', 'eco_x_pl', 'dj', 'trap_val_exp_lim', 'marginal_tvar_50', 'marginal_tvar_250', 'layer_min_capital', 'currency_by_layer', 'tot_cas_agg_lim', 'pricing_type', 'occ_ret', 'gr_net_agg_ret', 'gr_net_agg_lim', 'maol']
-    layer_lc.rename(columns=dict(
-        zip(layer_lc_curcols, [c + '_lc' for c in layer_lc_newcols])), inplace=True)
-
-    # inception dates 2020 & later
-    layer_lc = layer_lc.loc[layer_lc['crm_id_lc'].isin(
-        contract.crm_id_lc.drop_duplicates().tolist()), :].reset_index(drop=True)
-
-    # recode character cols to categories
-    # for col in ['crm_id_lc','reinstatement_string_lc','clash_type_lc','clash_coverage_lc','terror_coverage_lc','cat_coverage_type_lc','cyber_coverage_lc','eco_x_pl_lc','dj_lc','currency_by_layer_lc','pricing_type_lc','gr_net_agg_ret_lc','gr_net_agg_lim_lc']:
-    # layer_lc[col] = layer_lc[col].astype('category')
-
-    # recode layer_lc so can join
-    layer_lc['layer_lc'] = layer_lc['layer_lc'].astype('float')
-
-    # GET EFF DATE FOR JOIN
-    layer_lc = (
-        layer_lc
-        .merge(
-            contract['crm_gp_id_lc crm_id_lc eff_date_lc exp_date_lc'.split()],
-            how='left',
-            on='crm_gp_id_lc crm_id_lc'.split()
-        )
-    )
-
-    # return table
-    return (layer_lc)
-
-
-def cinre_ds_layers(ds_conn : pyodbc.Connection, earliest_eff_date : str = '2020-01-01') -> pd.DataFrame:
-    """
-    # Description
-        Read in layer table from deal sheet DB
-
-    # Parameters
-    ds_conn: pyodbc.Connection
-        connection to deal sheet DB
-    earliest_eff_date: str
-        earliest effective date to include in layer table
-        must be in format 'YYYY-MM-DD'
-        default is '2020-01-01'
-
-    # Returns
-    layer_ds: pandas.DataFrame
-        layer table from deal sheet DB
-    """
-
-    print('reading layer table from deal sheet DB')
-    
-    # read in layer table from deal sheet DB
-    layer_ds = readtbl(ds_conn, 'Layer')
-
-    # get contract table as well with a few key columns
-    contract = cinre_dealsheet_contract(ds_conn)['crm_gp_id_ds', 'crm_id_ds', 'eff_date_ds', 'exp_date_ds',
-                                                'expense_ratio_ds', 'tech_uw_ratio_ds', 'ult_cre_prem_ds'].drop_duplicates()
-
-    # rename columns to match layer_lc but include a suffix
-    contract.rename(
-        columns=dict(
-            expense_ratio_ds='expense_ratio_ds_contract',
-            tech_uw_ratio_ds='tech_uw_ratio_ds_contract',
-            ult_cre_prem_ds='ult_cre_prem_ds_contract'
-        ), 
-        inplace=True
-    )
-
-    # recode datetime columns
-    for c in 'Inception Expiration'.split():
-        layer_ds[c] = pd.to_datetime(layer_ds[c])
-
-    # change column names
-    layer_ds_curcols = ['CinReId', 'LayerID', 'LayerName', 'NewRenew', 'Inception', 'Expiration', 'SAPTreaty', 'SAPSection', 'ContractType', 'DominantType', 'Territory', 'UWArea', 'Limit', 'Retention', 'Reinstatements', 'MaxPolicyLimit', 'AggLimit', 'AggRetention', 'Currency', 'Trigger', 'ReportRemit', 'ALAE', 'Placement', 'Rate', 'ROL', 'AuthorizedLine',
-                        'SignedLine', 'UltCinRePrem', 'ExpectedLoss', 'TechUWRatio', 'UWProfit', 'NPVUWProfit', 'TVaR250', 'ROE250', 'RateChange', 'DepositPrem', 'CyberExposure', 'CyberAggLimit', 'CatDBLayerID', 'Note', 'MinimumPrem', 'DepPremSchedule', 'LossCostDBLayerID', 'PNOC', 'OrgInception', 'OrgExpiration', 'SubjectPrem', 'SubjectBase', 'Brokerage', 'RPBrokerage']
-    layer_ds_newcols = ['crm_gp_id', 'layer_id', 'layer_name', 'new_renew', 'eff_date', 'exp_date', 'sap_treaty', 'sap_section', 'contract_type', 'dominant_type', 'terr', 'uw_area', 'limit', 'retention', 'reinstatements', 'max_policy_limit', 'agg_limit', 'agg_retention', 'currency', 'trigger', 'report_remit', 'alae', 'placement', 'rate', 'rol', 'authorized_line',
-                        'signed_line', 'ult_cre_prem', 'expected_loss', 'tech_uw_ratio', 'uw_profit', 'npv_uw_profit', 'tvar_250', 'roe_250', 'rate_change', 'deposit_prem', 'cyber_exposure', 'cyber_agg_limit', 'cat_db_layer_id', 'note', 'min_prem', 'dep_prem_schedule', 'cinre_lc_layer_id', 'pnoc', 'org_eff_date', 'org_exp_date', 'subject_prem', 'subject_base', 'brokerage', 'rp_brokerage']
-    layer_ds.rename(columns=dict(
-        zip(layer_ds_curcols, [c + '_ds' for c in layer_ds_newcols])), inplace=True)
-
-    # inception dates later than earliest_eff_date
-    layer_ds = layer_ds.loc[layer_ds['eff_date_ds'] >= datetime.datetime.fromisoformat(earliest_eff_date), :].reset_index(drop=True)
-
-    # join in contract columns
-    layer_ds = layer_ds.merge(
-        contract, how='left', on='crm_gp_id_ds eff_date_ds exp_date_ds exp_date_ds'.split())
-
-    # sort by crm_gp_id
-    layer_ds = layer_ds.sort_values(
-        'crm_gp_id_ds layer_name_ds'.split()).reset_index(drop=True)
-
-    # return table
-    return (layer_ds)
-
-
-def cinre_air_layers(air_conn : pyodbc.Connection, layer_table_name : str, earliest_date : str = '2020-01-01') -> pd.DataFrame:
-    """
-    # Description
-        Read in layer table from AIR DB
-
-    # Parameters
-    air_conn: pyodbc.Connection
-        connection to AIR DB
-    layer_table_name: str
-        name of layer table in AIR DB
-    earliest_date: str
-        earliest effective date to include in layer table
-        must be in format 'YYYY-MM-DD'
-        default is '2020-01-01'
-
-    # Returns
-    layer_air: pandas.DataFrame
-        layer table from AIR DB
-    """
-    # print message
-    print('reading layer table from AIR DB')
-
-    # old/new column names
-    old_layer_cols = ['CRMID', 'CinReID', 'Name', 'Program', 'Inception', 'Expiration', 'Status', 'Broker', 'Region', 'Currency', 'LayerType', 'Rol', 'OccLimit', 'OccRetention', 'Franchise', 'ReinstatementNumber', 'ReinstatementRate', 'ReinstatementStr',
-                      'AggLimit', 'AggRetention', 'Participation', 'Components', 'SharesPriced', 'SharesAuthorized', 'SharesSigned', 'Brokerage', 'RpBrokerage', 'LayerId', 'RppRefRol', 'Comments', 'PricingRegistry', 'CinReGroupID', 'Lc_AppliesAgg', 'Lc_RatioToAgg']
-    new_layer_cols = ['crm_id', 'cre_id', 'name', 'program', 'eff_date', 'exp_date', 'status', 'broker', 'region', 'currency', 'layer_type', 'rol', 'occ_limit', 'occ_retention', 'franchise', 'reinstatement_numb', 'reinstatement_rate', 'reinstatement_str',
-                      'agg_limit', 'agg_retention', 'participation', 'components', 'shares_priced', 'shares_authorized', 'shares_signed', 'brokerage', 'rp_brokerage', 'layer_id', 'rpp_ref_rol', 'comments', 'pricing_registry', 'cre_gp_id', 'lc_applies_agg', 'lc_ratio_to_agg']
-
-    # read table
-    raw_layer_air = readtbl(air_conn, layer_table_name)
-
-    # rename columns
-    raw_layer_air.rename(columns=dict(
-        zip(old_layer_cols, [c+'_air' for c in new_layer_cols])), inplace=True)
-
-    # recode dates to datetime
-    for c in 'eff_date_air exp_date_air'.split():
-        raw_layer_air[c] = pd.to_datetime(raw_layer_air[c])
-
-    # eff_date >= 1/1/2020
-    raw_layer_air = raw_layer_air.loc[raw_layer_air.eff_date_air >=
-                                      datetime.datetime.fromisoformat(earliest_date), :]
-
-    # ensure contracts in line with contracts_air table
-    contract_air = cinre_air_contract(air_conn)
-    air_crmids = contract_air['crm_id_air crm_gp_id_air eff_date_air'.split(
-    )].drop_duplicates()
-
-    # merge the two tables
-    layer_air = raw_layer_air.merge(
-        air_crmids, how='outer', on='crm_id_air eff_date_air'.split())
-
-    # return the table
-    return (layer_air)
-
-
-def raw_layers(
-    lc_conn : pyodbc.Connection,
-    ds_conn : pyodbc.Connection,
-    sap_conn : pyodbc.Connection,
-    air_conn : pyodbc.Connection,
-    layer_table_name : str,
-    earliest_eff_date : str = '2020-01-01'
-    ) -> pd.DataFrame:
-    """
-    # Description
-        Read in layer table from all 4 databases
-
-    # Parameters
-    lc_conn: pyodbc.Connection
-        connection to LC DB
-    ds_conn: pyodbc.Connection
-        connection to DS DB
-    sap_conn: pyodbc.Connection
-        connection to SAP DB
-    air_conn: pyodbc.Connection 
-        connection to AIR DB
-    layer_table_name: str
-        name of layer table in AIR DB
-    earliest_eff_date: str
-        earliest effective date to include in layer table
-        must be in format 'YYYY-MM-DD'
-        default is '2020-01-01'
-
-    # Returns
-    layer: pandas.DataFrame
-        layer table from all 4 databases
-    """
-    # build indiviual tables
-    layer_lc = cinre_lc_layers(lc_conn)
-    layer_ds = cinre_ds_layers(ds_conn)
-    layer_air = cinre_air_layers(air_conn, layer_table_name, earliest_eff_date)
-
-    print("joining layer tables")
-    # merge together
-    layer = (
-        # start with loss cost table
-        layer_lc
-
-        # merge in ds table
-        .merge(
-            layer_ds,
-            how='outer',
-            left_on='crm_gp_id_lc layer_lc eff_date_lc'.split(),
-            right_on='crm_gp_id_ds layer_id_ds eff_date_ds'.split()
-            )
-
-        # merge in air table
-        .merge(
-            layer_air,
-            how='outer',
-            left_on='crm_gp_id_ds cinre_lc_layer_id_ds eff_date_ds'.split(),
-            right_on='crm_gp_id_air layer_id_air eff_date_air'.split()
-            )
-        )
-
-    print('updating layer table columns')
-    # add timestamp
-    layer['timestamp'] = build_timestamp()
-
-    # crm_gp_id
-    layer['crm_gp_id'] = all4hierarchy(
-        ds=layer.crm_gp_id_ds, lc=layer.crm_gp_id_lc, air=layer.crm_gp_id_air, sap=layer.crm_gp_id_ds)
-
-    # crm_id
-    layer['crm_id'] = all4hierarchy(
-        ds=layer.crm_id_ds, lc=layer.crm_id_lc, air=layer.crm_id_air, sap=layer.crm_id_ds)
-
-    # layer_id
-    layer['layer_id'] = all4hierarchy(
-        ds=layer.layer_id_ds, lc=layer.cinre_lc_layer_id_ds, air=layer.layer_lc, sap=layer.layer_id_air)
-
-    # eff_date
-    layer['eff_date'] = all4hierarchy(
-        ds=layer.eff_date_ds, lc=layer.eff_date_lc, air=layer.eff_date_air, sap=layer.eff_date_ds)
-
-    # exp_date
-    layer['exp_date'] = all4hierarchy(
-        ds=layer.exp_date_ds, lc=layer.exp_date_lc, air=layer.exp_date_air, sap=layer.exp_date_ds)
-
-    # make date cols datetime
-    for c in 'eff_date exp_date'.split():
-        layer[c] = pd.to_datetime(layer[c])
-
-    # occ_limit
-    layer['occ_limit'] = all4hierarchy(
-        ds=layer.occ_limit_lc, lc=layer.occ_limit_air, air=layer.occ_limit_lc, sap=layer.occ_limit_lc)
-
-    # occ_retention
-    layer['occ_retention'] = all4hierarchy(
-        ds=layer.occ_ret_lc, lc=layer.occ_retention_air, air=layer.occ_ret_lc, sap=layer.occ_ret_lc)
-
-    # risk limit
-    layer['risk_limit'] = all4hierarchy(
-        ds=layer.limit_ds, lc=layer.risk_limit_lc, air=layer.limit_ds, sap=layer.limit_ds)
-    layer['risk_limit'] = layer['risk_limit'].mask(
-        layer['risk_limit'].eq(0), other=layer['risk_limit_lc'])
-
-    # agg limit
-    layer['agg_limit'] = all4hierarchy(
-        ds=layer.agg_limit_ds, lc=layer.agg_limit_lc, air=layer.agg_limit_air, sap=layer.agg_limit_ds)
-
-    # agg retention
-    layer['agg_retention'] = all4hierarchy(
-        ds=layer.agg_retention_ds, lc=layer.aad_lc, air=layer.agg_retention_air, sap=layer.agg_retention_ds)
-
-    # risk retention
-    layer['risk_retention'] = all4hierarchy(
-        ds=layer.retention_ds, lc=layer.risk_retention_lc, air=layer.retention_ds, sap=layer.retention_ds)
-
-    # brokerage
-    layer['brokerage'] = all4hierarchy(
-        ds=layer.brokerage_ds, lc=layer.brokerage_lc, air=layer.brokerage_air, sap=layer.brokerage_ds)
-
-    # rp brokerage
-    layer['rp_brokerage'] = all4hierarchy(
-        ds=layer.rp_brokerage_ds, lc=layer.rp_brokerage_lc, air=layer.rp_brokerage_air, sap=layer.rp_brokerage_ds)
-
-    # reinstatement_string
-    layer['reinstatement_string'] = all4hierarchy(
-        ds=layer.reinstatements_ds, lc=layer.reinstatement_string_lc, air=layer.reinstatement_str_air, sap=layer.reinstatements_ds)
-
-    # subject prem
-    layer['subject_prem'] = all4hierarchy(
-        ds=layer.subject_prem_ds, lc=layer.subject_premium_lc, air=layer.subject_prem_ds, sap=layer.subject_prem_ds)
-
-    # deposit_prem
-    layer['deposit_prem'] = all4hierarchy(
-        ds=layer.deposit_prem_ds, lc=layer.cre_deposit_prem_lc, air=layer.deposit_prem_ds, sap=layer.deposit_prem_ds)
-
-    # ultimate_prem
-    layer['ultimate_prem'] = all4hierarchy(
-        ds=layer.ult_cre_prem_ds, lc=layer.cre_ult_prem_lc, air=layer.ult_cre_prem_ds, sap=layer.ult_cre_prem_ds)
-
-    # ult prem for contract
-    prem = layer['crm_id eff_date ultimate_prem'.split()].groupby('crm_id eff_date'.split(
-    ), observed=False).sum().reset_index().rename(columns=dict(ultimate_prem='ultimate_prem_contract'))
-    layer = layer.merge(prem, how='left', on='crm_id eff_date'.split())
-
-    # uw profit
-    layer['uw_profit'] = all4hierarchy(
-        ds=layer.uw_profit_ds, lc=layer.cre_uw_lc, air=layer.uw_profit_ds, sap=layer.uw_profit_ds)
-
-    # npv uw profit
-    layer['npv_uw_profit'] = all4hierarchy(
-        ds=layer.npv_uw_profit_ds, lc=layer.cre_npv_uw_lc, air=layer.npv_uw_profit_ds, sap=layer.npv_uw_profit_ds)
-
-    # authorized share
-    layer['authorized_share'] = all4hierarchy(
-        ds=layer.authorized_line_ds, lc=layer.authorized_share_lc, air=layer.shares_authorized_air, sap=layer.authorized_line_ds)
-
-    # signed share
-    layer['signed_share'] = all4hierarchy(
-        ds=layer.signed_line_ds, lc=layer.signed_share_lc, air=layer.shares_signed_air, sap=layer.signed_line_ds)
-
-    # rate
-    layer['rate'] = all4hierarchy(
-        ds=layer.rate_ds, lc=layer.rate_lc, air=layer.rate_ds, sap=layer.rate_ds)
-
-    # rol
-    layer['rol'] = all4hierarchy(
-        ds=layer.rol_ds, lc=layer.rol_air, air=layer.rol_ds, sap=layer.rol_ds)
-
-    # placement
-    layer['placement'] = all4hierarchy(
-        ds=layer.placement_ds, lc=layer.placement_lc, air=layer.placement_ds, sap=layer.placement_ds)
-
-    # expected loss
-    layer['calc_exp_loss'] = layer.non_cat_ave_loss_alae_lc + \
-        layer.mdl_cat_ave_loss_alae_lc + layer.nmd_cat_ave_loss_alae_lc
-    layer['expected_loss'] = all4hierarchy(
-        ds=layer.expected_loss_ds, lc=layer.calc_exp_loss, air=layer.expected_loss_ds, sap=layer.expected_loss_ds)
-
-    # expected loss for contract
-    prem = layer['crm_id eff_date expected_loss'.split()].groupby('crm_id eff_date'.split(
-    ), observed=False).sum().reset_index().rename(columns=dict(expected_loss='expected_loss_contract'))
-    layer = layer.merge(prem, how='left', on='crm_id eff_date'.split())
-
-    # pricing lr
-    layer['expected_loss_ratio'] = layer.expected_loss / layer.ultimate_prem
-    layer['expected_loss_ratio_contract'] = layer.expected_loss_contract / \
-        layer.ultimate_prem_contract
-
-    # calc expense
-    layer['calc_expense'] = layer.ultimate_prem - \
-        layer.expected_loss - layer.uw_profit
-    layer['calc_expense_ratio1'] = layer.calc_expense / \
-        layer.ultimate_prem - layer.profit_comm_lc
-    layer['calc_expense_ratio2'] = layer.brokerage + layer.comm_lc
-
-    layer['expense_ratio'] = layer.calc_expense_ratio2.where(
-        layer.calc_expense_ratio2.ne(0), other=layer.calc_expense_ratio1)
-
-    # broker dollars
-    layer['broker_dollars'] = layer.ultimate_prem * layer.brokerage
-
-    # cyber limit
-    layer['cyber_limit'] = all4hierarchy(
-        ds=layer.cyber_agg_limit_ds, lc=layer.cyber_sublimit_lc, air=layer.cyber_agg_limit_ds, sap=layer.cyber_agg_limit_ds)
-
-    layer['cre_ao_ratio'] = (
-        layer.cre_ao_exp_lc / layer.ultimate_prem).where(layer.ultimate_prem.ne(0), other=0)
-
-    # cyber exposure
-    layer['cyber_coverage'] = layer.cyber_exposure_ds.mask(
-        layer.cyber_exposure_ds.isna(), other=layer.cyber_coverage_lc)
-
-    # sort table columns
-    col_ord = ['timestamp',
-               'crm_gp_id', 'crm_id', 'layer_id', 'layer_name_ds',
-
-               'eff_date', 'exp_date',
-               'sap_treaty_ds', 'sap_section_ds',
-
-               # 'max_policy_limit_ds',
-
-               'risk_retention',
-               # 'retention_ds','risk_retention_lc',
-
-               'risk_limit',
-               # 'limit_ds','risk_limit_lc',
-
-               'occ_retention',
-               # 'occ_ret_lc','occ_retention_air',
-
-               'occ_limit',
-               # 'occ_limit_lc', 'occ_limit_air',
-
-               'agg_retention',
-               # 'aad_lc','agg_retention_ds', 'agg_retention_air',
-
-               'agg_limit',
-               # 'agg_limit_lc', 'agg_limit_ds', 'agg_limit_air',
-               # 'quote_rate_lc',
-
-               'rate',
-               # 'rate_lc', 'rate_ds',
-               # 'fot_rate_lc',
-               # 'rate_change_ds',
-
-               'rol',
-               # 'rol_ds', 'rol_air',
-
-               'reinstatement_string',
-               # 'reinstatements_ds', 'reinstatement_numb_air','reinstatement_rate_air',
-               # 'reinstatement_string_lc', 'reinstatement_str_air',
-               # 'rp_brokerage',
-               # 'rp_brokerage_lc', 'rp_brokerage_ds', 'rp_brokerage_air',
-               # 'alae_ds',
-               # 'max_pc_lc',
-               # 'reins_exp_load_lc',
-               # 'reins_premium_100_lc',
-               # 'dep_prem_schedule_ds',
-
-               'subject_prem',
-               # 'subject_premium_lc','subject_prem_ds',
-               # 'subject_base_ds',
-               # 'min_prem_ds',
-               # 'cre_pro_prem_lc',
-
-               'deposit_prem',
-               # 'cre_deposit_prem_lc','deposit_prem_ds',
-               # 'broker_dollars',
-
-               'ultimate_prem',
-               'ultimate_prem_contract',
-               # 'ult_cre_prem_ds_contract',
-               # 'cre_ult_prem_lc', 'ult_cre_prem_ds',
-
-               'tech_uw_ratio_ds',
-               # 'tech_uw_ratio_ds_contract',
-
-               'brokerage',
-               # 'brokerage_lc','brokerage_ds','brokerage_air','cre_brok_exp_lc',
-
-               'comm_lc',
-               # 'cre_ceded_comm_lc',
-
-               'cre_ao_ratio', 'profit_comm_lc',
-
-               'ulae_ratio_lc',
-
-               # 'expense_ratio_ds_contract',
-               # 'calc_expense_ratio','calc_expense',
-               'expense_ratio',
-               'expected_loss_ratio', 'expected_loss_ratio_contract',
-               # 'expected_loss','expected_loss_contract',
-               # 'expected_loss_ds', 'calc_exp_loss',
-               # 'non_cat_ave_loss_alae_lc','mdl_cat_ave_loss_alae_lc','nmd_cat_ave_loss_alae_lc',
-               # 'mdl_hu_eq_cat_ave_loss_alae_lc',
-               # 'mdl_ao_cat_ave_loss_alae_lc',
-
-               # 'cre_ao_exp_lc',
-
-               'uw_profit',
-               # 'cre_uw_lc','uw_profit_ds',
-
-               'npv_uw_profit',
-               # 'cre_npv_uw_lc','npv_uw_profit_ds',
-
-               'clash_type_lc', 'clash_coverage_lc',
-
-               'cyber_limit',
-               # 'cyber_sublimit_lc', 'cyber_agg_limit_ds',
-
-               'cyber_coverage',
-               # 'cyber_coverage_lc', 'cyber_exposure_ds',
-
-               'terror_coverage_lc', 'terror_sublimit_lc',
-
-               'cat_coverage_type_lc', 'cat_experience_load_lc',
-
-               'placement',
-               # 'placement_lc', 'placement_ds',
-               'eco_x_pl_lc',
-               'dj_lc',
-               'trap_val_exp_lim_lc',
-
-               # 'roe_250_ds',
-               # 'marginal_tvar_50_lc',
-               # 'marginal_tvar_250_lc',
-               # 'tvar_250_ds',
-
-               # 'layer_min_capital_lc',
-
-               'tot_cas_agg_lim_lc',
-               'pricing_type_lc',
-
-               'gr_net_agg_ret_lc', 'gr_net_agg_lim_lc',
-
-               'maol_lc',
-
-               # 'shares_priced_air',
-
-               'authorized_share',
-               # 'authorized_share_lc','authorized_line_ds','shares_authorized_air',
-
-               'signed_share',
-               # 'signed_share_lc','signed_line_ds','shares_signed_air',
-
-               'pnoc_ds',
-
-               'franchise_air',
-
-               'ss_lr_min_lc', 'ss_slide1_lc', 'ss_lr_mid_lc', 'ss_slide2_lc', 'ss_lr_max_lc',
-
-               'loss_corr_start_lc', 'loss_corr_stop_lc',
-
-               'swing_min_rate_lc', 'swing_max_rate_lc', 'swing_load_lc',
-
-               'raw_non_cat_cv_lc', 'non_cat_param_risk_lc', 'non_cat_cv_lc', 'raw_nmd_cat_cv_lc', 'nmd_cat_param_risk_lc', 'nmd_cat_cv_lc',
-
-               'participation_air',
-               # 'components_air',
-
-               'rpp_ref_rol_air',
-
-               'pricing_registry_air',
-               'lc_applies_agg_air',
-               'lc_ratio_to_agg_air'
-               ]
-
-    # get the layer data, ordered as abovev
-    layer = layer[col_ord]
-
-    # rename the columns to include the layer suffix
-    layer.rename(columns=dict(zip(layer.columns.tolist(), [
-                 c + '_layer' for c in layer.columns.tolist()])), inplace=True)
-
-    # except for a few columns that are not layer specific, or that do not need the suffix
-    layer.rename(columns=dict(zip('crm_gp_id_layer crm_id_layer eff_date_layer exp_date_layer layer_id_layer'.split(
-    ), 'crm_gp_id crm_id eff_date exp_date layer_id'.split())), inplace=True)
-
-    # add in the number of layers for each contract
-    layer = layer.merge(
-        # merge this calculation back in:
-        (
-            # count the number of layers for each contract
-            layer['crm_gp_id crm_id eff_date exp_date layer_id'.split()]
-            .drop_duplicates()
-            
-            # group by contract (key is crm_gp_id crm_id eff_date exp_date)
-            .groupby('crm_gp_id crm_id eff_date exp_date'.split(), observed=False)
-            
-            # count the number of unique layer ids
-            .count()
-
-            # reset the index
-            .reset_index()
-
-            # rename the layer_id column to layer_count
-            .rename(columns=dict(layer_id='layer_count'))
-
-         ),
-         
-         # merge on the key, which is crm_gp_id crm_id eff_date exp_date
-         how='left', on='crm_gp_id crm_id eff_date exp_date'.split()
-    )
-
-    # if layer name is missing, add it in
-    layer['layer_name_default'] = (
-        layer.layer_id
-
-        # if layer id is missing, the assumption is that there is only one layer
-        # and so the layer name is layer 1. if layer id is not missing, we take the
-        # layer id and add layer to it to get the layer name
-        .apply(lambda x: 'Layer 1' if np.isnan(x) else 'Layer ' + str(int(x)))
-    )
-
-    # this is what we will use if the layer name is missing
-    layer['layer_name_missing'] = ""
-
-    # boolean to indicate if the layer name exists, which is true if there is more
-    # than one layer
-    layer['layer_name_exists'] = layer.layer_count.gt(1)
-
-    # also need to know if the layer name exists in the ds layer table
-    layer['layer_ds_name_exists'] = layer.layer_name_ds_layer.notna()
-
-    # if the layer name exists in the ds layer table, then we use that
-    layer['layer_name'] = (
-        layer.layer_name_ds_layer.where(
-            layer.layer_name_ds_layer.notna(),
-    
-            # otherwise, we use the default layer name that we calculated above
-            other=layer.layer_name_default.where(
-                layer.layer_name_exists,
-                
-                # if this default name does not exist, then we use the
-                # "missing" name
-                other=layer.layer_name_missing
-            )
-        )
-    )
-
-    # remove essent completely from the layer table
-    layer = layer.query("layer_name_ds_layer!='Essent'")
-
-    # return total layer table
-    return (layer)
-
-
-def read_sap_tbl(ds_conn : pyodbc.Connection) -> pd.DataFrame:
-    """
-    # Description
-        Read the SAP lookup table from the deal sheet database
-
-    # Parameters
-        ds_conn: pyodbc.Connection
-            Connection to the deal sheet database
-
-    # Returns
-        sap_tbl: pandas.DataFrame
-            SAP lookup table
-    """
-    print('reading SAP lookup')
-    
-    # read the SAP lookup table
-    sap_tbl = readtbl('CRMIDforSAP', ds_conn)
-
-    # rename the columns
-    sap_tbl.rename(columns=dict(zip(
-        sap_tbl.columns.tolist(),
-        'cre_id crm_id eff_date exp_date treaty_category sap_treaty sap_section line'.split())),
-        inplace=True)
-
-    # convert the crm_id to an integer, by removing the leading character
-    # and converting to an integer
-    # this is how the crm_gp_id is calculated
-    sap_tbl['crm_gp_id'] = sap_tbl['crm_id'].apply(lambda x: int(x[1:]))
-
-    # drop the crm_id column
-    sap_tbl.drop('cre_id', 1, inplace=True)
-
-    # convert the dates to datetime
-    for c in 'eff_date exp_date'.split():
-        sap_tbl[c] = pd.to_datetime(sap_tbl[c])
-
-    # rename the columns to include the suffix
-    sap_tbl.rename(columns=dict(zip(sap_tbl.columns.tolist(), [
-                   c + '_crmidforsap' for c in sap_tbl.columns.tolist()])), inplace=True)
-
-    # return the SAP lookup table
-    return (sap_tbl)
-
-
-def join_layer_contract1(lc_conn : pyodbc.Connection, ds_conn : pyodbc.Connection, sap_conn : pyodbc.Connection, air_conn : pyodbc.Connection) -> pd.DataFrame:
-    """
-    # Description
-        Join the layer table to the contract table
-
-    # Parameters
-        lc_conn: pyodbc.Connection
-            Connection to the loss cost database
-        ds_conn: pyodbc.Connection
-            Connection to the deal sheet database
-        sap_conn: pyodbc.Connection
-            Connection to the SAP database
-        air_conn: pyodbc.Connection
-            Connection to the AIR database
-
-    # Returns
-        out: pandas.DataFrame
-            Layer table joined to the contract table
-    """
-    # read the contract & layer tables
-    raw_contract = raw_contracts(lc_conn, ds_conn, sap_conn, air_conn)
-    raw_layer = raw_layers(lc_conn, ds_conn, sap_conn, air_conn)
-
-    # join the contract table to the layer table
-    print('joining the contract table to the layer table')
-    out = raw_layer.merge(raw_contract, how='left',
-                          on='crm_gp_id crm_id eff_date exp_date'.split())
-
-    # calculate the contract term, which is the number of months between the
-    # effective date and the expiration date, plus 1
-    out['contract_term'] = (
-        out['eff_date exp_date'.split()]
-        .apply(
-            # (12 * exp_date.year + exp_date.month) - (12 * eff_date.year - eff_date.month) + 1
-            # this represents an integer number of months between the effective date
-            # and the expiration date, plus 1
-            lambda x: (12*x[1].year + x[1].month) - (12*x[0].year + x[0].month) + 1,
-            axis=1
-        )
-    )
-
-    # use program to assign to reserving analysis line
-    xol_program_list = ['Aggregate XOL', 'Per Claim XOL', 'Per Occurence XOL', 'Per Occurrence Cat XOL',
-                        'Per Occurrence XOL', 'Per Policy XOL', 'Per Risk XOL', 'Risk Aggregate XOL']
-    qs_program_list = ['Cat Quota Share',
-                       'Pro Rata/Quota Share', 'Pro-Rata/Quota Share ']
-    var_qs_program_list = ['Variable Quota Share']
-    cat_program_list = ['Cat Quota Share', 'Per Occurrence Cat XOL', 'Aggregate CAT XOL - Occurrence Exposed',
-                        'Aggregate Cat XOL', 'MY Per Occurrence Cat XOL', 'Per Occurrence Cat XOL Multiyear', 'Per Occurrence Cat XOL Annual']
-    ppr_program_list = ['Risk Aggregate XOL', 'Per Risk XOL']
-    agg_xol_program_list = ['Aggregate XOL', 'Risk Aggregate XOL',
-                            'Aggregate CAT XOL - Occurrence Exposed', 'Aggregate Cat XOL', 'Aggregate XOL (Occurrence Exposed)']
-    surplus_share_program_list = ['Surplus Share']
-
-    # helper columns for the program assignment
-    out['one'], out['zero'] = 1, 0
-
-    # xol_ind
-    # 1 if the program is in the xol_program_list
-    # 0 otherwise
-    out['xol_ind'] = out.one.where(
-        out.program.isin(xol_program_list), other=out.zero)
-
-    # qs_ind
-    # 1 if the program is in the qs_program_list
-    # 0 otherwise
-    out['qs_ind'] = out.one.where(out.program.isin(
-        qs_program_list), other=out.zero).mask(out.placement_layer.lt(1), other=1)
-
-    # cat_ind
-    out['cat_ind'] = out.one.where(
-        out.program.isin(cat_program_list), other=out.zero)
-
-    # ppr_ind
-    out['ppr_ind'] = out.one.where(out.program.isin(
-        ppr_program_list), other=out.zero).where(out.line.eq('Property'), other=out.zero)
-
-    # agg xol ind
-    out['agg_xol_ind'] = out.one.where(
-        out.program.isin(agg_xol_program_list), other=out.zero)
-
-    # surplus share ind
-    out['surplus_share_ind'] = out.one.where(
-        out.program.isin(surplus_share_program_list), other=out.zero)
-
-    # variable qs ind
-    out['var_qs_ind'] = out.one.where(
-        out.program.isin(var_qs_program_list), other=out.zero)
-
-    # transactional ind
-    out['trans_ind'] = out.one.where(
-        out.contract_name.str.lower().str.find('transaction').ne(-1), other=out.zero)
-    # out['trans_ind'] = out.contract_name.apply(lambda x: 0 if x.lower().find('transactional') == -1 else 1)
-
-    # clash ind
-    out['clash_ind'] = out.one.where(np.logical_and(out.line.eq(
-        'Casualty'), out.program.str.lower().eq('clash')), other=out.zero)
-
-    # assign reserving line using the helper columns and np.select
-    cond = [
-        # when all these conditions are true, the line is casualty XOL
-        # eg Casualty NP (non-proportional):
-        # 1. line is casualty
-        # 2. program is in the xol_program_list
-        # 3. this is not a cat program
-        # 4. this is not a qs program
-        # 5. this is not a transactional program
-        np.logical_and(
-            out.line.eq('Casualty'),        # line is casualty
-            np.logical_and(
-                out.xol_ind.eq(1),          # program is in the xol_program_list
-                np.logical_and(
-                    out.cat_ind.eq(0),      # this is not a cat program
-                    np.logical_and(
-                        out.qs_ind.eq(0),   # this is not a qs program
-                        out.trans_ind.eq(0) # this is not a transactional program
-                    )
-                )
-            )
-        ),
-
-        # casualty pr (proportional) is when:
-        # 1. line is casualty
-        # 2. program is in the qs_program_list
-        # 3. this is not a transactional program
-        np.logical_and(
-            out.line.eq('Casualty'),        # line is casualty
-            np.logical_and(
-                out.qs_ind.eq(1),           # program is in the qs_program_list
-                out.trans_ind.eq(0)         # this is not a transactional program
-            )
-        ),
-
-        # ppr (property per risk) is when:
-        # 1. line is property
-        # 2. program is in the ppr_program_list
-        np.logical_and(
-            out.line.eq('Property'),        # line is property
-            out.ppr_ind.eq(1)               # program is in the ppr_program_list
-        ),
-
-        # property cat is when:
-        # 1. line is property
-        # 2. program is in the cat_program_list
-        np.logical_and(
-            out.line.eq('Property'),        # line is property
-            out.cat_ind.eq(1)               # program is in the cat_program_list
-        ),
-
-        # cirt is when:
-        # 1. line is specialty
-        # 2. contract term is greater than or equal to 90 months
-        np.logical_and(
-            out.line.eq('Specialty'),       # line is specialty
-            out.contract_term.ge(90)        # contract term is greater than or equal to 90 months
-        ),
-
-        # other specialty is when:
-        # 1. line is specialty
-        # 2. contract term is less than 90 months
-        np.logical_and(
-            out.line.eq('Specialty'),       # line is specialty
-            out.contract_term.lt(90)        # contract term is less than 90 months
-        ),
-
-        # transactional is when:
-        # 1. line is casualty
-        # 2. program is in the transactional_program_list
-        # 3. contract name is not null
-        np.logical_and(
-            out.line.eq('Casualty'),        # line is casualty
-            np.logical_and(
-                out.trans_ind.eq(1),        # program is in the transactional_program_list
-                out.contract_name.notna()   # contract name is not null
-            )
-        ),
-
-        # other property cat is when:
-        # 1. line is property
-        # 2. program is not in the ppr_program_list
-        # 3. this is a cat program
-        np.logical_and(
-            out.line.eq('Property'),        # line is property
-            np.logical_and(
-                out.ppr_ind.eq(0),          # program is not in the ppr_program_list
-                out.cat_ind.eq(1)           # this is a cat program
-            )
-        ),
-
-        # other property non cat is when:
-        # 1. line is property
-        # 2. program is not in the ppr_program_list
-        # 3. this is not a cat program
-        np.logical_and(
-            out.line.eq('Property'),        # line is property
-            np.logical_and(
-                out.ppr_ind.eq(0),          # program is not in the ppr_program_list
-                out.cat_ind.eq(0)           # this is not a cat program
-            )
-        ),
-
-        # WC cat is when:
-        # 1. line is casualty
-        # 2. program is in the cat_program_list
-        np.logical_and(
-            out.line.eq('Casualty'),    # line is casualty
-            out.cat_ind.eq(1)           # program is in the cat_program_list
-        ),
-
-        # clash is when:
-        # 1. clash ind is 1 (in the clash_program_list)
-        out.clash_ind.eq(1)             # clash ind is 1
-    ]
-
-    # set up reserving line choices that are assigned based on the conditions above, 
-    # in the same order as the conditions above
-    choices = [
-        'casualty_np',
-        'casualty_pr',
-        'property_per_risk',
-        'property_cat',
-        'cirt',
-        'specialty',
-        'transactional',
-        'other_property_cat',
-        'other_property_noncat',
-        'wc_cat',
-        'clash'
-    ]
-
-    # build reserving line column, using the conditions and choices above
-    # and allowing for the possibility that the program is not in any of the lists
-    # in which case the reserving line is 'other'
-    out['reserving_line'] = np.select(cond, choices, 'other')
-
-    # read sap table
-    sap_tbl = read_sap_tbl(ds_conn)
-
-    # join sap table
-    out = (
-        out.merge(
-            sap_tbl.drop('treaty_category_crmidforsap crm_gp_id_crmidforsap'.split(), 1),
-            how='left',
-            left_on='crm_id eff_date exp_date layer_id line'.split(),
-
-            # this is a left join, so we need to specify the right_on columns
-            # these columns are the same as the left_on columns, but with the suffix '_crmidforsap'
-            right_on='crm_id_crmidforsap eff_date_crmidforsap exp_date_crmidforsap sap_section_crmidforsap line_crmidforsap'.split()
-        )
-    )
-
-    # recode sap treaty and sap section numbers
-    out['sap_treaty'] = all4hierarchy(ds=out.sap_treaty_ds_layer, lc=out.sap_treaty_crmidforsap,
-                                      air=out.sap_treaty_ds_layer, sap=out.sap_treaty_ds_layer)
-    out['sap_section'] = all4hierarchy(
-        ds=out.layer_id, lc=out.sap_section_crmidforsap, air=out.layer_id, sap=out.layer_id)
-
-    # qs on deal ind
-    # indicator that tells you whether the deal has qs on it
-    qs_df = (
-        # start with the out table, but only keep the crm_id, eff_date, and qs_ind columns
-        out['crm_id eff_date qs_ind'.split()]
-        
-        # group by crm_id and eff_date (which is the treaty level) and sum qs_ind
-        .groupby('crm_id eff_date'.split(), observed=False)
-        .sum()
-        .reset_index()
-    )
-    
-    # helper columns
-    qs_df['one'], qs_df['zero'] = 1, 0
-
-    # qs on deal ind is 1 if qs_ind is greater than or equal to 1, eg 
-    # the number of qs programs on the deal is greater than or equal to 1
-    qs_df['qs_on_deal_ind'] = (
-        qs_df.one # return 1 when qs_ind is greater than or equal to 1
-        .where(
-            # if qs_ind is greater than or equal to 1
-            qs_df.qs_ind.ge(1),
-            
-            # otherwise return 0
-            other=qs_df.zero
-        )
-    )
-
-    # join qs_on_deal_ind
-    out = out.merge(qs_df.drop('one zero qs_ind'.split(), 1),
-                    how='left', on='crm_id eff_date'.split())
-
-    # return out
-    return (out)
-
-
-def join_layer_contract(lc_conn : pyodbc.Connection,
-                        ds_conn : pyodbc.Connection,
-                        sap_conn : pyodbc.Connection,
-                        air_conn : pyodbc.Connection) -> pd.DataFrame:
-    """
-    # Description
-        Join layer contract table with ds table, sap table, and air table.
-
-    # Parameters
-        lc_conn : pyodbc.Connection
-            Connection to loss cost database.
-        ds_conn : pyodbc.Connection
-            Connection to deal sheet database.
-        sap_conn : pyodbc.Connection
-            Connection to sap database.
-        air_conn : pyodbc.Connection
-            Connection to air database.
-
-    # Returns
-        df : pd.DataFrame
-            Layer contract table with ds table, sap table, and air table joined.
-    """
-    # start with layer contract table
-    df = join_layer_contract1(lc_conn, ds_conn, sap_conn, air_conn)
-
-    # calculate treaty year as the year of the effective date
-    df['treaty_year'] = df.eff_date.dt.year
-
-    # add a filter into broader categories
-    cond = [
-        df.xol_ind.eq(1),               # XOL
-        df.agg_xol_ind.eq(1),           # AGG XOL
-        df.surplus_share_ind.eq(1),     # surplus share
-        df.qs_ind.eq(1),                # quota share
-        df.var_qs_ind.eq(1)             # variable quota share
-    ]
-
-    choices = [
-        'XOL',
-        'AGG XOL',
-        'Surplus Share',
-        'Quota Share',
-        'Variable QS'
-    ]
-
-    # description type column is the mapping of
-    # the above conditions to the above choices
-    df['descr_type'] = np.select(cond, choices, 'other')
-
-    # qs on same deal?
-    cond = [df.qs_on_deal_ind.eq(1), df.qs_on_deal_ind.eq(0)]
-    choices = ['Yes', 'No']
-    df['qs_on_deal'] = np.select(cond, choices)
-
-    # multi layer always = "No"??                       ##################################################################### what is this? why is it always no? ##############################
-    df['multi_layer'] = 'No'
-
-    # recode a few WC CAT treaties to the correct reserving line
-    cond = [
-        # WC CAT is a casualty_pr line, but the 
-        # program is Per Occurrence Cat XOL
-        np.logical_and(
-            df.reserving_line.eq('casualty_pr'),            # reserving line is casualty_pr
-            np.logical_and(
-                df.line.eq('Casualty'),                     # line is casualty
-                df.program.eq('Per Occurrence Cat XOL')     # program is Per Occurrence Cat XOL
-            )
-        )
-    ]
-
-    choices = [
-        'wc_cat'
-    ]
-
-    # reserving line is wc_cat if the above condition is true
-    # otherwise, reserving line is the same as before
-    df['reserving_line'] = np.select(cond, choices, df['reserving_line'])
-
-    # recode missing crm_gp_id's
-    df['crm_gp_id'] = (
-        df['crm_gp_id']
-        .where(
-            df['crm_gp_id'].ne(0),
-            other=df.crm_id.str.lstrip(1).astype(float)))
-    df['crm_gp_id'] = df['crm_gp_id'].where(
-        df['crm_gp_id'].notna(), other=0).astype(int)
-
-    # better contract name & layer name
-    df['contract_layer_name'] = df.client_name.str.strip().str.cat(
-        others=df.contract_name.str.strip(), sep=' - ')
-    df['contract_name2'] = df.contract_layer_name.str.cat(others=df.layer_name.str.strip(
-    ).where(df.layer_name.str.strip().notna(), other=''), sep=' - ')
-
-    # change contract_name
-    df.rename(columns=dict(contract_name='old_contract_name'), inplace=True)
-
-    # reorder columns
-    col_ord = ['timestamp',
-               'reserving_line',
-               'crm_id',
-               'sap_treaty',
-               'sap_section',
-               'contract_layer_name',
-               'contract_name2',
-               'eff_date',
-               'treaty_year',
-               'exp_date',
-               'contract_term',
-               'trigger',
-               'descr_type',
-               'expected_loss_ratio_layer',
-               'expected_loss_ratio_contract_layer',
-               'brokerage_layer',
-               'comm_lc_layer',
-               'expense_ratio_layer',
-               'qs_on_deal',
-               'ultimate_prem_layer',
-               'ultimate_prem_contract_layer',
-               'rate_layer',
-               'signed_share_layer',
-               'risk_limit_layer',
-               'risk_retention_layer',
-
-               'multi_layer',
-
-               'reinstatement_string_layer',
-               'agg_limit_layer',
-               'agg_retention_layer',
-
-               # assumed retrocession?
-
-               'crm_gp_id',
-               'trigger_long',
-
-               'status_lc',
-               'status_ds',
-               'status_air',
-               'source_file_ds',
-               'share_point_file_ds',
-               'source_file_lc',
-               'file_location_air',
-
-               'last_updated',
-               'last_updated_ds',
-
-               'occ_limit_layer',
-               'occ_retention_layer',
-
-               'rol_layer',
-               'placement_layer',
-
-               'line',
-               'subline_ds',
-
-               'program',
-               'client_name',
-               'old_contract_name',
-               'layer_name',
-               'layer_id',
-               'layer_name_ds_layer',
-
-               'subject_prem_layer',
-               'deposit_prem_layer',
-
-               'tech_uw_ratio_ds_layer',
-               'uw_profit_layer',
-               'npv_uw_profit_layer',
-               'cre_ao_ratio_layer',
-               'profit_comm_lc_layer',
-               'ulae_ratio_lc_layer',
-
-               'clash_type_lc_layer',
-               'clash_coverage_lc_layer',
-               'cyber_limit_layer',
-               'cyber_coverage_layer',
-               'cyber_agg_limit_ds',
-               'cyber_exposure_ds',
-               'terror_coverage_lc_layer',
-               'terror_sublimit_lc_layer',
-               'cat_coverage_type_lc_layer',
-               'cat_experience_load_lc_layer',
-
-               'territory',
-               'currency',
-               'treaty_category',
-
-               'broker',
-
-               'executive_summary_air',
-
-               'last_updated_lc',
-               'last_updated_air',
-               'user_id_lc',
-               'user_name_air',
-
-               'eco_x_pl_lc_layer', 'dj_lc_layer',
-               'trap_val_exp_lim_lc_layer',
-               'tot_cas_agg_lim_lc_layer',
-               'pricing_type_lc_layer',
-               'gr_net_agg_ret_lc_layer',
-               'gr_net_agg_lim_lc_layer',
-               'maol_lc_layer',
-               'authorized_share_layer',
-
-               'pnoc_ds_layer',
-               'franchise_air_layer',
-               'ss_lr_min_lc_layer',
-               'ss_slide1_lc_layer',
-               'ss_lr_mid_lc_layer',
-               'ss_slide2_lc_layer',
-               'ss_lr_max_lc_layer',
-               'loss_corr_start_lc_layer',
-               'loss_corr_stop_lc_layer',
-               'swing_min_rate_lc_layer',
-               'swing_max_rate_lc_layer',
-               'swing_load_lc_layer',
-
-               'participation_air_layer',
-               'rpp_ref_rol_air_layer',
-               'pricing_registry_air_layer',
-               'lc_applies_agg_air_layer',
-               'lc_ratio_to_agg_air_layer',
-               'layer_count',
-
-               'alae_basis_lc',
-
-               'roe_change_ds',
-               'standalone_tvar_250_ds',
-               'standalone_roc_250_ds',
-               'diversified_tvar_250_ds',
-               'diversified_roc_250_ds',
-               'loss_cv_ds',
-               'chg_rate_adequacy_ds',
-               'rate_change_ds',
-               'program_rate_change_ds',
-
-               'dominant_type_ds',
-
-               'xol_ind',
-               'qs_ind',
-               'cat_ind',
-               'ppr_ind',
-               'agg_xol_ind',
-               'trans_ind',
-               'clash_ind'
-               ]
-
-    # actual reorder step
-    df = df[col_ord]
-
-    # sort table
-    df.sort_values(
-        'eff_date reserving_line crm_id layer_id'.split(), inplace=True)
-
-    # reset index
-    df.reset_index(drop=True, inplace=True)
-
-    # rename cols
-    old_col = 'ultimate_prem_contract_layer rate_layer signed_share_layer contract_name2'.split()
-    new_col = 'ultimate_prem_contract reinsurance_rate cre_participation contract_name'.split()
-    df.rename(columns=dict(zip(old_col, new_col)), inplace=True)
-
-    print('finished with data pull')
-
-    return (df)
+import pandas as pd
+import numpy as np
+import pyodbc
+import datetime
+import concurrent.futures
+import functools
+
+db_list = ['CINRE_LC', 'CINRE_DealSheet', 'CINRE_SAP',
+           'CINRE_PRICING_AIRv10', 'CorpAct_Reserving']
+
+
+def constr(
+        database_name: str,
+        server_name: str = "Corpsqlhqpcf060\HS1,4911",
+        driver_name: str = "SQL Server", trusted_connection:
+        str = "yes") -> str:
+    """
+    # Description: 
+        Function to build the connection string for the database
+
+    # Parameters:
+        database_name:
+            string, name of the database (e.g. 'CINRE_LC')
+        server_name:
+            string, name of the server (e.g. 'Corpsqlhqpcf060\HS1,4911')
+            default: "Corpsqlhqpcf060\HS1,4911"
+        driver_name:
+            string, name of the driver (e.g. 'SQL Server')
+            default: "SQL Server"
+        trusted_connection:
+            string, name of the trusted connection (e.g. 'yes')
+            default: "yes"
+
+    # Output:
+        connection string for the database
+        of the form:
+
+    # Example:
+        constr('CINRE_LC')
+        > 'Driver={SQL Server};Server=Corpsqlhqpcf060\HS1,4911;
+           Database=CINRE_LC;Trusted_Connection=yes;'
+
+        constr("CorpAct_Reserving", "different_server", "Fake Driver", "no")
+        > 'Driver={Fake Driver};Server=different_server;
+           Database=CorpAct_Reserving;Trusted_Connection=no;'
+    """
+    # return the connection string
+    return (r'Driver={};'r'Server={};'r'Database={};'r'Trusted_Connection={};'
+            .format(driver_name, server_name, database_name, trusted_connection))
+
+
+def connect_to_dbs(*args: str) -> dict():
+    """
+    # Description:
+        Function that takes an arbitrary number of database names and returns
+        a dictionary of connection strings whose keys are the database names and
+        whose values are the connection strings
+
+        If no arguments are passed, the function will use the global variable db_list
+        as the list of databases to connect to
+
+    # Parameters:
+        args:
+            string, name of the database (e.g. 'CINRE_LC')
+
+    # Output:
+        dictionary of connection strings for the databases
+        of the form:
+            {'CINRE_LC': <pyodbc.Connection object at 0x0000020B1B0F0C88>,
+            'CINRE_DealSheet': <pyodbc.Connection object at 0x0000020B1B0F0C88>,
+            'CINRE_SAP': <pyodbc.Connection object at 0x0000020B1B0F0C88>,
+            'CINRE_PRICING_AIRv10': <pyodbc.Connection object at 0x0000020B1B0F0C88>,
+            'CorpAct_Reserving': <pyodbc.Connection object at 0x0000020B1B0F0C88>}
+
+    # Example:
+        connect_to_dbs()
+        > {'CINRE_LC': <pyodbc.Connection object at 0x0000020B1B0F0C88>,
+            'CINRE_DealSheet': <pyodbc.Connection object at 0x0000020B1B0F0C88>,
+            'CINRE_SAP': <pyodbc.Connection object at 0x0000020B1B0F0C88>,
+            'CINRE_PRICING_AIRv10': <pyodbc.Connection object at 0x0000020B1B0F0C88>,
+            'CorpAct_Reserving': <pyodbc.Connection object at 0x0000020B1B0F0C88>}
+
+        connect_to_dbs('CINRE_LC', 'CINRE_DealSheet')
+        > {'CINRE_LC': <pyodbc.Connection object at 0x0000020B1B0F0C88>,
+            'CINRE_DealSheet': <pyodbc.Connection object at 0x0000020B1B0F0C88>}
+        """
+
+    # if no arguments are passed, use the global variable db_list
+    if len(args) == 0:
+        args = db_list
+
+    # loop through the args and build the dictionary
+    out = {}
+    for x in args:
+        out[x] = pyodbc.connect(constr(x))
+        
+    return out
+
+
+def readtbl(table_name: str, conn: pyodbc.Connection) -> pd.DataFrame:
+    """
+    # Description:
+        Function that takes a table name and a connection object and returns a dataframe
+        containing the data from the table
+
+    # Parameters:
+        table_name:
+            string, name of the table (e.g. 'CINRE_LC.dbo.CINRE_LC')
+        conn:
+            pyodbc.Connection object, connection to the database
+
+    # Output:
+        dataframe containing the data from the table
+
+    # Example:
+        # assume the table CINRE_LC.dbo.Layer exists in the database CINRE_LC
+        # and is 3 rows two columns with A, B, C, D, E, F as the data and the columns
+        # are named col1 and col2
+        conn = connect_to_dbs()['CINRE_LC']
+        readtbl('CINRE_LC.dbo.Layer', conn)
+        >  col1 col2
+        0    A    B
+        1    C    D
+        2    E    F
+    """
+    # read the table into a dataframe using the connection
+    return pd.read_sql_query('select * from [{}]'.format(table_name), conn)
+
+
+def build_timestamp(nearest: int = 10) -> datetime.datetime:
+    """
+    # Description:
+        Function that takes a number of minutes and returns a timestamp rounded to the nearest
+        number of minutes. The default is 10 minutes.
+
+    # Parameters:
+        nearest:
+            int, number of minutes to round to (e.g. 10)
+            default: 10
+
+    # Output:
+        timestamp rounded to the nearest number of minutes
+
+    # Example:
+        # assume the time is 10:03:00, on 3/2/2027
+        build_timestamp()
+        > datetime.datetime(2027, 3, 2, 10, 0) # 10:00:00 is the nearest 10 minutes
+    """
+    # build the timstamp for when the data are pulled rounded to 10 minutes
+    # this is done by:
+    # subtracting the current time from
+    # the minimum time and then
+    # rounding to the nearest 10 minutes
+    now = datetime.datetime.now()
+    return (now - (now - datetime.datetime.min) % datetime.timedelta(minutes=nearest))
+
+
+def raw_lookup_tbl(
+        df: pd.DataFrame,
+        id_col_name: str,
+        col_list: list,
+        nearest: int = 10) -> pd.DataFrame:
+    """
+    # Description:
+        Function that takes a dataframe, a column name, and a list of columns and returns a dataframe
+        containing the unique values of the columns in the list and the index of the unique values
+        in the column name
+
+    # Parameters:
+        df:
+            dataframe, dataframe containing the data
+        id_col_name:
+            string, name of the column to use as the index
+        col_list:
+            list, list of columns to use as the values
+
+    # Output:
+        dataframe containing the unique values of the columns in the list and the index of the unique values
+        in the column name. this is used to build lookup tables and set up a star schema so that the
+        data can be normalized
+
+    # Example:
+        # assume the dataframe df is 3 rows two columns first A, A, A, B, B, B, second 1,2,3,4,5,6, 
+        # and third X1, X2, X3, X3, X2, X1
+        # with columns named col1, col2, col3
+        raw_lookup_tbl(df, 'col1_id', ['col1'])
+        >   timestamp col1_id col1
+        0 2020-03-02       0    A
+        1 2020-03-02       1    B
+
+        raw_lookup_tbl(df, 'col3_id', ['col3'])
+        >   timestamp col3_id col3  
+        0 2020-03-02       0    X1
+        1 2020-03-02       1    X2
+        2 2020-03-02       2    X3
+    """
+
+    # build the lookup table for the column names
+    col_df = (
+        # select the columns in the `col_list`
+        df[col_list]
+
+        # drop duplicates, sort, reset the index, and rename the index
+        .drop_duplicates()
+        .sort_values(col_list)
+        .reset_index(drop=True)
+        .reset_index()
+        .rename(columns=dict(index=id_col_name))
+    )
+
+    # build the timstamp for when the data are pulled rounded to
+    # `nearest` minutes using `build_timestamp()`
+    col_df['timestamp'] = build_timestamp(nearest=nearest)
+
+    # reorder columns so that timestamp is first
+    col_df = col_df[['timestamp', id_col_name] + col_list]
+
+    # return the dataframe
+    return (col_df)
+
+
+def raw_lookup_dict(
+        df: pd.DataFrame, id_col_names: list, col_lists: list) -> dict:
+    """
+    # Description:
+        Function that takes a dataframe, a list of column names, and
+        a list of lists of columns and returns a dictionary containing
+        the unique values of the columns in the list and the index of
+        the unique values in the column name for each column name
+
+    # Parameters:
+        df:
+            dataframe, dataframe containing the data
+        id_col_names:
+            list, list of column names to use as the index
+        col_lists:
+            list, list of lists of columns to use as the values
+
+    """
+    # initialize the output dictionary
+    out = {}
+
+    # loop through the column names and build the lookup table:
+    # note that zip() is used to loop through two lists at the same time
+    for id_col, cols in zip(id_col_names, col_lists):
+        out[id_col] = raw_lookup_tbl(df=df, id_col_name=id_col, col_list=cols)
+
+    # return the dictionary
+    return (out)
+
+
+# provenance codes written by `all4hierarchy`, one small int per resolved field
+# telling which source database the value came from
+provenance_codes = dict(none=0, ds=1, lc=2, air=3, sap=4, derived=5)
+
+
+def provenance_source(name: str, default: str = None) -> int:
+    """
+    # Description:
+        Function that returns the provenance code for a column, based on the
+        suffix of the column name (e.g. 'risk_limit_lc' comes from the loss
+        cost database). The `_crmidforsap` lookup columns count as SAP.
+
+    # Parameters:
+        name:
+            string, name of the column (e.g. 'risk_limit_lc')
+        default:
+            string, source to use if the name has no recognised suffix
+            (e.g. 'lc'). default: None, which gives code 0 ('none')
+
+    # Output:
+        int, provenance code from `provenance_codes`
+
+    # Example:
+        provenance_source('risk_limit_lc')
+        > 2
+        provenance_source('calc_exp_loss', default='lc')
+        > 2
+    """
+    # look for a suffix that names the source database
+    name = str(name)
+    for src in ['ds', 'lc', 'air', 'sap']:
+        if name.endswith('_' + src):
+            return provenance_codes[src]
+    if name.endswith('_crmidforsap'):
+        return provenance_codes['sap']
+
+    # otherwise fall back to the default
+    return provenance_codes[default] if default is not None else provenance_codes['none']
+
+
+def provenance_labels(code: pd.Series) -> pd.Series:
+    """
+    # Description:
+        Function that decodes a `_src` provenance column back to the
+        source names in `provenance_codes`, for checking the feed
+
+    # Parameters:
+        code:
+            pd.Series, provenance codes (e.g. df.risk_limit_src_layer)
+
+    # Output:
+        pd.Series (categorical), source name for each row
+
+    # Example:
+        provenance_labels(df.risk_limit_src_layer).value_counts()
+        > lc     1520
+        > ds      310
+    """
+    labels = {v: k for k, v in provenance_codes.items()}
+    return (code.map(labels).astype('category'))
+
+
+def all4hierarchy(*args: pd.Series, provenance: bool = False, **kwargs: pd.Series) -> pd.Series:
+    """
+    # Description:
+        Function that takes an arbitrary number of series and
+        returns a series with the first non-null value from the 
+        series, in the order they are passed (like COALESCE in SQL)
+
+        If `provenance` is True, also returns a small int series with the
+        code (see `provenance_codes`) of the source each value was taken
+        from, computed in the same pass. The source is read from the suffix
+        of the series name (e.g. `_lc`), falling back to the keyword the
+        series was passed as. Lists (eg constant defaults) get code 0.
+
+    # Parameters:
+        *args, **kwargs:
+            pd.Series (or list), series to use to build the hierarchy
+        provenance:
+            bool, if True return the provenance codes as well
+            default: False
+
+    # Output:
+        pd.Series, series with the first non-null value from the
+        series
+        or, if `provenance` is True, a tuple (value, code) where code
+        is a uint8 pd.Series
+
+    # Example:
+        # assume the series are:
+        # ds: Null, 2, 3, 4, 5, 6, 7, 8, 9, 10
+        # lc: Null, 2, 3, 4, 5, 6, 7, 8, 9, 10
+        # air: 2, 2, 3, 4, 5, 6, 7, 8, 9, 10
+        # sap: 1, 2, 3, 4, 5, 6, 7, 8, 9, 10 
+        all4hierarchy(ds=ds, lc=lc, air=air, sap=sap)
+        > 0     2
+        all4hierarchy(ds=ds, lc=lc, air=air, sap=sap, provenance=True)[1]
+        > 0     3
+    """
+    # list of (series, keyword) pairs in hierarchy order
+    inputs = [(x, None) for x in args] + [(x, k) for k, x in kwargs.items()]
+
+    # use the index of the first series for any lists that are passed
+    index = next(x.index for x, _ in inputs if isinstance(x, pd.Series))
+
+    # start with the first series, and fill in the missing values from
+    # each of the following series in turn, keeping track of which
+    # series each value came from
+    out, code = None, np.zeros(len(index), dtype=np.uint8)
+    for x, k in inputs:
+
+        # the code for this series: lists are defaults, not a source
+        if isinstance(x, pd.Series):
+            src = provenance_source(x.name, default=k)
+        else:
+            x, src = pd.Series(x, index=index), provenance_codes['none']
+
+        # values still missing that this series can fill
+        fill = x.notna().to_numpy() if out is None else (out.isna() & x.notna()).to_numpy()
+        code[fill] = src
+
+        # coalesce
+        out = x if out is None else out.where(out.notna(), other=x)
+
+    # unnamed, like the original output
+    out = out.rename(None)
+
+    if provenance:
+        return (out, pd.Series(code, index=index))
+    return (out)
+
+
+# contract statuses that are dropped from each source (declined, work in
+# progress, not taken up, ...), used by both the pandas readers and the
+# pushdown queries. statuses are compared case-insensitively, so these are
+# lower case, and contracts with no status are kept
+lc_excluded_statuses = 'declined decline wip ntu'.split()
+air_excluded_statuses = ['not bound', 'reference', 'declined', 'wip', 'ntu', 'started']
+
+
+def cinre_lc_contract(
+        lc_conn: pyodbc.Connection,
+        earliest_inception: str = '2020-01-01',
+        latest_inception: str = None) -> pd.DataFrame:
+    """
+    # Description:
+        Function that reads in the contract table from the loss cost database
+
+    # Parameters:
+        lc_conn:
+            pyodbc.Connection, connection to the loss cost database
+        earliest_inception:
+            string, earliest inception date to use in the query
+            must be in the format 'YYYY-MM-DD'
+            default is '2020-01-01'
+        latest_inception:
+            string, inception dates on or after this date are excluded
+            must be in the format 'YYYY-MM-DD'
+            default is None (no upper bound)
+
+    # Output:
+        dataframe, dataframe containing the contract table from the loss cost database,
+        without the statuses in `lc_excluded_statuses` (in any case)
+
+    # Example:
+        cinre_lc_contract(lc_conn)
+        >   CrmGroupID MgtRptLine  ... LossEvalDate crm_id_lc
+        0       10000          1  ...   2020-01-01         0
+        1       10000          2  ...   2020-01-01         1
+        2       10000          3  ...   2020-01-01         2
+        3       10000          4  ...   2020-01-01         3
+        ...       ...        ...  ...          ...       ...
+    """
+    # print statement that the function is running
+    print('reading Contract table from loss cost DB')
+
+    # read in table
+    contract_lc = readtbl("Contract", lc_conn)
+
+    # recode date columns to datetime
+    contract_lc[['Inception', 'Expiration', 'LossEvalDate', 'LastUpdated']] = contract_lc[
+        'Inception Expiration LossEvalDate LastUpdated'.split()].apply(pd.to_datetime)
+
+    # we only take inception dates after the `earliest_inception` date
+    contract_lc = contract_lc.loc[contract_lc.Inception >= datetime.datetime.fromisoformat(
+        earliest_inception), :].reset_index(drop=True)
+
+    # and only inception dates before the `latest_inception` date, if one is given
+    if latest_inception is not None:
+        contract_lc = contract_lc.loc[contract_lc.Inception < datetime.datetime.fromisoformat(
+            latest_inception), :].reset_index(drop=True)
+
+    # add in CRM_ID, which is a combination of CrmGroupID and MgtRptLine
+    # which takes the first character of CrmGroupID and adds MgtRptLine
+    contract_lc['crm_id_lc'] = contract_lc['MgtRptLine'].str[0] + contract_lc['CrmGroupID'].astype(str)
+
+    # change column names to be more descriptive, and add in the `_lc` suffix
+    # to indicate that the column comes from the loss cost database
+    # these are the current column names:
+    contract_lc_curcols = ['CrmGroupID', 'Account', 'MgtRptLine', 'Description', 'Program', 'Inception', 'Expiration', 'TreatyBasis',
+                           'AlaeBasis', 'LossEvalDate', 'Status', 'CatModelVersion', 'Note', 'UserID', 'LastUpdated', 'Region', 'Currency', 'SourceFile']
+    contract_lc_newcols = ['crm_gp_id', 'account', 'mrl', 'account_desc', 'program', 'eff_date', 'exp_date', 'treaty_basis', 'alae_basis',
+                           'loss_eval_date', 'status', 'cat_model_version', 'note', 'user_id', 'last_updated', 'region', 'currency', 'source_file']
+    contract_lc.rename(columns=dict(zip(contract_lc_curcols, [
+                       c + '_lc' for c in contract_lc_newcols])), inplace=True)
+
+    # filter out declined statuses, as well as WIP and NTU, in any case
+    contract_lc = contract_lc.loc[~contract_lc.status_lc.str.lower().isin(lc_excluded_statuses), :]
+
+    # return table
+    return (contract_lc)
+
+
+def cinre_dealsheet_contract(ds_conn: pyodbc.Connection, earliest_inception: str = '2020-01-01', latest_inception: str = None) -> pd.DataFrame:
+    """
+    # Description:
+        Function that reads in the contract table from the deal sheet database
+
+    # Parameters:
+        ds_conn:
+            pyodbc.Connection, connection to the deal sheet database
+        earliest_inception:
+            string, earliest inception date to use in the query
+            must be in the format 'YYYY-MM-DD'
+            default is '2020-01-01'
+        latest_inception:
+            string, inception dates on or after this date are excluded
+            must be in the format 'YYYY-MM-DD'
+            default is None (no upper bound)
+
+    # Output:
+        pd.DataFrame, dataframe containing the contract table from the deal sheet database
+
+    # Example:
+        cinre_dealsheet_contract(ds_conn)
+        >   CinReId CRMID  ... DominantType timestamp_ds
+        0        1     0  ...         None   2020-01-01
+        1        2     1  ...         None   2020-01-01
+        2        3     2  ...         None   2020-01-01
+        ...      ...   ...  ...          ...          ...
+    """
+    # print statement that the function is running
+
+    print('reading Contract table from deal sheet DB')
+
+    # read in table using `readtbl` function
+    contract_ds = readtbl("Contract", ds_conn)
+
+    # recode date columns to datetime
+    # (assigning a list of columns to a list of column names is read row-wise
+    # by pandas, so each column is converted on its own)
+    for c in 'Inception Expiration LastUpdated'.split():
+        contract_ds[c] = pd.to_datetime(contract_ds[c])
+
+    # we only take inception dates after the `earliest_inception` date
+    contract_ds = contract_ds.loc[contract_ds.Inception >= datetime.datetime.fromisoformat(
+        earliest_inception), :].reset_index(drop=True)
+
+    # and only inception dates before the `latest_inception` date, if one is given
+    if latest_inception is not None:
+        contract_ds = contract_ds.loc[contract_ds.Inception < datetime.datetime.fromisoformat(
+            latest_inception), :].reset_index(drop=True)
+
+    # change column names to be more descriptive, and add in the `_ds` suffix
+    # to indicate that the column comes from the deal sheet database
+    # these are the current column names:
+    contract_ds_curcols = ['CinReId', 'CRMID', 'ClientName', 'Reassured', 'Inception', 'Expiration', 'ContractName', 'DominantType', 'MGA', 'Broker', 'BrokerNum', 'TreatyCategory', 'Line', 'UltCinRePrem', 'ExpectedLoss', 'ExpenseRatio', 'TechUWRatio', 'UWProfit', 'NPVUWProfit', 'ChgRateAdequacy', 'ROEChange',
+                           'RateChange', 'ProgramRateChange', 'StandaloneTVaR250', 'StandaloneROC250', 'DiversifiedTVaR250', 'DiversifiedROC250', 'LossCV', 'Status', 'SourceFile', 'SharePointFile', 'Note', 'LastUpdated', 'CyberExposure', 'CyberAggLimit', 'Subline', 'CompanyID', 'DepositPrem', 'ModelExpectedLoss', 'AnnualValues']
+
+    # these are the new column names:
+    contract_ds_newcols = ['crm_gp_id', 'crm_id', 'client_name', 'reassured', 'eff_date', 'exp_date', 'contract_name', 'dominant_type', 'mga', 'broker', 'broker_numb', 'treaty_category', 'line', 'ult_cre_prem', 'expected_loss', 'expense_ratio', 'tech_uw_ratio', 'uw_profit', 'npv_uw_profit', 'chg_rate_adequacy', 'roe_change',
+                           'rate_change', 'program_rate_change', 'standalone_tvar_250', 'standalone_roc_250', 'diversified_tvar_250', 'diversified_roc_250', 'loss_cv', 'status', 'source_file', 'share_point_file', 'note', 'last_updated', 'cyber_exposure', 'cyber_agg_limit', 'subline', 'company_id', 'deposit_prem', 'model_expected_loss', 'annual_values']
+
+    # rename the columns
+    contract_ds.rename(columns=dict(zip(contract_ds_curcols, [
+                       c + '_ds' for c in contract_ds_newcols])), inplace=True)
+
+    # want to bring in some columns from the `Layer` table, but we need to rename them
+    # so that they don't conflict with the column names in the `contract_ds` table
+
+    # define the dictionary that will be used to rename the columns:
+    layer_rename = dict(
+        CinReId='crm_gp_id_ds',
+        Inception='eff_date_ds',
+        Expiration='exp_date_ds',
+        Trigger='trigger_ds',
+        ContractType='contract_type_ds',
+        Currency='currency_ds',
+        Territory='terr_ds')
+
+    # read in the `Layer` table, only keep the columns we need, rename them, and drop duplicates
+    layer = (readtbl('Layer', ds_conn)[list(layer_rename.keys())]
+
+             # rename columns & drop duplicates
+             .rename(columns=layer_rename)
+             .drop_duplicates())
+
+    # recode date columns to datetime as above
+    for c in 'eff_date_ds exp_date_ds'.split():
+        layer[c] = pd.to_datetime(layer[c])
+
+    # merge the `contract_ds` and `layer` tables, using the `crm_gp_id_ds`,
+    # `eff_date_ds`, and `exp_date_ds` columns
+    contract_ds = contract_ds.merge(
+        layer, how='left', on='crm_gp_id_ds eff_date_ds exp_date_ds'.split())
+
+    # return table
+    return (contract_ds)
+
+
+def cinre_air_contract(air_conn: pyodbc.Connection, earliest_inception: str = "2020-01-01", latest_inception: str = None) -> pd.DataFrame:
+    """
+    # Description
+        Read in the `Contract` table from the AIR database, and return it as a pandas DataFrame.
+
+    # Parameters
+        air_conn: pyodbc.Connection
+            Connection to the AIR database.
+        earliest_inception: str
+            Earliest inception date to include in the returned table.
+            Must be in ISO format (e.g. '2020-01-01').
+        latest_inception: str
+            Inception dates on or after this date are excluded.
+            Must be in ISO format (e.g. '2021-01-01').
+            Default is None (no upper bound).
+
+    # Output
+        contract_air: pd.DataFrame
+            `Contract` table from the AIR database, without the statuses in
+            `air_excluded_statuses` (in any case).
+
+    # Example
+        >>> contract_air = cinre_air_contract(air_conn)
+        >>> contract_air.head()
+        #  client_name client_id_numb   eff_date   ... crm_gp_id template_source
+        # 0  Client 1        1234567 2020-01-01   ...  1234567   template name
+        # 1  Client 2        2345678 2020-01-01   ...  2345678   template name
+        # 2  Client 3        3456789 2020-01-01   ...  3456789   template name
+        # 3  Client 4        4567890 2020-01-01   ...  4567890   template name
+        # 4  Client 5        5678901 2020-01-01   ...  5678901   template name
+        # [5 rows x 25 columns]
+    """
+
+    # print status message
+    print('reading Contract table from AIR DB')
+
+    # list of new column names
+    air_new_cols = ['client_name', 'client_id_numb', 'eff_date', 'exp_date',
+                    'program', 'crm_gp_id2', 'wp_contract', 'occ_limit_contract', 'agg_limit_contract',
+                    'status', 'region', 'note', 'last_updated', 'has_pc', 'user_name', 'file_location',
+                    'broker', 'executive_summary', 'currency', 'crm_id', 'fx_rate_id', 'template_altered',
+                    'crm_gp_id', 'template_source']
+
+    # read in table
+    contract_air = readtbl('Contract_New', air_conn)
+
+    # rename columns
+    contract_air.rename(columns=dict(zip(contract_air.columns.tolist(), [
+                        c + '_air' for c in air_new_cols])), inplace=True)
+
+    # recode dates using the `pd.to_datetime` function
+    for c in ['eff_date_air', 'exp_date_air', 'last_updated_air']:
+        contract_air[c] = pd.to_datetime(contract_air[c])
+
+    # drop rows with dates before `earliest_inception`
+    contract_air = contract_air.loc[contract_air.eff_date_air >=
+                                    datetime.datetime.fromisoformat(earliest_inception), :]
+
+    # drop rows with dates on or after `latest_inception`, if one is given
+    if latest_inception is not None:
+        contract_air = contract_air.loc[contract_air.eff_date_air <
+                                        datetime.datetime.fromisoformat(latest_inception), :]
+
+    # drop some columns I don't want to carry forward
+    colstodrop = ['crm_gp_id2_air', 'wp_contract_air', 'occ_limit_contract_air', 'agg_limit_contract_air',
+                  'template_altered_air', 'has_pc_air', 'fx_rate_id_air', 'template_source_air']
+    contract_air.drop(columns=colstodrop, inplace=True)
+
+    # drop treaties not bound, in any case
+    contract_air = contract_air.loc[~contract_air.status_air.str.lower().isin(air_excluded_statuses), :]
+
+    # return table
+    return (contract_air)
+
+# RESTART HERE
+
+
+def cinre_sap_contract(sap_conn: pyodbc.Connection, earliest_date: str = "2020-01-01", latest_date: str = None) -> pd.DataFrame:
+    """
+    # Description
+        Read in the `Contract` table from the SAP database, and return it as a pandas DataFrame.
+
+    # Parameters
+        sap_conn: pyodbc.Connection
+            Connection to the SAP database.
+        earliest_date: str
+            Earliest inception date to include in the returned table.
+            Must be in ISO format (e.g. '2020-01-01').
+            Default is '2020-01-01' (this is about the earliest date that
+            the data quality is good enough to use).
+        latest_date: str
+            Inception dates on or after this date are excluded.
+            Must be in ISO format (e.g. '2021-01-01').
+            Default is None (no upper bound).
+    
+    # Output
+        contract_sap: pd.DataFrame
+            `Contract` table from the SAP database.
+
+    # Example
+        >>> contract_sap = cinre_sap_contract(sap_conn)
+        >>> contract_sap.head()
+        #  Company Code Deal Number Contract Number  ... Cancel Date End of Acct Period
+        # 0         1000  1000000001      1000000001  ...  2020-12-31         2020-12-31
+        # 1         1000  1000000002      1000000002  ...  2020-12-31         2020-12-31
+        # 2         1000  1000000003      1000000003  ...  2020-12-31         2020-12-31
+        # 3         1000  1000000004      1000000004  ...  2020-12-31         2020-12-31
+        # 4         1000  1000000005      1000000005  ...  2020-12-31         2020-12-31
+        # [5 rows x 16 columns]
+    """
+
+    # print status message so I know it's working
+    print('reading Contract table from SAP DB')
+
+    # read in table from the SAP database
+    contract_sap = readtbl('Treaty$', sap_conn)
+
+    # recode dates using the `pd.to_datetime` function
+    for c in ['Effective Date', 'Cancel Date', 'End of Acct Period']:
+        contract_sap[c] = pd.to_datetime(contract_sap[c])
+
+
+    # filter inception date to be after `earliest_date`
+    contract_sap = contract_sap.loc[contract_sap['Effective Date'] >=
+                                    datetime.datetime.fromisoformat(earliest_date), :].reset_index(drop=True)
+
+    # and before `latest_date`, if one is given
+    if latest_date is not None:
+        contract_sap = contract_sap.loc[contract_sap['Effective Date'] <
+                                        datetime.datetime.fromisoformat(latest_date), :].reset_index(drop=True)
+
+    # change column names to be easier to work with (eg remove spaces) and make them lowercase, and add `_sap`
+    # to the end to compare with different databases that in theory have the same values
+    contract_sap_curcols = ['Company Code', 'Deal Number', 'Contract Number', 'CRM Submission ID', 'Treaty Text', 'Cedent',
+                            'Cedent Name', 'Underwriter for Treaty', 'Nature of Treaty', 'Treaty Category', 'Accounting Freq# No#',
+                            'Account Level', 'Cancel Date', 'End of Acctg Year', 'Spec# Retro Allowed', 'Specific Retro Treaty',
+                            'Effective Date', 'Expiration Date', 'Contract Status', 'Renewal', 'Exposure Territory',
+                            'Retro Treaty Number', 'Retro Section Number', 'Cession Percentage', 'Reported Data Placement %',
+                            'CinciRe Share/participation', 'Section', 'Text for Section', 'Contract Type', 'Layer', 'UW Area',
+                            'Business Type Number', 'Contract Trigger', 'Cancel Type', 'Days Runoff', 'XPL Limit', 'ECO Limit',
+                            'Peril','COB(UOBG)', 'CoB (UOBG) %', 'Segment', 'Subsegment', 'Quota Share %', 'Maximum Liability',
+                            'Retained Line', 'No# of Lines', 'Limit', 'Retention', 'Cat Occurrence Retention', 'Cat Occurrence Limit',
+                            'Terror Occurrence Limit', 'AAD', 'AAL', 'Loss Corridor Floor', 'Loss Corridor Ceiling', 'ALAE Treatment',
+                            'Protected Share', 'Subject Premium', 'Base Rate', 'Min Rate for swing', 'Max Rate for swing', 'Deposit Premium', 'Reinstatement Cover %', 'Reinstatem# Time %', 'Flat Commission%', 'Provisional Commission%', 'Overriding Commission%', 'Brokerage%', 'Provisional Loss Ratio', 'Dev Pattern', 'LR at Min Commission', 'LR at Max Commission', 'Commission at Min', 'Commission at Max', 'Profit Commission %', 'Profit Commission Expense']
+    contract_sap_newcols = ['company_code', 'deal_numb', 'contract_numb', 'crm_id', 'treaty_text', 'cedent', 'cedent_name', 'uw_for_treaty', 'nature_of_treaty', 'treaty_category', 'acct_freq_numb', 'acct_level', 'cancel_date', 'end_of_acct_year', 'specific_numb_retro_allowed', 'specific_retro_treaty', 'eff_date', 'exp_date', 'contract_status', 'renewal', 'exposure_terr', 'retro_treaty_numb', 'retro_section_numb', 'cession_pct', 'reported_data_placement_pct', 'cre_share_participation', 'section', 'text_for_section', 'contract_type', 'layer', 'uw_area', 'business_type_numb', 'contract_trigger', 'cancel_type', 'days_runoff', 'xpl_limit', 'eco_limit',
+                            'peril', 'uobg', 'uobg_pct', 'segment', 'subsegment', 'qs_pct', 'max_liab', 'retained_line', 'number_of_lines', 'limit', 'retention', 'cat_occ_retention', 'cat_occ_limit', 'terror_occ_limit', 'aad', 'aal', 'loss_corridor_floor', 'loss_corridor_ceiling', 'alae_treatment', 'protected_share', 'subject_prem', 'base_rate', 'min_rate_for_swing', 'max_rate_for_swing', 'deposit_prem', 'reinstatement_cover_pct', 'reinstatement_time_pct', 'flat_comm_pct', 'provisional_comm_pct', 'overriding_comm_pct', 'brokerage_pct', 'provisional_loss_ratio', 'dev_pattern', 'lr_at_min_comm', 'lr_at_max_comm', 'comm_at_min', 'comm_at_max', 'profit_comm_pct', 'profit_comm']
+    contract_sap.rename(columns=dict(zip(contract_sap_curcols, [
+                        c + '_sap' for c in contract_sap_newcols])), inplace=True)
+
+    # drop these columns that are more "layer" than "contract"
+    contract_sap = contract_sap.drop(columns='limit_sap retention_sap'.split())
+
+    # drop these columns that are use numbers that I have found may not be correct
+    contract_sap = contract_sap.drop(columns='uobg_sap uobg_pct_sap layer_sap section_sap text_for_section_sap base_rate_sap min_rate_for_swing_sap max_rate_for_swing_sap reinstatement_cover_pct_sap reinstatement_time_pct_sap flat_comm_pct_sap provisional_comm_pct_sap overriding_comm_pct_sap brokerage_pct_sap provisional_loss_ratio_sap lr_at_min_comm_sap lr_at_max_comm_sap comm_at_min_sap comm_at_max_sap profit_comm_pct_sap profit_comm_sap cat_occ_retention_sap cat_occ_limit_sap terror_occ_limit_sap aad_sap aal_sap subject_prem_sap cedent_sap cedent_name_sap contract_status_sap'.split())
+    contract_sap = contract_sap.drop(
+        columns='deposit_prem_sap cre_share_participation_sap max_liab_sap segment_sap subsegment_sap contract_numb_sap treaty_text_sap contract_type_sap deal_numb_sap qs_pct_sap retained_line_sap number_of_lines_sap uw_area_sap'.split())
+    contract_sap = contract_sap.drop(
+        columns='retro_treaty_numb_sap retro_section_numb_sap cession_pct_sap reported_data_placement_pct_sap days_runoff_sap renewal_sap contract_trigger_sap alae_treatment_sap treaty_category_sap dev_pattern_sap xpl_limit_sap eco_limit_sap loss_corridor_floor_sap loss_corridor_ceiling_sap protected_share_sap'.split())
+    contract_sap = contract_sap.drop_duplicates()
+    contract_sap = contract_sap.reset_index(drop=True)
+
+    # return table
+    return (contract_sap)
+
+
+def sql_date_filter(col: str, earliest_date: str, latest_date: str = None) -> str:
+    """
+    # Description
+        Build the SQL `WHERE` condition for an effective date window, the same
+        window that the pandas readers apply with `earliest_*` / `latest_*`
+
+    # Parameters
+        col: str
+            Column (or expression) holding the date, e.g. "c.[Inception]"
+        earliest_date: str
+            Earliest date to include, in format 'YYYY-MM-DD'
+        latest_date: str
+            Dates on or after this date are excluded, in format 'YYYY-MM-DD'.
+            Default is None (no upper bound)
+
+    # Returns
+        cond: str
+            SQL condition
+
+    # Example
+        >>> sql_date_filter('c.[Inception]', '2021-01-01', '2022-01-01')
+        "c.[Inception] >= '2021-01-01' AND c.[Inception] < '2022-01-01'"
+    """
+    # validate the dates before they are put into the query
+    cond = "{} >= '{}'".format(col, datetime.date.fromisoformat(earliest_date).isoformat())
+
+    # add the upper bound if there is one
+    if latest_date is not None:
+        cond = cond + " AND {} < '{}'".format(col, datetime.date.fromisoformat(latest_date).isoformat())
+
+    return (cond)
+
+
+def sql_provenance(*cols: str) -> str:
+    """
+    # Description
+        Build the SQL `CASE` expression giving the provenance code (see
+        `provenance_codes`) of a `COALESCE` over the same columns, so that the
+        pushdown queries return the same `_src` columns as `all4hierarchy`
+
+    # Parameters
+        *cols: str
+            Columns passed to the `COALESCE`, in the same order, e.g. "ds.crm_id_ds".
+            The source is read from the column suffix, as in `provenance_source`
+
+    # Returns
+        expr: str
+            SQL expression
+
+    # Example
+        >>> sql_provenance('ds.crm_id_ds', 'lc.crm_id_lc')
+        'CASE WHEN ds.crm_id_ds IS NOT NULL THEN 1 WHEN lc.crm_id_lc IS NOT NULL THEN 2 ELSE 0 END'
+    """
+    whens = ' '.join('WHEN {} IS NOT NULL THEN {}'.format(c, provenance_source(c.split('.')[-1])) for c in cols)
+    return ('CASE {} ELSE 0 END'.format(whens))
+
+
+# SQL used by the pushdown queries that differs between databases
+# 'mssql' is the CINRE SQL Server instance, 'sqlite' is a local stand-in for testing,
+# with each source database attached under its own name
+pushdown_dialects = {
+    'mssql': dict(
+        table='[{}].[dbo].[{}]',
+        concat='{} + {}',
+        columns=("select COLUMN_NAME from [{}].INFORMATION_SCHEMA.COLUMNS "
+                 "where TABLE_NAME = '{}' order by ORDINAL_POSITION")),
+    'sqlite': dict(
+        table='[{}].[{}]',
+        concat='{} || {}',
+        columns="select name as COLUMN_NAME from pragma_table_info('{1}', '{0}') order by cid"),
+}
+
+
+def table_columns(conn: pyodbc.Connection, database_name: str, table_name: str, dialect: str = 'mssql') -> list:
+    """
+    # Description
+        Read the column names of a source table in table order, for the
+        pushdown queries
+
+    # Parameters
+        conn: pyodbc.Connection
+            Connection to any database on the CINRE SQL Server instance
+        database_name: str
+            Name of the database holding the table (e.g. 'CINRE_SAP')
+        table_name: str
+            Name of the table (e.g. 'Treaty$')
+        dialect: str
+            Key of `pushdown_dialects`. Default is 'mssql'
+
+    # Returns
+        cols: list
+            Column names of the table, in order
+    """
+    # read the column names from the catalog, in column order
+    cols = pd.read_sql_query(pushdown_dialects[dialect]['columns'].format(database_name, table_name), conn)
+
+    return (cols.COLUMN_NAME.tolist())
+
+
+def air_contract_columns(conn: pyodbc.Connection, dialect: str = 'mssql') -> list:
+    """
+    # Description
+        Read the column names of the AIR `Contract_New` table in table order.
+        `cinre_air_contract` renames these columns by position, so the pushdown
+        query needs the actual names to do the same renaming on the server.
+
+    # Parameters
+        conn: pyodbc.Connection
+            Connection to any database on the CINRE SQL Server instance
+        dialect: str
+            Key of `pushdown_dialects`. Default is 'mssql'
+
+    # Returns
+        cols: list
+            Column names of `CINRE_PRICING_AIRv10.dbo.Contract_New`, in order
+    """
+    return (table_columns(conn, 'CINRE_PRICING_AIRv10', 'Contract_New', dialect))
+
+
+def pushdown_contract_query(
+        air_cols: list,
+        sap_cols: list,
+        earliest_inception: str = '2020-01-01',
+        latest_inception: str = None,
+        dialect: str = 'mssql') -> str:
+    """
+    # Description
+        Build a single cross-database query that does the work of the four
+        `cinre_*_contract` readers and the outer joins in `raw_contracts` on the
+        server, since all of the source databases live on the same instance.
+
+        Each source is filtered, renamed (with the same `_lc`, `_ds`, `_air`
+        and `_sap` suffixes as the pandas readers) and reduced to only the
+        columns that `raw_contracts` uses. The key columns `crm_gp_id`,
+        `crm_id`, `eff_date` and `exp_date` are coalesced on the server in the
+        same order as `all4hierarchy` (ds, lc, air), and rows with no `crm_id`
+        in any source are dropped, since `raw_contracts` drops them anyway.
+
+        The LC and AIR statuses are filtered with the same
+        `lc_excluded_statuses` and `air_excluded_statuses` lists as the pandas
+        readers, compared in lower case so that any casing is excluded, and
+        contracts with no status are kept.
+
+        None of the SAP contract columns survive to the feed, so only the SAP
+        `crm_id` / `eff_date` keys are returned. They are returned once per
+        distinct row of the SAP columns that `cinre_sap_contract` keeps, so a
+        treaty with several SAP rows repeats its contract rows exactly as the
+        pandas join does.
+
+        The one known difference from the pandas join is on missing keys: the
+        server never joins NULL keys, where `DataFrame.merge` matches missing
+        keys to each other. Rows with no `crm_id` are dropped by both paths,
+        so this only matters for a source row with a `crm_id` but no `eff_date`.
+
+    # Parameters
+        air_cols: list
+            Column names of the AIR `Contract_New` table, in table order
+            (see `air_contract_columns`)
+        sap_cols: list
+            Column names of the SAP `Treaty$` table (see `table_columns`)
+        earliest_inception: str
+            Earliest inception date to include, in format 'YYYY-MM-DD'
+            Default is '2020-01-01'
+        latest_inception: str
+            Inception dates on or after this date are excluded, in format 'YYYY-MM-DD'
+            Default is None (no upper bound)
+        dialect: str
+            Key of `pushdown_dialects`. Default is 'mssql'
+
+    # Returns
+        qry: str
+            SQL query returning the pre-joined contract table
+    """
+    # (source column, new column) pairs for each source, only the ones
+    # that `raw_contracts` uses
+    lc_cols = [('CrmGroupID', 'crm_gp_id'), ('Inception', 'eff_date'), ('Expiration', 'exp_date'),
+               ('Account', 'account'), ('MgtRptLine', 'mrl'), ('Description', 'account_desc'),
+               ('Program', 'program'), ('TreatyBasis', 'treaty_basis'), ('AlaeBasis', 'alae_basis'),
+               ('Status', 'status'), ('UserID', 'user_id'), ('LastUpdated', 'last_updated'),
+               ('Region', 'region'), ('Currency', 'currency'), ('SourceFile', 'source_file')]
+    ds_cols = [('CinReId', 'crm_gp_id'), ('CRMID', 'crm_id'), ('ClientName', 'client_name'),
+               ('Reassured', 'reassured'), ('Inception', 'eff_date'), ('Expiration', 'exp_date'),
+               ('ContractName', 'contract_name'), ('DominantType', 'dominant_type'), ('Broker', 'broker'),
+               ('TreatyCategory', 'treaty_category'), ('Line', 'line'), ('UltCinRePrem', 'ult_cre_prem'),
+               ('ExpectedLoss', 'expected_loss'), ('ExpenseRatio', 'expense_ratio'),
+               ('TechUWRatio', 'tech_uw_ratio'), ('UWProfit', 'uw_profit'), ('NPVUWProfit', 'npv_uw_profit'),
+               ('ChgRateAdequacy', 'chg_rate_adequacy'), ('ROEChange', 'roe_change'),
+               ('RateChange', 'rate_change'), ('ProgramRateChange', 'program_rate_change'),
+               ('StandaloneTVaR250', 'standalone_tvar_250'), ('StandaloneROC250', 'standalone_roc_250'),
+               ('DiversifiedTVaR250', 'diversified_tvar_250'), ('DiversifiedROC250', 'diversified_roc_250'),
+               ('LossCV', 'loss_cv'), ('Status', 'status'), ('SourceFile', 'source_file'),
+               ('SharePointFile', 'share_point_file'), ('LastUpdated', 'last_updated'),
+               ('CyberExposure', 'cyber_exposure'), ('CyberAggLimit', 'cyber_agg_limit'),
+               ('Subline', 'subline'), ('DepositPrem', 'deposit_prem'),
+               ('ModelExpectedLoss', 'model_expected_loss')]
+    ds_layer_cols = [('Trigger', 'trigger'), ('ContractType', 'contract_type'),
+                     ('Currency', 'currency'), ('Territory', 'terr')]
+
+    # the AIR table is renamed by position in `cinre_air_contract`, so match
+    # the new names up with the actual column names in the same way
+    air_new_cols = ['client_name', 'client_id_numb', 'eff_date', 'exp_date',
+                    'program', 'crm_gp_id2', 'wp_contract', 'occ_limit_contract', 'agg_limit_contract',
+                    'status', 'region', 'note', 'last_updated', 'has_pc', 'user_name', 'file_location',
+                    'broker', 'executive_summary', 'currency', 'crm_id', 'fx_rate_id', 'template_altered',
+                    'crm_gp_id', 'template_source']
+    air_keep = ['client_name', 'eff_date', 'exp_date', 'program', 'status', 'region', 'last_updated',
+                'user_name', 'file_location', 'broker', 'executive_summary', 'currency', 'crm_id', 'crm_gp_id']
+    air_lookup = dict(zip(air_new_cols, air_cols))
+    air_cols = [(air_lookup[c], c) for c in air_keep]
+
+    # SAP columns that `cinre_sap_contract` drops before its `drop_duplicates`,
+    # every other SAP column is kept to get the same number of rows per key
+    sap_dropped = ['Limit', 'Retention', 'COB(UOBG)', 'CoB (UOBG) %', 'Layer', 'Section', 'Text for Section',
+                   'Base Rate', 'Min Rate for swing', 'Max Rate for swing', 'Reinstatement Cover %',
+                   'Reinstatem# Time %', 'Flat Commission%', 'Provisional Commission%', 'Overriding Commission%',
+                   'Brokerage%', 'Provisional Loss Ratio', 'LR at Min Commission', 'LR at Max Commission',
+                   'Commission at Min', 'Commission at Max', 'Profit Commission %', 'Profit Commission Expense',
+                   'Cat Occurrence Retention', 'Cat Occurrence Limit', 'Terror Occurrence Limit', 'AAD', 'AAL',
+                   'Subject Premium', 'Cedent', 'Cedent Name', 'Contract Status', 'Deposit Premium',
+                   'CinciRe Share/participation', 'Maximum Liability', 'Segment', 'Subsegment', 'Contract Number',
+                   'Treaty Text', 'Contract Type', 'Deal Number', 'Quota Share %', 'Retained Line', 'No# of Lines',
+                   'UW Area', 'Retro Treaty Number', 'Retro Section Number', 'Cession Percentage',
+                   'Reported Data Placement %', 'Days Runoff', 'Renewal', 'Contract Trigger', 'ALAE Treatment',
+                   'Treaty Category', 'Dev Pattern', 'XPL Limit', 'ECO Limit', 'Loss Corridor Floor',
+                   'Loss Corridor Ceiling', 'Protected Share']
+    sap_keys = ['CRM Submission ID', 'Effective Date']
+    sap_other = [c for c in sap_cols if c not in sap_dropped + sap_keys]
+
+    # table names & string concatenation for this database
+    sql = pushdown_dialects[dialect]
+    table = sql['table'].format
+
+    def select_list(cols, alias, suffix):
+        return ',\n        '.join('{}.[{}] AS {}_{}'.format(alias, old, new, suffix) for old, new in cols)
+
+    def in_list(values):
+        return ', '.join("'{}'".format(v) for v in values)
+
+    qry = '''
+WITH lc AS (
+    SELECT
+        {lc_select},
+        {crm_id_lc} AS crm_id_lc
+    FROM {lc_contract} c
+    WHERE {lc_dates}
+      AND (c.[Status] IS NULL OR LOWER(c.[Status]) NOT IN ({lc_stats}))
+),
+ds AS (
+    SELECT
+        {ds_select},
+        {ds_layer_select}
+    FROM {ds_contract} c
+    LEFT JOIN (
+        SELECT DISTINCT [CinReId], [Inception], [Expiration], [Trigger], [ContractType], [Currency], [Territory]
+        FROM {ds_layer}
+    ) l
+      ON l.[CinReId] = c.[CinReId] AND l.[Inception] = c.[Inception] AND l.[Expiration] = c.[Expiration]
+    WHERE {ds_dates}
+),
+sap AS (
+    SELECT t.crm_id_sap, t.eff_date_sap
+    FROM (
+        SELECT DISTINCT
+            t.[CRM Submission ID] AS crm_id_sap,
+            t.[Effective Date] AS eff_date_sap{sap_other}
+        FROM {sap_treaty} t
+        WHERE {sap_dates}
+    ) t
+),
+air AS (
+    SELECT
+        {air_select}
+    FROM {air_contract} c
+    WHERE {air_dates}
+      AND (c.[{air_status}] IS NULL OR LOWER(c.[{air_status}]) NOT IN ({air_stats}))
+)
+SELECT
+    COALESCE(ds.crm_gp_id_ds, lc.crm_gp_id_lc, air.crm_gp_id_air, 0) AS crm_gp_id,
+    COALESCE(ds.crm_id_ds, lc.crm_id_lc, air.crm_id_air) AS crm_id,
+    COALESCE(ds.eff_date_ds, lc.eff_date_lc, air.eff_date_air, '2200-12-31') AS eff_date,
+    COALESCE(ds.exp_date_ds, lc.exp_date_lc, air.exp_date_air, '2201-12-31') AS exp_date,
+    {crm_gp_id_src} AS crm_gp_id_src,
+    {crm_id_src} AS crm_id_src,
+    {eff_date_src} AS eff_date_src,
+    {exp_date_src} AS exp_date_src,
+    lc.*, ds.*, sap.*, air.*
+FROM lc
+FULL OUTER JOIN ds
+  ON lc.crm_id_lc = ds.crm_id_ds AND lc.eff_date_lc = ds.eff_date_ds
+FULL OUTER JOIN sap
+  ON ds.crm_id_ds = sap.crm_id_sap AND ds.eff_date_ds = sap.eff_date_sap
+FULL OUTER JOIN air
+  ON ds.crm_id_ds = air.crm_id_air AND ds.eff_date_ds = air.eff_date_air
+WHERE COALESCE(ds.crm_id_ds, lc.crm_id_lc, air.crm_id_air) IS NOT NULL
+'''.format(lc_select=select_list(lc_cols, 'c', 'lc'),
+           crm_id_lc=sql['concat'].format('SUBSTRING(c.[MgtRptLine], 1, 1)', 'CAST(c.[CrmGroupID] AS varchar(20))'),
+           lc_contract=table('CINRE_LC', 'Contract'),
+           ds_contract=table('CINRE_DealSheet', 'Contract'),
+           ds_layer=table('CINRE_DealSheet', 'Layer'),
+           sap_treaty=table('CINRE_SAP', 'Treaty$'),
+           sap_other=''.join(',\n            t.[{}]'.format(c) for c in sap_other),
+           air_contract=table('CINRE_PRICING_AIRv10', 'Contract_New'),
+           lc_dates=sql_date_filter('c.[Inception]', earliest_inception, latest_inception),
+           lc_stats=in_list(lc_excluded_statuses),
+           ds_select=select_list(ds_cols, 'c', 'ds'),
+           ds_layer_select=select_list(ds_layer_cols, 'l', 'ds'),
+           ds_dates=sql_date_filter('c.[Inception]', earliest_inception, latest_inception),
+           sap_dates=sql_date_filter('t.[Effective Date]', earliest_inception, latest_inception),
+           air_select=select_list(air_cols, 'c', 'air'),
+           air_dates=sql_date_filter('c.[{}]'.format(air_lookup['eff_date']), earliest_inception, latest_inception),
+           air_status=air_lookup['status'],
+           air_stats=in_list(air_excluded_statuses),
+           crm_gp_id_src=sql_provenance('ds.crm_gp_id_ds', 'lc.crm_gp_id_lc', 'air.crm_gp_id_air'),
+           crm_id_src=sql_provenance('ds.crm_id_ds', 'lc.crm_id_lc', 'air.crm_id_air'),
+           eff_date_src=sql_provenance('ds.eff_date_ds', 'lc.eff_date_lc', 'air.eff_date_air'),
+           exp_date_src=sql_provenance('ds.exp_date_ds', 'lc.exp_date_lc', 'air.exp_date_air'))
+
+    return (qry)
+
+
+def pushdown_contracts(
+        conn: pyodbc.Connection,
+        earliest_inception: str = '2020-01-01',
+        latest_inception: str = None,
+        dialect: str = 'mssql') -> pd.DataFrame:
+    """
+    # Description
+        Read the pre-joined contract table with `pushdown_contract_query`, so
+        that the joins happen on the server and only one narrow result set
+        comes back over the network. The result has the same columns that
+        `raw_contracts` builds from the four `cinre_*_contract` readers, with
+        the key columns already coalesced.
+
+    # Parameters
+        conn: pyodbc.Connection
+            Connection to any database on the CINRE SQL Server instance
+            (the query uses fully qualified table names)
+        earliest_inception: str
+            Earliest inception date to include, in format 'YYYY-MM-DD'
+            Default is '2020-01-01'
+        latest_inception: str
+            Inception dates on or after this date are excluded, in format 'YYYY-MM-DD'
+            Default is None (no upper bound)
+        dialect: str
+            Key of `pushdown_dialects`. Default is 'mssql'
+
+    # Returns
+        contract: pd.DataFrame
+            Joined contract table
+    """
+    print('reading pre-joined contract table from the server')
+
+    # build & run the query
+    qry = pushdown_contract_query(air_contract_columns(conn, dialect),
+                                  table_columns(conn, 'CINRE_SAP', 'Treaty$', dialect),
+                                  earliest_inception, latest_inception, dialect)
+    contract = pd.read_sql_query(qry, conn)
+
+    # recode date columns to datetime, as the pandas readers do
+    for c in ('eff_date_lc exp_date_lc eff_date_ds exp_date_ds eff_date_air exp_date_air eff_date_sap '
+              'last_updated_lc last_updated_ds last_updated_air').split():
+        contract[c] = pd.to_datetime(contract[c])
+
+    return (contract)
+
+
+def raw_contracts(lc_conn : pyodbc.Connection,
+    ds_conn: pyodbc.Connection,
+    sap_conn: pyodbc.Connection,
+    air_conn: pyodbc.Connection,
+    delete_once_renamed: bool = False,
+    earliest_inception: str = '2020-01-01',
+    latest_inception: str = None,
+    pushdown: bool = False,
+    dialect: str = 'mssql') -> pd.DataFrame:
+    """
+    # Description
+    This function builds the raw contracts table from the individual contract tables.
+    Reads data from the `Contracts` table (or similar) from four specific databases:
+    - Loss Cost
+    - Deal Sheet
+    - SAP
+    - AIR
+    
+    # Parameters 
+    Note that all these connections are made in the above functions.  
+
+    lc_conn: pyodbc.Connection
+        Connection to the loss cost database.
+    ds_conn: pyodbc.Connection
+        Connection to the deal sheet database.
+    sap_conn: pyodbc.Connection
+        Connection to the SAP database.
+    air_conn: pyodbc.Connection
+        Connection to the AIR database.
+    delete_once_renamed: bool
+        If True, the columns that are compared to get the final column names are deleted.
+        This is useful if you want to save memory, and should be implemented in the future.
+        For now, it is set to False, and the columns are not deleted, so that the user can
+        see the columns that were used to get the final column names and make sure they are
+        correct.
+    earliest_inception: str
+        Earliest inception date to include, passed to each of the four contract tables.
+        Must be in ISO format (e.g. '2020-01-01').
+    latest_inception: str
+        Inception dates on or after this date are excluded from each of the four contract
+        tables. Must be in ISO format (e.g. '2021-01-01'). Default is None (no upper bound).
+    pushdown: bool
+        If True, the four contract tables are joined (and the key columns coalesced) on the
+        server in a single query using `pushdown_contracts`, and only the joined result is
+        read. All four databases are on the same instance, so only `lc_conn` is used.
+        Default is False (read each table and join them in pandas).
+    dialect: str
+        Key of `pushdown_dialects`, only used when `pushdown` is True. Default is 'mssql'.
+
+    # Returns
+    contract: pd.DataFrame
+        The raw contracts table.
+
+    # Example
+    >>> contract = raw_contracts(lc_conn, ds_conn, sap_conn, air_conn)
+    >>> contract.head()
+    # crm_id_lc eff_date_lc crm_id_ds eff_date_ds crm_id_sap eff_date_sap crm_id_air eff_date_air
+    .............................................
+
+    """
+
+    if pushdown:
+        # the server does the joins & the key coalescing in one query
+        contract = pushdown_contracts(lc_conn, earliest_inception, latest_inception, dialect)
+
+    else:
+        # build individual contract tables
+        # tables are built from the individual contract tables
+        # from each individual database
+        contract_lc = cinre_lc_contract(lc_conn, earliest_inception, latest_inception)
+        contract_ds = cinre_dealsheet_contract(ds_conn, earliest_inception, latest_inception)
+        contract_sap = cinre_sap_contract(sap_conn, earliest_inception, latest_inception)
+        contract_air = cinre_air_contract(air_conn, earliest_inception, latest_inception)
+
+        # merge the contract tables together
+        # this is done by joining on the `crm_id` and `eff_date` fields
+        # these have been the most reliable fields in my brief testing
+        print('joining contract tables from each database on crm_id and eff_date...')
+        contract = (
+                    # loss cost database: crm_id_lc, eff_date_lc
+                    contract_lc
+
+                    # deal sheet database: crm_id_ds, eff_date_ds
+                    .merge(contract_ds, how='outer', left_on='crm_id_lc eff_date_lc'.split(), right_on='crm_id_ds eff_date_ds'.split())
+
+                    # sap database: crm_id_sap, eff_date_sap
+                    .merge(contract_sap, how='outer', left_on='crm_id_ds eff_date_ds'.split(), right_on='crm_id_sap eff_date_sap'.split())
+
+                    # air database: crm_id_air, eff_date_air
+                    .merge(contract_air, how='outer', left_on='crm_id_ds eff_date_ds'.split(), right_on='crm_id_air eff_date_air'.split())
+                    )
+
+        # add columns for a join to contract table
+        # this is done using the `all4hierarchy` function, which is designed to
+        # take the values from the four databases and return the first non-null value
+        # in this order:
+        # 1. loss cost
+        # 2. deal sheet
+        # 3. air
+        # 4. sap
+        # this order is fairly arbitrary, but I have found that the loss cost database
+        # is the most reliable, so I have placed it first, followed by the deal sheet,
+        # air, and sap
+        # note also that the columns start as names with the database name, and are then
+        # renamed to the final column name
+        contract['crm_gp_id'], contract['crm_gp_id_src'] = all4hierarchy(ds=contract.crm_gp_id_ds, lc=contract.crm_gp_id_lc, air=contract.crm_gp_id_air, sap=[
+                                              0 for r in range(contract.shape[0])], provenance=True)
+        contract['crm_gp_id'] = contract['crm_gp_id'].astype(int)
+        contract['crm_id'], contract['crm_id_src'] = all4hierarchy(ds=contract.crm_id_ds, lc=contract.crm_id_lc, air=contract.crm_id_air, sap=[
+                                           'M0' for r in range(contract.shape[0])], provenance=True)
+        contract['eff_date'], contract['eff_date_src'] = all4hierarchy(ds=contract.eff_date_ds, lc=contract.eff_date_lc, air=contract.eff_date_air, sap=[
+                                             datetime.datetime.fromisoformat('2200-12-31') for r in range(contract.shape[0])], provenance=True)
+        contract['exp_date'], contract['exp_date_src'] = all4hierarchy(ds=contract.exp_date_ds, lc=contract.exp_date_lc, air=contract.exp_date_air, sap=[
+                                             datetime.datetime.fromisoformat('2201-12-31') for r in range(contract.shape[0])], provenance=True)
+
+    # update the user that the join is complete
+    print('updating contract table columns')
+    
+    # add timestamp column
+    contract['timestamp'] = build_timestamp()
+
+    # convert dates to datetime
+    for c in 'eff_date exp_date'.split():
+        contract[c] = pd.to_datetime(contract[c])
+
+    # In this next portion, I am using the `all4hierarchy` function to
+    # return the first non-null value from the four databases in the above order,
+    # and then renaming the columns to the final column names
+    # If the `delete_once_renamed` parameter is set to True, then the columns
+    # that are used to get the final column names are deleted, to save memory
+
+    # build `client_name`
+    contract['client_name'], contract['client_name_src'] = all4hierarchy(
+        ds=contract.client_name_ds, lc=contract.client_name_air, air=contract.account_lc, sap=contract.reassured_ds, provenance=True)
+
+    # delete all four input columns if `delete_once_renamed` is True
+    if delete_once_renamed:
+        contract = contract.drop(columns='client_name_ds client_name_air account_lc reassured_ds'.split())
+
+    # build `mrl` first by getting the `mrl` from the `crm_id` column
+    contract['crm_id_mrl'] = contract.crm_id.apply(lambda x: x[0]).map(
+        {'C': 'Casualty', 'P': 'Property', 'S': 'Specialty'})
+    
+    # build `line` - note that line_ds is repeated twice, because this column is not 
+    # available in the SAP database
+    contract['line'], contract['line_src'] = all4hierarchy(
+        ds=contract.line_ds, lc=contract.mrl_lc, air=contract.crm_id_mrl, sap=contract.line_ds, provenance=True)
+
+    # delete all four input columns if `delete_once_renamed` is True
+    if delete_once_renamed:
+        contract = contract.drop(columns='line_ds mrl_lc crm_id_mrl'.split())
+
+    # contract name
+    contract['contract_name'], contract['contract_name_src'] = all4hierarchy(
+        ds=contract.contract_name_ds, lc=contract.account_desc_lc, air=contract.contract_name_ds, sap=contract.contract_name_ds, provenance=True)
+
+    # delete all four input columns if `delete_once_renamed` is True
+    if delete_once_renamed:
+        contract = contract.drop(columns='contract_name_ds account_desc_lc'.split())
+
+    # some recoding on the contract name:
+    # 1. if the contract name is 0, then replace with 'temp'
+    # 2. if the contract name is blank, then replace with 'temp'
+    # 3. if the contract name is ' ', then replace with 'temp'
+    # the contracts whose names are set to 'temp' will be given a name later
+    contract['contract_name'] = (contract['contract_name']
+                                 .mask(contract['contract_name'].eq(0), other='temp')
+                                 .mask(contract['contract_name'].eq(''), other='temp')
+                                 .mask(contract['contract_name'].eq(' '), other='temp')
+                                 )
+
+    # program
+    # this next line is a bit complicated, but what it does is:
+    # 1. if the contract_type_ds is NOT 0, then replace with the program_lc
+    # 2. if the contract_type_ds is NOT '0', then replace with the program_lc
+
+    contract['contract_type_ds'] = contract['contract_type_ds'].where(contract['contract_type_ds'].ne(
+        0), other=contract.program_lc).where(contract['contract_type_ds'].ne('0'), other=contract.program_lc)
+    contract['program'], contract['program_src'] = all4hierarchy(ds=contract.contract_type_ds.where(contract.contract_type_ds.ne(
+        0), other=contract.program_lc), lc=contract.program_lc, air=contract.program_air, sap=contract.contract_type_ds, provenance=True)
+    contract['program'] = contract.program.mask(contract.program.eq('0'), other='').mask(
+        contract.program.eq(''), other='').mask(contract.program.eq(' '), other='')
+
+    # WC Catastrophe Excess of Loss
+    # 'Per Occurrence Cat XOL'
+    # This is to recode one specific program name
+    contract['program'] = (contract.program
+                           # missing WC Cat XOL is per occ cat xol
+                           .mask(
+                                # if program is 0 or blank and contract name is WC Cat XOL
+                                np.logical_and(
+                                    np.logical_or(
+                                        contract.program.eq(0), contract.program.eq('')
+                                    )
+                                    , contract.contract_name.eq('WC Catastrophe Excess of Loss')
+                                )
+                            # then program is Per Occ Cat XOL
+                            , other='Per Occurrence Cat XOL'
+                            )
+                        )
+
+    # here are a few additional programs that need to be recoded:
+    # 1. if the program is 0, then replace with ''
+    # 2. if the program is blank, then replace with ''
+    # 3. if the program is ' ', then replace with ''
+
+    # use the np.select function to recode the program column
+    # this starts by defining conditions and choices
+    cond = [
+        # Condition 1: does the contract name contain 'Per Policy XOL' anywhere?
+        contract.contract_name.str.contains("Per Policy XOL")
+        
+        # Condition 2: does the contract name contain 'WC Catastrophe Excess of Loss' anywhere?
+        , contract.contract_name.str.contains("WC Catastrophe Excess of Loss")
+        ]
+
+    # if the program has either of these two substrings,
+    # then replace with the corresponding choice general options
+    choices = [
+        # Choice 1: if the contract name contains 'Per Policy XOL',
+        # then replace the entire program column with 'Per Policy XOL'
+        'Per Policy XOL'
+        
+        # Choice 2: if the contract name contains 'WC Catastrophe Excess of Loss',
+        # then replace the entire program column with 'Per Occurrence Cat XOL'
+        , 'Per Occurrence Cat XOL'
+        ]
+
+    # now use the np.select function to recode the program column, but 
+    # only if the program column is blank (this is why we did the recoding before)
+    contract['program'] = (
+        contract['program']
+        .where(
+            contract['program'].notna()
+            , other=np.select(cond, choices, '')
+        )
+    )
+
+    # trigger is one of three values: RA, LO, or LD, which stand for
+    # "Risks Attaching", "Losses Occurring", and "Losses Discovered"
+    # this section uses the all4hierarchy function to recode the trigger column
+    # so that it is consistent
+    contract['trigger_long'], contract['trigger_long_src'] = all4hierarchy(ds=contract.trigger_ds, lc=contract.treaty_basis_lc
+
+        # this line defines that the trigger equals "Risks Attaching"
+        # if the contract name is "Freddie Mac"
+        , air=contract.trigger_ds.mask(
+            contract.contract_name.eq('Freddie Mac'), other='Risks Attaching'
+            )
+
+            , sap=contract.trigger_ds, provenance=True)
+
+    # recode the trigger column so that NA values are replaced with the treaty basis
+    # from the loss cost DB
+    contract['trigger_long_src'] = contract['trigger_long_src'].mask(
+        contract['trigger_long'].isna() & contract.treaty_basis_lc.notna(), other=provenance_codes['lc'])
+    contract['trigger_long'] = (
+        contract['trigger_long']
+        .where(
+            contract['trigger_long'].notna()
+            , other=contract.treaty_basis_lc
+        )
+    )
+
+    # define a `trigger` column that is the same as the `trigger_long` column,
+    # but with the values recoded to RA, LO, or LD
+    contract['trigger'] = contract['trigger_long'].map(
+        {'Risks Attaching': 'RA', 'Losses Occurring': 'LO', 'Losses Discovered': 'LD'}
+    )
+
+    # treaty category 
+    contract['treaty_category'] = contract['treaty_category_ds'].mask(
+        contract['treaty_category_ds'].isna(), other='Missing')
+
+    # currency
+    contract['currency'], contract['currency_src'] = all4hierarchy(
+        ds=contract.currency_ds, lc=contract.currency_lc, air=contract.currency_air, sap=contract.currency_ds, provenance=True)
+
+    # create something if contract name is missing
+    temp_name = (
+        # start with the line and program columns
+        contract['line'].astype(str)
+        
+        # join them together with a space, and the year of the eff_date
+        # instead of the full date
+        .str.cat([contract['program'].astype(str), contract['eff_date'].dt.strftime('%Y')], sep=' ')
+    )
+
+    # replace missing contract names with the temp_name
+    contract['contract_name_src'] = contract['contract_name_src'].mask(
+        contract.contract_name.isin(['temp', ' ']), other=provenance_codes['derived'])
+    contract['contract_name'] = (
+        contract.contract_name
+        
+        # use the `mask` function to replace contract names 'temp' with the
+        # actual value defined as `temp_name`
+        .mask(contract.contract_name.eq('temp'), other=temp_name)
+        
+        # use the `mask` function to replace contract names ' ' with the
+        # actual value defined as `temp_name`
+        .mask(contract.contract_name.eq(' '), other=temp_name)
+
+        # otherwise, just use the contract name
+    )
+
+
+    # territory
+    contract['territory'], contract['territory_src'] = all4hierarchy(
+        ds=contract.terr_ds, lc=contract.region_lc, air=contract.region_air, sap=contract.terr_ds, provenance=True)
+
+    # replace missing values with 'Missing' so that they can be grouped together
+    # or filtered out, etc
+    contract['territory'] = contract['territory'].mask(
+        contract['territory'].eq(0), other='Missing')
+
+    # broker
+    contract['broker'], contract['broker_src'] = all4hierarchy(
+        ds=contract.broker_ds, lc=contract.broker_air, air=contract.broker_ds, sap=contract.broker_ds, provenance=True)
+    
+    # replace missing values with 'Missing' so that they can be grouped together
+    # or filtered out, etc
+    contract['broker'] = contract['broker'].mask(
+        contract['broker'].eq(0), other='Missing')
+
+    # last updated date
+    # replace missing values with 1/1/1900, so that they can be grouped together
+    # or filtered out, etc
+    contract['last_updated_lc'] = contract['last_updated_lc'].mask(
+        contract['last_updated_lc'].isna(), other=datetime.datetime.fromisoformat('1990-01-01'))
+    contract['last_updated_ds'] = contract['last_updated_ds'].mask(
+        contract['last_updated_ds'].isna(), other=datetime.datetime.fromisoformat('1990-01-01'))
+    contract['last_updated_air'] = contract['last_updated_air'].mask(
+        contract['last_updated_air'].isna(), other=datetime.datetime.fromisoformat('1990-01-01'))
+
+    # max of the 3 `last_updated` columns:
+    # should work like this, but faster:
+    # contract['last_updated'] = contract['last_updated_lc last_updated_ds last_updated_air'.split(
+    # )].apply(lambda x: max(x[0], x[1], x[2]), axis=1)
+
+    # first try to use the loss cost last updated date,
+    # then the DS last updated date, then the AIR last updated date
+    contract['last_updated'] = contract['last_updated_lc'].mask(
+        contract['last_updated_lc'] > contract['last_updated_ds'], other=contract['last_updated_ds'])
+    contract['last_updated'] = contract['last_updated'].mask(
+        contract['last_updated'] > contract['last_updated_air'], other=contract['last_updated_air'])
+
+
+    # drop out all ceded_retro contracts
+    contract = contract.copy().query('treaty_category_ds != "Ceded Retrocession"')
+
+    # return sorted contract table with only the columns we want
+    contract = contract[['timestamp',
+                         'crm_gp_id', 'crm_id', 'eff_date', 'exp_date',
+
+                         'client_name',
+                         # 'client_name_ds', 'client_name_air', 'account_lc','reassured_ds',
+
+                         'line',
+                         # 'mrl_lc','line_ds','crm_id_mrl',
+                         'subline_ds',
+
+                         'contract_name',
+                         # 'account_desc_lc','contract_name_ds',
+
+                         'program',
+                         # 'contract_type_ds', 'program_lc','program_air',
+
+                         'trigger', 'trigger_long',
+                         # 'trigger_ds','treaty_basis_lc',
+
+                         'alae_basis_lc',
+                         'dominant_type_ds',
+
+                         'treaty_category',
+                         # 'treaty_category_ds',
+
+                         # 'nature_of_treaty_sap',
+                         # 'mga_ds',
+
+                         'broker',
+                         # 'broker_ds','broker_air',
+                         # 'broker_numb_ds',
+
+                         'cyber_agg_limit_ds', 'cyber_exposure_ds',
+                         # 'uw_for_treaty_sap',
+                         # 'acct_freq_numb_sap','acct_level_sap',
+
+                         'territory',
+                         # 'terr_ds','region_lc','region_air',
+                         # 'exposure_terr_sap',
+                         # 'business_type_numb_sap',
+                         # 'cancel_date_sap','cancel_type_sap',
+                         # 'peril_sap',
+                         # 'loss_eval_date_lc',
+                         'status_lc', 'status_ds', 'status_air',
+                         # 'cat_model_version_lc',
+                         'user_id_lc', 'user_name_air',
+
+                         'last_updated',
+                         'last_updated_ds', 'last_updated_lc', 'last_updated_air',
+
+                         'currency',
+                         # 'currency_ds','currency_lc','currency_air',
+
+                         'source_file_ds', 'source_file_lc',
+                         'share_point_file_ds', 'file_location_air',
+
+                         # 'note_lc','note_ds','note_air',
+
+                         'ult_cre_prem_ds', 'deposit_prem_ds',
+                         'expected_loss_ds', 'model_expected_loss_ds',
+                         'expense_ratio_ds',
+                         'tech_uw_ratio_ds', 'uw_profit_ds', 'npv_uw_profit_ds', 'roe_change_ds',
+                         'standalone_tvar_250_ds', 'standalone_roc_250_ds', 'diversified_tvar_250_ds', 'diversified_roc_250_ds', 'loss_cv_ds',
+                         'chg_rate_adequacy_ds', 'rate_change_ds', 'program_rate_change_ds',
+                         # 'company_id_ds','annual_values_ds','company_code_sap','end_of_acct_year_sap','specific_numb_retro_allowed_sap',
+                         'executive_summary_air',
+
+                         # provenance code of each coalesced column (see `provenance_codes`)
+                         'crm_gp_id_src', 'crm_id_src', 'eff_date_src', 'exp_date_src',
+                         'client_name_src', 'line_src', 'contract_name_src', 'program_src',
+                         'trigger_long_src', 'currency_src', 'territory_src', 'broker_src'
+                         ]]
+    ################################################################################################################################################################ MAYBE CHECK THIS
+    ################################################################################################################################################################ MAYBE CHECK THIS
+    ################################################################################################################################################################ MAYBE CHECK THIS
+    contract.query('crm_id != "M0"', inplace=True)
+
+    return (contract)
+
+    ### NOW, after going through that entire process to clean the contract table,
+    ### we can do almost the exact same thing to clean the layer terms table
+    ### of course, we will not be able to reuse almost any of the code, but
+    ### it's good to keep in mind that this is the same general process 
+
+
+def cinre_lc_layers(lc_conn : pyodbc.Connection, earliest_eff_date : str = '2020-01-01', latest_eff_date : str = None):
+    """
+    # Description:
+        Read in the layer terms table from the loss cost DB
+    # Parameters:
+        lc_conn: pyodbc.Connection object
+            connection to the loss cost DB
+        earliest_eff_date: str
+            earliest effective date to include in the table
+            must be in format 'YYYY-MM-DD'
+            Default: '2020-01-01'
+        latest_eff_date: str
+            effective dates on or after this date are excluded
+            must be in format 'YYYY-MM-DD'
+            Default: None (no upper bound)
+    # Returns:
+        layer_lc: pandas.DataFrame
+    """
+    # print 
+    print('reading layer terms table from loss cost DB')
+
+    # read in table
+    layer_lc = readtbl('LayerTerms', lc_conn)
+
+    # need contract table for filtering out effective dates
+    contract = cinre_lc_contract(lc_conn, earliest_eff_date, latest_eff_date)
+
+
+    # change column names
+    layer_lc_curcols = ['CrmGroupID', 'CrmID', 'Layer', 'SubjectPremium', 'RiskLimit', 'RiskRetention', 'OccLimit', 'ReinstStrg', 'Aad', 'AggLimit', 'LossCorrStart', 'LossCorrStop', 'Brokerage', 'RpBrokerage', 'Rate', 'SwingMinRate', 'SwingMaxRate', 'SwingLoad', 'UlaeRatio', 'ProfitComm', 'MaxPc', 'ReinsExpLoad', 'Comm', 'SsLrMin', 'SsSlide1', 'SsLrMid', 'SsSlide2', 'SsLrMax', 'ReinsPremium100', 'NonCatAvgLossAlae', 'MdlCatAvgLossAlae', 'MdlHuEqCatAvgLossAlae', 'MdlAOCatAvgLossAlae', 'NmdCatAvgLossAlae', 'RawNonCatCV', 'NonCatParmRisk', 'NonCatCV', 'RawNmdCatCV',
+                        'NmdCatParmRisk', 'NmdCatCV', 'InterestRate', 'Bound', 'AuthorizedShare', 'FotRate', 'QuoteRate', 'SignedShare', 'CreProPrem', 'CreDepPrem', 'CreUltPrem', 'CreCedComm', 'CreBrokExp', 'CreAoExp', 'CreUw', 'CreNpvUw', 'ClashType', 'ClashCoverage', 'CyberSublimit', 'TerrorCoverage', 'TerrorSublimit', 'CatCoverageType', 'CatExperienceLoad', 'CyberCoverage', 'Placement', 'EcoXpl', 'DJ', 'TrapValExpLim', 'MarginalTvar50', 'MarginalTvar250', 'LayerMinCapital', 'CurrencyByLayer', 'TotCasAggLim', 'PricingType', 'OccRet', 'GrNetAggRet', 'GrNetAggLim', 'Maol']
+    layer_lc_newcols = ['crm_gp_id', 'crm_id', 'layer', 'subject_premium', 'risk_limit', 'risk_retention', 'occ_limit', 'reinstatement_string', 'aad', 'agg_limit', 'loss_corr_start', 'loss_corr_stop', 'brokerage', 'rp_brokerage', 'rate', 'swing_min_rate', 'swing_max_rate', 'swing_load', 'ulae_ratio', 'profit_comm', 'max_pc', 'reins_exp_load', 'comm', 'ss_lr_min', 'ss_slide1', 'ss_lr_mid', 'ss_slide2', 'ss_lr_max', 'reins_premium_100', 'non_cat_ave_loss_alae', 'mdl_cat_ave_loss_alae', 'mdl_hu_eq_cat_ave_loss_alae', 'mdl_ao_cat_ave_loss_alae', 'nmd_cat_ave_loss_alae', 'raw_non_cat_cv', 'non_cat_param_risk', 'non_cat_cv', 'raw_nmd_cat_cv',
+                        'nmd_cat_param_risk', 'nmd_cat_cv', 'interest_rate', 'bound', 'authorized_share', 'fot_rate', 'quote_rate', 'signed_share', 'cre_pro_prem', 'cre_deposit_prem', 'cre_ult_prem', 'cre_ceded_comm', 'cre_brok_exp', 'cre_ao_exp', 'cre_uw', 'cre_npv_uw', 'clash_type', 'clash_coverage', 'cyber_sublimit', 'terror_coverage', 'terror_sublimit', 'cat_coverage_type', 'cat_experience_load', 'cyber_coverage', 'placement', 'eco_x_pl', 'dj', 'trap_val_exp_lim', 'marginal_tvar_50', 'marginal_tvar_250', 'layer_min_capital', 'currency_by_layer', 'tot_cas_agg_lim', 'pricing_type', 'occ_ret', 'gr_net_agg_ret', 'gr_net_agg_lim', 'maol']
+    layer_lc.rename(columns=dict(
+        zip(layer_lc_curcols, [c + '_lc' for c in layer_lc_newcols])), inplace=True)
+
+    # inception dates 2020 & later
+    layer_lc = layer_lc.loc[layer_lc['crm_id_lc'].isin(
+        contract.crm_id_lc.drop_duplicates().tolist()), :].reset_index(drop=True)
+
+    # recode character cols to categories
+    # for col in ['crm_id_lc','reinstatement_string_lc','clash_type_lc','clash_coverage_lc','terror_coverage_lc','cat_coverage_type_lc','cyber_coverage_lc','eco_x_pl_lc','dj_lc','currency_by_layer_lc','pricing_type_lc','gr_net_agg_ret_lc','gr_net_agg_lim_lc']:
+    # layer_lc[col] = layer_lc[col].astype('category')
+
+    # recode layer_lc so can join
+    layer_lc['layer_lc'] = layer_lc['layer_lc'].astype('float')
+
+    # GET EFF DATE FOR JOIN
+    layer_lc = (
+        layer_lc
+        .merge(
+            contract['crm_gp_id_lc crm_id_lc eff_date_lc exp_date_lc'.split()],
+            how='left',
+            on='crm_gp_id_lc crm_id_lc'.split()
+        )
+    )
+
+    # return table
+    return (layer_lc)
+
+
+def cinre_ds_layers(ds_conn : pyodbc.Connection, earliest_eff_date : str = '2020-01-01', latest_eff_date : str = None) -> pd.DataFrame:
+    """
+    # Description
+        Read in layer table from deal sheet DB
+
+    # Parameters
+    ds_conn: pyodbc.Connection
+        connection to deal sheet DB
+    earliest_eff_date: str
+        earliest effective date to include in layer table
+        must be in format 'YYYY-MM-DD'
+        default is '2020-01-01'
+    latest_eff_date: str
+        effective dates on or after this date are excluded
+        must be in format 'YYYY-MM-DD'
+        default is None (no upper bound)
+
+    # Returns
+    layer_ds: pandas.DataFrame
+        layer table from deal sheet DB
+    """
+
+    print('reading layer table from deal sheet DB')
+    
+    # read in layer table from deal sheet DB
+    layer_ds = readtbl('Layer', ds_conn)
+
+    # get contract table as well with a few key columns
+    contract = cinre_dealsheet_contract(ds_conn, earliest_eff_date, latest_eff_date)[['crm_gp_id_ds', 'crm_id_ds', 'eff_date_ds', 'exp_date_ds',
+                                                'expense_ratio_ds', 'tech_uw_ratio_ds', 'ult_cre_prem_ds']].drop_duplicates()
+
+    # rename columns to match layer_lc but include a suffix
+    contract.rename(
+        columns=dict(
+            expense_ratio_ds='expense_ratio_ds_contract',
+            tech_uw_ratio_ds='tech_uw_ratio_ds_contract',
+            ult_cre_prem_ds='ult_cre_prem_ds_contract'
+        ), 
+        inplace=True
+    )
+
+    # recode datetime columns
+    for c in 'Inception Expiration'.split():
+        layer_ds[c] = pd.to_datetime(layer_ds[c])
+
+    # change column names
+    layer_ds_curcols = ['CinReId', 'LayerID', 'LayerName', 'NewRenew', 'Inception', 'Expiration', 'SAPTreaty', 'SAPSection', 'ContractType', 'DominantType', 'Territory', 'UWArea', 'Limit', 'Retention', 'Reinstatements', 'MaxPolicyLimit', 'AggLimit', 'AggRetention', 'Currency', 'Trigger', 'ReportRemit', 'ALAE', 'Placement', 'Rate', 'ROL', 'AuthorizedLine',
+                        'SignedLine', 'UltCinRePrem', 'ExpectedLoss', 'TechUWRatio', 'UWProfit', 'NPVUWProfit', 'TVaR250', 'ROE250', 'RateChange', 'DepositPrem', 'CyberExposure', 'CyberAggLimit', 'CatDBLayerID', 'Note', 'MinimumPrem', 'DepPremSchedule', 'LossCostDBLayerID', 'PNOC', 'OrgInception', 'OrgExpiration', 'SubjectPrem', 'SubjectBase', 'Brokerage', 'RPBrokerage']
+    layer_ds_newcols = ['crm_gp_id', 'layer_id', 'layer_name', 'new_renew', 'eff_date', 'exp_date', 'sap_treaty', 'sap_section', 'contract_type', 'dominant_type', 'terr', 'uw_area', 'limit', 'retention', 'reinstatements', 'max_policy_limit', 'agg_limit', 'agg_retention', 'currency', 'trigger', 'report_remit', 'alae', 'placement', 'rate', 'rol', 'authorized_line',
+                        'signed_line', 'ult_cre_prem', 'expected_loss', 'tech_uw_ratio', 'uw_profit', 'npv_uw_profit', 'tvar_250', 'roe_250', 'rate_change', 'deposit_prem', 'cyber_exposure', 'cyber_agg_limit', 'cat_db_layer_id', 'note', 'min_prem', 'dep_prem_schedule', 'cinre_lc_layer_id', 'pnoc', 'org_eff_date', 'org_exp_date', 'subject_prem', 'subject_base', 'brokerage', 'rp_brokerage']
+    layer_ds.rename(columns=dict(
+        zip(layer_ds_curcols, [c + '_ds' for c in layer_ds_newcols])), inplace=True)
+
+    # inception dates later than earliest_eff_date
+    layer_ds = layer_ds.loc[layer_ds['eff_date_ds'] >= datetime.datetime.fromisoformat(earliest_eff_date), :].reset_index(drop=True)
+
+    # inception dates earlier than latest_eff_date, if one is given
+    if latest_eff_date is not None:
+        layer_ds = layer_ds.loc[layer_ds['eff_date_ds'] < datetime.datetime.fromisoformat(latest_eff_date), :].reset_index(drop=True)
+
+    # join in contract columns
+    layer_ds = layer_ds.merge(
+        contract, how='left', on='crm_gp_id_ds eff_date_ds exp_date_ds'.split())
+
+    # sort by crm_gp_id
+    layer_ds = layer_ds.sort_values(
+        'crm_gp_id_ds layer_name_ds'.split()).reset_index(drop=True)
+
+    # return table
+    return (layer_ds)
+
+
+def cinre_air_layers(air_conn : pyodbc.Connection, layer_table_name : str, earliest_date : str = '2020-01-01', latest_date : str = None) -> pd.DataFrame:
+    """
+    # Description
+        Read in layer table from AIR DB
+
+    # Parameters
+    air_conn: pyodbc.Connection
+        connection to AIR DB
+    layer_table_name: str
+        name of layer table in AIR DB
+    earliest_date: str
+        earliest effective date to include in layer table
+        must be in format 'YYYY-MM-DD'
+        default is '2020-01-01'
+    latest_date: str
+        effective dates on or after this date are excluded
+        must be in format 'YYYY-MM-DD'
+        default is None (no upper bound)
+
+    # Returns
+    layer_air: pandas.DataFrame
+        layer table from AIR DB
+    """
+    # print message
+    print('reading layer table from AIR DB')
+
+    # old/new column names
+    old_layer_cols = ['CRMID', 'CinReID', 'Name', 'Program', 'Inception', 'Expiration', 'Status', 'Broker', 'Region', 'Currency', 'LayerType', 'Rol', 'OccLimit', 'OccRetention', 'Franchise', 'ReinstatementNumber', 'ReinstatementRate', 'ReinstatementStr',
+                      'AggLimit', 'AggRetention', 'Participation', 'Components', 'SharesPriced', 'SharesAuthorized', 'SharesSigned', 'Brokerage', 'RpBrokerage', 'LayerId', 'RppRefRol', 'Comments', 'PricingRegistry', 'CinReGroupID', 'Lc_AppliesAgg', 'Lc_RatioToAgg']
+    new_layer_cols = ['crm_id', 'cre_id', 'name', 'program', 'eff_date', 'exp_date', 'status', 'broker', 'region', 'currency', 'layer_type', 'rol', 'occ_limit', 'occ_retention', 'franchise', 'reinstatement_numb', 'reinstatement_rate', 'reinstatement_str',
+                      'agg_limit', 'agg_retention', 'participation', 'components', 'shares_priced', 'shares_authorized', 'shares_signed', 'brokerage', 'rp_brokerage', 'layer_id', 'rpp_ref_rol', 'comments', 'pricing_registry', 'cre_gp_id', 'lc_applies_agg', 'lc_ratio_to_agg']
+
+    # read table
+    raw_layer_air = readtbl(layer_table_name, air_conn)
+
+    # rename columns
+    raw_layer_air.rename(columns=dict(
+        zip(old_layer_cols, [c+'_air' for c in new_layer_cols])), inplace=True)
+
+    # recode dates to datetime
+    for c in 'eff_date_air exp_date_air'.split():
+        raw_layer_air[c] = pd.to_datetime(raw_layer_air[c])
+
+    # eff_date >= 1/1/2020
+    raw_layer_air = raw_layer_air.loc[raw_layer_air.eff_date_air >=
+                                      datetime.datetime.fromisoformat(earliest_date), :]
+
+    # eff_date < latest_date, if one is given
+    if latest_date is not None:
+        raw_layer_air = raw_layer_air.loc[raw_layer_air.eff_date_air <
+                                          datetime.datetime.fromisoformat(latest_date), :]
+
+    # ensure contracts in line with contracts_air table
+    contract_air = cinre_air_contract(air_conn, earliest_date, latest_date)
+    air_crmids = contract_air['crm_id_air crm_gp_id_air eff_date_air'.split(
+    )].drop_duplicates()
+
+    # merge the two tables
+    layer_air = raw_layer_air.merge(
+        air_crmids, how='outer', on='crm_id_air eff_date_air'.split())
+
+    # return the table
+    return (layer_air)
+
+
+def pushdown_layer_query(
+        air_cols: list,
+        layer_table_name: str,
+        earliest_eff_date: str = '2020-01-01',
+        latest_eff_date: str = None,
+        dialect: str = 'mssql') -> str:
+    """
+    # Description
+        Build a single cross-database query that does the work of the three
+        `cinre_*_layers` readers and the outer joins in `raw_layers` on the
+        server, in the same way as `pushdown_contract_query` does for contracts.
+
+        Each source is filtered, renamed (with the same `_lc`, `_ds` and `_air`
+        suffixes as the pandas readers) and reduced to only the columns that
+        `raw_layers` uses. The key columns `crm_gp_id`, `crm_id`, `layer_id`,
+        `eff_date` and `exp_date` are coalesced on the server in the same order
+        as `raw_layers` does with `all4hierarchy`. The contract statuses are
+        filtered in lower case with the same lists as the pandas readers.
+
+    # Parameters
+        air_cols: list
+            Column names of the AIR `Contract_New` table, in table order
+            (see `air_contract_columns`)
+        layer_table_name: str
+            Name of the layer table in the AIR DB
+        earliest_eff_date: str
+            Earliest effective date to include, in format 'YYYY-MM-DD'
+            Default is '2020-01-01'
+        latest_eff_date: str
+            Effective dates on or after this date are excluded, in format 'YYYY-MM-DD'
+            Default is None (no upper bound)
+        dialect: str
+            Key of `pushdown_dialects`. Default is 'mssql'
+
+    # Returns
+        qry: str
+            SQL query returning the pre-joined layer table
+    """
+    # (source column, new column) pairs for each source, only the ones
+    # that `raw_layers` uses
+    lc_cols = [('CrmGroupID', 'crm_gp_id'), ('CrmID', 'crm_id'), ('SubjectPremium', 'subject_premium'),
+               ('RiskLimit', 'risk_limit'), ('RiskRetention', 'risk_retention'), ('OccLimit', 'occ_limit'),
+               ('ReinstStrg', 'reinstatement_string'), ('Aad', 'aad'), ('AggLimit', 'agg_limit'),
+               ('LossCorrStart', 'loss_corr_start'), ('LossCorrStop', 'loss_corr_stop'),
+               ('Brokerage', 'brokerage'), ('RpBrokerage', 'rp_brokerage'), ('Rate', 'rate'),
+               ('SwingMinRate', 'swing_min_rate'), ('SwingMaxRate', 'swing_max_rate'), ('SwingLoad', 'swing_load'),
+               ('UlaeRatio', 'ulae_ratio'), ('ProfitComm', 'profit_comm'), ('Comm', 'comm'),
+               ('SsLrMin', 'ss_lr_min'), ('SsSlide1', 'ss_slide1'), ('SsLrMid', 'ss_lr_mid'),
+               ('SsSlide2', 'ss_slide2'), ('SsLrMax', 'ss_lr_max'),
+               ('NonCatAvgLossAlae', 'non_cat_ave_loss_alae'), ('MdlCatAvgLossAlae', 'mdl_cat_ave_loss_alae'),
+               ('NmdCatAvgLossAlae', 'nmd_cat_ave_loss_alae'), ('RawNonCatCV', 'raw_non_cat_cv'),
+               ('NonCatParmRisk', 'non_cat_param_risk'), ('NonCatCV', 'non_cat_cv'),
+               ('RawNmdCatCV', 'raw_nmd_cat_cv'), ('NmdCatParmRisk', 'nmd_cat_param_risk'), ('NmdCatCV', 'nmd_cat_cv'),
+               ('AuthorizedShare', 'authorized_share'), ('SignedShare', 'signed_share'),
+               ('CreDepPrem', 'cre_deposit_prem'), ('CreUltPrem', 'cre_ult_prem'), ('CreAoExp', 'cre_ao_exp'),
+               ('CreUw', 'cre_uw'), ('CreNpvUw', 'cre_npv_uw'), ('ClashType', 'clash_type'),
+               ('ClashCoverage', 'clash_coverage'), ('CyberSublimit', 'cyber_sublimit'),
+               ('TerrorCoverage', 'terror_coverage'), ('TerrorSublimit', 'terror_sublimit'),
+               ('CatCoverageType', 'cat_coverage_type'), ('CatExperienceLoad', 'cat_experience_load'),
+               ('CyberCoverage', 'cyber_coverage'), ('Placement', 'placement'), ('EcoXpl', 'eco_x_pl'),
+               ('DJ', 'dj'), ('TrapValExpLim', 'trap_val_exp_lim'), ('TotCasAggLim', 'tot_cas_agg_lim'),
+               ('PricingType', 'pricing_type'), ('OccRet', 'occ_ret'), ('GrNetAggRet', 'gr_net_agg_ret'),
+               ('GrNetAggLim', 'gr_net_agg_lim'), ('Maol', 'maol')]
+    ds_cols = [('CinReId', 'crm_gp_id'), ('LayerID', 'layer_id'), ('LayerName', 'layer_name'),
+               ('Inception', 'eff_date'), ('Expiration', 'exp_date'), ('SAPTreaty', 'sap_treaty'),
+               ('SAPSection', 'sap_section'), ('Limit', 'limit'), ('Retention', 'retention'),
+               ('Reinstatements', 'reinstatements'), ('AggLimit', 'agg_limit'), ('AggRetention', 'agg_retention'),
+               ('Placement', 'placement'), ('Rate', 'rate'), ('ROL', 'rol'), ('AuthorizedLine', 'authorized_line'),
+               ('SignedLine', 'signed_line'), ('UltCinRePrem', 'ult_cre_prem'), ('ExpectedLoss', 'expected_loss'),
+               ('TechUWRatio', 'tech_uw_ratio'), ('UWProfit', 'uw_profit'), ('NPVUWProfit', 'npv_uw_profit'),
+               ('DepositPrem', 'deposit_prem'), ('CyberExposure', 'cyber_exposure'),
+               ('CyberAggLimit', 'cyber_agg_limit'), ('LossCostDBLayerID', 'cinre_lc_layer_id'),
+               ('PNOC', 'pnoc'), ('SubjectPrem', 'subject_prem'), ('Brokerage', 'brokerage'),
+               ('RPBrokerage', 'rp_brokerage')]
+    air_layer_cols = [('Rol', 'rol'), ('OccLimit', 'occ_limit'), ('OccRetention', 'occ_retention'),
+                      ('Franchise', 'franchise'), ('ReinstatementStr', 'reinstatement_str'),
+                      ('AggLimit', 'agg_limit'), ('AggRetention', 'agg_retention'),
+                      ('Participation', 'participation'), ('SharesAuthorized', 'shares_authorized'),
+                      ('SharesSigned', 'shares_signed'), ('Brokerage', 'brokerage'),
+                      ('RpBrokerage', 'rp_brokerage'), ('LayerId', 'layer_id'), ('RppRefRol', 'rpp_ref_rol'),
+                      ('PricingRegistry', 'pricing_registry'), ('Lc_AppliesAgg', 'lc_applies_agg'),
+                      ('Lc_RatioToAgg', 'lc_ratio_to_agg')]
+
+    # the AIR contract table is renamed by position, see `pushdown_contract_query`
+    air_new_cols = ['client_name', 'client_id_numb', 'eff_date', 'exp_date',
+                    'program', 'crm_gp_id2', 'wp_contract', 'occ_limit_contract', 'agg_limit_contract',
+                    'status', 'region', 'note', 'last_updated', 'has_pc', 'user_name', 'file_location',
+                    'broker', 'executive_summary', 'currency', 'crm_id', 'fx_rate_id', 'template_altered',
+                    'crm_gp_id', 'template_source']
+    air_lookup = dict(zip(air_new_cols, air_cols))
+
+    # table names & string concatenation for this database
+    sql = pushdown_dialects[dialect]
+    table = sql['table'].format
+
+    def select_list(cols, alias, suffix):
+        return ',\n        '.join('{}.[{}] AS {}_{}'.format(alias, old, new, suffix) for old, new in cols)
+
+    def in_list(values):
+        return ', '.join("'{}'".format(v) for v in values)
+
+    qry = '''
+WITH lc_contract AS (
+    SELECT
+        c.[CrmGroupID] AS crm_gp_id_lc,
+        {crm_id_lc} AS crm_id_lc,
+        c.[Inception] AS eff_date_lc,
+        c.[Expiration] AS exp_date_lc
+    FROM {lc_contract} c
+    WHERE {lc_dates}
+      AND (c.[Status] IS NULL OR LOWER(c.[Status]) NOT IN ({lc_stats}))
+),
+lc AS (
+    SELECT
+        {lc_select},
+        CAST(lt.[Layer] AS float) AS layer_lc,
+        c.eff_date_lc,
+        c.exp_date_lc
+    FROM {lc_layer} lt
+    LEFT JOIN lc_contract c
+      ON c.crm_gp_id_lc = lt.[CrmGroupID] AND c.crm_id_lc = lt.[CrmID]
+    WHERE lt.[CrmID] IN (SELECT crm_id_lc FROM lc_contract)
+),
+ds AS (
+    SELECT
+        {ds_select},
+        c.crm_id_ds
+    FROM {ds_layer} l
+    LEFT JOIN (
+        SELECT DISTINCT [CinReId], [CRMID] AS crm_id_ds, [Inception], [Expiration]
+        FROM {ds_contract}
+        WHERE {ds_contract_dates}
+    ) c
+      ON c.[CinReId] = l.[CinReId] AND c.[Inception] = l.[Inception] AND c.[Expiration] = l.[Expiration]
+    WHERE {ds_dates}
+),
+air AS (
+    SELECT
+        COALESCE(l.crm_id_air, k.crm_id_air) AS crm_id_air,
+        COALESCE(l.eff_date_air, k.eff_date_air) AS eff_date_air,
+        l.exp_date_air,
+        k.crm_gp_id_air,
+        {air_layer_aliases}
+    FROM (
+        SELECT
+            l.[CRMID] AS crm_id_air,
+            l.[Inception] AS eff_date_air,
+            l.[Expiration] AS exp_date_air,
+            {air_layer_select}
+        FROM {air_layer} l
+        WHERE {air_layer_dates}
+    ) l
+    FULL OUTER JOIN (
+        SELECT DISTINCT
+            c.[{air_crm_id}] AS crm_id_air,
+            c.[{air_crm_gp_id}] AS crm_gp_id_air,
+            c.[{air_eff_date}] AS eff_date_air
+        FROM {air_contract} c
+        WHERE {air_contract_dates}
+          AND (c.[{air_status}] IS NULL OR LOWER(c.[{air_status}]) NOT IN ({air_stats}))
+    ) k
+      ON k.crm_id_air = l.crm_id_air AND k.eff_date_air = l.eff_date_air
+)
+SELECT
+    COALESCE(ds.crm_gp_id_ds, lc.crm_gp_id_lc, air.crm_gp_id_air) AS crm_gp_id,
+    COALESCE(ds.crm_id_ds, lc.crm_id_lc, air.crm_id_air) AS crm_id,
+    COALESCE(ds.layer_id_ds, ds.cinre_lc_layer_id_ds, lc.layer_lc, air.layer_id_air) AS layer_id,
+    COALESCE(ds.eff_date_ds, lc.eff_date_lc, air.eff_date_air) AS eff_date,
+    COALESCE(ds.exp_date_ds, lc.exp_date_lc, air.exp_date_air) AS exp_date,
+    {crm_gp_id_src} AS crm_gp_id_src,
+    {crm_id_src} AS crm_id_src,
+    {layer_id_src} AS layer_id_src,
+    {eff_date_src} AS eff_date_src,
+    {exp_date_src} AS exp_date_src,
+    lc.*, ds.*, air.*
+FROM lc
+FULL OUTER JOIN ds
+  ON lc.crm_gp_id_lc = ds.crm_gp_id_ds AND lc.layer_lc = ds.layer_id_ds AND lc.eff_date_lc = ds.eff_date_ds
+FULL OUTER JOIN air
+  ON ds.crm_gp_id_ds = air.crm_gp_id_air AND ds.cinre_lc_layer_id_ds = air.layer_id_air AND ds.eff_date_ds = air.eff_date_air
+'''.format(crm_id_lc=sql['concat'].format('SUBSTRING(c.[MgtRptLine], 1, 1)', 'CAST(c.[CrmGroupID] AS varchar(20))'),
+           lc_contract=table('CINRE_LC', 'Contract'),
+           lc_layer=table('CINRE_LC', 'LayerTerms'),
+           ds_contract=table('CINRE_DealSheet', 'Contract'),
+           ds_layer=table('CINRE_DealSheet', 'Layer'),
+           air_contract=table('CINRE_PRICING_AIRv10', 'Contract_New'),
+           air_layer=table('CINRE_PRICING_AIRv10', layer_table_name),
+           lc_dates=sql_date_filter('c.[Inception]', earliest_eff_date, latest_eff_date),
+           lc_stats=in_list(lc_excluded_statuses),
+           lc_select=select_list(lc_cols, 'lt', 'lc'),
+           ds_select=select_list(ds_cols, 'l', 'ds'),
+           ds_contract_dates=sql_date_filter('[Inception]', earliest_eff_date, latest_eff_date),
+           ds_dates=sql_date_filter('l.[Inception]', earliest_eff_date, latest_eff_date),
+           air_layer_aliases=',\n        '.join('l.{}_air'.format(new) for old, new in air_layer_cols),
+           air_layer_select=select_list(air_layer_cols, 'l', 'air'),
+           air_layer_dates=sql_date_filter('l.[Inception]', earliest_eff_date, latest_eff_date),
+           air_crm_id=air_lookup['crm_id'],
+           air_crm_gp_id=air_lookup['crm_gp_id'],
+           air_eff_date=air_lookup['eff_date'],
+           air_contract_dates=sql_date_filter('c.[{}]'.format(air_lookup['eff_date']), earliest_eff_date, latest_eff_date),
+           air_status=air_lookup['status'],
+           air_stats=in_list(air_excluded_statuses),
+           crm_gp_id_src=sql_provenance('ds.crm_gp_id_ds', 'lc.crm_gp_id_lc', 'air.crm_gp_id_air'),
+           crm_id_src=sql_provenance('ds.crm_id_ds', 'lc.crm_id_lc', 'air.crm_id_air'),
+           layer_id_src=sql_provenance('ds.layer_id_ds', 'ds.cinre_lc_layer_id_ds', 'lc.layer_lc', 'air.layer_id_air'),
+           eff_date_src=sql_provenance('ds.eff_date_ds', 'lc.eff_date_lc', 'air.eff_date_air'),
+           exp_date_src=sql_provenance('ds.exp_date_ds', 'lc.exp_date_lc', 'air.exp_date_air'))
+
+    return (qry)
+
+
+def pushdown_layers(
+        conn: pyodbc.Connection,
+        layer_table_name: str,
+        earliest_eff_date: str = '2020-01-01',
+        latest_eff_date: str = None,
+        dialect: str = 'mssql') -> pd.DataFrame:
+    """
+    # Description
+        Read the pre-joined layer table with `pushdown_layer_query`, so that
+        the joins happen on the server and only one narrow result set comes
+        back over the network. The result has the same columns that
+        `raw_layers` builds from the three `cinre_*_layers` readers, with the
+        key columns already coalesced.
+
+    # Parameters
+        conn: pyodbc.Connection
+            Connection to any database on the CINRE SQL Server instance
+            (the query uses fully qualified table names)
+        layer_table_name: str
+            Name of the layer table in the AIR DB
+        earliest_eff_date: str
+            Earliest effective date to include, in format 'YYYY-MM-DD'
+            Default is '2020-01-01'
+        latest_eff_date: str
+            Effective dates on or after this date are excluded, in format 'YYYY-MM-DD'
+            Default is None (no upper bound)
+        dialect: str
+            Key of `pushdown_dialects`. Default is 'mssql'
+
+    # Returns
+        layer: pd.DataFrame
+            Joined layer table
+    """
+    print('reading pre-joined layer table from the server')
+
+    # build & run the query
+    qry = pushdown_layer_query(air_contract_columns(conn, dialect), layer_table_name,
+                               earliest_eff_date, latest_eff_date, dialect)
+    layer = pd.read_sql_query(qry, conn)
+
+    # recode date columns to datetime, as the pandas readers do
+    for c in 'eff_date_lc exp_date_lc eff_date_ds exp_date_ds eff_date_air exp_date_air'.split():
+        layer[c] = pd.to_datetime(layer[c])
+
+    return (layer)
+
+
+def raw_layers(
+    lc_conn : pyodbc.Connection,
+    ds_conn : pyodbc.Connection,
+    sap_conn : pyodbc.Connection,
+    air_conn : pyodbc.Connection,
+    layer_table_name : str,
+    earliest_eff_date : str = '2020-01-01',
+    latest_eff_date : str = None,
+    pushdown : bool = False,
+    dialect : str = 'mssql'
+    ) -> pd.DataFrame:
+    """
+    # Description
+        Read in layer table from all 4 databases
+
+    # Parameters
+    lc_conn: pyodbc.Connection
+        connection to LC DB
+    ds_conn: pyodbc.Connection
+        connection to DS DB
+    sap_conn: pyodbc.Connection
+        connection to SAP DB
+    air_conn: pyodbc.Connection 
+        connection to AIR DB
+    layer_table_name: str
+        name of layer table in AIR DB
+    earliest_eff_date: str
+        earliest effective date to include in layer table
+        must be in format 'YYYY-MM-DD'
+        default is '2020-01-01'
+    latest_eff_date: str
+        effective dates on or after this date are excluded
+        must be in format 'YYYY-MM-DD'
+        default is None (no upper bound)
+    pushdown: bool
+        if True, the layer tables are joined (and the key columns coalesced)
+        on the server in a single query using `pushdown_layers`, and only the
+        joined result is read. all the databases are on the same instance,
+        so only `lc_conn` is used
+        default is False (read each table and join them in pandas)
+    dialect: str
+        key of `pushdown_dialects`, only used when `pushdown` is True
+        default is 'mssql'
+
+    # Returns
+    layer: pandas.DataFrame
+        layer table from all 4 databases
+    """
+    if pushdown:
+        # the server does the joins & the key coalescing in one query
+        layer = pushdown_layers(lc_conn, layer_table_name, earliest_eff_date, latest_eff_date, dialect)
+
+    else:
+        # build indiviual tables
+        layer_lc = cinre_lc_layers(lc_conn, earliest_eff_date, latest_eff_date)
+        layer_ds = cinre_ds_layers(ds_conn, earliest_eff_date, latest_eff_date)
+        layer_air = cinre_air_layers(air_conn, layer_table_name, earliest_eff_date, latest_eff_date)
+
+        print("joining layer tables")
+        # merge together
+        layer = (
+            # start with loss cost table
+            layer_lc
+
+            # merge in ds table
+            .merge(
+                layer_ds,
+                how='outer',
+                left_on='crm_gp_id_lc layer_lc eff_date_lc'.split(),
+                right_on='crm_gp_id_ds layer_id_ds eff_date_ds'.split()
+                )
+
+            # merge in air table
+            .merge(
+                layer_air,
+                how='outer',
+                left_on='crm_gp_id_ds cinre_lc_layer_id_ds eff_date_ds'.split(),
+                right_on='crm_gp_id_air layer_id_air eff_date_air'.split()
+                )
+            )
+
+        # crm_gp_id
+        layer['crm_gp_id'], layer['crm_gp_id_src'] = all4hierarchy(
+            ds=layer.crm_gp_id_ds, lc=layer.crm_gp_id_lc, air=layer.crm_gp_id_air, sap=layer.crm_gp_id_ds, provenance=True)
+
+        # crm_id
+        layer['crm_id'], layer['crm_id_src'] = all4hierarchy(
+            ds=layer.crm_id_ds, lc=layer.crm_id_lc, air=layer.crm_id_air, sap=layer.crm_id_ds, provenance=True)
+
+        # layer_id
+        layer['layer_id'], layer['layer_id_src'] = all4hierarchy(
+            ds=layer.layer_id_ds, lc=layer.cinre_lc_layer_id_ds, air=layer.layer_lc, sap=layer.layer_id_air, provenance=True)
+
+        # eff_date
+        layer['eff_date'], layer['eff_date_src'] = all4hierarchy(
+            ds=layer.eff_date_ds, lc=layer.eff_date_lc, air=layer.eff_date_air, sap=layer.eff_date_ds, provenance=True)
+
+        # exp_date
+        layer['exp_date'], layer['exp_date_src'] = all4hierarchy(
+            ds=layer.exp_date_ds, lc=layer.exp_date_lc, air=layer.exp_date_air, sap=layer.exp_date_ds, provenance=True)
+
+    print('updating layer table columns')
+    # add timestamp
+    layer['timestamp'] = build_timestamp()
+
+    # make date cols datetime
+    for c in 'eff_date exp_date'.split():
+        layer[c] = pd.to_datetime(layer[c])
+
+    # occ_limit
+    layer['occ_limit'], layer['occ_limit_src'] = all4hierarchy(
+        ds=layer.occ_limit_lc, lc=layer.occ_limit_air, air=layer.occ_limit_lc, sap=layer.occ_limit_lc, provenance=True)
+
+    # occ_retention
+    layer['occ_retention'], layer['occ_retention_src'] = all4hierarchy(
+        ds=layer.occ_ret_lc, lc=layer.occ_retention_air, air=layer.occ_ret_lc, sap=layer.occ_ret_lc, provenance=True)
+
+    # risk limit
+    layer['risk_limit'], layer['risk_limit_src'] = all4hierarchy(
+        ds=layer.limit_ds, lc=layer.risk_limit_lc, air=layer.limit_ds, sap=layer.limit_ds, provenance=True)
+    # a zero limit is replaced by the lc limit, where there is one
+    zero_limit = layer['risk_limit'].eq(0) & layer['risk_limit_lc'].notna()
+    layer['risk_limit_src'] = layer['risk_limit_src'].mask(zero_limit, other=provenance_codes['lc'])
+    layer['risk_limit'] = layer['risk_limit'].mask(zero_limit, other=layer['risk_limit_lc'])
+
+    # agg limit
+    layer['agg_limit'], layer['agg_limit_src'] = all4hierarchy(
+        ds=layer.agg_limit_ds, lc=layer.agg_limit_lc, air=layer.agg_limit_air, sap=layer.agg_limit_ds, provenance=True)
+
+    # agg retention
+    layer['agg_retention'], layer['agg_retention_src'] = all4hierarchy(
+        ds=layer.agg_retention_ds, lc=layer.aad_lc, air=layer.agg_retention_air, sap=layer.agg_retention_ds, provenance=True)
+
+    # risk retention
+    layer['risk_retention'], layer['risk_retention_src'] = all4hierarchy(
+        ds=layer.retention_ds, lc=layer.risk_retention_lc, air=layer.retention_ds, sap=layer.retention_ds, provenance=True)
+
+    # brokerage
+    layer['brokerage'], layer['brokerage_src'] = all4hierarchy(
+        ds=layer.brokerage_ds, lc=layer.brokerage_lc, air=layer.brokerage_air, sap=layer.brokerage_ds, provenance=True)
+
+    # rp brokerage
+    layer['rp_brokerage'], layer['rp_brokerage_src'] = all4hierarchy(
+        ds=layer.rp_brokerage_ds, lc=layer.rp_brokerage_lc, air=layer.rp_brokerage_air, sap=layer.rp_brokerage_ds, provenance=True)
+
+    # reinstatement_string
+    layer['reinstatement_string'], layer['reinstatement_string_src'] = all4hierarchy(
+        ds=layer.reinstatements_ds, lc=layer.reinstatement_string_lc, air=layer.reinstatement_str_air, sap=layer.reinstatements_ds, provenance=True)
+
+    # subject prem
+    layer['subject_prem'], layer['subject_prem_src'] = all4hierarchy(
+        ds=layer.subject_prem_ds, lc=layer.subject_premium_lc, air=layer.subject_prem_ds, sap=layer.subject_prem_ds, provenance=True)
+
+    # deposit_prem
+    layer['deposit_prem'], layer['deposit_prem_src'] = all4hierarchy(
+        ds=layer.deposit_prem_ds, lc=layer.cre_deposit_prem_lc, air=layer.deposit_prem_ds, sap=layer.deposit_prem_ds, provenance=True)
+
+    # ultimate_prem
+    layer['ultimate_prem'], layer['ultimate_prem_src'] = all4hierarchy(
+        ds=layer.ult_cre_prem_ds, lc=layer.cre_ult_prem_lc, air=layer.ult_cre_prem_ds, sap=layer.ult_cre_prem_ds, provenance=True)
+
+    # ult prem for contract
+    prem = layer['crm_id eff_date ultimate_prem'.split()].groupby('crm_id eff_date'.split(
+    ), observed=False).sum().reset_index().rename(columns=dict(ultimate_prem='ultimate_prem_contract'))
+    layer = layer.merge(prem, how='left', on='crm_id eff_date'.split())
+
+    # uw profit
+    layer['uw_profit'], layer['uw_profit_src'] = all4hierarchy(
+        ds=layer.uw_profit_ds, lc=layer.cre_uw_lc, air=layer.uw_profit_ds, sap=layer.uw_profit_ds, provenance=True)
+
+    # npv uw profit
+    layer['npv_uw_profit'], layer['npv_uw_profit_src'] = all4hierarchy(
+        ds=layer.npv_uw_profit_ds, lc=layer.cre_npv_uw_lc, air=layer.npv_uw_profit_ds, sap=layer.npv_uw_profit_ds, provenance=True)
+
+    # authorized share
+    layer['authorized_share'], layer['authorized_share_src'] = all4hierarchy(
+        ds=layer.authorized_line_ds, lc=layer.authorized_share_lc, air=layer.shares_authorized_air, sap=layer.authorized_line_ds, provenance=True)
+
+    # signed share
+    layer['signed_share'], layer['signed_share_src'] = all4hierarchy(
+        ds=layer.signed_line_ds, lc=layer.signed_share_lc, air=layer.shares_signed_air, sap=layer.signed_line_ds, provenance=True)
+
+    # rate
+    layer['rate'], layer['rate_src'] = all4hierarchy(
+        ds=layer.rate_ds, lc=layer.rate_lc, air=layer.rate_ds, sap=layer.rate_ds, provenance=True)
+
+    # rol
+    layer['rol'], layer['rol_src'] = all4hierarchy(
+        ds=layer.rol_ds, lc=layer.rol_air, air=layer.rol_ds, sap=layer.rol_ds, provenance=True)
+
+    # placement
+    layer['placement'], layer['placement_src'] = all4hierarchy(
+        ds=layer.placement_ds, lc=layer.placement_lc, air=layer.placement_ds, sap=layer.placement_ds, provenance=True)
+
+    # expected loss
+    layer['calc_exp_loss'] = layer.non_cat_ave_loss_alae_lc + \
+        layer.mdl_cat_ave_loss_alae_lc + layer.nmd_cat_ave_loss_alae_lc
+    layer['expected_loss'], layer['expected_loss_src'] = all4hierarchy(
+        ds=layer.expected_loss_ds, lc=layer.calc_exp_loss, air=layer.expected_loss_ds, sap=layer.expected_loss_ds, provenance=True)
+
+    # expected loss for contract
+    prem = layer['crm_id eff_date expected_loss'.split()].groupby('crm_id eff_date'.split(
+    ), observed=False).sum().reset_index().rename(columns=dict(expected_loss='expected_loss_contract'))
+    layer = layer.merge(prem, how='left', on='crm_id eff_date'.split())
+
+    # pricing lr
+    layer['expected_loss_ratio'] = layer.expected_loss / layer.ultimate_prem
+    layer['expected_loss_ratio_contract'] = layer.expected_loss_contract / \
+        layer.ultimate_prem_contract
+
+    # calc expense
+    layer['calc_expense'] = layer.ultimate_prem - \
+        layer.expected_loss - layer.uw_profit
+    layer['calc_expense_ratio1'] = layer.calc_expense / \
+        layer.ultimate_prem - layer.profit_comm_lc
+    layer['calc_expense_ratio2'] = layer.brokerage + layer.comm_lc
+
+    layer['expense_ratio'] = layer.calc_expense_ratio2.where(
+        layer.calc_expense_ratio2.ne(0), other=layer.calc_expense_ratio1)
+
+    # broker dollars
+    layer['broker_dollars'] = layer.ultimate_prem * layer.brokerage
+
+    # cyber limit
+    layer['cyber_limit'], layer['cyber_limit_src'] = all4hierarchy(
+        ds=layer.cyber_agg_limit_ds, lc=layer.cyber_sublimit_lc, air=layer.cyber_agg_limit_ds, sap=layer.cyber_agg_limit_ds, provenance=True)
+
+    layer['cre_ao_ratio'] = (
+        layer.cre_ao_exp_lc / layer.ultimate_prem).where(layer.ultimate_prem.ne(0), other=0)
+
+    # cyber exposure
+    layer['cyber_coverage'] = layer.cyber_exposure_ds.mask(
+        layer.cyber_exposure_ds.isna(), other=layer.cyber_coverage_lc)
+
+    # sort table columns
+    col_ord = ['timestamp',
+               'crm_gp_id', 'crm_id', 'layer_id', 'layer_name_ds',
+
+               'eff_date', 'exp_date',
+               'sap_treaty_ds', 'sap_section_ds',
+
+               # 'max_policy_limit_ds',
+
+               'risk_retention',
+               # 'retention_ds','risk_retention_lc',
+
+               'risk_limit',
+               # 'limit_ds','risk_limit_lc',
+
+               'occ_retention',
+               # 'occ_ret_lc','occ_retention_air',
+
+               'occ_limit',
+               # 'occ_limit_lc', 'occ_limit_air',
+
+               'agg_retention',
+               # 'aad_lc','agg_retention_ds', 'agg_retention_air',
+
+               'agg_limit',
+               # 'agg_limit_lc', 'agg_limit_ds', 'agg_limit_air',
+               # 'quote_rate_lc',
+
+               'rate',
+               # 'rate_lc', 'rate_ds',
+               # 'fot_rate_lc',
+               # 'rate_change_ds',
+
+               'rol',
+               # 'rol_ds', 'rol_air',
+
+               'reinstatement_string',
+               # 'reinstatements_ds', 'reinstatement_numb_air','reinstatement_rate_air',
+               # 'reinstatement_string_lc', 'reinstatement_str_air',
+               # 'rp_brokerage',
+               # 'rp_brokerage_lc', 'rp_brokerage_ds', 'rp_brokerage_air',
+               # 'alae_ds',
+               # 'max_pc_lc',
+               # 'reins_exp_load_lc',
+               # 'reins_premium_100_lc',
+               # 'dep_prem_schedule_ds',
+
+               'subject_prem',
+               # 'subject_premium_lc','subject_prem_ds',
+               # 'subject_base_ds',
+               # 'min_prem_ds',
+               # 'cre_pro_prem_lc',
+
+               'deposit_prem',
+               # 'cre_deposit_prem_lc','deposit_prem_ds',
+               # 'broker_dollars',
+
+               'ultimate_prem',
+               'ultimate_prem_contract',
+               # 'ult_cre_prem_ds_contract',
+               # 'cre_ult_prem_lc', 'ult_cre_prem_ds',
+
+               'tech_uw_ratio_ds',
+               # 'tech_uw_ratio_ds_contract',
+
+               'brokerage',
+               # 'brokerage_lc','brokerage_ds','brokerage_air','cre_brok_exp_lc',
+
+               'comm_lc',
+               # 'cre_ceded_comm_lc',
+
+               'cre_ao_ratio', 'profit_comm_lc',
+
+               'ulae_ratio_lc',
+
+               # 'expense_ratio_ds_contract',
+               # 'calc_expense_ratio','calc_expense',
+               'expense_ratio',
+               'expected_loss_ratio', 'expected_loss_ratio_contract',
+               # 'expected_loss','expected_loss_contract',
+               # 'expected_loss_ds', 'calc_exp_loss',
+               # 'non_cat_ave_loss_alae_lc','mdl_cat_ave_loss_alae_lc','nmd_cat_ave_loss_alae_lc',
+               # 'mdl_hu_eq_cat_ave_loss_alae_lc',
+               # 'mdl_ao_cat_ave_loss_alae_lc',
+
+               # 'cre_ao_exp_lc',
+
+               'uw_profit',
+               # 'cre_uw_lc','uw_profit_ds',
+
+               'npv_uw_profit',
+               # 'cre_npv_uw_lc','npv_uw_profit_ds',
+
+               'clash_type_lc', 'clash_coverage_lc',
+
+               'cyber_limit',
+               # 'cyber_sublimit_lc', 'cyber_agg_limit_ds',
+
+               'cyber_coverage',
+               # 'cyber_coverage_lc', 'cyber_exposure_ds',
+
+               'terror_coverage_lc', 'terror_sublimit_lc',
+
+               'cat_coverage_type_lc', 'cat_experience_load_lc',
+
+               'placement',
+               # 'placement_lc', 'placement_ds',
+               'eco_x_pl_lc',
+               'dj_lc',
+               'trap_val_exp_lim_lc',
+
+               # 'roe_250_ds',
+               # 'marginal_tvar_50_lc',
+               # 'marginal_tvar_250_lc',
+               # 'tvar_250_ds',
+
+               # 'layer_min_capital_lc',
+
+               'tot_cas_agg_lim_lc',
+               'pricing_type_lc',
+
+               'gr_net_agg_ret_lc', 'gr_net_agg_lim_lc',
+
+               'maol_lc',
+
+               # 'shares_priced_air',
+
+               'authorized_share',
+               # 'authorized_share_lc','authorized_line_ds','shares_authorized_air',
+
+               'signed_share',
+               # 'signed_share_lc','signed_line_ds','shares_signed_air',
+
+               'pnoc_ds',
+
+               'franchise_air',
+
+               'ss_lr_min_lc', 'ss_slide1_lc', 'ss_lr_mid_lc', 'ss_slide2_lc', 'ss_lr_max_lc',
+
+               'loss_corr_start_lc', 'loss_corr_stop_lc',
+
+               'swing_min_rate_lc', 'swing_max_rate_lc', 'swing_load_lc',
+
+               'raw_non_cat_cv_lc', 'non_cat_param_risk_lc', 'non_cat_cv_lc', 'raw_nmd_cat_cv_lc', 'nmd_cat_param_risk_lc', 'nmd_cat_cv_lc',
+
+               'participation_air',
+               # 'components_air',
+
+               'rpp_ref_rol_air',
+
+               'pricing_registry_air',
+               'lc_applies_agg_air',
+               'lc_ratio_to_agg_air',
+
+               # provenance code of each coalesced column (see `provenance_codes`)
+               'crm_gp_id_src', 'crm_id_src', 'layer_id_src', 'eff_date_src', 'exp_date_src',
+               'risk_retention_src', 'risk_limit_src', 'occ_retention_src', 'occ_limit_src',
+               'agg_retention_src', 'agg_limit_src', 'rate_src', 'rol_src', 'reinstatement_string_src',
+               'subject_prem_src', 'deposit_prem_src', 'ultimate_prem_src', 'brokerage_src',
+               'uw_profit_src', 'npv_uw_profit_src', 'cyber_limit_src', 'placement_src',
+               'authorized_share_src', 'signed_share_src'
+               ]
+
+    # get the layer data, ordered as abovev
+    layer = layer[col_ord]
+
+    # rename the columns to include the layer suffix
+    layer.rename(columns=dict(zip(layer.columns.tolist(), [
+                 c + '_layer' for c in layer.columns.tolist()])), inplace=True)
+
+    # except for a few columns that are not layer specific, or that do not need the suffix
+    layer.rename(columns=dict(zip('crm_gp_id_layer crm_id_layer eff_date_layer exp_date_layer layer_id_layer'.split(
+    ), 'crm_gp_id crm_id eff_date exp_date layer_id'.split())), inplace=True)
+
+    # add in the number of layers for each contract
+    layer = layer.merge(
+        # merge this calculation back in:
+        (
+            # count the number of layers for each contract
+            layer['crm_gp_id crm_id eff_date exp_date layer_id'.split()]
+            .drop_duplicates()
+            
+            # group by contract (key is crm_gp_id crm_id eff_date exp_date)
+            .groupby('crm_gp_id crm_id eff_date exp_date'.split(), observed=False)
+            
+            # count the number of unique layer ids
+            .count()
+
+            # reset the index
+            .reset_index()
+
+            # rename the layer_id column to layer_count
+            .rename(columns=dict(layer_id='layer_count'))
+
+         ),
+         
+         # merge on the key, which is crm_gp_id crm_id eff_date exp_date
+         how='left', on='crm_gp_id crm_id eff_date exp_date'.split()
+    )
+
+    # if layer name is missing, add it in
+    layer['layer_name_default'] = (
+        layer.layer_id
+
+        # if layer id is missing, the assumption is that there is only one layer
+        # and so the layer name is layer 1. if layer id is not missing, we take the
+        # layer id and add layer to it to get the layer name
+        .apply(lambda x: 'Layer 1' if np.isnan(x) else 'Layer ' + str(int(x)))
+    )
+
+    # this is what we will use if the layer name is missing
+    layer['layer_name_missing'] = ""
+
+    # boolean to indicate if the layer name exists, which is true if there is more
+    # than one layer
+    layer['layer_name_exists'] = layer.layer_count.gt(1)
+
+    # also need to know if the layer name exists in the ds layer table
+    layer['layer_ds_name_exists'] = layer.layer_name_ds_layer.notna()
+
+    # if the layer name exists in the ds layer table, then we use that
+    layer['layer_name'] = (
+        layer.layer_name_ds_layer.where(
+            layer.layer_name_ds_layer.notna(),
+    
+            # otherwise, we use the default layer name that we calculated above
+            other=layer.layer_name_default.where(
+                layer.layer_name_exists,
+                
+                # if this default name does not exist, then we use the
+                # "missing" name
+                other=layer.layer_name_missing
+            )
+        )
+    )
+
+    # remove essent completely from the layer table
+    layer = layer.query("layer_name_ds_layer!='Essent'")
+
+    # return total layer table
+    return (layer)
+
+
+def read_sap_tbl(ds_conn : pyodbc.Connection) -> pd.DataFrame:
+    """
+    # Description
+        Read the SAP lookup table from the deal sheet database
+
+    # Parameters
+        ds_conn: pyodbc.Connection
+            Connection to the deal sheet database
+
+    # Returns
+        sap_tbl: pandas.DataFrame
+            SAP lookup table
+    """
+    print('reading SAP lookup')
+    
+    # read the SAP lookup table
+    sap_tbl = readtbl('CRMIDforSAP', ds_conn)
+
+    # rename the columns
+    sap_tbl.rename(columns=dict(zip(
+        sap_tbl.columns.tolist(),
+        'cre_id crm_id eff_date exp_date treaty_category sap_treaty sap_section line'.split())),
+        inplace=True)
+
+    # convert the crm_id to an integer, by removing the leading character
+    # and converting to an integer
+    # this is how the crm_gp_id is calculated
+    sap_tbl['crm_gp_id'] = sap_tbl['crm_id'].apply(lambda x: int(x[1:]))
+
+    # drop the crm_id column
+    sap_tbl.drop(columns='cre_id', inplace=True)
+
+    # convert the dates to datetime
+    for c in 'eff_date exp_date'.split():
+        sap_tbl[c] = pd.to_datetime(sap_tbl[c])
+
+    # rename the columns to include the suffix
+    sap_tbl.rename(columns=dict(zip(sap_tbl.columns.tolist(), [
+                   c + '_crmidforsap' for c in sap_tbl.columns.tolist()])), inplace=True)
+
+    # return the SAP lookup table
+    return (sap_tbl)
+
+
+def join_layer_contract1(lc_conn : pyodbc.Connection, ds_conn : pyodbc.Connection, sap_conn : pyodbc.Connection, air_conn : pyodbc.Connection, layer_table_name : str = 'Layer_New', earliest_eff_date : str = '2020-01-01', latest_eff_date : str = None, pushdown : bool = False) -> pd.DataFrame:
+    """
+    # Description
+        Join the layer table to the contract table
+
+    # Parameters
+        lc_conn: pyodbc.Connection
+            Connection to the loss cost database
+        ds_conn: pyodbc.Connection
+            Connection to the deal sheet database
+        sap_conn: pyodbc.Connection
+            Connection to the SAP database
+        air_conn: pyodbc.Connection
+            Connection to the AIR database
+        layer_table_name: str
+            Name of the layer table in the AIR database. Default is 'Layer_New'
+        earliest_eff_date: str
+            Earliest effective date to include, in format 'YYYY-MM-DD'
+            Default is '2020-01-01'
+        latest_eff_date: str
+            Effective dates on or after this date are excluded, in format 'YYYY-MM-DD'
+            Default is None (no upper bound)
+        pushdown: bool
+            If True, join the source tables on the server (see `raw_contracts`
+            and `raw_layers`). Default is False
+
+    # Returns
+        out: pandas.DataFrame
+            Layer table joined to the contract table
+    """
+    # read the contract & layer tables, using the same effective date
+    # window for both so that every source is filtered consistently
+    raw_contract = raw_contracts(lc_conn, ds_conn, sap_conn, air_conn,
+                                 earliest_inception=earliest_eff_date, latest_inception=latest_eff_date,
+                                 pushdown=pushdown)
+    raw_layer = raw_layers(lc_conn, ds_conn, sap_conn, air_conn, layer_table_name,
+                           earliest_eff_date=earliest_eff_date, latest_eff_date=latest_eff_date,
+                           pushdown=pushdown)
+
+    # join the contract table to the layer table
+    print('joining the contract table to the layer table')
+    out = raw_layer.merge(raw_contract, how='left',
+                          on='crm_gp_id crm_id eff_date exp_date'.split())
+
+    # calculate the contract term, which is the number of months between the
+    # effective date and the expiration date, plus 1
+    out['contract_term'] = (
+        # (12 * exp_date.year + exp_date.month) - (12 * eff_date.year - eff_date.month) + 1
+        # this represents an integer number of months between the effective date
+        # and the expiration date, plus 1
+        (12*out.exp_date.dt.year + out.exp_date.dt.month) - (12*out.eff_date.dt.year + out.eff_date.dt.month) + 1
+    )
+
+    # use program to assign to reserving analysis line
+    xol_program_list = ['Aggregate XOL', 'Per Claim XOL', 'Per Occurence XOL', 'Per Occurrence Cat XOL',
+                        'Per Occurrence XOL', 'Per Policy XOL', 'Per Risk XOL', 'Risk Aggregate XOL']
+    qs_program_list = ['Cat Quota Share',
+                       'Pro Rata/Quota Share', 'Pro-Rata/Quota Share ']
+    var_qs_program_list = ['Variable Quota Share']
+    cat_program_list = ['Cat Quota Share', 'Per Occurrence Cat XOL', 'Aggregate CAT XOL - Occurrence Exposed',
+                        'Aggregate Cat XOL', 'MY Per Occurrence Cat XOL', 'Per Occurrence Cat XOL Multiyear', 'Per Occurrence Cat XOL Annual']
+    ppr_program_list = ['Risk Aggregate XOL', 'Per Risk XOL']
+    agg_xol_program_list = ['Aggregate XOL', 'Risk Aggregate XOL',
+                            'Aggregate CAT XOL - Occurrence Exposed', 'Aggregate Cat XOL', 'Aggregate XOL (Occurrence Exposed)']
+    surplus_share_program_list = ['Surplus Share']
+
+    # helper columns for the program assignment
+    out['one'], out['zero'] = 1, 0
+
+    # xol_ind
+    # 1 if the program is in the xol_program_list
+    # 0 otherwise
+    out['xol_ind'] = out.one.where(
+        out.program.isin(xol_program_list), other=out.zero)
+
+    # qs_ind
+    # 1 if the program is in the qs_program_list
+    # 0 otherwise
+    out['qs_ind'] = out.one.where(out.program.isin(
+        qs_program_list), other=out.zero).mask(out.placement_layer.lt(1), other=1)
+
+    # cat_ind
+    out['cat_ind'] = out.one.where(
+        out.program.isin(cat_program_list), other=out.zero)
+
+    # ppr_ind
+    out['ppr_ind'] = out.one.where(out.program.isin(
+        ppr_program_list), other=out.zero).where(out.line.eq('Property'), other=out.zero)
+
+    # agg xol ind
+    out['agg_xol_ind'] = out.one.where(
+        out.program.isin(agg_xol_program_list), other=out.zero)
+
+    # surplus share ind
+    out['surplus_share_ind'] = out.one.where(
+        out.program.isin(surplus_share_program_list), other=out.zero)
+
+    # variable qs ind
+    out['var_qs_ind'] = out.one.where(
+        out.program.isin(var_qs_program_list), other=out.zero)
+
+    # transactional ind
+    out['trans_ind'] = out.one.where(
+        out.contract_name.str.lower().str.find('transaction').ne(-1), other=out.zero)
+    # out['trans_ind'] = out.contract_name.apply(lambda x: 0 if x.lower().find('transactional') == -1 else 1)
+
+    # clash ind
+    out['clash_ind'] = out.one.where(np.logical_and(out.line.eq(
+        'Casualty'), out.program.str.lower().eq('clash')), other=out.zero)
+
+    # assign reserving line using the helper columns and np.select
+    cond = [
+        # when all these conditions are true, the line is casualty XOL
+        # eg Casualty NP (non-proportional):
+        # 1. line is casualty
+        # 2. program is in the xol_program_list
+        # 3. this is not a cat program
+        # 4. this is not a qs program
+        # 5. this is not a transactional program
+        np.logical_and(
+            out.line.eq('Casualty'),        # line is casualty
+            np.logical_and(
+                out.xol_ind.eq(1),          # program is in the xol_program_list
+                np.logical_and(
+                    out.cat_ind.eq(0),      # this is not a cat program
+                    np.logical_and(
+                        out.qs_ind.eq(0),   # this is not a qs program
+                        out.trans_ind.eq(0) # this is not a transactional program
+                    )
+                )
+            )
+        ),
+
+        # casualty pr (proportional) is when:
+        # 1. line is casualty
+        # 2. program is in the qs_program_list
+        # 3. this is not a transactional program
+        np.logical_and(
+            out.line.eq('Casualty'),        # line is casualty
+            np.logical_and(
+                out.qs_ind.eq(1),           # program is in the qs_program_list
+                out.trans_ind.eq(0)         # this is not a transactional program
+            )
+        ),
+
+        # ppr (property per risk) is when:
+        # 1. line is property
+        # 2. program is in the ppr_program_list
+        np.logical_and(
+            out.line.eq('Property'),        # line is property
+            out.ppr_ind.eq(1)               # program is in the ppr_program_list
+        ),
+
+        # property cat is when:
+        # 1. line is property
+        # 2. program is in the cat_program_list
+        np.logical_and(
+            out.line.eq('Property'),        # line is property
+            out.cat_ind.eq(1)               # program is in the cat_program_list
+        ),
+
+        # cirt is when:
+        # 1. line is specialty
+        # 2. contract term is greater than or equal to 90 months
+        np.logical_and(
+            out.line.eq('Specialty'),       # line is specialty
+            out.contract_term.ge(90)        # contract term is greater than or equal to 90 months
+        ),
+
+        # other specialty is when:
+        # 1. line is specialty
+        # 2. contract term is less than 90 months
+        np.logical_and(
+            out.line.eq('Specialty'),       # line is specialty
+            out.contract_term.lt(90)        # contract term is less than 90 months
+        ),
+
+        # transactional is when:
+        # 1. line is casualty
+        # 2. program is in the transactional_program_list
+        # 3. contract name is not null
+        np.logical_and(
+            out.line.eq('Casualty'),        # line is casualty
+            np.logical_and(
+                out.trans_ind.eq(1),        # program is in the transactional_program_list
+                out.contract_name.notna()   # contract name is not null
+            )
+        ),
+
+        # other property cat is when:
+        # 1. line is property
+        # 2. program is not in the ppr_program_list
+        # 3. this is a cat program
+        np.logical_and(
+            out.line.eq('Property'),        # line is property
+            np.logical_and(
+                out.ppr_ind.eq(0),          # program is not in the ppr_program_list
+                out.cat_ind.eq(1)           # this is a cat program
+            )
+        ),
+
+        # other property non cat is when:
+        # 1. line is property
+        # 2. program is not in the ppr_program_list
+        # 3. this is not a cat program
+        np.logical_and(
+            out.line.eq('Property'),        # line is property
+            np.logical_and(
+                out.ppr_ind.eq(0),          # program is not in the ppr_program_list
+                out.cat_ind.eq(0)           # this is not a cat program
+            )
+        ),
+
+        # WC cat is when:
+        # 1. line is casualty
+        # 2. program is in the cat_program_list
+        np.logical_and(
+            out.line.eq('Casualty'),    # line is casualty
+            out.cat_ind.eq(1)           # program is in the cat_program_list
+        ),
+
+        # clash is when:
+        # 1. clash ind is 1 (in the clash_program_list)
+        out.clash_ind.eq(1)             # clash ind is 1
+    ]
+
+    # set up reserving line choices that are assigned based on the conditions above, 
+    # in the same order as the conditions above
+    choices = [
+        'casualty_np',
+        'casualty_pr',
+        'property_per_risk',
+        'property_cat',
+        'cirt',
+        'specialty',
+        'transactional',
+        'other_property_cat',
+        'other_property_noncat',
+        'wc_cat',
+        'clash'
+    ]
+
+    # build reserving line column, using the conditions and choices above
+    # and allowing for the possibility that the program is not in any of the lists
+    # in which case the reserving line is 'other'
+    out['reserving_line'] = np.select(cond, choices, 'other')
+
+    # read sap table
+    sap_tbl = read_sap_tbl(ds_conn)
+
+    # join sap table
+    out = (
+        out.merge(
+            sap_tbl.drop(columns='treaty_category_crmidforsap crm_gp_id_crmidforsap'.split()),
+            how='left',
+            left_on='crm_id eff_date exp_date layer_id line'.split(),
+
+            # this is a left join, so we need to specify the right_on columns
+            # these columns are the same as the left_on columns, but with the suffix '_crmidforsap'
+            right_on='crm_id_crmidforsap eff_date_crmidforsap exp_date_crmidforsap sap_section_crmidforsap line_crmidforsap'.split()
+        )
+    )
+
+    # recode sap treaty and sap section numbers
+    out['sap_treaty'], out['sap_treaty_src'] = all4hierarchy(ds=out.sap_treaty_ds_layer, lc=out.sap_treaty_crmidforsap,
+                                      air=out.sap_treaty_ds_layer, sap=out.sap_treaty_ds_layer, provenance=True)
+    out['sap_section'], out['sap_section_src'] = all4hierarchy(
+        ds=out.layer_id, lc=out.sap_section_crmidforsap, air=out.layer_id, sap=out.layer_id, provenance=True)
+
+    # qs on deal ind
+    # indicator that tells you whether the deal has qs on it
+    qs_df = (
+        # start with the out table, but only keep the crm_id, eff_date, and qs_ind columns
+        out['crm_id eff_date qs_ind'.split()]
+        
+        # group by crm_id and eff_date (which is the treaty level) and sum qs_ind
+        .groupby('crm_id eff_date'.split(), observed=False)
+        .sum()
+        .reset_index()
+    )
+    
+    # helper columns
+    qs_df['one'], qs_df['zero'] = 1, 0
+
+    # qs on deal ind is 1 if qs_ind is greater than or equal to 1, eg 
+    # the number of qs programs on the deal is greater than or equal to 1
+    qs_df['qs_on_deal_ind'] = (
+        qs_df.one # return 1 when qs_ind is greater than or equal to 1
+        .where(
+            # if qs_ind is greater than or equal to 1
+            qs_df.qs_ind.ge(1),
+            
+            # otherwise return 0
+            other=qs_df.zero
+        )
+    )
+
+    # join qs_on_deal_ind
+    out = out.merge(qs_df.drop(columns='one zero qs_ind'.split()),
+                    how='left', on='crm_id eff_date'.split())
+
+    # return out
+    return (out)
+
+
+def join_layer_contract(lc_conn : pyodbc.Connection,
+                        ds_conn : pyodbc.Connection,
+                        sap_conn : pyodbc.Connection,
+                        air_conn : pyodbc.Connection,
+                        layer_table_name : str = 'Layer_New',
+                        earliest_eff_date : str = '2020-01-01',
+                        latest_eff_date : str = None,
+                        pushdown : bool = False) -> pd.DataFrame:
+    """
+    # Description
+        Join layer contract table with ds table, sap table, and air table.
+
+    # Parameters
+        lc_conn : pyodbc.Connection
+            Connection to loss cost database.
+        ds_conn : pyodbc.Connection
+            Connection to deal sheet database.
+        sap_conn : pyodbc.Connection
+            Connection to sap database.
+        air_conn : pyodbc.Connection
+            Connection to air database.
+        layer_table_name : str
+            Name of the layer table in the air database. Default is 'Layer_New'.
+        earliest_eff_date : str
+            Earliest effective date to include, in format 'YYYY-MM-DD'.
+            Default is '2020-01-01'.
+        latest_eff_date : str
+            Effective dates on or after this date are excluded, in format 'YYYY-MM-DD'.
+            Default is None (no upper bound).
+        pushdown : bool
+            If True, join the source tables on the server (see `raw_contracts`
+            and `raw_layers`). Default is False.
+
+    # Returns
+        df : pd.DataFrame
+            Layer contract table with ds table, sap table, and air table joined.
+    """
+    # start with layer contract table
+    df = join_layer_contract1(lc_conn, ds_conn, sap_conn, air_conn, layer_table_name,
+                              earliest_eff_date=earliest_eff_date, latest_eff_date=latest_eff_date,
+                              pushdown=pushdown)
+
+    # calculate treaty year as the year of the effective date
+    df['treaty_year'] = df.eff_date.dt.year
+
+    # add a filter into broader categories
+    cond = [
+        df.xol_ind.eq(1),               # XOL
+        df.agg_xol_ind.eq(1),           # AGG XOL
+        df.surplus_share_ind.eq(1),     # surplus share
+        df.qs_ind.eq(1),                # quota share
+        df.var_qs_ind.eq(1)             # variable quota share
+    ]
+
+    choices = [
+        'XOL',
+        'AGG XOL',
+        'Surplus Share',
+        'Quota Share',
+        'Variable QS'
+    ]
+
+    # description type column is the mapping of
+    # the above conditions to the above choices
+    df['descr_type'] = np.select(cond, choices, 'other')
+
+    # qs on same deal?
+    cond = [df.qs_on_deal_ind.eq(1), df.qs_on_deal_ind.eq(0)]
+    choices = ['Yes', 'No']
+    df['qs_on_deal'] = np.select(cond, choices, '')
+
+    # multi layer always = "No"??                       ##################################################################### what is this? why is it always no? ##############################
+    df['multi_layer'] = 'No'
+
+    # recode a few WC CAT treaties to the correct reserving line
+    cond = [
+        # WC CAT is a casualty_pr line, but the 
+        # program is Per Occurrence Cat XOL
+        np.logical_and(
+            df.reserving_line.eq('casualty_pr'),            # reserving line is casualty_pr
+            np.logical_and(
+                df.line.eq('Casualty'),                     # line is casualty
+                df.program.eq('Per Occurrence Cat XOL')     # program is Per Occurrence Cat XOL
+            )
+        )
+    ]
+
+    choices = [
+        'wc_cat'
+    ]
+
+    # reserving line is wc_cat if the above condition is true
+    # otherwise, reserving line is the same as before
+    df['reserving_line'] = np.select(cond, choices, df['reserving_line'])
+
+    # recode missing crm_gp_id's from the crm_id without its leading line
+    # character, as in `read_sap_tbl`
+    df['crm_gp_id_src'] = df['crm_gp_id_src'].mask(
+        df['crm_gp_id'].eq(0), other=provenance_codes['derived'])
+    df['crm_gp_id'] = (
+        df['crm_gp_id']
+        .where(
+            df['crm_gp_id'].ne(0),
+            other=pd.to_numeric(df.crm_id.str[1:], errors='coerce')))
+    df['crm_gp_id'] = df['crm_gp_id'].where(
+        df['crm_gp_id'].notna(), other=0).astype(int)
+
+    # better contract name & layer name
+    df['contract_layer_name'] = df.client_name.str.strip().str.cat(
+        others=df.contract_name.str.strip(), sep=' - ')
+    df['contract_name2'] = df.contract_layer_name.str.cat(others=df.layer_name.str.strip(
+    ).where(df.layer_name.str.strip().notna(), other=''), sep=' - ')
+
+    # change contract_name
+    df.rename(columns=dict(contract_name='old_contract_name'), inplace=True)
+
+    # reorder columns
+    col_ord = ['timestamp',
+               'reserving_line',
+               'crm_id',
+               'sap_treaty',
+               'sap_section',
+               'contract_layer_name',
+               'contract_name2',
+               'eff_date',
+               'treaty_year',
+               'exp_date',
+               'contract_term',
+               'trigger',
+               'descr_type',
+               'expected_loss_ratio_layer',
+               'expected_loss_ratio_contract_layer',
+               'brokerage_layer',
+               'comm_lc_layer',
+               'expense_ratio_layer',
+               'qs_on_deal',
+               'ultimate_prem_layer',
+               'ultimate_prem_contract_layer',
+               'rate_layer',
+               'signed_share_layer',
+               'risk_limit_layer',
+               'risk_retention_layer',
+
+               'multi_layer',
+
+               'reinstatement_string_layer',
+               'agg_limit_layer',
+               'agg_retention_layer',
+
+               # assumed retrocession?
+
+               'crm_gp_id',
+               'trigger_long',
+
+               'status_lc',
+               'status_ds',
+               'status_air',
+               'source_file_ds',
+               'share_point_file_ds',
+               'source_file_lc',
+               'file_location_air',
+
+               'last_updated',
+               'last_updated_ds',
+
+               'occ_limit_layer',
+               'occ_retention_layer',
+
+               'rol_layer',
+               'placement_layer',
+
+               'line',
+               'subline_ds',
+
+               'program',
+               'client_name',
+               'old_contract_name',
+               'layer_name',
+               'layer_id',
+               'layer_name_ds_layer',
+
+               'subject_prem_layer',
+               'deposit_prem_layer',
+
+               'tech_uw_ratio_ds_layer',
+               'uw_profit_layer',
+               'npv_uw_profit_layer',
+               'cre_ao_ratio_layer',
+               'profit_comm_lc_layer',
+               'ulae_ratio_lc_layer',
+
+               'clash_type_lc_layer',
+               'clash_coverage_lc_layer',
+               'cyber_limit_layer',
+               'cyber_coverage_layer',
+               'cyber_agg_limit_ds',
+               'cyber_exposure_ds',
+               'terror_coverage_lc_layer',
+               'terror_sublimit_lc_layer',
+               'cat_coverage_type_lc_layer',
+               'cat_experience_load_lc_layer',
+
+               'territory',
+               'currency',
+               'treaty_category',
+
+               'broker',
+
+               'executive_summary_air',
+
+               'last_updated_lc',
+               'last_updated_air',
+               'user_id_lc',
+               'user_name_air',
+
+               'eco_x_pl_lc_layer', 'dj_lc_layer',
+               'trap_val_exp_lim_lc_layer',
+               'tot_cas_agg_lim_lc_layer',
+               'pricing_type_lc_layer',
+               'gr_net_agg_ret_lc_layer',
+               'gr_net_agg_lim_lc_layer',
+               'maol_lc_layer',
+               'authorized_share_layer',
+
+               'pnoc_ds_layer',
+               'franchise_air_layer',
+               'ss_lr_min_lc_layer',
+               'ss_slide1_lc_layer',
+               'ss_lr_mid_lc_layer',
+               'ss_slide2_lc_layer',
+               'ss_lr_max_lc_layer',
+               'loss_corr_start_lc_layer',
+               'loss_corr_stop_lc_layer',
+               'swing_min_rate_lc_layer',
+               'swing_max_rate_lc_layer',
+               'swing_load_lc_layer',
+
+               'participation_air_layer',
+               'rpp_ref_rol_air_layer',
+               'pricing_registry_air_layer',
+               'lc_applies_agg_air_layer',
+               'lc_ratio_to_agg_air_layer',
+               'layer_count',
+
+               'alae_basis_lc',
+
+               'roe_change_ds',
+               'standalone_tvar_250_ds',
+               'standalone_roc_250_ds',
+               'diversified_tvar_250_ds',
+               'diversified_roc_250_ds',
+               'loss_cv_ds',
+               'chg_rate_adequacy_ds',
+               'rate_change_ds',
+               'program_rate_change_ds',
+
+               'dominant_type_ds',
+
+               'xol_ind',
+               'qs_ind',
+               'cat_ind',
+               'ppr_ind',
+               'agg_xol_ind',
+               'trans_ind',
+               'clash_ind',
+
+               # provenance codes (see `provenance_codes`), so the raw source
+               # columns do not need to be kept to audit where a value came from
+               'crm_gp_id_src', 'crm_id_src', 'eff_date_src', 'exp_date_src',
+               'client_name_src', 'line_src', 'contract_name_src', 'program_src',
+               'trigger_long_src', 'currency_src', 'territory_src', 'broker_src',
+               'sap_treaty_src', 'sap_section_src', 'layer_id_src_layer',
+               'risk_retention_src_layer', 'risk_limit_src_layer',
+               'occ_retention_src_layer', 'occ_limit_src_layer',
+               'agg_retention_src_layer', 'agg_limit_src_layer',
+               'rate_src_layer', 'rol_src_layer', 'reinstatement_string_src_layer',
+               'subject_prem_src_layer', 'deposit_prem_src_layer', 'ultimate_prem_src_layer',
+               'brokerage_src_layer', 'uw_profit_src_layer', 'npv_uw_profit_src_layer',
+               'cyber_limit_src_layer', 'placement_src_layer',
+               'authorized_share_src_layer', 'signed_share_src_layer'
+               ]
+
+    # actual reorder step
+    df = df[col_ord]
+
+    # sort table
+    df.sort_values(
+        'eff_date reserving_line crm_id layer_id'.split(), inplace=True)
+
+    # reset index
+    df.reset_index(drop=True, inplace=True)
+
+    # rename cols
+    old_col = 'ultimate_prem_contract_layer rate_layer signed_share_layer contract_name2'.split()
+    new_col = 'ultimate_prem_contract reinsurance_rate cre_participation contract_name'.split()
+    df.rename(columns=dict(zip(old_col, new_col)), inplace=True)
+
+    print('finished with data pull')
+
+    return (df)
+
+
+def treaty_year_bounds(treaty_year: int) -> tuple:
+    """
+    # Description
+        Return the effective date window for a single treaty year, as the
+        `earliest_eff_date` (inclusive) and `latest_eff_date` (exclusive)
+        strings that are passed through the contract & layer readers
+
+    # Parameters
+        treaty_year: int
+            Treaty year, eg the year of the effective date (e.g. 2021)
+
+    # Returns
+        bounds: tuple
+            (earliest_eff_date, latest_eff_date), both in format 'YYYY-MM-DD'
+
+    # Example
+        >>> treaty_year_bounds(2021)
+        ('2021-01-01', '2022-01-01')
+    """
+    return ('{}-01-01'.format(treaty_year), '{}-01-01'.format(treaty_year + 1))
+
+
+def build_treaty_year(treaty_year: int, pushdown: bool = False, layer_table_name: str = 'Layer_New') -> pd.DataFrame:
+    """
+    # Description
+        Build the data feed for a single treaty year. This opens its own
+        connections to the four source databases (connections cannot be shared
+        across processes), extracts, joins and classifies only the contracts
+        and layers with an effective date in `treaty_year`, and closes the
+        connections again.
+
+        This can be called directly to rebuild one treaty year on its own, and
+        is also the unit of work for `build_feed_by_treaty_year`.
+
+    # Parameters
+        treaty_year: int
+            Treaty year to build (e.g. 2021)
+        pushdown: bool
+            If True, join the source tables on the server (see `raw_contracts`
+            and `raw_layers`). Default is False
+        layer_table_name: str
+            Name of the layer table in the AIR database. Default is 'Layer_New'
+
+    # Returns
+        df: pd.DataFrame
+            Same layout as `join_layer_contract`, for one treaty year only
+
+    # Example
+        >>> df = build_treaty_year(2021)
+        >>> df.treaty_year.unique()
+        array([2021])
+    """
+    # effective date window for this treaty year
+    earliest_eff_date, latest_eff_date = treaty_year_bounds(treaty_year)
+
+    print('building treaty year {}'.format(treaty_year))
+
+    # each shard connects on its own
+    conns = connect_to_dbs('CINRE_LC', 'CINRE_DealSheet', 'CINRE_SAP', 'CINRE_PRICING_AIRv10')
+
+    try:
+        df = join_layer_contract(conns['CINRE_LC'], conns['CINRE_DealSheet'],
+                                 conns['CINRE_SAP'], conns['CINRE_PRICING_AIRv10'],
+                                 layer_table_name=layer_table_name,
+                                 earliest_eff_date=earliest_eff_date,
+                                 latest_eff_date=latest_eff_date,
+                                 pushdown=pushdown)
+    finally:
+        for conn in conns.values():
+            conn.close()
+
+    return (df)
+
+
+def build_feed_by_treaty_year(treaty_years: list, max_workers: int = None, pushdown: bool = False,
+                              layer_table_name: str = 'Layer_New') -> pd.DataFrame:
+    """
+    # Description
+        Build the data feed sharded by treaty year. Each treaty year is built
+        independently with `build_treaty_year` in a process pool, and the
+        shards are concatenated at the end, so a full rebuild scales with the
+        number of cores.
+
+    # Parameters
+        treaty_years: list
+            List of treaty years to build (e.g. [2020, 2021, 2022])
+        max_workers: int
+            Maximum number of worker processes.
+            Default is None (one per core, as in `ProcessPoolExecutor`)
+        pushdown: bool
+            If True, each shard joins the source tables on the server
+            (see `raw_contracts` and `raw_layers`). Default is False
+        layer_table_name: str
+            Name of the layer table in the AIR database. Default is 'Layer_New'
+
+    # Returns
+        df: pd.DataFrame
+            Same layout as `join_layer_contract`, for all requested treaty years
+
+    # Example
+        >>> df = build_feed_by_treaty_year([2020, 2021, 2022])
+        >>> df.treaty_year.unique()
+        array([2020, 2021, 2022])
+    """
+    # one timestamp for the whole feed, so that the shards agree
+    timestamp = build_timestamp()
+
+    # build each treaty year in its own process
+    # `map` returns the shards in the same order as `treaty_years`
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        shards = list(executor.map(functools.partial(build_treaty_year, pushdown=pushdown,
+                                                         layer_table_name=layer_table_name), treaty_years))
+
+    # concatenate the shards
+    print('concatenating {} treaty year shards'.format(len(shards)))
+    df = pd.concat(shards)
+
+    # same timestamp, sort and index as the unsharded build
+    df['timestamp'] = timestamp
+    df.sort_values(
+        'eff_date reserving_line crm_id layer_id'.split(), inplace=True)
+    df.reset_index(drop=True, inplace=True)
+
+    return (df)
+
+
+# data-quality rules checked by `validate_feed`
+# each rule is (description, function of the feed returning a boolean mask
+# that is True for the rows that break the rule)
+feed_validation_rules = {
+    'duplicate_key': (
+        'more than one row for the same crm_id, eff_date and layer_id',
+        lambda df: df.duplicated('crm_id eff_date layer_id'.split(), keep=False)),
+    'inf_expected_loss_ratio': (
+        'expected loss ratio is infinite (zero ultimate premium)',
+        lambda df: np.isinf(df['expected_loss_ratio_layer expected_loss_ratio_contract_layer'.split()]
+                            .apply(pd.to_numeric, errors='coerce')).any(axis=1)),
+    'negative_premium': (
+        'subject, deposit or ultimate premium is negative',
+        lambda df: df['subject_prem_layer deposit_prem_layer ultimate_prem_layer ultimate_prem_contract'.split()]
+                   .apply(pd.to_numeric, errors='coerce').lt(0).any(axis=1)),
+    'unmatched_sap_section': (
+        'layer is not matched to a SAP treaty and section',
+        lambda df: df['sap_treaty'].isna() | df['sap_section'].isna()),
+    'default_crm_gp_id': (
+        'crm_gp_id is missing from every source (defaulted to 0 or recoded from crm_id)',
+        lambda df: df['crm_gp_id'].eq(0) | df['crm_gp_id_src'].eq(provenance_codes['derived'])),
+}
+
+
+def validate_feed(df: pd.DataFrame, rules: dict = None) -> tuple:
+    """
+    # Description
+        Check the joined feed against a set of data-quality rules. Each rule
+        is evaluated once as a boolean mask over the whole table, so this
+        takes about as long as a few column comparisons, even for millions
+        of rows.
+
+    # Parameters
+        df: pd.DataFrame
+            Data feed, as returned by `join_layer_contract` or
+            `build_feed_by_treaty_year`
+        rules: dict
+            Rules to check, in the same layout as `feed_validation_rules`.
+            Default is None (use `feed_validation_rules`)
+
+    # Returns
+        exceptions: pd.DataFrame
+            One row per (row, broken rule), with the row index of the feed,
+            the rule name, and the key columns needed to find the row
+        counts: pd.DataFrame
+            Number of rows breaking each rule, with the rule descriptions
+
+    # Example
+        >>> exceptions, counts = validate_feed(df)
+        >>> counts
+                                 description                          n_rows
+        duplicate_key            more than one row for the same ...   4
+        ...
+    """
+    if rules is None:
+        rules = feed_validation_rules
+
+    # columns kept in the exceptions table to identify the row
+    key_cols = 'crm_id eff_date layer_id sap_treaty sap_section'.split()
+
+    # evaluate each rule as a mask over the whole frame
+    masks = {name: np.asarray(rule(df), dtype=bool) for name, (descr, rule) in rules.items()}
+
+    # per-rule counts
+    counts = pd.DataFrame({
+        'description': [descr for descr, rule in rules.values()],
+        'n_rows': [int(m.sum()) for m in masks.values()]
+    }, index=pd.Index(list(rules.keys()), name='rule'))
+
+    # long table of the rows that break each rule
+    exceptions = pd.concat(
+        [df[key_cols][m].assign(rule=name) for name, m in masks.items()]
+    )
+    exceptions['rule'] = pd.Categorical(exceptions['rule'], categories=list(rules.keys()))
+    exceptions = exceptions.rename_axis('row').reset_index()['row rule'.split() + key_cols]
+
+    print('validation: {} exceptions on {} rows'.format(exceptions.shape[0], exceptions.row.nunique()))
+
+    return (exceptions, counts)
+
+
+# SQL used by `load_feed` for each supported database
+# 'mssql' is the CorpAct_Reserving server, 'sqlite' is a local stand-in for testing
+load_dialects = {
+    'mssql': dict(
+        quote='[{}]',
+        types=dict(f='FLOAT', i='BIGINT', u='BIGINT', b='BIT', M='DATETIME2', O='NVARCHAR(MAX)'),
+        drop='DROP TABLE IF EXISTS {}',
+        rename="EXEC sp_rename '{}', '{}'"),
+    'sqlite': dict(
+        quote='"{}"',
+        types=dict(f='REAL', i='INTEGER', u='INTEGER', b='INTEGER', M='TEXT', O='TEXT'),
+        drop='DROP TABLE IF EXISTS {}',
+        rename='ALTER TABLE {} RENAME TO {}'),
+}
+
+
+def table_exists(cursor: pyodbc.Cursor, table_name: str, dialect: str = 'mssql') -> bool:
+    """
+    # Description
+        Check whether a table exists, for the staging swap in `load_feed`
+
+    # Parameters
+        cursor: pyodbc.Cursor
+            Cursor on the target database
+        table_name: str
+            Name of the table
+        dialect: str
+            Key of `load_dialects`. Default is 'mssql'
+
+    # Returns
+        bool, True if the table exists
+    """
+    if dialect == 'sqlite':
+        qry = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?"
+    else:
+        qry = "SELECT 1 FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_NAME = ?"
+
+    return (cursor.execute(qry, (table_name,)).fetchone() is not None)
+
+
+def load_feed(df: pd.DataFrame,
+              conn: pyodbc.Connection,
+              table_name: str = 'cre_data_feed',
+              batch_size: int = 10000,
+              dialect: str = 'mssql') -> int:
+    """
+    # Description
+        Bulk load the data feed into a database table (by default in
+        CorpAct_Reserving), so that downstream jobs can query it instead of
+        re-reading the Excel output.
+
+        The rows are written to a staging table in batches of parameter
+        arrays (with `fast_executemany` when the cursor supports it), and
+        only when every batch has loaded is the staging table swapped in for
+        the live table. A failed load leaves the live table as it was.
+
+        Missing and infinite values are loaded as NULL, and datetimes as
+        datetimes (text for SQLite).
+
+    # Parameters
+        df: pd.DataFrame
+            Data feed, as returned by `join_layer_contract`
+        conn: pyodbc.Connection
+            Connection to the target database (any DB-API connection using
+            `?` parameters, e.g. `sqlite3.connect(':memory:')`)
+        table_name: str
+            Name of the live table. Default is 'cre_data_feed'
+        batch_size: int
+            Number of rows sent per `executemany` call. Default is 10000
+        dialect: str
+            Key of `load_dialects`, either 'mssql' or 'sqlite'. Default is 'mssql'
+
+    # Returns
+        n: int
+            Number of rows loaded
+
+    # Example
+        >>> conn = connect_to_dbs('CorpAct_Reserving')['CorpAct_Reserving']
+        >>> load_feed(df, conn)
+        123456
+
+        >>> import sqlite3
+        >>> load_feed(df, sqlite3.connect(':memory:'), dialect='sqlite')
+        123456
+    """
+    sql = load_dialects[dialect]
+    quote = sql['quote'].format
+    staging_name, old_name = table_name + '_staging', table_name + '_old'
+
+    # column types from the pandas dtypes (categories load as text)
+    def col_type(s):
+        kind = s.dtype.kind if s.dtype.kind in sql['types'] else 'O'
+        return sql['types'][kind]
+
+    col_defs = ', '.join('{} {}'.format(quote(c), col_type(df[c])) for c in df.columns)
+
+    # convert each column once, up front, to python values with None for missing
+    print('preparing {} rows to load into {}'.format(df.shape[0], table_name))
+    values = []
+    for c in df.columns:
+        s = df[c]
+        missing = s.isna().to_numpy()
+        if s.dtype.kind == 'f':
+            missing = missing | np.isinf(s.to_numpy())
+        if s.dtype.kind == 'M' and dialect == 'sqlite':
+            s = s.dt.strftime('%Y-%m-%d %H:%M:%S')
+        elif s.dtype.kind == 'M':
+            s = pd.Series(s.dt.to_pydatetime(), index=s.index, dtype=object)
+        v = s.to_numpy(dtype=object, copy=True)
+        v[missing] = None
+        values.append(v)
+
+    cursor = conn.cursor()
+    if hasattr(cursor, 'fast_executemany'):
+        cursor.fast_executemany = True
+
+    # load into a fresh staging table
+    cursor.execute(sql['drop'].format(quote(staging_name)))
+    cursor.execute('CREATE TABLE {} ({})'.format(quote(staging_name), col_defs))
+    insert = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(staging_name), ', '.join(quote(c) for c in df.columns), ', '.join('?' for c in df.columns))
+    for start in range(0, df.shape[0], batch_size):
+        batch = list(zip(*[v[start:start + batch_size].tolist() for v in values]))
+        cursor.executemany(insert, batch)
+        print('loaded {} of {} rows'.format(start + len(batch), df.shape[0]))
+    conn.commit()
+
+    # swap the staging table in for the live table
+    print('swapping {} in for {}'.format(staging_name, table_name))
+    cursor.execute(sql['drop'].format(quote(old_name)))
+    had_live = table_exists(cursor, table_name, dialect)
+    if had_live:
+        cursor.execute(sql['rename'].format(table_name, old_name))
+    try:
+        cursor.execute(sql['rename'].format(staging_name, table_name))
+    except Exception:
+        # put the live table back, so a failed swap leaves it as it was
+        if had_live:
+            cursor.execute(sql['rename'].format(old_name, table_name))
+        conn.commit()
+        raise
+    cursor.execute(sql['drop'].format(quote(old_name)))
+    conn.commit()
+
+    return (df.shape[0])
+
@@ -1,38 +1,77 @@
-import pandas as pd
-import datetime
-import sys
-
-# import the script
-import build_contract_layer_tables as credat
-
-# path where the python script for reading the data is located
-SCRIPT_PATH = r'O:\PARM\Corporate Actuarial\Reserving\Scripts\python\cin_re_data'
-
-# add the path to the system PATH variable so it can be loaded
-sys.path.append(SCRIPT_PATH)
-
-
-def main():
-
-    # year, month, day
-    today = datetime.datetime.today()
-    y, m, d, hr, mi, se = today.year, today.month, today.day, today.hour, today.minute, today.second
-
-    # output path for the returned data set
-    OUTPUT_PATH = r'O:\PARM\Corporate Actuarial\Reserving\Assumed Reinsurance\data\DATA_FEED\v1_table'
-    OUTPUT_FILENAME = 'cre_data_feed_{}_{}_{}_{}_{}_{}.xlsx'.format(
-        y, m, d, hr, mi, se)
-    OUTPUT_FILEPATH = '{}\\{}'.format(OUTPUT_PATH, OUTPUT_FILENAME)
-
-    # connect to the various databases
-    lc_conn, ds_conn, sap_conn, air_conn, rsv_conn = credat.connect_to_dbs()
-
-    # pull the data set
-    df = credat.join_layer_contract(lc_conn, ds_conn, sap_conn, air_conn)
-
-    print('outputting data table to {}'.format(OUTPUT_FILEPATH))
-    # output to OUTPUT_PATH
-    df.to_excel(OUTPUT_FILEPATH)
-
-
-main()
+import pandas as pd
+import datetime
+import sys
+
+# import the script
+import build_contract_layer_tables as credat
+
+# path where the python script for reading the data is located
+SCRIPT_PATH = r'O:\PARM\Corporate Actuarial\Reserving\Scripts\python\cin_re_data'
+
+# add the path to the system PATH variable so it can be loaded
+sys.path.append(SCRIPT_PATH)
+
+
+# first treaty year included in a full rebuild
+FIRST_TREATY_YEAR = 2020
+
+# table in CorpAct_Reserving that the feed is loaded into
+RESERVING_TABLE = 'cre_data_feed'
+
+# layer table in the AIR pricing database (read alongside `Contract_New`)
+AIR_LAYER_TABLE = 'Layer_New'
+
+
+def main():
+
+    # year, month, day
+    today = datetime.datetime.today()
+    y, m, d, hr, mi, se = today.year, today.month, today.day, today.hour, today.minute, today.second
+
+    # the feed is only loaded into the reserving database when asked for with `--load`
+    load = '--load' in sys.argv[1:]
+
+    # treaty years to build: any passed on the command line (to rebuild a single
+    # treaty year on its own), otherwise every treaty year through next year
+    treaty_years = [int(ty) for ty in sys.argv[1:] if ty != '--load']
+    full_rebuild = len(treaty_years) == 0
+    if full_rebuild:
+        treaty_years = list(range(FIRST_TREATY_YEAR, y + 2))
+
+    # output path for the returned data set
+    OUTPUT_PATH = r'O:\PARM\Corporate Actuarial\Reserving\Assumed Reinsurance\data\DATA_FEED\v1_table'
+    OUTPUT_FILENAME = 'cre_data_feed_{}_{}_{}_{}_{}_{}.xlsx'.format(
+        y, m, d, hr, mi, se)
+    OUTPUT_FILEPATH = '{}\\{}'.format(OUTPUT_PATH, OUTPUT_FILENAME)
+
+    # pull the data set, one treaty year per process
+    df = credat.build_feed_by_treaty_year(treaty_years, layer_table_name=AIR_LAYER_TABLE)
+
+    # data-quality checks on the finished feed
+    exceptions, counts = credat.validate_feed(df)
+    print(counts)
+
+    print('outputting data table to {}'.format(OUTPUT_FILEPATH))
+    # output to OUTPUT_PATH, with the exceptions on their own sheets
+    with pd.ExcelWriter(OUTPUT_FILEPATH) as writer:
+        df.to_excel(writer)
+        exceptions.to_excel(writer, sheet_name='exceptions', index=False)
+        counts.to_excel(writer, sheet_name='exception_counts')
+
+    # load the feed into the reserving database, for downstream jobs
+    # (the load replaces the whole table, so never with only some treaty years)
+    if not load:
+        print('not loading {} (pass --load to load it)'.format(RESERVING_TABLE))
+    elif not full_rebuild:
+        print('not loading {} from a rebuild of treaty years {}'.format(RESERVING_TABLE, treaty_years))
+    else:
+        rsv_conn = credat.connect_to_dbs('CorpAct_Reserving')['CorpAct_Reserving']
+        try:
+            credat.load_feed(df, rsv_conn, RESERVING_TABLE)
+        finally:
+            rsv_conn.close()
+
+
+# guard is needed so that the process pool workers do not re-run `main`
+if __name__ == '__main__':
+    main()
@@ -1,1114 +1,3097 @@
-import pandas as pd
-import numpy as np
-import pyxlsb
-import os
-
-from datetime import datetime, timedelta
-
-import sys
-
-# add the location of these scripts to the path so they can be imported
-sys.path.append(r'O:\PARM\Corporate Actuarial\Reserving\Scripts\python')
-sys.path.append('./')
-
-# this is a script that contains functions to get user inputs
-# this section is grabbing those inputs
-import user_inputs as i
-folder = i.get_folder()
-show_every=i.get_show_every()
-
-### given folder, return the subfolders
-def get_subfolders(folder : str = None) -> list:
-    """
-    # Description
-        Given a folder, return the subfolders
-    # Inputs
-        folder: string, the folder to search
-    # Outputs
-        out: list, the subfolders in the folder
-    # Imports
-        import os
-    # Example
-        >>> # assume there is a folder called "test" in the current directory
-        >>> # with subfolders called "subtest1" and "subtest2"
-        >>> get_subfolders(folder='test')
-        ['subtest1', 'subtest2']
-    """
-    # get the list of files in the folder
-    # `os.path.isdir(x)`` returns True if `x` is a directory
-    # `os.listdir(folder)` returns a list of the files in the `folder`
-    # uses list comprehension to create a list of booleans
-    out = [os.path.isdir('{}\\{}'.format(folder, x)) for x in os.listdir(folder)]
-
-    # use the list of booleans to filter the list of files
-    # should reproduce this code, but as optimized as possible:
-    # out2 = list(np.array(os.listdir(folder))[out])
-    out2 = [x for x, y in zip(os.listdir(folder), out) if y]
-
-    # this is better because:
-    # 1. it doesn't require numpy
-    # 2. it doesn't require a list comprehension (it uses a generator expression)
-
-    # return the list of subfolders
-    return(out2)
-    
-### given folder, find subfolders, then find their subfolders, until lowest level
-def get_all_subfolders(folder : str = None) -> list:
-    """
-    # Description
-        Given a folder, find subfolders, then find their subfolders, 
-        and on and on, until reaching the lowest level
-    # Inputs
-        folder: string, the folder to search
-    # Outputs
-        out: list, the subfolders in the folder
-    # Imports
-        import os
-    # Example
-        >>> # assume there is a folder called "test" in the current directory
-        >>> # with subfolders called "subtest1" and "subtest2"
-        >>> # "subtest1" has subfolders called "subsubtest1" and "subsubtest2"
-        >>> # "subtest2" has subfolders called "subsubtest3" and "subsubtest4"
-        >>> get_all_subfolders(folder='test')
-        ['subtest1', 'subtest2',
-        'subtest1\\subsubtest1','subtest1\\subsubtest2',
-        'subtest2\\subsubtest3', 'subtest2\\subsubtest4']
-    """
-
-    ## this function should reproduce the following, but as optimized for speed as possible
-    # level = {}
-    # level['1'] = ['{}\\{}'.format(folder, x) for x in get_subfolders(folder=folder)]
-    # cur_level = 1
-    # loop_ind = True
-    # while loop_ind:
-    #     prior_level = cur_level
-    #     cur_level = cur_level + 1
-        
-    #     level['{}'.format(cur_level)] = []
-    #     for fold in level['{}'.format(prior_level)]:
-    #         level['{}'.format(cur_level)] = level['{}'.format(cur_level)] + ['{}\\{}'.format(fold, x) for x in get_subfolders(folder=fold)] 
-            
-    #     if len(level['{}'.format(cur_level)]) == len(level['{}'.format(prior_level)]):
-    #         loop_ind = False
-        
-    # out = []
-    # for k in list(level.keys()):
-    #     out = out + level[k]
-
-    level = {}
-
-    # get the subfolders in the top level folder
-    level['1'] = [os.path.join(folder, x) for x in get_subfolders(folder=folder)]
-
-    # set the current level to 1
-    cur_level = 1
-
-    # set the loop indicator to True
-    loop_ind = True
-
-    # while the loop indicator is True
-    while loop_ind:
-
-        # set the prior level to the current level
-        prior_level = cur_level
-
-        # increment the current level
-        cur_level = cur_level + 1
-
-        # set the current level to an empty list
-        level['{}'.format(cur_level)] = (x for x in level['{}'.format(cur_level)])
-
-        # for each folder in the prior level
-        for fold in level['{}'.format(prior_level)]:
-                
-                # get the subfolders in the folder
-                level['{}'.format(cur_level)] = level['{}'.format(cur_level)] + (os.path.join(fold, x) for x in get_subfolders(folder=fold))
-
-        # if the length of the current level is the same as the prior level
-        if len(list(level['{}'.format(cur_level)])) == len(list(level['{}'.format(prior_level)])):
-            
-            # this means that there are no more subfolders, because otherwise the
-            # length of the current level would be greater than the prior level
-            # to break the loop, set the loop indicator to False
-            loop_ind = False
-
-    # initialize the output list
-    out = []
-
-    # for each key in the level dictionary (using a generator expression)
-    for k in (x for x in level.keys()):
-            
-            # extend the output list with the list of folders in the current level
-            out.extend(level[k])
-
-    # return the output list
-    return(out)
-    
-    
-### given folder, retrun the files in that folder
-def get_files(folder : str = None) -> list:
-    """
-    # Description
-        Given a folder, return the files in that folder
-    # Inputs
-        folder: string, the folder to search
-    # Outputs
-        out2: list, the files in the folder
-    # Imports
-        import os
-    # Example
-        >>> # assume there is a folder called "test" in the current directory
-        >>> # with files called "test1.txt" and "test2.txt"
-        >>> get_files(folder='test')
-        ['test1.txt', 'test2.txt']
-    """
-    # out = [os.path.isdir('{}\\{}'.format(folder, x)) for x in os.listdir(folder)] # this line can be optimized by using os.path.join instead of string concatenation:
-    
-    # this line can be optimized by using os.path.join instead of string concatenation
-    # compiles a list of booleans, where True indicates that the item is a folder
-    out = [os.path.isdir(os.path.join(folder, x)) for x in os.listdir(folder)]
-    
-
-    # this line can be optimized by using os.path.join instead of string concatenation
-    # out2 = list(np.array(os.listdir(folder))[np.logical_not(out)])
-    out2 = list(np.array(os.listdir(folder))[np.logical_not(out)]) # is it ok to use numpy here: no, because it is not a core python library
-    return(out2)
-    
-### given folder, return all the files in that folder, as well as in subfolders
-def get_all_files(folder : str = None) -> pd.DataFrame:
-    """
-    # Description
-        Given a folder, return all the files in that folder, as well as in subfolders
-    # Inputs
-        folder: string, the folder to search
-                default: None
-    # Outputs
-        out: pandas DataFrame, the files in the folder, as well as in subfolders
-    # Imports
-        import pandas as pd
-        import numpy as np
-    # Example
-        >>> # assume there is a folder called "test" in the current directory
-        >>> # with files called "test1.txt" and "test2.txt"
-        >>> # assume there is a subfolder called "test_sub" in the folder "test"
-        >>> # with files called "test_sub1.txt" and "test_sub2.txt"
-        >>> get_all_files(folder='test')
-        top_level_folder folder file
-        0 test test1.txt
-        1 test test2.txt
-        2 test test_sub test_sub1.txt
-        3 test test_sub test_sub2.txt
-
-    """
-    # get the subfolders in the top level folder, using the function `get_all_subfolders`
-    folder_list = get_all_subfolders(folder)
-    
-    # initialize the output list
-    out_list = []
-
-    # the following line can be optimized by using a list comprehension instead of a for loop:
-    # for fold in folder_list:
-    #     temp = pd.DataFrame(dict(file=get_files(fold)))
-    #     temp['folder'] = fold[len(folder)+1:]
-    #     temp['top_level_folder'] = folder
-    #     out_list.append(temp['top_level_folder folder file'.split()])
-
-    # this line creates a list of dataframes, where each dataframe contains the files in a subfolder
-    out_list = [pd.DataFrame(dict(file=get_files(fold)))['file'] for fold in folder_list]
-
-    # this line adds a column to each dataframe in the list, where the column contains the subfolder name
-    out_list = [x.assign(folder=fold[len(folder)+1:]) for x in out_list]
-
-    # this line adds a column to each dataframe in the list, where the column contains the top level folder name
-    out_list = [x.assign(top_level_folder=folder) for x in out_list]
-
-    # this line concatenates the dataframes in the list into a single dataframe
-    out_df = pd.concat(out_list).reset_index(drop=True)
-       
-    # filter out non-excel files by looking for the string ".xls" in the file name
-    # (will get files with the extensions .xls, .xlsx, .xlsm, etc.)
-    is_excel_ind = out_df.file.str.lower().str.contains('.xls')
-
-    # filter out files with some variation of the word "deal"
-    deal_filter = out.file.str.lower().str.contains('deal')
-
-    # filter out files with some variation of the word "final"
-    final_filter = out.file.str.lower().str.contains('final')
-    
-    # return the filtered dataframe
-    return(out)
-    
-### test filename to find patterns for clues re: what type of contract
-def parse_filename_test(x : str = None, search_list : list = None) -> pd.DataFrame:
-    """
-    # Description
-        Given a filename, return a dataframe with a column for each search term,
-        where the value is True if the search term is in the filename, and False
-        otherwise
-    # Inputs
-        x:  string, the filename
-            default: None
-        search_list: list, the search terms
-            default: None
-    # Outputs
-        out: pandas DataFrame, a dataframe with a column for each search term,
-            where the value is True if the search term is in the filename, and False
-            otherwise
-    # Imports
-        import pandas as pd
-    # Example
-        >>> parse_filename_test(x='test1.txt', search_list=['test', '1'])
-        is_test is_1
-        0 True True
-    """
-    # this line can be optimized by using a list comprehension instead of a for loop:
-    # qry = pd.DataFrame(dict(x=x))
-    # for term in search_list:
-    #     qry['is_{}'.format(term)] = x.str.lower().str.contains(term)
-    # optimized version:
-    qry = pd.DataFrame(dict(x=x))
-    qry = qry.assign(**{'is_{}'.format(term): x.str.lower().str.contains(term) for term in search_list})
-
-    # the optimized version works by creating a dictionary, where the keys are the column names
-    # and the values are the values for the columns. the dictionary is then passed to the `assign`
-    # function, which creates the columns in the dataframe.
-
-    # this line drops the column 'x' and
-    # returns True if any of the columns are True
-    out = qry.drop(columns='x').any(axis=1)
-
-    # return the output dataframe
-    return(out)
-
-def get_page(sht : wb.Sheet = None, max_columns : int = 32) -> list:
-    """
-    # Description
-        Given a sheet, return a list of lists, where each list is a row in the sheet
-    # Inputs
-        sht:  wb.Sheet, the sheet
-            default: None
-        max_columns: int, the maximum number of columns to read
-            default: 32
-    # Outputs
-        page: list, a list of lists, where each list is a row in the sheet
-    # Imports
-        import pandas as pd
-        import numpy as np
-    """
-    # initialize the output list
-    page = []
-
-    # loop through the rows in the sheet
-    for r in sht.rows():
-
-        # initialize the counter
-        counter = 1
-
-        # initialize the row list
-        row = []
-
-        # loop through the cells in the row
-        for cell in r:
-
-            # increment the counter
-            counter = counter + 1
-
-            # if the counter is less than or equal to 32 (the maximum number of columns to read)
-            # is given by the input `max_columns`
-            if counter <= max_columns:
-
-                # if the value of the cell is not None
-                if cell.v is not None:
-                    # append the value of the cell to the row list
-                    row.append(cell.v)
-
-        # append the row list to the output list
-        page.append(row)
-
-    # return the output list
-    return(page)
-    
-def format_ds_data(x : str = None) -> str:
-    """
-    # Description
-        Given a value, return the value in a format suitable for the data source
-    # Inputs
-        x:  string, the value
-            default: None
-    # Outputs
-        out: string, the value in a format suitable for the data source
-    # Imports
-        import pandas as pd
-    # Example
-        >>> format_ds_data(x='test1.txt')
-        'test1.txt'
-    """
-    # first test if the value is a string
-    if type(x)==str:
-
-        # if the value is a string, and the string is '0x7', return 0
-        if x=='0x7':
-            return(0)
-
-        # if the value is a string, and the string is empty, return 'N/A'
-        elif x=='':
-            return('N/A')
-
-        # if the value is a nonempty string that is not '0x7', return the string
-        # but strip any leading or trailing whitespace
-        else:
-            return(x.strip())
-
-    # if the value is a float
-    elif type(x)==float:
-
-        # if the value is less than 1, round to 4 decimal places
-        if x<1:
-            return(round(x, 4))
-
-        # if the value is greater than or equal to 1, round to 3 decimal places
-        else:
-            return(round(x, 3))
-
-    # otherwise, return the value
-    else:
-        return(x)
-        
-def parse_key_contract_terms(page : list = None, n_layers : int = 8) -> dict:
-    """
-    # Description
-        Given a list of lists, where each list is a row in the sheet, return a dictionary
-        with the key contract terms
-    # Inputs
-        page: list, a list of lists, where each list is a row in the sheet
-            default: None
-        n_layers: int, the number of layers in the sheet
-            default: 8
-    # Outputs
-        d: dict, a dictionary with the key contract terms
-    # Imports
-        import pandas as pd
-        import numpy as np
-    """
-    # initialize the output dictionary and the list of other terms
-    d = {}
-    others = []
-
-    # loop through the rows in the sheet
-    # this loop can be optimized by using a list comprehension instead of a for loop:
-    # for row in page:
-    #     if len(row)==0:
-    #         pass
-    #     else:
-    #         if row[0]=="Summary Economics":
-    #             break
-    #         elif row[0]=="Key Contract Terms":
-    #             pass
-    #         elif len(row)==1:
-    #             row[0] = row[0].replace("(%)", "%")
-    #             d[row[0].replace(' ', '_').lower()] = 'N/A'
-    #         elif row[1]=="CRM ID:":
-    #             row[0] = row[0].replace("(%)", "%")
-    #             d['client_name'] = row[0] if row[0] != '' else 'N/A'
-    #             d['crm_id'] = row[2] if row[2] != '' else 'N/A'
-    #             d['contract_name'] = row[4] if row[4] != '' else 'N/A'
-    #             d['mga'] = row[6] if row[6] != '' else 'N/A'
-    #             d['broker']=row[8] if row[8] != '' else 'N/A'
-    #         elif len(row)==9:
-    #             row[0] = row[0].replace("(%)", "%")
-    #             item = row[0].replace(' ', '_').lower()
-    #             d[item] = {}
-    #             for layer in range(8):
-    #                 d[item]['layer_{}'.format(layer+1)] = format_ds_data(row[1+layer])
-    #         elif len(row)==25:
-    #             row[0] = row[0].replace("(%)", "%")
-    #             ## these have two values, and an extra cell for a delimiter between the range
-    #             item1 = row[0][:row[0].find("/")].lower().replace(" ", "_")
-    #             item2 = row[0][1+row[0].find("/"):].lower().replace(" ", "_")
-    #             d[item1], d[item2] = {}, {}
-    #             for layer in range(8):
-    #                 d[item1]['layer_{}'.format(layer+1)] = format_ds_data(row[1:][(3*layer)])
-    #                 d[item2]['layer_{}'.format(layer+1)] = format_ds_data(row[1:][2+(3*layer)])
-    #         elif len(row)==17:
-    #             row[0] = row[0].replace("Brok on R/I Prem (%)", "Brok on RI Prem (%)")
-    #             row[0] = row[0].replace("(%)", "%")
-                
-    #             ## these have two values, but no delimeter
-    #             if row[0].find('/') != -1:
-    #                 item1 = row[0][:row[0].find("/")].lower().replace(" ", "_")
-    #                 item2 = row[0][1+row[0].find("/"):].lower().replace(" ", "_")
-    #                 d[item1], d[item2] = {}, {}
-    #                 for layer in range(8):
-    #                     d[item1]['layer_{}'.format(layer+1)] = format_ds_data(row[1:][(2*layer)])
-    #                     d[item2]['layer_{}'.format(layer+1)] = format_ds_data(row[1:][1+(2*layer)])
-    #             else:
-    #                 item1 = row[0].lower().replace(" ", "_") + '_basis'
-    #                 item2 = row[0].lower().replace(" ", "_") 
-    #                 d[item1], d[item2] = {}, {}
-    #                 for layer in range(8):
-    #                     d[item1]['layer_{}'.format(layer+1)] = format_ds_data(row[1:][(2*layer)])
-    #                     d[item2]['layer_{}'.format(layer+1)] = format_ds_data(row[1:][1+(2*layer)])
-    #         elif len(row)==10:
-    #             row[0] = row[0].replace("(%)", "%")
-    #             item = row[0].replace(' ', '_').lower()
-    #             d[item] = {}
-    #             for layer in range(8):
-    #                 d[item]['layer_{}'.format(layer+1)] = format_ds_data(row[1+layer])
-    #             d[item]['note'] = format_ds_data(row[9])
-    #         else:
-    #             others.append(row)
-    # this is the list comprehension version of the above for loop
-    
-    # loop over the rows in the sheet, skipping empty rows
-    for row in [row for row in page if len(row) != 0]:
-
-        # if the row is the summary economics row, break the loop
-        if row[0] == "Summary Economics":
-            break
-
-        # if the row is the key contract terms row, skip it
-        elif row[0] == "Key Contract Terms":
-            pass
-
-        # if the row is a single cell, replace the spaces with underscores and add it to the dictionary
-        elif len(row) == 1:
-
-            # if the first cell has a percent sign in parentheses, replace it with a percent sign
-            row[0] = row[0].replace("(%)", "%")
-
-            # add the key to the dictionary
-            d[row[0].replace(' ', '_').lower()] = 'N/A'
-
-        # if the second cell is CRM ID, then we are in the header row,
-        # and we need to add the client name, CRM ID, contract name, MGA,
-        # and broker to the dictionary
-        elif row[1] == "CRM ID:":
-
-            # if the first cell has a percent sign in parentheses, replace it with a percent sign
-            row[0] = row[0].replace("(%)", "%")
-
-            # add the client name, CRM ID, contract name, MGA, and broker to the dictionary
-            # if the value is empty, replace it with N/A
-            d['client_name'] = row[0] if row[0] != '' else 'N/A'
-            d['crm_id'] = row[2] if row[2] != '' else 'N/A'
-            d['contract_name'] = row[4] if row[4] != '' else 'N/A'
-            d['mga'] = row[6] if row[6] != '' else 'N/A'
-            d['broker'] = row[8] if row[8] != '' else 'N/A'
-        
-        # if the row has 9 cells, then we are in the summary economics row
-        elif len(row) == 9:
-
-            # if the first cell has a percent sign in parentheses, replace it with a percent sign
-            row[0] = row[0].replace("(%)", "%")
-
-            # replace the spaces with underscores and add the key to the dictionary
-            item = row[0].replace(' ', '_').lower()
-
-            # initialize the dictionary for the item
-            d[item] = {}
-
-            # loop over the layers and add the values to the dictionary (max 8 layers)
-            for layer in range(n_layers):
-
-                # if the value is empty, replace it with N/A
-                d[item]['layer_{}'.format(layer + 1)] = format_ds_data(row[1 + layer])
-
-        elif len(row) == 25:
-            # if the first cell has a percent sign in parentheses, replace it with a percent sign
-            row[0] = row[0].replace("(%)", "%")
-
-            ## these have two values, and an extra cell for a delimiter between the range
-            # if the first cell has a slash, then we have two values, so we need to split them
-
-            item1 = row[0][:row[0].find("/")].lower().replace(" ", "_")
-
-            # if the first cell has a slash, then we have two values, so we need to split them
-            item2 = row[0][1 + row[0].find("/"):].lower().replace(" ", "_")
-
-            # initialize the dictionaries for the items
-            d[item1], d[item2] = {}, {}
-
-            # loop over the layers and add the values to the dictionary (max `n_layers` layers)
-            for layer in range(n_layers):
-
-                # if the value is empty, replace it with N/A
-                d[item1]['layer_{}'.format(layer + 1)] = format_ds_data(row[1:][(3 * layer)])
-                d[item2]['layer_{}'.format(layer + 1)] = format_ds_data(row[1:][2 + (3 * layer)])
-
-        elif len(row) == 17:
-            row[0] = row[0].replace("Brok on R/I Prem (%)", "Brok on RI Prem (%)")
-            row[0] = row[0].replace("(%)", "%")
-
-            ## these have two values, but no delimeter
-            if row[0].find('/') != -1:
-
-                # if the first cell has a slash, then we have two values, so we need to split them
-                item1 = row[0][:row[0].find("/")].lower().replace(" ", "_")
-                item2 = row[0][1 + row[0].find("/"):].lower().replace(" ", "_")
-
-                # initialize the dictionaries for the items
-                d[item1], d[item2] = {}, {}
-                
-                # loop over the layers and add the values to the dictionary (max `n_layers` layers)
-                for layer in range(n_layers):
-                    d[item1]['layer_{}'.format(layer + 1)] = format_ds_data(row[1:][(2 * layer)])
-                    d[item2]['layer_{}'.format(layer + 1)] = format_ds_data(row[1:][1 + (2 * layer)])
-    
-    # add the other rows to the list of other rows
-    out = dict(dat=d, others=others)
-
-    # return the dictionary
-    return(out)
-    
-def parse_summary_economics(page : list = None, n_layers : int = 8) -> dict:
-    """
-    # Description
-        This function parses the summary economics from the deal sheet.
-    # Inputs
-        page : list
-            The list of rows from the deal sheet.
-        n_layers : int
-            The number of layers in the deal sheet.
-            Default is 8.
-    # Outputs
-        out : dict
-            A dictionary containing the summary economics.
-    """
-    # initialize the dictionary with the client name, CRM ID, contract name, MGA, and broker
-    key_contract_terms = parse_key_contract_terms(page=page, n_layers=n_layers)
-
-    # initialize the dictionary
-    d = key_contract_terms['dat']
-
-    # initialize the list of other rows
-    others = []
-
-    # initialize the number of layers
-    used_cols = list(key_contract_terms['dat'].keys())
-
-    # initialize the flag for the summary economics
-    hit_sum_econ = False
-
-    # loop over the rows
-    for row in page:
-
-        # if the row has 0 cells, then we are in the summary economics row, so
-        if len(row)==0:
-            pass
-        else:
-
-            # if `hit_sum_econ` is `True`, then we are in the summary economics row
-            if hit_sum_econ:
-
-                # if the first cell is a string
-                if type(row[0])==str:
-
-                    # if the first cell has a subject business UOBG
-                    if row[0]=="Subject Business UOBG":
-                        break
-
-                    # if the first cell is not "Subject Business UOBG"
-                    else:
-                        # replace "Ult." with "Ult"
-                        row[0] = row[0].replace('Ult.', 'Ult')
-                        
-                        ## ROW LENGTH 10
-                        # if the row has either 10 or 11 cells
-                        if len(row) in [n_layers+2, n_layers+3]:
-
-                            # remove the spaces and parentheses from the first cell
-                            item = row[0].lower().replace(" ", "_").replace("_(1:", "_1:")
-
-                            # initialize the dictionary for the item
-                            d[item] = {}
-
-                            # loop over the layers and add the values to the dictionary (max 8 layers)
-                            for layer in range(n_layers):
-
-                                # add the values to the dictionary
-                                d[item]['layer_{}'.format(layer+1)] = format_ds_data(row[1:][layer])
-
-                            # if the row has exactly 10 cells, then the last cell is the combined value
-                            if len(row)==n_layers+2:
-
-                                # add the combined value to the dictionary
-                                d[item]['combined'] = format_ds_data(row[len(row)-1])
-
-                            # if the row has exactly 11 cells, then the last two cells are the capital and the ROE
-                            else:
-                                d[item]['capital'] = format_ds_data(row[len(row)-2])
-                                d[item]['roe'] = format_ds_data(row[len(row)-1])
-                        
-                        ## ROW LENGTH 18 & 19
-                        # if the row has either 18 or 19 cells
-                        elif len(row) in [(2*(n_layers)+2), (2*(n_layers)+3)]:
-
-                            # if the first cell has a slash
-                            if row[0].find("/") != -1:
-
-                                # replace the spaces and parentheses in the first cell, to get the first item
-                                item1 = row[0][:row[0].find("/")].lower().replace(" ", "_").replace("_(1:", "_1:")
-
-                                # if the first item is either "Risk Limit Share" or "Occurrence Limit Share", then the second cell is
-                                # the "ROL" version of the first cell
-                                if item1 in ['risk_limit_share', 'occurrence_limit_share']:
-                                    item2 = '{}_rol'.format(item1)
-
-                                # otherwise, the second cell is the first cell with the slash removed
-                                # and the spaces and parentheses replaced
-                                else:
-                                    item2 = row[0][1+row[0].find("/"):].lower().replace(" ", "_").replace("_(1:", "_1:")
-                                
-                                # initialize the dictionaries for the items
-                                d[item1], d[item2] = {}, {}
-
-                                # loop over the layers and add the values to the dictionary (max `n_layers` layers)
-                                for layer in range(n_layers):
-
-                                    # add the values to the dictionary
-                                    d[item1]['layer_{}'.format(layer+1)] = format_ds_data(row[1:][2*layer])
-                                    d[item2]['layer_{}'.format(layer+1)] = format_ds_data(row[1:][1+(2*layer)])
-                                
-                                # if the row has exactly 19 cells, then the last two cells are the combined values
-                                # for the first and second items (over all layers)
-                                if len(row)==(2*(n_layers)+3):
-                                    d[item1]['combined'] = format_ds_data(row[len(row)-2])
-                                    d[item2]['combined'] = format_ds_data(row[len(row)-1])
-
-                                # if the row has exactly 18 cells, then the last cell is the combined value
-                                # for the first item (over all layers), and there is no combined value for
-                                # the second item
-                                else:
-                                    d[item1]['combined'] = format_ds_data(row[len(row)-1])
-
-                            # if the first cell does not have a slash
-                            else:
-
-                                # replace the spaces and parentheses in the first cell, to get the first item
-                                item1 = row[0][:row[0].find("/")].lower().replace(" ", "_").replace("_(1:", "_1:")
-                                item2 = '{}_pct'.format(item1)
-                                d[item1], d[item2] = {}, {}
-
-                                # loop over the layers and add the values to the dictionary (max `n_layers` layers)
-                                for layer in range(n_layers):
-
-                                    # add the values to the dictionary
-                                    d[item1]['layer_{}'.format(layer+1)] = format_ds_data(row[1:][2*layer])
-                                    d[item2]['layer_{}'.format(layer+1)] = format_ds_data(row[1:][1+(2*layer)])
-                                
-                                # if the row has exactly 19 cells, then the last two cells are the combined values
-                                if len(row)==(2*(n_layers)+3):
-                                    d[item1]['combined'] = format_ds_data(row[len(row)-2])
-                                    d[item2]['combined'] = format_ds_data(row[len(row)-1])
-                                
-                                # if the row does not have exactly 19 cells, then the last cell is the combined value
-                                else:
-                                    d[item1]['combined'] = format_ds_data(row[len(row)-1])
-                        
-                        # if the row has 9 cells, the first is the name of the item, and the rest are the values
-                        # for each layer (max 8 layers)
-                        elif len(row)==(n_layers + 1):
-
-                            # replace the spaces and parentheses in the first cell, to get the item
-                            item = row[0].lower().replace(" ", "_").replace("_(1:", "_1:")
-                            
-                            # initialize the dictionary for the item
-                            d[item] = {}
-
-                            # loop over the layers and add the values to the dictionary (max `n_layers` layers)
-                            for layer in range(n_layers):
-
-                                # add the values to the dictionary
-                                d[item]['layer_{}'.format(layer+1)] = format_ds_data(row[1:][layer])
-                        
-                        # if the row length is not yet given, then add it to the list of "others"
-                        # which will be returned at the end, to be parsed manually
-                        else:
-                            others.append(row)
-
-            # if we have hit the "Summary Economics" section, then continue
-            else:
-                if row[0] == 'Summary Economics':
-                    hit_sum_econ = True
-                else:
-                    pass
-    # return the dictionary of data and the list of "others"
-    return(dict(dat=d, others=others))
-    
-def parse_subject_business_uobg(page : list = None) -> dict:
-    """
-    # Description
-    Parses the "Subject Business" and "UOBG" sections of the DS page.
-
-    # Inputs
-    page : list
-        The list of rows from the DS page.
-
-
-    """
-    key_contract_terms = parse_summary_economics(page)
-    d = key_contract_terms['dat']
-    others = []
-    used_cols = list(key_contract_terms['dat'].keys())
-    hit_uobg = False
-    for row in page:
-        if len(row)==0:
-            pass
-        else:
-            if hit_uobg:
-                if type(row[0])==str:
-                    if row[0]=="Deposit Prem Schedule":
-                        break
-                    elif row[0] in ["<Select UOBG>", 'Total']:
-                        pass
-                    else:
-                        row[0] = row[0].replace('Ult.', 'Ult')
-                        ## ROW LENGTH 10
-                        if len(row) in [10, 11]:
-                            item = 'uobg_{}'.format(counter)
-                            d[item] = {}
-                            for layer in range(8):
-                                d[item]['layer_{}'.format(layer+1)] = format_ds_data(row[1:][layer])
-                            if len(row)==10:
-                                d[item]['combined'] = format_ds_data(row[len(row)-1])
-                            else:
-                                d[item]['capital'] = format_ds_data(row[len(row)-2])
-                                d[item]['roe'] = format_ds_data(row[len(row)-1])
-                        ## ROW LENGTH 18 & 19
-                        elif len(row) in [18, 19]:
-                            if row[0].find("/") != -1:
-                                item1 = 'uobg_{}'.format(counter)
-                                item2 = 'uobg_{}_pct'.format(counter)
-                                d[item1], d[item2] = {}, {}
-                                for layer in range(8):
-                                    d[item1]['layer_{}'.format(layer+1)] = format_ds_data(row[1:][2*layer])
-                                    d[item2]['layer_{}'.format(layer+1)] = format_ds_data(row[1:][1+(2*layer)])
-                                if len(row)==19:
-                                    d[item1]['combined'] = format_ds_data(row[len(row)-2])
-                                    d[item2]['combined'] = format_ds_data(row[len(row)-1])
-                                else:
-                                    d[item1]['combined'] = format_ds_data(row[len(row)-1])
-                            else:
-                                item1 = 'uobg_{}'.format(counter)
-                                item2 = 'uobg_{}_pct'.format(counter)
-                                d[item1], d[item2] = {}, {}
-                                for layer in range(8):
-                                    d[item1]['layer_{}'.format(layer+1)] = format_ds_data(row[1:][2*layer])
-                                    d[item2]['layer_{}'.format(layer+1)] = format_ds_data(row[1:][1+(2*layer)])
-                                if len(row)==19:
-                                    d[item1]['combined'] = format_ds_data(row[len(row)-2])
-                                    d[item2]['combined'] = format_ds_data(row[len(row)-1])
-                                else:
-                                    d[item1]['combined'] = format_ds_data(row[len(row)-1])
-                        elif len(row)==9:
-                            item = 'uobg_{}'.format(counter)
-                            d[item] = {}
-                            for layer in range(8):
-                                d[item]['layer_{}'.format(layer+1)] = format_ds_data(row[1:][layer])
-                        else:
-                            others.append(row)
-                    counter = counter + 1
-            else:
-                if row[0] == 'Subject Business UOBG':
-                    hit_uobg = True
-                    counter = 1
-                else:
-                    pass
-    return(dict(dat=d, others=others))
-    
-def find_num_layers(d : dict = None) -> int:
-    """
-    """
-    prem_series = pd.Series(d['ult_cin_re_premiu'])
-    idx = prem_series.index.tolist()
-    
-    for i in range(len(idx)-1):
-        if prem_series[idx[:i+1]].sum().round(0)==round(prem_series[len(idx)-1], 0):
-            return(i+1)
-    return(999)
-    
-def rename_column(c):
-    ## several things always get renamed
-    new_col_name = (c
-                    .replace('effective', 'effective_date')
-                    .replace('expire_date', 'expiration_date')
-                    .replace('qs%_', 'qs')
-                    .replace('_placement%', 'placement%')
-                    .replace('reinsurance_rat', 'reinsurance_rate')
-                    .replace('th%', 'th')
-                    .replace('ceding_com_', 'ceding_comm_'))
-    
-    ## remove final character unless specific sequence of characters
-    if new_col_name.find("1:")==-1:
-        new_col_name = new_col_name.replace(":", "")
-    if new_col_name.find("(")==-1:
-        new_col_name = new_col_name.replace(")", "")
-        
-    ## if missing final letter, add it
-    if new_col_name.find('bonus')==-1:
-        new_col_name = new_col_name.replace("bonu", "bonus")
-    if new_col_name.find('capital')==-1:
-        new_col_name = new_col_name.replace("capita", "capital")
-    if new_col_name.find('premium')==-1:
-        new_col_name = new_col_name.replace('premiu', 'premium')
-    if new_col_name.find('ratio')==-1:
-        new_col_name = new_col_name.replace('rati', 'ratio')
-    if new_col_name.find('adjustment')==-1:
-        new_col_name = new_col_name.replace('adjustmen', 'adjustment')
-    if new_col_name.find('brokerage')==-1:
-        new_col_name = new_col_name.replace('brokerag', 'brokerage')
-    if new_col_name.find('expense')==-1:
-        new_col_name = new_col_name.replace('expens', 'expense')
-    if new_col_name.find('profit')==-1:
-        new_col_name = new_col_name.replace('profi', 'profit')
-    if new_col_name.find('discounted')==-1:
-        new_col_name = new_col_name.replace('discounte', 'discounted')
-        
-    ## add closing parentheses if needed
-    if (new_col_name.find("(")!=-1) and (new_col_name.find(")")==-1):
-        new_col_name = new_col_name + ")"
-        
-    ## change something to something new, may or may not be missing final letter
-    if new_col_name.find('commission')==-1:
-        new_col_name = new_col_name.replace('commissio', 'comm')
-    else:
-        new_col_name = new_col_name.replace('commission', 'comm')
-        
-    ## once all this is done, combine a few things:
-    new_col_name = (new_col_name.replace('brokerage_%', 'brokerage_pct'))
-
-    return(new_col_name)
-    
-def parsed_to_df(d):
-    cols_0 = list(d.keys())
-    cols = ['layer'] + cols_0
-    
-    try:
-        num_layers = find_num_layers(d)
-#         print('num_layers: {}'.format(num_layers))
-        if num_layers==999:
-            print('Unable to find the number of layers for this treaty. (1000)')
-            try:
-                print('client_name: {}\ncrm_id: {}\ncontract_name: {}'.format(d['client_name'], d['crm_id'], d['contract_name']))
-            except:
-                print('Not in the correct form: (1001)')
-            return(999)
-        else:
-            try:
-                df_list = pd.DataFrame(dict(layer=list(range(1, num_layers+1)))).set_index('layer')
-            except:
-                print('(1003)')
-            for c in cols_0:
-                new_col_name = rename_column(c)
-                if type(d[c])==dict:
-                    layers = list(range(1, num_layers+1))
-                    value = [d[c]['layer_{}'.format(l)] for l in layers]
-                else:
-                    layers = list(range(1, num_layers+1))
-                    value= [d[c] for _ in layers]
-                try:
-                    df_list[new_col_name] = value
-                except:
-                    print(c)
-            return(df_list.reset_index())
-    except:
-        print('Unable to find the number of layers for this treaty. (9999)')
-        print('client_name: {}\ncrm_id: {}\ncontract_name: {}'.format(d['client_name'], d['crm_id'], d['contract_name']))
-        return(999)
-        
-def one_file_type1(file):
-    try:
-        wb = pyxlsb.open_workbook(file)
-    except:
-        print('{} is not found'.format(file))
-    try:
-        sht = wb.get_sheet('Contract Summary')
-        page = get_page(sht)
-    except:
-        print('{} is not found does not have a Contract Summary tab'.format(file))
-    try:
-        d =  parse_subject_business_uobg(page)
-        df = parsed_to_df(d['dat'])
-        return(df)
-    except:
-        print('{} had another error. who knows what???'.format(file))
-        
-def calc_remaining_time(pct_complete, start_time):
-    import datetime
-    cur_time = datetime.datetime.now()
-    cur_hour, cur_min, cur_sec = cur_time.hour, cur_time.minute, cur_time.second
-    cur_s = (3600 * cur_hour) + (60 * cur_min) + (cur_sec)
-    
-    start_hour, start_min, start_sec = start_time.hour, start_time.minute, start_time.second
-    start_s = (3600 * start_hour) + (60 * start_min) + (start_sec)
-    
-    sec_so_far = cur_s - start_s
-    ult_sec = sec_so_far / pct_complete
-    sec_resv = ult_sec - sec_so_far
-    min_resv = np.floor(sec_resv / 60)
-    sec_resv2 = round(sec_resv - (60 * min_resv), 0)
-    
-    return(min_resv, sec_resv2, sec_so_far)
-    
-    
-def get_uobg_lookup(file=r'O:\PARM\Corporate Actuarial\Reserving\Assumed Reinsurance\data\uobg_mapping\ds_uobg_lookup_20220727.xlsx', 
-                    sheet_name='Sheet1'):
-    df = pd.read_excel(file, sheet_name)
-    
-    for c in 'major_lob subline business_segment business_sub_segment business_group class_group pr_non_pr cm_occ uobg_desc uobg_desc2'.split():
-        df[c] = df[c].astype('category')
-        
-    df['uobg'] = df['uobg'].astype(float)
-    return(df)
-
-def all_files(files, show_every=5):
-    dflist = []
-    others = []
-    n = len(files)
-    counter=1
-    
-    ## loop through the files, reading one by one
-    start_time = datetime.now()
-    for f in files:
-        if (counter % show_every == 0) or (counter == n):
-            m, s, sofar = calc_remaining_time(counter / n, start_time)
-            print('{} / {} ({}%) complete -- est. {}m{}s remaining'.format(counter, n, round(100 * (counter / n), 1), int(m), int(s)))
-        temp = one_file_type1(f)
-        if type(temp)==int:
-            ## this only happens when there is an error, so add this to the list of "others"
-            others.append(f)
-        else:
-            dflist.append(temp)
-        counter = counter + 1
-        
-    ## take the list of single-file df's from last step and append to a single table
-    df=pd.concat(dflist).reset_index(drop=True)
-    
-    ## format the columns
-    df['one'], df['zero'], df['blank'], df['na'] = 1, 0, '', 'N/A' # series for recoding
-    for c in df.columns.tolist():
-        if c in ['one', 'zero', 'blank', 'na']:                    # don't recode the recoding cols
-            pass
-        else:
-            df[c] = df['na'].where(df[c].isna(), other=df[c])
-    df.drop('one zero blank na'.split(), 1, inplace=True)          # remove the series used for recoding 
-    
-    ## join the uobg_desc field
-    ulk = uobg_lookup['uobg uobg_desc'.split()].set_index('uobg')
-    for i in range(1, 9):
-        df = df.set_index('uobg_{}'.format(i))
-        df = df.join(ulk, how='left')
-        df = df.rename(columns={'uobg_desc':'uobg_{}_desc'.format(i)})
-        df = df.reset_index().rename(columns={'index':'uobg_{}'.format(i)})
-        print(df.head())
-    
-    ## return a dictionary with both the data and the "others" list of files that didn't work correctly
-    out = dict(df=df, others=others)
-    return(out)
-    
-def main():
-
-    ### df with all the files
-    df = get_all_files(folder)
-
-
-    ### is it an excel filename? 
-    df['is_excel'] = df['file'].str.contains('.xls')
-
-    ### run many different queries
-    qry = (df
-           .assign(has_deal=df.file.str.lower().str.contains('deal'))
-           .assign(has_summary=df.file.str.lower().str.contains('summary'))
-           .assign(not_db=np.logical_not(df.file.str.lower().str.contains('database')))
-           .assign(not_db2=np.logical_not(df.file.str.lower().str.contains('db')))
-           .assign(not_template=np.logical_not(df.file.str.lower().str.contains('template')))
-    #        .assign(not_ds_folder=df.folder.ne('Deal Sheets'))
-           .assign(not_templates_folder=np.logical_not(df.folder.str.lower().str.contains('template')))
-           
-           .drop('top_level_folder folder'.split(), 1)
-           .all(axis=1, bool_only=True)
-          )
-    df1 = (df
-           .assign(is_final=df.file.str.lower().str.contains('final'))
-           .assign(is_cas=df.file.str.lower().str.contains('cas'))
-           .loc[qry, :]
-           .reset_index(drop=True)
-           .drop('is_excel', 1)
-          )
-
-    ### xlsb file
-    xlsb_list=['.xlsb']
-    df1['is_xlsb'] = parse_filename_test(df1.file, xlsb_list)
-
-    ### does the filename mention quota share?
-    qs_list = 'quota qs'.split()        ## list of keywords
-    df1['is_qs'] = parse_filename_test(df1.file, qs_list)
-
-    ### retro?
-    retro_list = ['retro']
-    df1['is_retro'] = parse_filename_test(df1.file, retro_list)
-
-    ### surplus share
-    ss_list = [' ss']
-    df1['is_surplus_share'] = parse_filename_test(df1.file, ss_list)
-
-    ### does the filename mention catastrophes?
-    cat_list = 'cat catastrophe'.split()
-    df1['is_cat'] = parse_filename_test(df1.file, cat_list)
-
-    ### does the filename mention property?
-    prop_list = 'prop property'.split()
-    df1['is_property'] = parse_filename_test(df1.file, prop_list)
-
-    ### does the filename mention WC?
-    wc_list = ['wc', 'work comp', 'workers comp', 'workers compensation']
-    df1['is_wc'] = parse_filename_test(df1.file, wc_list)
-
-    ### does the filename mention xol?
-    xol_list = ['xol']
-    df1['is_xol'] = parse_filename_test(df1.file, xol_list)
-
-    ### per policy
-    per_policy_list=['per policy']
-    df1['is_per_policy'] = parse_filename_test(df1.file, per_policy_list)
-
-    ### per risk
-    per_risk_list=['per risk', 'ppr']
-    df1['is_per_risk'] = parse_filename_test(df1.file, per_risk_list)
-
-    ### aggregate
-    agg_list=['agg']
-    df1['is_agg'] = parse_filename_test(df1.file, agg_list)
-
-    ### fannie/freddie
-    fannie_freddie_list=['fannie', 'freddie']
-    df1['is_fannie_freddie'] = parse_filename_test(df1.file, fannie_freddie_list)
-
-    ### cirt
-    cirt_list=['cirt']
-    df1['is_cirt'] = parse_filename_test(df1.file, cirt_list)
-
-    ### create files df that holds filenames
-    files = df1.loc[df1.is_xlsb, :]['top_level_folder folder file'.split()]
-    files['filepath'] = files.apply(lambda x: '{}\\{}'.format(x[0], x[1]), axis=1)
-    files['filename'] = files.apply(lambda x: '{}\\{}\\{}'.format(x[0], x[1], x[2]), axis=1)
-
-    ### read in uobg lookup df
-    uobg_lookup = get_uobg_lookup()
-
-    ### run process 
-    d = all_files(files.filename.tolist())
-
-    ### output table
-    n = datetime.now()
-    yr, mth, d, h, m, s = n.year, n.month, n.day, n.hour, n.minute, n.second
-
-    ts = '{}_{}_{}_{}_{}_{}'.format(yr,
-                                    ('0' if mth < 10 else '') + str(mth),
-                                    ('0' if d < 10 else '') + str(d),
-                                    ('0' if h < 10 else '') + str(h),
-                                    ('0' if m < 10 else '') + str(m),
-                                    ('0' if s < 10 else '') + str(s))
-    d['df'].to_excel('./ds_data_{}.xlsx'.format(ts))
-    
-main()
\ No newline at end of file
+import pandas as pd
+import numpy as np
+import pyxlsb
+import zipfile
+import mmap
+import struct
+import zlib
+import posixpath
+import xml.etree.ElementTree as ET
+import os
+import re
+import time
+import csv
+import shutil
+import hashlib
+import inspect
+import threading
+import concurrent.futures
+
+from datetime import datetime, timedelta
+from collections import namedtuple
+from pyxlsb import biff12
+
+import sys
+
+# add the location of these scripts to the path so they can be imported
+sys.path.append(r'O:\PARM\Corporate Actuarial\Reserving\Scripts\python')
+sys.path.append('./')
+
+# this is a script that contains functions to get user inputs
+# this section is grabbing those inputs
+import user_inputs as i
+folder = i.get_folder()
+show_every=i.get_show_every()
+crawl_workers=i.get_crawl_workers()
+catalog_file=i.get_catalog_file()
+crawl_rules=i.get_crawl_rules()
+store=i.get_store()
+parse_all_versions=i.get_parse_all_versions()
+parse_workers=i.get_parse_workers()
+parse_timeout=i.get_parse_timeout()
+parse_cache=i.get_parse_cache()
+checkpoint=i.get_checkpoint()
+failures_file=i.get_failures_file()
+output=i.get_output()
+files_per_group=i.get_files_per_group()
+
+### given folder, list it once, returning its files and subfolders
+def scan_folder(folder : str = None) -> tuple:
+    """
+    # Description
+        Given a folder, list it once with `os.scandir`, returning the files
+        (with size and modified time) and the subfolders. The file/folder type
+        comes from the cached `DirEntry` info, so there is no extra network
+        round-trip per entry
+    # Inputs
+        folder: string, the folder to search
+    # Outputs
+        files: list, (file name, size in bytes, mtime in ns) for each file in the folder
+        subfolders: list, the full paths of the subfolders
+    # Imports
+        import os
+    # Example
+        >>> # assume there is a folder called "test" in the current directory
+        >>> # with a file called "test1.txt" and a subfolder called "subtest1"
+        >>> scan_folder(folder='test')
+        ([('test1.txt', 1024, 1660000000000000000)], ['test\\subtest1'])
+    """
+    # initialize the output lists
+    files, subfolders = [], []
+
+    # list the folder a single time
+    with os.scandir(folder) as it:
+        for entry in it:
+
+            # `is_dir` uses the type returned with the listing,
+            # and does not follow links (so there are no cycles)
+            if entry.is_dir(follow_symlinks=False):
+                subfolders.append(entry.path)
+            else:
+                # on windows `stat` is also returned with the listing
+                st = entry.stat(follow_symlinks=False)
+                files.append((entry.name, st.st_size, st.st_mtime_ns))
+
+    return(files, subfolders)
+
+### given include/exclude rules, return functions that test folder and file names
+def compile_rules(rules : dict = None) -> tuple:
+    """
+    # Description
+        Given a set of include/exclude rules, return two functions that test
+        a folder name and a file name, so that the rules can be applied while
+        the tree is crawled. All tests ignore case
+    # Inputs
+        rules: dict, with any of these keys (missing keys are not checked)
+            exclude_folders: list, skip folders whose name contains any of these
+            extensions: list, only keep files with one of these extensions
+            include_files: list, only keep files whose name contains all of these
+            exclude_files: list, skip files whose name contains any of these
+            default: None (keep everything)
+    # Outputs
+        keep_folder: function, folder name -> True if the folder should be crawled
+        keep_file: function, file name -> True if the file should be kept
+    # Example
+        >>> keep_folder, keep_file = compile_rules(dict(exclude_folders=['template'], extensions=['.xlsb']))
+        >>> keep_folder('Templates'), keep_file('Deal Summary.xlsb'), keep_file('Deal Summary.pdf')
+        (False, True, False)
+    """
+    if rules is None:
+        rules = {}
+
+    # lower case once, up front
+    exclude_folders = [x.lower() for x in rules.get('exclude_folders', [])]
+    extensions = set(x.lower() for x in rules.get('extensions', []))
+    include_files = [x.lower() for x in rules.get('include_files', [])]
+    exclude_files = [x.lower() for x in rules.get('exclude_files', [])]
+
+    def keep_folder(name):
+        name = name.lower()
+        return(not any(x in name for x in exclude_folders))
+
+    def keep_file(name):
+        name = name.lower()
+        return((not extensions or os.path.splitext(name)[1] in extensions)
+               and all(x in name for x in include_files)
+               and not any(x in name for x in exclude_files))
+
+    return(keep_folder, keep_file)
+
+### given folder, list it and all of its subfolders, optionally in parallel
+def crawl_folders(folder : str = None, max_workers : int = None, catalog : dict = None, rules : dict = None) -> dict:
+    """
+    # Description
+        Given a folder, list it and every folder below it with `scan_folder`.
+        If `max_workers` is given, the folders are listed concurrently by a
+        bounded thread pool: each listing that finishes puts its subfolders
+        on the pool's shared work queue, and whichever thread is free picks
+        up the next folder, so the network waits overlap and the crawl time
+        depends on the number of folders rather than the depth of the tree.
+        Folders that cannot be read are reported and treated as empty
+
+        If a `catalog` from an earlier crawl is given, a folder whose modified
+        time has not changed is not listed again, and its entry in the catalog
+        is reused (its subfolders are still checked). Adding, removing or
+        renaming a file changes the folder's modified time, and so does saving
+        a workbook from Excel (which writes a new file and renames it)
+
+        Subfolders excluded by the `rules` (see `compile_rules`) are never listed
+    # Inputs
+        folder: string, the folder to search
+                default: None
+        max_workers: int, the number of folders to list at once
+                default: None (list one folder at a time)
+        catalog: dict, the output of an earlier crawl (see `load_catalog`)
+                default: None (list every folder)
+        rules: dict, include/exclude rules (see `compile_rules`)
+                default: None (crawl every folder)
+    # Outputs
+        listing: dict, {folder path: (files, subfolders, folder mtime in ns)},
+                 with files and subfolders as returned by `scan_folder`
+    # Imports
+        import os
+        import concurrent.futures
+    # Example
+        >>> # same folder as `get_all_files`
+        >>> crawl_folders(folder='test', max_workers=16)
+        {'test': ([('test1.txt', 10, ...), ('test2.txt', 10, ...)], ['test\\test_sub'], ...),
+         'test\\test_sub': ([('test_sub1.txt', 10, ...), ('test_sub2.txt', 10, ...)], [], ...)}
+    """
+    if catalog is None:
+        catalog = {}
+    keep_folder, _ = compile_rules(rules)
+
+    # subfolders to crawl, pruning the excluded ones
+    def crawl_subfolders(fold):
+        return([sub for sub in listing[fold][1] if keep_folder(os.path.basename(sub))])
+
+    # list one folder, treating unreadable folders as empty
+    # and reusing the catalog entry if the folder has not changed
+    def scan(fold):
+        try:
+            dir_mtime = os.stat(fold).st_mtime_ns
+            if fold in catalog and catalog[fold][2] == dir_mtime:
+                return(catalog[fold])
+            files, subfolders = scan_folder(fold)
+            return(files, subfolders, dir_mtime)
+        except OSError as e:
+            print('unable to read {} ({})'.format(fold, e))
+            return([], [], None)
+
+    listing = {}
+
+    # sequential crawl
+    if max_workers is None:
+        to_scan = [folder]
+        while to_scan:
+            fold = to_scan.pop()
+            listing[fold] = scan(fold)
+            to_scan.extend(crawl_subfolders(fold))
+        return(listing)
+
+    # parallel crawl: keep submitting subfolders until no listings are pending
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {executor.submit(scan, folder): folder}
+        while pending:
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                fold = pending.pop(future)
+                listing[fold] = future.result()
+                for sub in crawl_subfolders(fold):
+                    pending[executor.submit(scan, sub)] = sub
+
+    return(listing)
+
+### given folder, return all the files in that folder, as well as in subfolders
+def get_all_files(folder : str = None, max_workers : int = None, catalog : dict = None, rules : dict = None) -> pd.DataFrame:
+    """
+    # Description
+        Given a folder, return all the files in that folder, as well as in subfolders,
+        in a single pass over the tree. Each folder is listed exactly once
+        (see `crawl_folders`), and the output is in the same order whether or
+        not the folders are listed in parallel
+    # Inputs
+        folder: string, the folder to search
+                default: None
+        max_workers: int, the number of folders to list at once
+                default: None (list one folder at a time)
+        catalog: dict, the output of an earlier crawl, to skip unchanged folders
+                default: None (list every folder)
+        rules: dict, include/exclude rules applied while crawling (see `compile_rules`)
+                default: None (keep every file)
+    # Outputs
+        out: pandas DataFrame, the files in the folder, as well as in subfolders,
+             with their size (bytes) and modified time
+    # Imports
+        import pandas as pd
+        import os
+    # Example
+        >>> # assume there is a folder called "test" in the current directory
+        >>> # with files called "test1.txt" and "test2.txt"
+        >>> # assume there is a subfolder called "test_sub" in the folder "test"
+        >>> # with files called "test_sub1.txt" and "test_sub2.txt"
+        >>> get_all_files(folder='test')
+          top_level_folder    folder           file  size               mtime
+        0             test                test1.txt    10 2022-07-27 10:00:00
+        1             test                test2.txt    10 2022-07-27 10:00:00
+        2             test  test_sub  test_sub1.txt    10 2022-07-27 10:00:00
+        3             test  test_sub  test_sub2.txt    10 2022-07-27 10:00:00
+    """
+    # list every folder
+    listing = crawl_folders(folder, max_workers, catalog, rules)
+
+    # return the dataframe
+    return(listing_to_df(folder, listing, rules))
+
+### given the output of `crawl_folders`, return the files as a dataframe
+def listing_to_df(folder : str = None, listing : dict = None, rules : dict = None) -> pd.DataFrame:
+    """
+    # Description
+        Given the output of `crawl_folders`, return the files as a dataframe
+        (see `get_all_files`)
+    # Inputs
+        folder: string, the top level folder that was crawled
+        listing: dict, the output of `crawl_folders`
+        rules: dict, include/exclude rules (see `compile_rules`), the same
+               ones that were used for the crawl
+                default: None (keep every file)
+    # Outputs
+        out: pandas DataFrame, the files in the folder, as well as in subfolders,
+             with their size (bytes) and modified time
+    # Imports
+        import pandas as pd
+        import os
+    """
+    keep_folder, keep_file = compile_rules(rules)
+
+    # one record per file, depth first with the subfolders in name order,
+    # so the output order is stable
+    out_list = []
+    to_visit = [folder]
+    while to_visit:
+        fold = to_visit.pop()
+        files, subfolders, _ = listing[fold]
+
+        # folder relative to the top level folder ('' for the top level itself)
+        rel = os.path.relpath(fold, folder)
+        rel = '' if rel == '.' else rel
+        out_list.extend((folder, rel, name, size, mtime) for name, size, mtime in files if keep_file(name))
+
+        to_visit.extend(sorted((sub for sub in subfolders if keep_folder(os.path.basename(sub))), reverse=True))
+
+    # build the dataframe in one step
+    out = pd.DataFrame(out_list, columns='top_level_folder folder file size mtime'.split())
+    out['mtime'] = pd.to_datetime(out['mtime'], unit='ns')
+
+    # return the dataframe
+    return(out)
+    
+### full paths of the files in a listing dataframe
+def file_paths(df : pd.DataFrame = None) -> tuple:
+    """
+    # Description
+        Given files as returned by `get_all_files`, return the folder and the
+        full path of each file, the same as `os.path.join` gives for each row,
+        but built a whole column at a time
+    # Inputs
+        df: pandas DataFrame, with top_level_folder, folder and file columns
+    # Outputs
+        filepath: pandas Series, os.path.join(top_level_folder, folder)
+        filename: pandas Series, os.path.join(top_level_folder, folder, file)
+    # Imports
+        import pandas as pd
+        import os
+    # Example
+        >>> df = pd.DataFrame(dict(top_level_folder=['test', 'test'], folder=['', 'test_sub'],
+        ...                        file=['test1.txt', 'test_sub1.txt']))
+        >>> file_paths(df)[1].tolist()
+        ['test\\test1.txt', 'test\\test_sub\\test_sub1.txt']
+    """
+    # `os.path.join` only adds a separator where there is not one already
+    top = df.top_level_folder.where(df.top_level_folder.str.endswith(os.sep), df.top_level_folder + os.sep)
+    filepath = top + df.folder
+
+    # files in the top level folder have folder '', so filepath already ends in a separator
+    filename = filepath.where(df.folder.eq(''), filepath + os.sep) + df.file
+    return(filepath, filename)
+
+### read the file catalog saved by the last crawl
+def load_catalog(file : str = None, rules : dict = None) -> dict:
+    """
+    # Description
+        Read the file catalog saved by `save_catalog`. If there is no saved
+        catalog yet, or it was crawled with different include/exclude rules,
+        return an empty one (so every folder will be listed)
+    # Inputs
+        file: string, the catalog file
+        rules: dict, the include/exclude rules for this crawl (see `compile_rules`)
+                default: None (keep every file)
+    # Outputs
+        catalog: dict, the output of `crawl_folders`
+    # Imports
+        import pandas as pd
+        import os
+    # Example
+        >>> catalog = load_catalog('./deal_sheet_catalog.pkl', dict(exclude_folders=['template']))
+    """
+    if file is None or not os.path.exists(file):
+        return({})
+    saved = pd.read_pickle(file)
+
+    # a catalog from before the rules were saved with it, or from other rules,
+    # does not say which files the last crawl kept
+    if set(saved) != {'rules', 'listing'} or saved['rules'] != rules:
+        return({})
+    return(saved['listing'])
+
+### save the file catalog for the next crawl
+def save_catalog(catalog : dict = None, file : str = None, rules : dict = None) -> None:
+    """
+    # Description
+        Save the file catalog (the output of `crawl_folders`) and the rules it
+        was crawled with, so that the next crawl can skip the folders that
+        have not changed
+    # Inputs
+        catalog: dict, the output of `crawl_folders`
+        file: string, the catalog file
+        rules: dict, the include/exclude rules used for the crawl (see `compile_rules`)
+                default: None (keep every file)
+    # Outputs
+        None
+    # Imports
+        import pandas as pd
+    # Example
+        >>> save_catalog(crawl_folders('test'), './deal_sheet_catalog.pkl')
+    """
+    pd.to_pickle(dict(rules=rules, listing=catalog), file)
+
+### re-crawl the folder, only listing the folders that changed since the last crawl
+def refresh_catalog(folder : str = None, file : str = None, max_workers : int = None, rules : dict = None) -> tuple:
+    """
+    # Description
+        Re-crawl the folder using the catalog saved by the last crawl (see
+        `crawl_folders`), save the new catalog, and report the files that are
+        new or modified since the last crawl. If the rules changed since the
+        last crawl, every folder is listed again and every file is reported
+        as new (the files the old rules skipped have never been parsed)
+    # Inputs
+        folder: string, the folder to search
+        file: string, the catalog file
+        max_workers: int, the number of folders to list at once
+                default: None (list one folder at a time)
+        rules: dict, include/exclude rules applied while crawling (see `compile_rules`)
+                default: None (keep every file)
+    # Outputs
+        out: pandas DataFrame, all the files (same as `get_all_files`)
+        changed: pandas DataFrame, the rows of `out` that are new or modified,
+                 with a `status` column ('new' or 'modified')
+    # Imports
+        import pandas as pd
+    # Example
+        >>> df, changed = refresh_catalog('test', './deal_sheet_catalog.pkl')
+        >>> changed
+          top_level_folder folder       file  size               mtime  status
+        0             test         test3.txt    10 2022-08-01 09:00:00     new
+    """
+    # files as of the last crawl
+    catalog = load_catalog(file, rules)
+    old = listing_to_df(folder, catalog if folder in catalog else {folder: ([], [], None)}, rules)
+
+    # re-crawl, listing only the folders that changed
+    listing = crawl_folders(folder, max_workers, catalog, rules)
+    save_catalog(listing, file, rules)
+    out = listing_to_df(folder, listing, rules)
+
+    # compare with the last crawl
+    keys = 'folder file'.split()
+    changed = out.merge(old[keys + 'size mtime'.split()], how='left', on=keys, suffixes=('', '_old'), indicator=True)
+    changed['status'] = np.select(
+        [changed['_merge'].eq('left_only'),
+         changed['size'].ne(changed['size_old']) | changed['mtime'].ne(changed['mtime_old'])],
+        ['new', 'modified'], '')
+    changed = changed.loc[changed.status.ne(''), out.columns.tolist() + ['status']].reset_index(drop=True)
+
+    print('{} files found, {} new or modified since the last crawl'.format(out.shape[0], changed.shape[0]))
+
+    return(out, changed)
+    
+### keywords in the filename that give clues re: what type of contract
+### each category is True if the (lower case) filename contains any of its keywords
+filename_categories = {
+    'is_final': ['final'],
+    'is_cas': ['cas'],
+    'is_xlsb': ['.xlsb'],
+    'is_xlsx': ['.xlsx'],
+    'is_xlsm': ['.xlsm'],
+    'is_qs': ['quota', 'qs'],
+    'is_retro': ['retro'],
+    'is_surplus_share': [' ss'],
+    'is_cat': ['cat', 'catastrophe'],
+    'is_property': ['prop', 'property'],
+    'is_wc': ['wc', 'work comp', 'workers comp', 'workers compensation'],
+    'is_xol': ['xol'],
+    'is_per_policy': ['per policy'],
+    'is_per_risk': ['per risk', 'ppr'],
+    'is_agg': ['agg'],
+    'is_fannie_freddie': ['fannie', 'freddie'],
+    'is_cirt': ['cirt'],
+}
+
+### given a list of keywords, return one regular expression that matches any of them
+def keyword_regex(keywords : list = None) -> str:
+    """
+    # Description
+        Given a list of keywords, return a regular expression that matches any
+        of them, with the keywords merged into a tree on their shared prefixes
+        (eg 'cat' and 'cirt' become 'c(?:at|irt)'), so that the regex engine
+        checks each character once instead of trying every keyword in turn.
+        At any position it matches the longest keyword that fits
+    # Inputs
+        keywords: list, the keywords
+            default: None
+    # Outputs
+        out: string, the regular expression
+    # Imports
+        import re
+    # Example
+        >>> keyword_regex(['cat', 'catastrophe', 'cirt'])
+        'c(?:at(?:astrophe)?|irt)'
+    """
+    # build the prefix tree, '' marks the end of a keyword
+    tree = {}
+    for k in keywords:
+        node = tree
+        for ch in k:
+            node = node.setdefault(ch, {})
+        node[''] = True
+
+    # turn a node of the tree into a regex
+    def to_regex(node):
+        alts = [re.escape(ch) + to_regex(child) for ch, child in sorted(node.items()) if ch != '']
+        if len(alts) == 0:
+            return('')
+        out = alts[0] if len(alts) == 1 else '(?:{})'.format('|'.join(alts))
+        # a keyword can end here, so the rest is optional
+        # (greedy, so the longest keyword is matched)
+        return('(?:{})?'.format(out) if '' in node else out)
+
+    return(to_regex(tree))
+
+### test filenames to find patterns for clues re: what type of contract
+def classify_filenames(x : pd.Series = None, categories : dict = None, packed : bool = False) -> pd.DataFrame:
+    """
+    # Description
+        Given a series of filenames, return a column for each category in
+        `categories`, where the value is True if the filename contains any of
+        the category's keywords (ignoring case), and False otherwise.
+
+        All the keywords are compiled into one regular expression (see
+        `keyword_regex`), and each distinct filename is lower cased and
+        scanned once, no matter how many categories there are. At each
+        position the longest keyword is matched, and it also counts for any
+        keywords that are its prefix (eg 'catastrophe' also counts as 'cat'),
+        so the result is the same as testing each keyword on its own
+    # Inputs
+        x: pandas Series, the filenames
+            default: None
+        categories: dict, {column name: list of keywords}
+            default: None (use `filename_categories`)
+        packed: bool, if True return the flags packed into one integer per
+                filename (bit i is the i-th category) instead of a column each
+            default: False
+    # Outputs
+        out: pandas DataFrame, a boolean column for each category
+             (or, if `packed` is True, a pandas Series of integer bitmasks)
+    # Imports
+        import pandas as pd
+        import numpy as np
+        import re
+    # Example
+        >>> classify_filenames(pd.Series(['XOL Deal Summary FINAL.xlsb']))[['is_final', 'is_xlsb', 'is_xol', 'is_qs']]
+           is_final  is_xlsb  is_xol  is_qs
+        0      True     True    True  False
+    """
+    if categories is None:
+        categories = filename_categories
+    names = list(categories.keys())
+
+    # bit for each keyword: its own categories, plus the categories of
+    # any keyword that is a prefix of it (those match at the same place)
+    keywords = sorted(set(k.lower() for v in categories.values() for k in v))
+    bits = {k: 0 for k in keywords}
+    for j, c in enumerate(names):
+        for k in categories[c]:
+            for kw in keywords:
+                if kw.startswith(k.lower()):
+                    bits[kw] |= 1 << j
+
+    # one pattern for every keyword, inside a lookahead so that
+    # overlapping keywords are all found
+    pattern = re.compile('(?=({}))'.format(keyword_regex(keywords)))
+
+    # scan each distinct filename once
+    # (lower cased a whole column at a time, before the names are deduplicated)
+    def scan(f):
+        mask = 0
+        for k in pattern.findall(f):
+            mask |= bits[k]
+        return(mask)
+
+    codes, uniques = pd.factorize(x.astype(str).str.lower())
+    mask = np.fromiter((scan(f) for f in uniques), dtype=np.int64, count=len(uniques))[codes]
+
+    if packed:
+        return(pd.Series(mask, index=x.index))
+
+    # unpack the bits into a boolean column per category
+    block = (mask[:, None] >> np.arange(len(names))) & 1
+    return(pd.DataFrame(block.astype(bool), index=x.index, columns=names))
+
+### words in a filename that mark a version of a deal sheet rather than a different contract
+### (`(?<![a-z0-9])` and `(?![a-z0-9])` are word boundaries that, unlike `\b`, also
+### split words on underscores, eg 'deal summary_7_27_22'; dates come before
+### version numbers so 'v3_7_27_22' loses the whole date)
+version_patterns = [
+    r'\.xls[xmb]?$',                                                       # extension
+    r'(?<![a-z0-9])copy([\s_]+of)?(?![a-z0-9])', r'\(\d+\)',               # windows copies
+    r'(?<![a-z0-9])(final|draft|updated?|revised|old|new|latest|clean)(?![a-z0-9])',
+    r'(?<![a-z0-9])\d{1,2}[._\-]\d{1,2}[._\-]\d{2,4}(?![a-z0-9])',          # dates like 7.27.22
+    r'(?<![a-z0-9])(19|20)\d{2}[01]\d[0-3]\d(?![a-z0-9])',                  # dates like 20220727
+    r'(?<![a-z0-9])(v|ver|version|rev)[\s_]*\d+([._]\d+)?(?![a-z0-9])',    # v2, version 3, rev1, v1.2
+]
+
+### given filenames, remove the words that only mark a version
+def normalize_filename(x : pd.Series = None) -> pd.Series:
+    """
+    # Description
+        Given a series of filenames, return the filenames with the words that
+        only mark a version of the deal sheet (final, draft, v2, copy, dates,
+        ... see `version_patterns`) removed, lower cased and with the
+        punctuation collapsed, so that versions of the same contract compare
+        equal. Years (eg 2022) and contract type words (xol, qs, cat, ...) are
+        kept, since they tell contracts apart
+    # Inputs
+        x: pandas Series, the filenames
+    # Outputs
+        out: pandas Series, the normalized filenames
+    # Imports
+        import pandas as pd
+    # Example
+        >>> normalize_filename(pd.Series(['2022 Cat XOL Deal Summary v3 FINAL.xlsb', 'Copy of 2022 Cat XOL Deal Summary_7.27.22.xlsb',
+        ...                               '2022 Cat XOL Deal Summary_7_27_22.xlsb']))
+        0    2022 cat xol deal summary
+        1    2022 cat xol deal summary
+        2    2022 cat xol deal summary
+        dtype: object
+    """
+    # the version words are removed before the punctuation is collapsed,
+    # so dates like 7_27_22 are still in one piece
+    out = x.str.lower()
+    for p in version_patterns:
+        out = out.str.replace(p, ' ', regex=True)
+
+    # collapse everything that is not a letter or number (underscores too)
+    return(out.str.replace(r'[^a-z0-9]+', ' ', regex=True).str.strip())
+
+### keep only the newest version of each deal sheet
+def select_latest_versions(df : pd.DataFrame = None, all_versions : bool = False) -> pd.DataFrame:
+    """
+    # Description
+        Given the deal sheet files (from `get_all_files`), group the files that
+        are versions of the same contract (same folder and same filename once
+        the version words are removed, see `normalize_filename`), and rank the
+        versions in each group by modified time (newest first), then by
+        filename. Only the newest version of each contract is kept, unless
+        `all_versions` is True
+    # Inputs
+        df: pandas DataFrame, the files, with folder, file and mtime columns
+        all_versions: bool, if True keep every version (with its rank)
+            default: False
+    # Outputs
+        out: pandas DataFrame, `df` with `version_group` (the normalized filename)
+             and `version_rank` (1 = newest) columns
+    # Imports
+        import pandas as pd
+    # Example
+        >>> select_latest_versions(df)[['folder', 'file', 'version_rank']]
+                folder                                  file  version_rank
+        0  Client A\\2022  2022 Cat XOL Deal Summary FINAL.xlsb             1
+    """
+    out = df.assign(version_group=normalize_filename(df.file))
+
+    # newest first, with the filename breaking ties (so 'v3' beats 'v2')
+    out = out.sort_values('folder version_group mtime file'.split(), ascending=[True, True, False, False])
+    out['version_rank'] = out.groupby('folder version_group'.split(), sort=False).cumcount() + 1
+
+    if not all_versions:
+        n = out.shape[0]
+        out = out.loc[out.version_rank.eq(1)]
+        print('{} files, keeping the newest version of each ({} files)'.format(n, out.shape[0]))
+
+    # back in the original order
+    return(out.sort_index())
+    
+### the parsers stop at the "Deposit Prem Schedule" row, so nothing after it needs to be read
+def last_needed_row(row : list = None) -> bool:
+    """
+    # Description
+        Given a row (as returned by `iter_page`), return True if it is the last row
+        of the Contract Summary that the parsers need, i.e. the "Deposit Prem Schedule"
+        marker that ends the "Subject Business UOBG" section
+    # Inputs
+        row:  list, the values in the row
+            default: None
+    # Outputs
+        out: bool, True if no rows after this one need to be read
+    # Example
+        >>> last_needed_row(['Deposit Prem Schedule'])
+        True
+        >>> last_needed_row(['Summary Economics'])
+        False
+    """
+    return(len(row) > 0 and row[0] == 'Deposit Prem Schedule')
+
+### given a sheet, yield its rows one at a time, stopping once the last needed row is read
+def iter_page(sht : pyxlsb.Worksheet = None, max_columns : int = 32, stop = last_needed_row):
+    """
+    # Description
+        Given a sheet, yield each row in the sheet as a list of the (non-empty) cell values.
+        Only the first `max_columns - 1` columns are read, and reading stops after the
+        first row for which `stop(row)` is True (that row is still yielded). Blank rows
+        that are not stored in the sheet are not yielded.
+    # Inputs
+        sht:  pyxlsb.Worksheet, the sheet
+            default: None
+        max_columns: int, the column bound (cells from column `max_columns - 1` on are skipped)
+            default: 32
+        stop: function, given a row returns True if no later rows are needed
+            (None reads the whole sheet)
+            default: last_needed_row
+    # Outputs
+        row: list, the values in one row of the sheet
+    # Imports
+        import pyxlsb
+    """
+    # cells past the bound are sliced off without being looked at
+    n_columns = max(max_columns - 1, 0)
+
+    # sparse=True so the rows that are not stored in the sheet are skipped, rather than
+    # being padded out with empty cells
+    for r in sht.rows(sparse=True):
+        row = [cell.v for cell in r[:n_columns] if cell.v is not None]
+        yield row
+
+        # once the last needed section has been read, stop decoding the sheet
+        if stop is not None and stop(row):
+            break
+
+def get_page(sht : pyxlsb.Worksheet = None, max_columns : int = 32, stop = last_needed_row) -> list:
+    """
+    # Description
+        Given a sheet, return a list of lists, where each list is a row in the sheet
+        (see `iter_page`)
+    # Inputs
+        sht:  pyxlsb.Worksheet, the sheet
+            default: None
+        max_columns: int, the column bound (cells from column `max_columns - 1` on are skipped)
+            default: 32
+        stop: function, given a row returns True if no later rows are needed
+            (None reads the whole sheet)
+            default: last_needed_row
+    # Outputs
+        page: list, a list of lists, where each list is a row in the sheet
+    # Imports
+        import pyxlsb
+    """
+    return(list(iter_page(sht, max_columns=max_columns, stop=stop)))
+    
+### the namespaces of the parts of .xlsx/.xlsm (OOXML) workbooks
+ooxml_ns = dict(main='{http://schemas.openxmlformats.org/spreadsheetml/2006/main}',
+                rel='{http://schemas.openxmlformats.org/officeDocument/2006/relationships}',
+                pkg='{http://schemas.openxmlformats.org/package/2006/relationships}')
+
+### error cells are saved as text in OOXML worksheets, but pyxlsb returns the error code
+### (as a hex string, eg '0x7' for #DIV/0!), so the text is swapped for the code
+ooxml_errors = {'#NULL!': '0x0', '#DIV/0!': '0x7', '#VALUE!': '0xf', '#REF!': '0x17',
+                '#NAME?': '0x1d', '#NUM!': '0x24', '#N/A': '0x2a', '#GETTING_DATA': '0x2b'}
+
+### given a workbook part (inside the zip), return where each of its relationships points
+def part_rels(zf : zipfile.ZipFile = None, part : str = 'xl/workbook.xml') -> dict:
+    """
+    # Description
+        Given an open .xlsx/.xlsm/.xlsb zip file and one of the parts in it, read the
+        part's relationships (`_rels/<part>.rels`), and return the part each relationship
+        id points to, as a path inside the zip
+    # Inputs
+        zf: zipfile.ZipFile, the open workbook
+            default: None
+        part: str, the part whose relationships are read
+            default: 'xl/workbook.xml'
+    # Outputs
+        out: dict, {relationship id: path of the part inside the zip}
+    # Imports
+        import zipfile
+        import posixpath
+        import xml.etree.ElementTree as ET
+    # Example
+        >>> part_rels(zipfile.ZipFile('test\\\\deal summary.xlsx'))['rId1']
+        'xl/worksheets/sheet1.xml'
+    """
+    folder, name = posixpath.split(part)
+    with zf.open(posixpath.join(folder, '_rels', name + '.rels')) as f:
+        root = ET.parse(f).getroot()
+
+    # targets are relative to the part's folder, unless they start with '/'
+    out = {}
+    for el in root.iter(ooxml_ns['pkg'] + 'Relationship'):
+        target = el.get('Target')
+        if target.startswith('/'):
+            out[el.get('Id')] = target[1:]
+        else:
+            out[el.get('Id')] = posixpath.normpath(posixpath.join(folder, target))
+    return(out)
+
+### find the worksheet part of a sheet of an .xlsx/.xlsm workbook
+def ooxml_sheet_part(zf : zipfile.ZipFile = None, name : str = None) -> str:
+    """
+    # Description
+        Given an open .xlsx/.xlsm zip file and a sheet name, return the path (inside the
+        zip) of the part that holds the sheet. Like pyxlsb, the name is matched ignoring case
+    # Inputs
+        zf: zipfile.ZipFile, the open workbook
+            default: None
+        name: str, the sheet name
+            default: None
+    # Outputs
+        out: str, the path of the worksheet part
+    # Imports
+        import zipfile
+        import xml.etree.ElementTree as ET
+    # Example
+        >>> ooxml_sheet_part(zipfile.ZipFile('test\\\\deal summary.xlsx'), 'Contract Summary')
+        'xl/worksheets/sheet2.xml'
+    """
+    with zf.open('xl/workbook.xml') as f:
+        root = ET.parse(f).getroot()
+
+    for el in root.iter(ooxml_ns['main'] + 'sheet'):
+        if el.get('name', '').lower() == name.lower():
+            return(part_rels(zf, 'xl/workbook.xml')[el.get(ooxml_ns['rel'] + 'id')])
+
+    raise ValueError('there is no sheet named {}'.format(name))
+
+### given a string item (<si> or <is>), return its text
+def ooxml_text(el : ET.Element = None) -> str:
+    """
+    # Description
+        Given a string item from an OOXML workbook (a shared string <si>, or the <is> of
+        an inline string), return its text: the plain <t>, or the <t> of each rich text
+        run joined together (the phonetic hints are left out). Characters that were
+        escaped as _xHHHH_ (eg line breaks) are put back
+    # Inputs
+        el: xml.etree.ElementTree.Element, the string item
+            default: None
+    # Outputs
+        out: str, the text
+    # Imports
+        import re
+        import xml.etree.ElementTree as ET
+    """
+    t = el.find(ooxml_ns['main'] + 't')
+    if t is not None:
+        out = t.text or ''
+    else:
+        out = ''.join(r.findtext(ooxml_ns['main'] + 't', '') for r in el.iterfind(ooxml_ns['main'] + 'r'))
+
+    if '_x' in out:
+        out = re.sub('_x([0-9A-Fa-f]{4})_', lambda m: chr(int(m.group(1), 16)), out)
+    return(out)
+
+### read the shared strings of an .xlsx/.xlsm workbook a little at a time
+def new_shared_strings(zf : zipfile.ZipFile = None, part : str = None) -> dict:
+    """
+    # Description
+        Given an open .xlsx/.xlsm/.xlsb zip file and its shared strings part, return an
+        empty table of shared strings. Nothing is read yet: `shared_string` reads the part
+        only as far as the highest string asked for, so a sheet that uses the first few
+        hundred strings does not pay for the whole (workbook wide) table
+    # Inputs
+        zf: zipfile.ZipFile, the open workbook
+            default: None
+        part: str, the path of the shared strings part (None if the workbook has none)
+            default: None
+    # Outputs
+        strings: dict, with keys
+            strings: list, the strings read so far
+            items: generator of the strings not read yet (None if there are none), which
+                keeps the part open until it is read to the end or closed
+    # Imports
+        import zipfile
+        import xml.etree.ElementTree as ET
+        from pyxlsb import biff12
+    """
+    def items():
+        with zf.open(part) as f:
+            # .xlsb keeps them as records (a byte of flags, then the string)
+            if part.endswith('.bin'):
+                for recid, data in xlsb_records(iter(lambda: f.read(1 << 16), b'')):
+                    if recid == biff12.SI:
+                        yield(xlsb_string(data, 1)[0])
+                return
+
+            for _, el in ET.iterparse(f):
+                if el.tag == ooxml_ns['main'] + 'si':
+                    yield(ooxml_text(el))
+                    # the string is kept, so the element can be emptied
+                    el.clear()
+
+    return(dict(strings=[], items=items() if part is not None else None))
+
+### look up a shared string by its index
+def shared_string(strings : dict = None, idx : int = None) -> str:
+    """
+    # Description
+        Given the shared strings (from `new_shared_strings`) and an index, return the
+        string, reading more of the shared strings part first if it has not got that far
+    # Inputs
+        strings: dict, the shared strings
+            default: None
+        idx: int, the index of the string
+            default: None
+    # Outputs
+        out: str, the string
+    """
+    out = strings['strings']
+    while len(out) <= idx:
+        s = next(strings['items'], None) if strings['items'] is not None else None
+        if s is None:
+            raise IndexError('shared string {} not found ({} strings in the workbook)'.format(idx, len(out)))
+        out.append(s)
+    return(out[idx])
+
+### open a sheet of an .xlsx/.xlsm workbook (like pyxlsb's `Workbook.get_sheet`)
+def get_ooxml_sheet(zf : zipfile.ZipFile = None, name : str = None) -> dict:
+    """
+    # Description
+        Given an open .xlsx/.xlsm zip file and a sheet name, return what `iter_ooxml_page`
+        needs to read the sheet: the zip, the worksheet part and the (lazily read) shared strings
+    # Inputs
+        zf: zipfile.ZipFile, the open workbook
+            default: None
+        name: str, the sheet name
+            default: None
+    # Outputs
+        sht: dict, with keys zip, part and strings
+    # Imports
+        import zipfile
+    # Example
+        >>> sht = get_ooxml_sheet(zipfile.ZipFile('test\\\\deal summary.xlsx'), 'Contract Summary')
+        >>> sht['part']
+        'xl/worksheets/sheet2.xml'
+    """
+    part = ooxml_sheet_part(zf, name)
+
+    # the shared strings are optional (a workbook with no text has none)
+    rels = part_rels(zf, 'xl/workbook.xml')
+    sst = [p for p in rels.values() if p.endswith('sharedStrings.xml')]
+
+    return(dict(zip=zf, part=part, strings=new_shared_strings(zf, sst[0] if len(sst) > 0 else None)))
+
+### given a cell reference (eg 'AB12'), return its column number (0 based)
+def ooxml_column(ref : str = None) -> int:
+    """
+    # Description
+        Given a cell reference, return the (0 based) column number of the cell
+    # Inputs
+        ref: str, the cell reference
+            default: None
+    # Outputs
+        out: int, the column number
+    # Example
+        >>> ooxml_column('AB12')
+        27
+    """
+    out = 0
+    for ch in ref:
+        if ch.isdigit():
+            break
+        out = out * 26 + ord(ch) - 64
+    return(out - 1)
+
+### given a cell (<c>), return its value the way pyxlsb would
+def ooxml_value(c : ET.Element = None, strings : dict = None):
+    """
+    # Description
+        Given a cell from an OOXML worksheet and the workbook's shared strings, return the
+        value of the cell as pyxlsb returns it for the same cell in an .xlsb: numbers as
+        float, booleans as bool, errors as their code (eg '0x7', see `ooxml_errors`),
+        strings as str, and None for a cell with no value
+    # Inputs
+        c: xml.etree.ElementTree.Element, the cell
+            default: None
+        strings: dict, the shared strings (from `new_shared_strings`)
+            default: None
+    # Outputs
+        out: the value
+    # Imports
+        import xml.etree.ElementTree as ET
+    """
+    t = c.get('t', 'n')
+
+    # inline strings keep their text in <is> rather than <v>
+    if t == 'inlineStr':
+        el = c.find(ooxml_ns['main'] + 'is')
+        return(ooxml_text(el) if el is not None else None)
+
+    # (an empty <v/> has no value either, the same as a missing <v>)
+    v = c.findtext(ooxml_ns['main'] + 'v')
+    if not v:
+        # a formula that returns text can leave <v> out when the text is empty
+        return('' if t == 'str' else None)
+    elif t == 'n':
+        return(float(v))
+    elif t == 's':
+        return(shared_string(strings, int(v)))
+    elif t == 'b':
+        return(v != '0')
+    elif t == 'e':
+        return(ooxml_errors.get(v, v))
+    else:
+        # 'str' (formula text) and 'd' (ISO dates) are kept as text
+        return(v)
+
+### given an .xlsx/.xlsm sheet, yield its rows one at a time (like `iter_page`)
+def iter_ooxml_page(sht : dict = None, max_columns : int = 32, stop = last_needed_row):
+    """
+    # Description
+        Given a sheet of an .xlsx/.xlsm workbook (from `get_ooxml_sheet`), yield each row
+        in the sheet as a list of the (non-empty) cell values, exactly as `iter_page` does
+        for an .xlsb sheet. The worksheet XML is streamed, so nothing after the first row
+        for which `stop(row)` is True is decompressed or parsed, and only the shared
+        strings the rows use are read (see `shared_string`)
+    # Inputs
+        sht:  dict, the sheet
+            default: None
+        max_columns: int, the column bound (cells from column `max_columns - 1` on are skipped)
+            default: 32
+        stop: function, given a row returns True if no later rows are needed
+            (None reads the whole sheet)
+            default: last_needed_row
+    # Outputs
+        row: list, the values in one row of the sheet
+    # Imports
+        import zipfile
+        import xml.etree.ElementTree as ET
+    """
+    n_columns = max(max_columns - 1, 0)
+    c_tag, row_tag = ooxml_ns['main'] + 'c', ooxml_ns['main'] + 'row'
+
+    with sht['zip'].open(sht['part']) as f:
+        # the cells of the current row: (column, value), in the order they were saved
+        row, col = [], -1
+        for _, el in ET.iterparse(f):
+            if el.tag == c_tag:
+                # the reference can be left out, in which case it is the next column
+                ref = el.get('r')
+                col = ooxml_column(ref) if ref is not None else col + 1
+                if col < n_columns:
+                    v = ooxml_value(el, sht['strings'])
+                    if v is not None:
+                        row.append(v)
+
+            elif el.tag == row_tag:
+                yield row
+
+                # once the last needed section has been read, stop reading the sheet
+                if stop is not None and stop(row):
+                    break
+
+                # the row is done with, so its cells can be thrown away
+                el.clear()
+                row, col = [], -1
+
+### is the file on this computer (rather than on a network drive)?
+def is_local_file(file : str = None) -> bool:
+    """
+    # Description
+        Given a file, return True if it is on a local drive. Files on network drives
+        (UNC paths, or mapped drives like O:) are better read normally than memory mapped
+    # Inputs
+        file: str, the file
+            default: None
+    # Outputs
+        out: bool, True if the file is local
+    # Imports
+        import os
+        import ctypes (on Windows)
+    # Example
+        >>> is_local_file(r'C:\\Users\\me\\deal summary.xlsb')
+        True
+    """
+    # only Windows tells the drive type apart, elsewhere mapping is always tried
+    if os.name != 'nt':
+        return(True)
+
+    drive = os.path.splitdrive(os.path.abspath(file))[0]
+    if drive.startswith(('\\\\', '//')):
+        return(False)
+
+    import ctypes
+    # 4 is DRIVE_REMOTE
+    return(ctypes.windll.kernel32.GetDriveTypeW(drive + '\\') != 4)
+
+### an open .xlsb workbook (from `open_xlsb`): the zip, the memory map and the file, which
+### can be closed (or used in a `with` block) like the zip files the other readers open
+class XlsbWorkbook(dict):
+    def close(self):
+        # the zip first, then the map (which nothing may still be reading) and the file
+        self['zip'].close()
+        if self['map'] is not None:
+            self['map'].close()
+        self['file'].close()
+
+    def __enter__(self):
+        return(self)
+
+    def __exit__(self, *args):
+        self.close()
+
+### open an .xlsb workbook for `get_xlsb_sheet` (memory mapped when it is local)
+def open_xlsb(file : str = None) -> XlsbWorkbook:
+    """
+    # Description
+        Given an .xlsb file, open it as a zip file, and memory map it if it is local
+        (see `is_local_file`), so the parts can be decompressed straight from the map
+        (see `zip_part_chunks`) instead of being copied to a temporary file first, the
+        way pyxlsb does
+    # Inputs
+        file: str, the file
+            default: None
+    # Outputs
+        wb: XlsbWorkbook (a dict, closed with `wb.close()`), with keys
+            zip: zipfile.ZipFile, the open workbook
+            map: mmap.mmap, the mapped file (None if it is not mapped)
+            file: the open file
+    # Imports
+        import zipfile
+        import mmap
+    # Example
+        >>> with open_xlsb('test\\\\deal summary.xlsb') as wb:
+        ...     sht = get_xlsb_sheet(wb, 'Contract Summary')
+    """
+    f = open(file, 'rb')
+
+    mm = None
+    try:
+        if is_local_file(file):
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # eg an empty file cannot be mapped (it fails as a bad zip file below)
+                mm = None
+
+        return(XlsbWorkbook(zip=zipfile.ZipFile(f), map=mm, file=f))
+    except Exception:
+        # eg not a zip file: nothing is left open
+        if mm is not None:
+            mm.close()
+        f.close()
+        raise
+
+### yield the (decompressed) bytes of a part of an .xlsb workbook a chunk at a time
+def zip_part_chunks(wb : dict = None, part : str = None, chunk_size : int = 1 << 16):
+    """
+    # Description
+        Given a workbook (from `open_xlsb`) and one of its parts, yield the bytes of the
+        part a chunk at a time, so a reader that stops early never decompresses the rest.
+        When the workbook is memory mapped, the data is found from the zip's local header
+        and inflated straight from the map, otherwise the part is read with zipfile.
+        The view of the map is let go when the generator finishes or is closed, so close
+        it (or read it to the end) before closing the workbook
+    # Inputs
+        wb: dict, the workbook
+            default: None
+        part: str, the path of the part inside the zip
+            default: None
+        chunk_size: int, the (compressed) bytes read at a time
+            default: 65536
+    # Outputs
+        chunk: bytes, the next piece of the part
+    # Imports
+        import zipfile
+        import struct
+        import zlib
+    """
+    info = wb['zip'].getinfo(part)
+
+    # anything but a plain stored or deflated part is left to zipfile
+    if wb['map'] is None or info.flag_bits & 0x1 or info.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+        with wb['zip'].open(part) as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                yield chunk
+        return
+
+    # the data starts after the local header (30 bytes, then the name and the extra field)
+    name_len, extra_len = struct.unpack_from('<HH', wb['map'], info.header_offset + 26)
+    start = info.header_offset + 30 + name_len + extra_len
+    data = memoryview(wb['map'])[start:start + info.compress_size]
+
+    try:
+        d = zlib.decompressobj(-zlib.MAX_WBITS) if info.compress_type == zipfile.ZIP_DEFLATED else None
+        for i in range(0, len(data), chunk_size):
+            if d is None:
+                # copied, so no view of the map outlives the generator
+                yield bytes(data[i:i + chunk_size])
+            else:
+                out = d.decompress(data[i:i + chunk_size])
+                if out:
+                    yield out
+    finally:
+        # a map with a view of it still open cannot be closed
+        data.release()
+
+### find the record that starts at `pos`
+def xlsb_header(buf : bytes = None, pos : int = 0) -> tuple:
+    """
+    # Description
+        Given the bytes of an .xlsb part and the position of a record, read the record
+        header: the id (1 to 4 bytes, kept as they are, with the high bit of each byte
+        saying another follows, like pyxlsb's `biff12` constants) and the length (1 to 4
+        bytes of 7 bits each)
+    # Inputs
+        buf: bytes, the part (or the part of it read so far)
+            default: None
+        pos: int, where the record starts
+            default: 0
+    # Outputs
+        out: tuple, (id, where the data starts, where the data ends), or None if `buf`
+             ends before the whole record does
+    # Example
+        >>> xlsb_header(bytes([0x94, 0x01, 0x10]) + bytes(16))
+        (404, 3, 19)
+    """
+    n = len(buf)
+    recid, reclen = 0, 0
+    for k in range(4):
+        if pos >= n:
+            return(None)
+        b = buf[pos]
+        pos += 1
+        recid |= b << (8 * k)
+        if not b & 0x80:
+            break
+    for k in range(4):
+        if pos >= n:
+            return(None)
+        b = buf[pos]
+        pos += 1
+        reclen |= (b & 0x7F) << (7 * k)
+        if not b & 0x80:
+            break
+
+    if pos + reclen > n:
+        return(None)
+    return(recid, pos, pos + reclen)
+
+### yield the records of an .xlsb part
+def xlsb_records(chunks = None):
+    """
+    # Description
+        Given the bytes of an .xlsb part a chunk at a time (eg from `zip_part_chunks`),
+        yield each record as (id, data). A record split across chunks is put back together
+        before it is yielded, and nothing is read ahead of the record being yielded
+    # Inputs
+        chunks: iterable of bytes, the part
+            default: None
+    # Outputs
+        record: tuple, (id, the bytes of the record's data)
+    # Example
+        >>> list(xlsb_records([bytes([0x00, 0x04, 0x01]), bytes(3)]))
+        [(0, b'\\x01\\x00\\x00\\x00')]
+    """
+    buf, pos = b'', 0
+    for chunk in chunks:
+        # keep what is left of the last chunk (a record cut in two)
+        buf, pos = buf[pos:] + chunk, 0
+        while True:
+            header = xlsb_header(buf, pos)
+            if header is None:
+                break
+            recid, start, pos = header
+            yield(recid, buf[start:pos])
+
+### read a string from the data of an .xlsb record
+def xlsb_string(data : bytes = None, pos : int = 0) -> tuple:
+    """
+    # Description
+        Given the data of an .xlsb record and the position of a string in it (a 4 byte
+        count of characters, then the UTF-16 characters), return the string and where
+        the data after it starts
+    # Inputs
+        data: bytes, the record's data
+            default: None
+        pos: int, where the string starts
+            default: 0
+    # Outputs
+        out: tuple, (the string, the position after it)
+    # Imports
+        import struct
+    # Example
+        >>> xlsb_string(bytes([2, 0, 0, 0]) + 'ab'.encode('utf-16-le'))
+        ('ab', 8)
+    """
+    end = pos + 4 + 2 * struct.unpack_from('<I', data, pos)[0]
+    return(bytes(data[pos + 4:end]).decode('utf-16-le', errors='replace'), end)
+
+### find the worksheet part of a sheet of an .xlsb workbook
+def xlsb_sheet_part(wb : dict = None, name : str = None) -> str:
+    """
+    # Description
+        Given a workbook (from `open_xlsb`) and a sheet name, return the path (inside the
+        zip) of the part that holds the sheet. Like pyxlsb, the name is matched ignoring case
+    # Inputs
+        wb: dict, the workbook
+            default: None
+        name: str, the sheet name
+            default: None
+    # Outputs
+        out: str, the path of the worksheet part
+    # Imports
+        from pyxlsb import biff12
+    # Example
+        >>> xlsb_sheet_part(open_xlsb('test\\\\deal summary.xlsb'), 'Contract Summary')
+        'xl/worksheets/sheet2.bin'
+    """
+    chunks = zip_part_chunks(wb, 'xl/workbook.bin')
+    try:
+        for recid, data in xlsb_records(chunks):
+            if recid == biff12.SHEET:
+                # the sheet's state and id (4 bytes each), then its relationship id and name
+                relid, pos = xlsb_string(data, 8)
+                if xlsb_string(data, pos)[0].lower() == name.lower():
+                    return(part_rels(wb['zip'], 'xl/workbook.bin')[relid])
+            elif recid == biff12.SHEETS_END:
+                break
+    finally:
+        # let go of the part as soon as the sheet is found (see `zip_part_chunks`)
+        chunks.close()
+
+    raise ValueError('there is no sheet named {}'.format(name))
+
+### open a sheet of an .xlsb workbook (like pyxlsb's `Workbook.get_sheet`)
+def get_xlsb_sheet(wb : dict = None, name : str = None) -> dict:
+    """
+    # Description
+        Given a workbook (from `open_xlsb`) and a sheet name, return what `iter_xlsb_page`
+        needs to read the sheet: the workbook, the worksheet part and the (lazily read)
+        shared strings. Unlike pyxlsb, nothing from the sheet is read yet
+    # Inputs
+        wb: dict, the workbook
+            default: None
+        name: str, the sheet name
+            default: None
+    # Outputs
+        sht: dict, with keys workbook, part and strings
+    # Example
+        >>> sht = get_xlsb_sheet(open_xlsb('test\\\\deal summary.xlsb'), 'Contract Summary')
+        >>> sht['part']
+        'xl/worksheets/sheet2.bin'
+    """
+    part = xlsb_sheet_part(wb, name)
+
+    # the shared strings are optional (a workbook with no text has none)
+    rels = part_rels(wb['zip'], 'xl/workbook.bin')
+    sst = [p for p in rels.values() if p.endswith('sharedStrings.bin')]
+
+    return(dict(workbook=wb, part=part, strings=new_shared_strings(wb['zip'], sst[0] if len(sst) > 0 else None)))
+
+### given a cell record, return its value the way pyxlsb would
+def xlsb_value(recid : int = None, data : bytes = None, strings : dict = None):
+    """
+    # Description
+        Given the id and data of an .xlsb cell record and the workbook's shared strings,
+        return the value of the cell as pyxlsb returns it: numbers as float, booleans as
+        bool, errors as their code (eg '0x7'), strings as str, and None for a blank cell
+    # Inputs
+        recid: int, the record id (`biff12.BLANK` to `biff12.FORMULA_BOOLERR`)
+            default: None
+        data: bytes, the record's data (the column and style take the first 8 bytes)
+            default: None
+        strings: dict, the shared strings (from `new_shared_strings`)
+            default: None
+    # Outputs
+        out: the value
+    # Imports
+        import struct
+        from pyxlsb import biff12
+    """
+    if recid == biff12.FLOAT or recid == biff12.FORMULA_FLOAT:
+        return(struct.unpack_from('<d', data, 8)[0])
+    elif recid == biff12.NUM:
+        # an RK number: an integer, or the top 30 bits of a double, either maybe divided by 100
+        rk = struct.unpack_from('<i', data, 8)[0]
+        if rk & 0x2:
+            v = float(rk >> 2)
+        else:
+            v = struct.unpack('<d', b'\x00\x00\x00\x00' + struct.pack('<I', rk & 0xFFFFFFFC))[0]
+        return(v / 100 if rk & 0x1 else v)
+    elif recid == biff12.STRING:
+        return(shared_string(strings, struct.unpack_from('<I', data, 8)[0]))
+    elif recid == biff12.FORMULA_STRING:
+        return(xlsb_string(data, 8)[0])
+    elif recid == biff12.BOOL or recid == biff12.FORMULA_BOOL:
+        return(data[8] != 0)
+    elif recid == biff12.BOOLERR or recid == biff12.FORMULA_BOOLERR:
+        return(hex(data[8]))
+    else:
+        return(None)
+
+### given an .xlsb sheet, yield its rows one at a time (like `iter_page`)
+def iter_xlsb_page(sht : dict = None, max_columns : int = 32, stop = last_needed_row):
+    """
+    # Description
+        Given a sheet of an .xlsb workbook (from `get_xlsb_sheet`), yield each row in the
+        sheet as a list of the (non-empty) cell values, exactly as `iter_page` does with
+        pyxlsb. The records are read straight from the zip (see `zip_part_chunks`), only
+        the cells left of the column bound are decoded, and nothing after the first row
+        for which `stop(row)` is True is decompressed
+    # Inputs
+        sht:  dict, the sheet
+            default: None
+        max_columns: int, the column bound (cells from column `max_columns - 1` on are skipped)
+            default: 32
+        stop: function, given a row returns True if no later rows are needed
+            (None reads the whole sheet)
+            default: last_needed_row
+    # Outputs
+        row: list, the values in one row of the sheet
+    # Imports
+        import struct
+        from pyxlsb import biff12
+    """
+    n_columns = max(max_columns - 1, 0)
+
+    # the cells of the current row, {column: value}
+    row_num, cells = -1, None
+    chunks = zip_part_chunks(sht['workbook'], sht['part'])
+    try:
+        for recid, data in xlsb_records(chunks):
+            if biff12.BLANK <= recid <= biff12.FORMULA_BOOLERR:
+                # the column comes first, so the cells past the bound are never decoded
+                col = struct.unpack_from('<I', data, 0)[0]
+                if cells is not None and col < n_columns:
+                    cells[col] = xlsb_value(recid, data, sht['strings'])
+                continue
+            elif recid != biff12.ROW and recid != biff12.SHEETDATA_END:
+                continue
+
+            # like pyxlsb, a row record for the row already being read does not start a new one
+            if recid == biff12.ROW and struct.unpack_from('<I', data, 0)[0] == row_num:
+                continue
+
+            if cells is not None:
+                row = [cells[c] for c in sorted(cells) if cells[c] is not None]
+                yield row
+
+                # once the last needed section has been read, stop reading the sheet
+                if stop is not None and stop(row):
+                    break
+
+            if recid == biff12.SHEETDATA_END:
+                break
+            row_num, cells = struct.unpack_from('<I', data, 0)[0], {}
+    finally:
+        # let go of the part once the sheet is done with (see `zip_part_chunks`)
+        chunks.close()
+    
+def format_ds_data(x : str = None) -> str:
+    """
+    # Description
+        Given a value, return the value in a format suitable for the data source
+    # Inputs
+        x:  string, the value
+            default: None
+    # Outputs
+        out: string, the value in a format suitable for the data source
+    # Imports
+        import pandas as pd
+    # Example
+        >>> format_ds_data(x='test1.txt')
+        'test1.txt'
+    """
+    # first test if the value is a string
+    if type(x)==str:
+
+        # if the value is a string, and the string is '0x7', return 0
+        if x=='0x7':
+            return(0)
+
+        # if the value is a string, and the string is empty, return 'N/A'
+        elif x=='':
+            return('N/A')
+
+        # if the value is a nonempty string that is not '0x7', return the string
+        # but strip any leading or trailing whitespace
+        else:
+            return(x.strip())
+
+    # if the value is a float
+    elif type(x)==float:
+
+        # if the value is less than 1, round to 4 decimal places
+        if x<1:
+            return(round(x, 4))
+
+        # if the value is greater than or equal to 1, round to 3 decimal places
+        else:
+            return(round(x, 3))
+
+    # otherwise, return the value
+    else:
+        return(x)
+        
+### round floats the way `format_ds_data` does, for a whole array at once
+def round_ds_floats(x : np.ndarray = None) -> np.ndarray:
+    """
+    # Description
+        Given an array of floats, round the values less than 1 to 4 decimal places,
+        and the rest to 3, giving exactly the same values as python's `round` (as
+        used by `format_ds_data`)
+    # Inputs
+        x: numpy array of floats
+            default: None
+    # Outputs
+        out: numpy array of floats, the rounded values
+    # Imports
+        import numpy as np
+    # Example
+        >>> round_ds_floats(np.array([0.123456, 12.34567]))
+        array([ 0.1235, 12.346 ])
+    """
+    digits = np.where(x < 1, 4, 3)
+    scale = np.where(x < 1, 1e4, 1e3)
+
+    # round x * 10^digits to the nearest integer, and scale back down
+    y = x * scale
+    out = np.rint(y) / scale
+
+    # `round` rounds the exact decimal value of x, so where x * 10^digits is within a
+    # rounding error of a half it can go the other way; those few values (and huge,
+    # infinite and missing ones) are rounded one at a time with `round` itself
+    redo = ~np.isfinite(y) | (np.abs(y) >= 2**52)
+    redo[~redo] = np.abs(np.abs(y[~redo] - np.floor(y[~redo])) - 0.5) <= 4 * np.spacing(np.abs(y[~redo]))
+    out[redo] = [round(v, d) for v, d in zip(x[redo].tolist(), digits[redo].tolist())]
+    return(out)
+
+### format a whole column of values from the deal sheet at once
+def format_ds_values(values : np.ndarray = None) -> np.ndarray:
+    """
+    # Description
+        Given an array of values (as read from the deal sheet), return the values
+        formatted exactly as `format_ds_data` would format each one, working on all
+        the strings at once and all the floats at once:
+            '0x7' -> 0, '' -> 'N/A', any other string is stripped,
+            floats are rounded by `round_ds_floats`, and anything else is left as it is
+    # Inputs
+        values: numpy array (of python objects)
+            default: None
+    # Outputs
+        out: numpy array (of python objects), the formatted values
+    # Imports
+        import numpy as np
+        import pandas as pd
+    # Example
+        >>> format_ds_values(np.array(['0x7', '', ' a ', 0.123456, 12.34567, 3], dtype=object))
+        array([0, 'N/A', 'a', 0.1235, 12.346, 3], dtype=object)
+    """
+    values = np.asarray(values, dtype=object)
+    out = values.copy()
+
+    # the type of each value (exact types, as `format_ds_data` checks with `type(x)==...`)
+    types = np.frompyfunc(type, 1, 1)(values)
+
+    is_float = types == float
+    if is_float.any():
+        out[is_float] = round_ds_floats(values[is_float].astype(float))
+
+    is_str = types == str
+    if is_str.any():
+        strings = values[is_str]
+        formatted = pd.Series(strings, dtype=object).str.strip().to_numpy(dtype=object, copy=True)
+        formatted[strings == '0x7'] = 0
+        formatted[strings == ''] = 'N/A'
+        out[is_str] = formatted
+
+    return(out)
+
+### column names for each Contract Summary label seen so far: {(shape, label): tuple of column names}
+### (filled in by `label_columns` the first time each label is seen, so each distinct label is
+### only cleaned up once per run, however many deal sheets it appears on)
+label_map = {}
+
+### given a label from the Contract Summary, return the raw names of the term(s) on its row
+def label_keys(shape : str = None, label = None) -> tuple:
+    """
+    # Description
+        Given a label (the first cell of a row) and the shape of its row, return the
+        names of the terms the row holds, before `rename_column` is applied. This is
+        where all of the label clean up happens:
+            term: a key contract term with one value ("(%)" -> "%", spaces -> "_", lower case)
+            term_range: a key contract term with two values, e.g. "Effective / Expire Date",
+                split at the slash
+            term_pair: as `term_range`, but only for labels with a slash (no names otherwise)
+            economics: a summary economics term with one value ("Ult." -> "Ult", "_(1:" -> "_1:")
+            economics_pair: a summary economics term with two values, split at the slash
+                (the second is "<first>_rol" for the limit shares), or, without a slash,
+                "<first>_pct"
+            uobg: the `label`-th subject business UOBG, and its percent
+    # Inputs
+        shape: string, one of the shapes above
+            default: None
+        label: string (int for `uobg`), the label
+            default: None
+    # Outputs
+        out: tuple, the names of the terms
+    # Example
+        >>> label_keys('economics_pair', 'Ult. CIN Re Premium')
+        ('ult_cin_re_premiu', 'ult_cin_re_premiu_pct')
+    """
+    if shape == 'term':
+        return((label.replace("(%)", "%").replace(' ', '_').lower(),))
+
+    elif shape in ['term_range', 'term_pair']:
+        label = label.replace("Brok on R/I Prem (%)", "Brok on RI Prem (%)") if shape == 'term_pair' else label
+        label = label.replace("(%)", "%")
+        if shape == 'term_pair' and label.find('/') == -1:
+            return(())
+        item1 = label[:label.find("/")].lower().replace(" ", "_")
+        item2 = label[1 + label.find("/"):].lower().replace(" ", "_")
+        return((item1, item2))
+
+    elif shape == 'economics':
+        return((label.replace('Ult.', 'Ult').lower().replace(" ", "_").replace("_(1:", "_1:"),))
+
+    elif shape == 'economics_pair':
+        label = label.replace('Ult.', 'Ult')
+
+        # note that without a slash `find` returns -1, so the last character is dropped
+        # (e.g. "Ult CIN Re Premium" -> "ult_cin_re_premiu"); `rename_column` puts it back
+        item1 = label[:label.find("/")].lower().replace(" ", "_").replace("_(1:", "_1:")
+
+        # if the label has a slash, the second value is named after the part after the
+        # slash, except for the limit shares, where it is the rate on line
+        if label.find("/") != -1:
+            if item1 in ['risk_limit_share', 'occurrence_limit_share']:
+                item2 = '{}_rol'.format(item1)
+            else:
+                item2 = label[1 + label.find("/"):].lower().replace(" ", "_").replace("_(1:", "_1:")
+
+        # otherwise the second value is a percent
+        else:
+            item2 = '{}_pct'.format(item1)
+        return((item1, item2))
+
+    elif shape == 'uobg':
+        return(('uobg_{}'.format(label), 'uobg_{}_pct'.format(label)))
+
+    else:
+        raise ValueError('unknown label shape: {}'.format(shape))
+
+### given a label from the Contract Summary, return the column name(s) it fills
+def label_columns(shape : str = None, label = None) -> tuple:
+    """
+    # Description
+        Given a label and the shape of its row (see `label_keys`), return the final
+        column names for the terms on the row, i.e. `label_keys` followed by
+        `rename_column`. The names are worked out the first time a label is seen and
+        kept in `label_map` (interned, so every deal sheet shares the same strings),
+        so after that this is a single lookup
+    # Inputs
+        shape: string, the shape of the row (see `label_keys`)
+            default: None
+        label: string (int for `uobg`), the label
+            default: None
+    # Outputs
+        out: tuple, the column names
+    # Imports
+        import sys
+    # Example
+        >>> label_columns('economics_pair', 'Ult. CIN Re Premium')
+        ('ult_cin_re_premium', 'ult_cin_re_premium_pct')
+    """
+    names = label_map.get((shape, label))
+    if names is None:
+        names = tuple(sys.intern(rename_column(c)) for c in label_keys(shape, label))
+        label_map[(shape, label)] = names
+    return(names)
+
+### parse one row of the "Key Contract Terms" section into `d`
+def key_contract_terms_row(d : dict = None, row : list = None, n_layers : int = 8) -> None:
+    """
+    # Description
+        Given one (non-empty) row from the "Key Contract Terms" section, add the terms
+        in it to the dictionary `d`: a term with one value per layer is a list of the
+        `n_layers` values, and any other term is a single value. The row itself is
+        not changed.
+    # Inputs
+        d: dict, the parsed terms so far (updated in place)
+            default: None
+        row: list, the values in the row
+            default: None
+        n_layers: int, the number of layers in the sheet
+            default: 8
+    # Outputs
+        None
+    # Example
+        >>> d = {}
+        >>> key_contract_terms_row(d, ['Line of Business'])
+        >>> d
+        {'line_of_business': 'N/A'}
+    """
+    # the section header has no values
+    if row[0] == "Key Contract Terms":
+        return
+
+    # if the row is a single cell, the term has no values
+    if len(row) == 1:
+        item, = label_columns('term', row[0])
+        d[item] = 'N/A'
+
+    # if the second cell is CRM ID, then we are in the header row, which has the client
+    # name, CRM ID, contract name, MGA, and broker (N/A if the value is empty)
+    elif row[1] == "CRM ID:":
+        label = row[0].replace("(%)", "%")
+        d['client_name'] = label if label != '' else 'N/A'
+        d['crm_id'] = row[2] if row[2] != '' else 'N/A'
+        d['contract_name'] = row[4] if row[4] != '' else 'N/A'
+        d['mga'] = row[6] if row[6] != '' else 'N/A'
+        d['broker'] = row[8] if row[8] != '' else 'N/A'
+
+    # if the row has 9 cells, there is one value per layer
+    elif len(row) == 9:
+        item, = label_columns('term', row[0])
+        d[item] = row[1:1 + n_layers]
+
+    # if the row has 25 cells, there are two values per layer, with a delimiter
+    # cell between them (e.g. "Effective / Expire Date")
+    elif len(row) == 25:
+        item1, item2 = label_columns('term_range', row[0])
+        d[item1] = row[1:1 + (3 * n_layers):3]
+        d[item2] = row[3:3 + (3 * n_layers):3]
+
+    # if the row has 17 cells, there are two values per layer, with no delimiter
+    # (only the labels with a slash are kept)
+    elif len(row) == 17:
+        items = label_columns('term_pair', row[0])
+        if len(items) > 0:
+            item1, item2 = items
+            d[item1] = row[1:1 + (2 * n_layers):2]
+            d[item2] = row[2:2 + (2 * n_layers):2]
+
+### parse one row of the "Summary Economics" section into `d`
+def summary_economics_row(d : dict = None, totals : dict = None, row : list = None,
+                          others : list = None, n_layers : int = 8) -> None:
+    """
+    # Description
+        Given one row from the "Summary Economics" section (whose first cell is a string),
+        add the values for each layer to the dictionary `d` (as a list of `n_layers`
+        values), and the combined, capital and ROE values to `totals`. Rows in a shape
+        that is not known are added to `others`. The row itself is not changed.
+    # Inputs
+        d: dict, the parsed terms so far (updated in place)
+            default: None
+        totals: dict, the combined, capital and ROE values so far (updated in place)
+            default: None
+        row: list, the values in the row
+            default: None
+        others: list, the rows that could not be parsed (updated in place)
+            default: None
+        n_layers: int, the number of layers in the sheet
+            default: 8
+    # Outputs
+        None
+    """
+    # if the row has 10 or 11 cells, there is one value per layer, followed by either
+    # the combined value (10 cells) or the capital and ROE (11 cells)
+    if len(row) in [n_layers + 2, n_layers + 3]:
+        item, = label_columns('economics', row[0])
+        d[item], totals[item] = row[1:1 + n_layers], {}
+        if len(row) == n_layers + 2:
+            totals[item]['combined'] = row[len(row) - 1]
+        else:
+            totals[item]['capital'] = row[len(row) - 2]
+            totals[item]['roe'] = row[len(row) - 1]
+
+    # if the row has 18 or 19 cells, there are two values per layer, followed by the
+    # combined value of the first (18 cells) or of both (19 cells)
+    elif len(row) in [(2 * n_layers) + 2, (2 * n_layers) + 3]:
+
+        item1, item2 = label_columns('economics_pair', row[0])
+        d[item1] = row[1:1 + (2 * n_layers):2]
+        d[item2] = row[2:2 + (2 * n_layers):2]
+        totals[item1], totals[item2] = {}, {}
+        if len(row) == (2 * n_layers) + 3:
+            totals[item1]['combined'] = row[len(row) - 2]
+            totals[item2]['combined'] = row[len(row) - 1]
+        else:
+            totals[item1]['combined'] = row[len(row) - 1]
+
+    # if the row has 9 cells, there is one value per layer
+    elif len(row) == n_layers + 1:
+        item, = label_columns('economics', row[0])
+        d[item], totals[item] = row[1:1 + n_layers], {}
+
+    # otherwise keep the row, to be parsed manually
+    else:
+        others.append(row)
+
+### parse one row of the "Subject Business UOBG" section into `d`
+def subject_business_uobg_row(d : dict = None, totals : dict = None, row : list = None, counter : int = None,
+                              others : list = None, n_layers : int = 8) -> None:
+    """
+    # Description
+        Given one row from the "Subject Business UOBG" section (whose first cell is a
+        string), add its values to the dictionary `d` as `uobg_{counter}` (see
+        `summary_economics_row`). The "<Select UOBG>" and "Total" rows are skipped, and
+        rows in a shape that is not known are added to `others`.
+    # Inputs
+        d: dict, the parsed terms so far (updated in place)
+            default: None
+        totals: dict, the combined, capital and ROE values so far (updated in place)
+            default: None
+        row: list, the values in the row
+            default: None
+        counter: int, the position of the row in the section (starting at 1)
+            default: None
+        others: list, the rows that could not be parsed (updated in place)
+            default: None
+        n_layers: int, the number of layers in the sheet
+            default: 8
+    # Outputs
+        None
+    """
+    # placeholder and total rows
+    if row[0] in ["<Select UOBG>", 'Total']:
+        return
+
+    item, item_pct = label_columns('uobg', counter)
+
+    # one value per layer, then the combined value (10 cells) or the capital and ROE (11 cells)
+    if len(row) in [n_layers + 2, n_layers + 3]:
+        d[item], totals[item] = row[1:1 + n_layers], {}
+        if len(row) == n_layers + 2:
+            totals[item]['combined'] = row[len(row) - 1]
+        else:
+            totals[item]['capital'] = row[len(row) - 2]
+            totals[item]['roe'] = row[len(row) - 1]
+
+    # two values per layer (the value and its percent), then the combined value(s)
+    elif len(row) in [(2 * n_layers) + 2, (2 * n_layers) + 3]:
+        d[item] = row[1:1 + (2 * n_layers):2]
+        d[item_pct] = row[2:2 + (2 * n_layers):2]
+        totals[item], totals[item_pct] = {}, {}
+        if len(row) == (2 * n_layers) + 3:
+            totals[item]['combined'] = row[len(row) - 2]
+            totals[item_pct]['combined'] = row[len(row) - 1]
+        else:
+            totals[item]['combined'] = row[len(row) - 1]
+
+    # one value per layer
+    elif len(row) == n_layers + 1:
+        d[item], totals[item] = row[1:1 + n_layers], {}
+
+    # otherwise keep the row, to be parsed manually
+    else:
+        others.append(row)
+
+### parse the Contract Summary in one pass over its rows
+def parse_contract_summary(rows = None, n_layers : int = 8) -> dict:
+    """
+    # Description
+        Given the rows of the Contract Summary sheet (a list, or the generator from
+        `iter_page`), return a dictionary with the key contract terms, the summary
+        economics, and the subject business UOBGs.
+
+        The rows are read once, from the top. The parser starts in the "Key Contract
+        Terms" section, and moves on at the "Summary Economics", "Subject Business UOBG"
+        and "Deposit Prem Schedule" markers; it stops at the last one, so the rows after
+        it are never read. Empty rows are skipped, and the rows are not changed.
+    # Inputs
+        rows: iterable, the rows of the sheet, each a list of values
+            default: None
+        n_layers: int, the number of layers in the sheet
+            default: 8
+    # Outputs
+        out: dict, with
+            dat: dict, the parsed terms, each a list of the values for each layer or
+                a single value for the whole contract (see `parsed_to_table`); the values
+                are as read from the sheet, and are formatted later (see `format_ds_values`)
+            totals: dict, the combined (or capital and ROE) values of the summary
+                economics and subject business UOBG terms
+            others: list, the rows from the summary economics and subject business UOBG
+                sections that could not be parsed
+    # Example
+        >>> wb = pyxlsb.open_workbook('Deal Summary.xlsb')
+        >>> d = parse_contract_summary(iter_page(wb.get_sheet('Contract Summary')))
+        >>> table = parsed_to_table(d)
+    """
+    # initialize the output dictionaries and the list of other rows
+    d = {}
+    totals = {}
+    others = []
+
+    # the section we are in, and the position of the row in the subject business UOBG section
+    section = 'key_contract_terms'
+    counter = 0
+
+    for row in rows:
+
+        # skip empty rows
+        if len(row) == 0:
+            continue
+
+        # key contract terms run from the top of the sheet to "Summary Economics"
+        if section == 'key_contract_terms':
+            if row[0] == "Summary Economics":
+                section = 'summary_economics'
+            else:
+                key_contract_terms_row(d, row, n_layers=n_layers)
+
+        # summary economics run to "Subject Business UOBG" (rows without a label are skipped)
+        elif section == 'summary_economics':
+            if type(row[0]) != str:
+                pass
+            elif row[0] == "Subject Business UOBG":
+                section = 'subject_business_uobg'
+                counter = 1
+            else:
+                summary_economics_row(d, totals, row, others, n_layers=n_layers)
+
+        # subject business UOBGs run to "Deposit Prem Schedule", which is the last section needed
+        elif type(row[0]) == str:
+            if row[0] == "Deposit Prem Schedule":
+                break
+            subject_business_uobg_row(d, totals, row, counter, others, n_layers=n_layers)
+            counter = counter + 1
+
+    return(dict(dat=d, totals=totals, others=others))
+    
+def find_num_layers(d : dict = None, totals : dict = None) -> int:
+    """
+    # Description
+        Given the parsed terms (see `parse_contract_summary`), return the number of
+        layers: the first n for which the premium of layers 1 to n adds up to the
+        combined premium (999 if there is no such n)
+    # Inputs
+        d: dict, the parsed terms
+            default: None
+        totals: dict, the combined values of the parsed terms
+            default: None
+    # Outputs
+        out: int, the number of layers
+    """
+    # the premium for each layer, then the combined premium
+    # (the values are raw, so they are formatted first, as they will be in the output)
+    prem_series = pd.Series([format_ds_data(x) for x in d['ult_cin_re_premium'] + list(totals.get('ult_cin_re_premium', {}).values())])
+    idx = prem_series.index.tolist()
+    
+    for i in range(len(idx)-1):
+        if prem_series[idx[:i+1]].sum().round(0)==round(prem_series[len(idx)-1], 0):
+            return(i+1)
+    return(999)
+    
+def rename_column(c):
+    ## several things always get renamed
+    new_col_name = (c
+                    .replace('effective', 'effective_date')
+                    .replace('expire_date', 'expiration_date')
+                    .replace('qs%_', 'qs')
+                    .replace('_placement%', 'placement%')
+                    .replace('reinsurance_rat', 'reinsurance_rate')
+                    .replace('th%', 'th')
+                    .replace('ceding_com_', 'ceding_comm_'))
+    
+    ## remove final character unless specific sequence of characters
+    if new_col_name.find("1:")==-1:
+        new_col_name = new_col_name.replace(":", "")
+    if new_col_name.find("(")==-1:
+        new_col_name = new_col_name.replace(")", "")
+        
+    ## if missing final letter, add it
+    if new_col_name.find('bonus')==-1:
+        new_col_name = new_col_name.replace("bonu", "bonus")
+    if new_col_name.find('capital')==-1:
+        new_col_name = new_col_name.replace("capita", "capital")
+    if new_col_name.find('premium')==-1:
+        new_col_name = new_col_name.replace('premiu', 'premium')
+    if new_col_name.find('ratio')==-1:
+        new_col_name = new_col_name.replace('rati', 'ratio')
+    if new_col_name.find('adjustment')==-1:
+        new_col_name = new_col_name.replace('adjustmen', 'adjustment')
+    if new_col_name.find('brokerage')==-1:
+        new_col_name = new_col_name.replace('brokerag', 'brokerage')
+    if new_col_name.find('expense')==-1:
+        new_col_name = new_col_name.replace('expens', 'expense')
+    if new_col_name.find('profit')==-1:
+        new_col_name = new_col_name.replace('profi', 'profit')
+    if new_col_name.find('discounted')==-1:
+        new_col_name = new_col_name.replace('discounte', 'discounted')
+        
+    ## add closing parentheses if needed
+    if (new_col_name.find("(")!=-1) and (new_col_name.find(")")==-1):
+        new_col_name = new_col_name + ")"
+        
+    ## change something to something new, may or may not be missing final letter
+    if new_col_name.find('commission')==-1:
+        new_col_name = new_col_name.replace('commissio', 'comm')
+    else:
+        new_col_name = new_col_name.replace('commission', 'comm')
+        
+    ## once all this is done, combine a few things:
+    new_col_name = (new_col_name.replace('brokerage_%', 'brokerage_pct'))
+
+    return(new_col_name)
+    
+def parsed_to_table(parsed : dict = None) -> dict:
+    """
+    # Description
+        Given the output of `parse_contract_summary`, return the deal sheet as a table
+        with one row per layer, stored as a dictionary of columns (each a list or array
+        with one value per layer), in the order the terms were parsed. Terms with a
+        single value are repeated on every layer. Raises a ValueError if the number
+        of layers cannot be found
+    # Inputs
+        parsed: dict, the output of `parse_contract_summary`
+            default: None
+    # Outputs
+        table: dict, {column name: values}, starting with the `layer` column
+    # Example
+        >>> parsed_to_table(parse_contract_summary(page))
+        {'layer': array([1, 2]), 'client_name': ['ABC Insurance', 'ABC Insurance'], ...}
+    """
+    d, totals = parsed['dat'], parsed['totals']
+    
+    num_layers = find_num_layers(d, totals)
+    if num_layers==999:
+        raise ValueError('unable to find the number of layers for this treaty (client_name: {}, crm_id: {}, contract_name: {})'
+                         .format(d.get('client_name'), d.get('crm_id'), d.get('contract_name')))
+
+    table = dict(layer=np.arange(1, num_layers+1))
+    for c in d:
+        ## the per-layer terms are already one value per layer, so
+        ## they only need cutting down to the number of layers
+        ## (the terms are already named by column, see `label_columns`)
+        if type(d[c])==list:
+            table[c] = d[c][:num_layers]
+        else:
+            table[c] = [d[c]] * num_layers
+    return(table)
+        
+### a deal sheet that could not be parsed: the file, the stage it failed at
+### (open, sheet, parse, layers, or timeout & worker in `all_files`), the exception
+### type and message, and the seconds spent on it
+ParseFailure = namedtuple('ParseFailure', 'file stage error message seconds')
+
+### the stages whose failures may not happen again (the file could not be opened, e.g. the
+### share dropped, the parse ran out of time, or the worker process died), so they are
+### never saved to the parse cache or the checkpoint, and the file is tried again next time
+transient_stages = ['open', 'timeout', 'worker']
+
+### how to read each type of workbook: (open the workbook, get a sheet, yield the rows of the sheet)
+### (.xlsx/.xlsm are read straight from their XML, and anything else as .xlsb, straight from
+### its records; `pyxlsb.open_workbook`, `pyxlsb.Workbook.get_sheet` and `iter_page` read the same rows)
+sheet_readers = {
+    '.xlsb': (open_xlsb, get_xlsb_sheet, iter_xlsb_page),
+    '.xlsx': (zipfile.ZipFile, get_ooxml_sheet, iter_ooxml_page),
+    '.xlsm': (zipfile.ZipFile, get_ooxml_sheet, iter_ooxml_page),
+}
+
+def one_file_type1(file):
+    open_workbook, get_sheet, read_rows = sheet_readers.get(os.path.splitext(file)[1].lower(), sheet_readers['.xlsb'])
+
+    ## keep track of the stage, so a failure says where it happened
+    start = time.perf_counter()
+    stage = 'open'
+    wb, sht, rows = None, None, None
+    try:
+        wb = open_workbook(file)
+        stage = 'sheet'
+        sht = get_sheet(wb, 'Contract Summary')
+        stage = 'parse'
+        rows = read_rows(sht)
+        d = parse_contract_summary(rows)
+        stage = 'layers'
+        return(parsed_to_table(d))
+    except Exception as e:
+        print('{} could not be parsed ({}: {}: {})'.format(file, stage, type(e).__name__, e))
+        return(ParseFailure(file, stage, type(e).__name__, str(e), round(time.perf_counter() - start, 3)))
+    finally:
+        ## stop reading the rows (the parse stops early) and the shared strings, which keep
+        ## their part of the zip open, then close the workbook
+        if rows is not None:
+            rows.close()
+        if sht is not None and sht['strings']['items'] is not None:
+            sht['strings']['items'].close()
+        if wb is not None:
+            wb.close()
+        
+def calc_remaining_time(pct_complete, start_time):
+    import datetime
+    cur_time = datetime.datetime.now()
+    cur_hour, cur_min, cur_sec = cur_time.hour, cur_time.minute, cur_time.second
+    cur_s = (3600 * cur_hour) + (60 * cur_min) + (cur_sec)
+    
+    start_hour, start_min, start_sec = start_time.hour, start_time.minute, start_time.second
+    start_s = (3600 * start_hour) + (60 * start_min) + (start_sec)
+    
+    sec_so_far = cur_s - start_s
+    ult_sec = sec_so_far / pct_complete
+    sec_resv = ult_sec - sec_so_far
+    min_resv = np.floor(sec_resv / 60)
+    sec_resv2 = round(sec_resv - (60 * min_resv), 0)
+    
+    return(min_resv, sec_resv2, sec_so_far)
+    
+    
+def get_uobg_lookup(file=r'O:\PARM\Corporate Actuarial\Reserving\Assumed Reinsurance\data\uobg_mapping\ds_uobg_lookup_20220727.xlsx', 
+                    sheet_name='Sheet1'):
+    df = pd.read_excel(file, sheet_name)
+    
+    for c in 'major_lob subline business_segment business_sub_segment business_group class_group pr_non_pr cm_occ uobg_desc uobg_desc2'.split():
+        df[c] = df[c].astype('category')
+        
+    df['uobg'] = df['uobg'].astype(float)
+    return(df)
+
+### given a file and anything other than a parsed table, return the failure record for it
+def failure_record(file : str = None, result = None) -> ParseFailure:
+    """
+    # Description
+        Given a deal sheet and the result of parsing it (when it is not a table),
+        return its failure record, with the file set to `file` (so each copy of a
+        byte-identical file gets its own record). A result from before failures were
+        recorded (e.g. None) is recorded with the stage 'unknown'
+    # Inputs
+        file: string, the deal sheet
+        result: the output of `one_file_type1` (or `parse_with_timeout`)
+    # Outputs
+        out: ParseFailure
+    # Example
+        >>> failure_record('test\\\\copy of deal summary.xlsb', None)
+        ParseFailure(file='test\\\\copy of deal summary.xlsb', stage='unknown', error='NoneType', message='None', seconds=None)
+    """
+    if isinstance(result, ParseFailure):
+        return(result._replace(file=file))
+    return(ParseFailure(file, 'unknown', type(result).__name__, repr(result), None))
+
+### hash the contents of a file
+def hash_file(file : str = None, chunk_size : int = 1 << 20) -> str:
+    """
+    # Description
+        Given a file, return a hash of its contents (blake2b), reading the
+        file in chunks so large workbooks are not held in memory
+    # Inputs
+        file: string, the file
+        chunk_size: int, the number of bytes read at a time
+            default: 1MB
+    # Outputs
+        out: string, the hex digest of the contents
+    # Imports
+        import hashlib
+    # Example
+        >>> hash_file('test\\\\test1.txt')
+        '3a985da74fe225b2045c172d6bd390bd855f086e3e9d525b46bfe24511431532'
+    """
+    h = hashlib.blake2b(digest_size=32)
+    with open(file, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return(h.hexdigest())
+
+### given a list of files, return a key that is the same for byte-identical files
+def fingerprint_files(files : list = None, sizes : list = None) -> list:
+    """
+    # Description
+        Given a list of files, return a key for each file, where files with
+        identical contents get the same key. Files are compared by size first,
+        and only files that share their size with another file are hashed
+        (see `hash_file`), so most files are never read. Files that cannot
+        be read are keyed by their path. Pass the sizes from the crawl (see
+        `get_all_files`) so the files are not looked up on the share again
+    # Inputs
+        files: list, the files
+        sizes: list, the size in bytes of each file
+            default: None (look the sizes up with `os.path.getsize`)
+    # Outputs
+        out: list, a key for each file, in the same order as `files`
+    # Imports
+        import os
+    # Example
+        >>> # test1.txt and copy\\\\test1.txt are identical, test2.txt is different
+        >>> fingerprint_files(['test\\\\test1.txt', 'test\\\\copy\\\\test1.txt', 'test\\\\test2.txt'])
+        [('hash', 10, '3a98...'), ('hash', 10, '3a98...'), ('path', 'test\\\\test2.txt')]
+    """
+    # size of each file (None if the file cannot be read)
+    def size(f):
+        try:
+            return(os.path.getsize(f))
+        except OSError:
+            return(None)
+    if sizes is None:
+        sizes = [size(f) for f in files]
+
+    # number of files of each size
+    n_size = {}
+    for s in sizes:
+        n_size[s] = n_size.get(s, 0) + 1
+
+    # hash the files that share a size with another file
+    out = []
+    for f, s in zip(files, sizes):
+        if s is None or n_size[s] == 1:
+            out.append(('path', f))
+            continue
+        try:
+            out.append(('hash', s, hash_file(f)))
+        except OSError:
+            out.append(('path', f))
+
+    return(out)
+    
+### functions whose code decides what a parsed deal sheet looks like
+### (any change to one of these makes the parse cache out of date)
+parser_functions = ['last_needed_row', 'iter_page', 'get_page', 'part_rels', 'ooxml_sheet_part', 'ooxml_text',
+                    'new_shared_strings', 'shared_string', 'get_ooxml_sheet', 'ooxml_column', 'ooxml_value',
+                    'iter_ooxml_page', 'zip_part_chunks', 'xlsb_header', 'xlsb_records', 'xlsb_string',
+                    'xlsb_sheet_part', 'get_xlsb_sheet', 'xlsb_value', 'iter_xlsb_page',
+                    'format_ds_data', 'label_keys', 'label_columns',
+                    'key_contract_terms_row', 'summary_economics_row', 'subject_business_uobg_row',
+                    'parse_contract_summary', 'find_num_layers', 'rename_column', 'parsed_to_table', 'one_file_type1']
+
+### version of the deal sheet parser
+def parser_version() -> str:
+    """
+    # Description
+        Returns a hash of the source code of the parsing functions (see
+        `parser_functions`), so that cached results are thrown away
+        automatically whenever the parsing code changes
+    # Inputs
+        None
+    # Outputs
+        out: string, the parser version
+    # Imports
+        import inspect
+        import hashlib
+    # Example
+        >>> parser_version()
+        '1f3870be274f6c49b3e31a0c6728957f'
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for name in parser_functions:
+        h.update(inspect.getsource(globals()[name]).encode('utf-8'))
+    return(h.hexdigest())
+
+### where the cached parse of a deal sheet is saved
+def cache_entry(file : str = None, cache : str = None, version : str = None) -> str:
+    """
+    # Description
+        Given a deal sheet, return the path of its entry in the parse cache.
+        The entry is keyed by the file's path, size and modified time and the
+        parser version, so a changed file (or changed parser) gets a new entry
+    # Inputs
+        file: string, the deal sheet
+        cache: string, the parse cache folder
+        version: string, the parser version
+            default: None (use `parser_version()`)
+    # Outputs
+        out: string, the path of the cache entry
+    # Imports
+        import os
+        import hashlib
+    # Example
+        >>> cache_entry('test\\\\deal summary.xlsb', './ds_parse_cache')
+        './ds_parse_cache\\\\0cc175b9c0f1b6a831c399e269772661.pkl'
+    """
+    if version is None:
+        version = parser_version()
+    st = os.stat(file)
+    key = '{}|{}|{}|{}'.format(os.path.abspath(file), st.st_size, st.st_mtime_ns, version)
+    return(os.path.join(cache, '{}.pkl'.format(hashlib.md5(key.encode('utf-8')).hexdigest())))
+
+### read a deal sheet's parse from the cache
+def read_parse_cache(file : str = None, cache : str = None, version : str = None) -> tuple:
+    """
+    # Description
+        Given a deal sheet, return its cached parse (see `write_parse_cache`),
+        if there is one for the current version of the file and the parser
+    # Inputs
+        file: string, the deal sheet
+        cache: string, the parse cache folder
+        version: string, the parser version
+            default: None (use `parser_version()`)
+    # Outputs
+        found: bool, True if there is a cached parse
+        result: the cached output of `one_file_type1` (a ParseFailure for a file that could not be parsed)
+    # Imports
+        import pandas as pd
+        import os
+    # Example
+        >>> found, df = read_parse_cache('test\\\\deal summary.xlsb', './ds_parse_cache')
+    """
+    try:
+        entry = cache_entry(file, cache, version)
+    except OSError:
+        return(False, None)
+    if not os.path.exists(entry):
+        return(False, None)
+    return(True, pd.read_pickle(entry)['result'])
+
+### save a deal sheet's parse to the cache
+def write_parse_cache(file : str = None, result = None, cache : str = None, version : str = None) -> None:
+    """
+    # Description
+        Save the output of `one_file_type1` for a deal sheet to the parse cache.
+        A file that could not be parsed is saved with its failure record, so it
+        is not tried again until it (or the parser) changes, unless it failed at
+        one of the `transient_stages` (e.g. it timed out), since it may parse next time
+    # Inputs
+        file: string, the deal sheet
+        result: the output of `one_file_type1` (or `parse_with_timeout`)
+        cache: string, the parse cache folder
+        version: string, the parser version
+            default: None (use `parser_version()`)
+    # Outputs
+        None
+    # Imports
+        import pandas as pd
+        import os
+    # Example
+        >>> write_parse_cache('test\\\\deal summary.xlsb', one_file_type1('test\\\\deal summary.xlsb'), './ds_parse_cache')
+    """
+    if isinstance(result, ParseFailure) and result.stage in transient_stages:
+        return(None)
+    os.makedirs(cache, exist_ok=True)
+    try:
+        entry = cache_entry(file, cache, version)
+    except OSError:
+        return(None)
+
+    ok = isinstance(result, dict)
+    pd.to_pickle(dict(file=file, result=result, reason=None if ok else failure_record(file, result).message), entry + '.tmp')
+    os.replace(entry + '.tmp', entry)
+
+### read the deal sheets already finished by an interrupted run
+def load_checkpoint(checkpoint : str = None, version : str = None) -> dict:
+    """
+    # Description
+        Read the manifest of an interrupted `all_files` run (see
+        `save_checkpoint`), and return the parse of every deal sheet that was
+        finished, as long as neither the file nor the parser has changed since
+    # Inputs
+        checkpoint: string, the checkpoint folder
+        version: string, the parser version
+            default: None (use `parser_version()`)
+    # Outputs
+        out: dict, {file: output of `one_file_type1` (a ParseFailure if it could not be parsed)}
+    # Imports
+        import pandas as pd
+        import os
+    # Example
+        >>> done = load_checkpoint('./ds_checkpoint')
+        >>> len(done)
+        1234
+    """
+    if version is None:
+        version = parser_version()
+    manifest = os.path.join(checkpoint, 'manifest.csv')
+    if not os.path.exists(manifest):
+        return({})
+
+    # (a manifest from before the parser version was saved cannot be trusted)
+    done = pd.read_csv(manifest, dtype=str)
+    if 'version' not in done.columns:
+        return({})
+
+    out = {}
+    for file, size, mtime, entry in done.loc[done.version.eq(version), 'file size mtime entry'.split()].values:
+        try:
+            st = os.stat(file)
+        except OSError:
+            continue
+        if (str(st.st_size), str(st.st_mtime_ns)) == (size, mtime) and os.path.exists(entry):
+            out[file] = pd.read_pickle(entry)
+    return(out)
+
+### save one finished deal sheet to the checkpoint
+def save_checkpoint(file : str = None, result = None, checkpoint : str = None, version : str = None) -> None:
+    """
+    # Description
+        Save the parse of one deal sheet to the checkpoint folder and add it
+        to the manifest, with the parser version, so that an interrupted
+        `all_files` run can carry on where it stopped (see `load_checkpoint`).
+        A file that failed at one of the `transient_stages` (e.g. it timed out)
+        is not saved, so it is tried again
+    # Inputs
+        file: string, the deal sheet
+        result: the output of `one_file_type1` (or `parse_with_timeout`)
+        checkpoint: string, the checkpoint folder
+        version: string, the parser version
+            default: None (use `parser_version()`)
+    # Outputs
+        None
+    # Imports
+        import pandas as pd
+        import os
+        import csv
+    # Example
+        >>> save_checkpoint('test\\\\deal summary.xlsb', df, './ds_checkpoint')
+    """
+    if isinstance(result, ParseFailure) and result.stage in transient_stages:
+        return(None)
+    if version is None:
+        version = parser_version()
+    os.makedirs(checkpoint, exist_ok=True)
+    manifest = os.path.join(checkpoint, 'manifest.csv')
+
+    # the result first, then the manifest line, so the manifest never
+    # points at a missing result
+    entry = os.path.join(checkpoint, '{}.pkl'.format(hashlib.md5(file.encode('utf-8')).hexdigest()))
+    ok = isinstance(result, dict)
+    pd.to_pickle(result, entry)
+
+    st = os.stat(file)
+    new = not os.path.exists(manifest)
+    with open(manifest, 'a', newline='') as m:
+        w = csv.writer(m)
+        if new:
+            w.writerow('file size mtime status entry version'.split())
+        w.writerow([file, st.st_size, st.st_mtime_ns, 'parsed' if ok else 'failed', entry, version])
+
+### remove the checkpoint once a run has finished
+def clear_checkpoint(checkpoint : str = None) -> None:
+    """
+    # Description
+        Remove the checkpoint folder, once the output of a run is saved,
+        so that the next run starts from the beginning
+    # Inputs
+        checkpoint: string, the checkpoint folder
+    # Outputs
+        None
+    # Imports
+        import shutil
+    # Example
+        >>> clear_checkpoint('./ds_checkpoint')
+    """
+    shutil.rmtree(checkpoint, ignore_errors=True)
+
+### parse one deal sheet, giving up after `timeout` seconds
+def parse_with_timeout(file : str = None, timeout : float = None):
+    """
+    # Description
+        Given a deal sheet, parse it with `one_file_type1`, giving up after
+        `timeout` seconds. The parse runs in a background thread (signals
+        cannot interrupt a parse on windows), so a file that times out is
+        left to finish in the background and its result is thrown away.
+        A thread cannot be stopped, so the parse keeps its CPU and memory
+        until it finishes or the process exits: `all_files` with workers
+        replaces each worker process after its chunk of files when there
+        is a timeout, but without workers it carries on in this process
+    # Inputs
+        file: string, the deal sheet
+        timeout: float, seconds to wait for the parse
+            default: None (wait as long as it takes)
+    # Outputs
+        out: the output of `one_file_type1`, or a ParseFailure with the stage 'timeout'
+    # Imports
+        import threading
+    # Example
+        >>> parse_with_timeout('test\\\\deal summary.xlsb', timeout=300)
+    """
+    if timeout is None:
+        return(one_file_type1(file))
+
+    start = time.perf_counter()
+    out = []
+    t = threading.Thread(target=lambda: out.append(one_file_type1(file)), daemon=True)
+    t.start()
+    t.join(timeout)
+
+    if t.is_alive():
+        print('{} took more than {}s, skipping it'.format(file, timeout))
+        return(ParseFailure(file, 'timeout', 'TimeoutError', 'took more than {}s'.format(timeout),
+                            round(time.perf_counter() - start, 3)))
+    return(out[0] if len(out) > 0 else None)
+
+### parse a chunk of deal sheets (in a worker process)
+def parse_chunk(files : list = None, timeout : float = None) -> list:
+    """
+    # Description
+        Given a list of deal sheets, parse each one with `parse_with_timeout`.
+        This is what each worker process runs in `all_files`
+    # Inputs
+        files: list, the deal sheets
+        timeout: float, seconds to wait for each parse
+            default: None (wait as long as it takes)
+    # Outputs
+        out: list, the output of `parse_with_timeout` for each file, in the same order
+    # Example
+        >>> parse_chunk(['test\\\\deal summary 1.xlsb', 'test\\\\deal summary 2.xlsb'], timeout=300)
+    """
+    return([parse_with_timeout(f, timeout) for f in files])
+
+### start an empty table for parsed deal sheets to be appended to, column by column
+def new_layer_buffer(capacity : int = 1024) -> dict:
+    """
+    # Description
+        Return an empty layer buffer: one preallocated array per column, which
+        the tables from `parsed_to_table` are copied into (see `append_layers`),
+        so a whole batch of deal sheets ends up as one table without making a
+        DataFrame for each file
+    # Inputs
+        capacity: int, the number of rows to allocate to begin with (the buffer
+            doubles in size whenever it fills up)
+            default: 1024
+    # Outputs
+        buffer: dict, with
+            n: int, the number of rows used so far
+            capacity: int, the number of rows allocated
+            columns: dict, {column name: numpy array}
+    # Imports
+        import numpy as np
+    # Example
+        >>> buffer = new_layer_buffer()
+        >>> append_layers(buffer, one_file_type1('test\\\\deal summary.xlsb'), filename='test\\\\deal summary.xlsb')
+        >>> df = layer_buffer_to_df(buffer)
+    """
+    return(dict(n=0, capacity=capacity, columns={}))
+
+### append one parsed deal sheet to the layer buffer
+def append_layers(buffer : dict = None, table : dict = None, **constants) -> None:
+    """
+    # Description
+        Copy the columns of `table` (the output of `parsed_to_table`) onto the end
+        of the layer buffer, along with a column for each of `constants`, which
+        are the same on every row. A column that has not been seen before is
+        added, with NaN for the rows already in the buffer, and the rows of this
+        table get NaN in the columns it does not have (as `pd.concat` would)
+    # Inputs
+        buffer: dict, the layer buffer (see `new_layer_buffer`), updated in place
+            default: None
+        table: dict, {column name: values}, with one value per layer in each column
+            default: None
+        constants: values to add as columns, e.g. filename='deal summary.xlsb'
+    # Outputs
+        None
+    # Imports
+        import numpy as np
+    """
+    columns = buffer['columns']
+    n, k = buffer['n'], len(table['layer'])
+
+    # make room for the new rows, doubling the size of every column
+    if n + k > buffer['capacity']:
+        capacity = max(2 * buffer['capacity'], n + k)
+        for c in columns:
+            grown = np.full(capacity, np.nan, dtype=object)
+            grown[:n] = columns[c][:n]
+            columns[c] = grown
+        buffer['capacity'] = capacity
+
+    for c, values in list(table.items()) + list(constants.items()):
+        if c not in columns:
+            columns[c] = np.full(buffer['capacity'], np.nan, dtype=object)
+        columns[c][n:n + k] = values
+    buffer['n'] = n + k
+
+### columns whose values are kept as they are read, rather than formatted by `format_ds_values`
+unformatted_columns = 'layer client_name crm_id contract_name mga broker filename'.split()
+
+### return the rows in the layer buffer as a DataFrame
+def layer_buffer_to_df(buffer : dict = None, raw_columns : list = unformatted_columns) -> pd.DataFrame:
+    """
+    # Description
+        Return the rows used in the layer buffer (see `new_layer_buffer`) as
+        a DataFrame, with the columns in the order they were first seen. The
+        parsers keep the values as they are read, so each column (other than
+        `raw_columns`) is formatted here, in one go (see `format_ds_values`).
+        The columns are held as python objects in the buffer, so each one is
+        then converted to the type of its values (e.g. float64 for a column of numbers)
+    # Inputs
+        buffer: dict, the layer buffer
+            default: None
+        raw_columns: list, the columns not to format
+            default: unformatted_columns
+    # Outputs
+        df: pandas DataFrame
+    # Imports
+        import pandas as pd
+    """
+    n = buffer['n']
+    out = {}
+    for c, values in buffer['columns'].items():
+        out[c] = values[:n] if c in raw_columns else format_ds_values(values[:n])
+    return(pd.DataFrame(out).infer_objects())
+
+### write missing values as 'N/A'
+def recode_missing(df : pd.DataFrame = None) -> pd.DataFrame:
+    """
+    # Description
+        Given the parsed deal sheets, replace every missing value (e.g. a column
+        that one deal sheet has and another does not) with 'N/A'
+    # Inputs
+        df: pandas DataFrame, the parsed deal sheets
+            default: None
+    # Outputs
+        df: pandas DataFrame, the same table with 'N/A' for missing values
+    # Imports
+        import pandas as pd
+    """
+    df['one'], df['zero'], df['blank'], df['na'] = 1, 0, '', 'N/A' # series for recoding
+    for c in df.columns.tolist():
+        if c in ['one', 'zero', 'blank', 'na']:                    # don't recode the recoding cols
+            pass
+        else:
+            df[c] = df['na'].where(df[c].isna(), other=df[c])
+    df.drop('one zero blank na'.split(), axis=1, inplace=True)     # remove the series used for recoding 
+    return(df)
+
+### add the description of each subject business UOBG
+def join_uobg_desc(df : pd.DataFrame = None, uobg_lookup : pd.DataFrame = None) -> pd.DataFrame:
+    """
+    # Description
+        Given the parsed deal sheets, add a `uobg_{i}_desc` column after each
+        `uobg_{i}` column (i = 1, ..., 8), from the UOBG lookup table. A table
+        without some of the `uobg_{i}` columns gets them (empty) first
+    # Inputs
+        df: pandas DataFrame, the parsed deal sheets
+            default: None
+        uobg_lookup: pandas DataFrame, the output of `get_uobg_lookup`
+            default: None
+    # Outputs
+        df: pandas DataFrame, the same table with the UOBG descriptions
+    # Imports
+        import pandas as pd
+    """
+    ulk = uobg_lookup['uobg uobg_desc'.split()].set_index('uobg')
+    for i in range(1, 9):
+        if 'uobg_{}'.format(i) not in df.columns:
+            df['uobg_{}'.format(i)] = np.nan
+        df = df.set_index('uobg_{}'.format(i))
+        df = df.join(ulk, how='left')
+        df = df.rename(columns={'uobg_desc':'uobg_{}_desc'.format(i)})
+        df = df.reset_index().rename(columns={'index':'uobg_{}'.format(i)})
+    return(df)
+
+### start writing parsed deal sheets to a dataset folder, a group of files at a time
+def new_output_writer(folder : str = None, files_per_group : int = 50, uobg_lookup : pd.DataFrame = None) -> dict:
+    """
+    # Description
+        Return a writer that appends parsed deal sheets (see `write_layers`) to a
+        dataset folder: every `files_per_group` deal sheets are written out as one
+        parquet file (a row group), so only one group is ever held in memory, and
+        the groups already written can be read (see `read_output`) while the run
+        is still going
+    # Inputs
+        folder: string, the dataset folder (created if it does not exist)
+            default: None
+        files_per_group: int, the number of deal sheets in each file
+            default: 50
+        uobg_lookup: pandas DataFrame, the output of `get_uobg_lookup`
+            default: None
+    # Outputs
+        writer: dict, with the folder, the layer buffer for the current group,
+            and the number of files & groups written so far
+    # Imports
+        import os
+        import pyarrow (used by `pd.DataFrame.to_parquet`)
+    # Example
+        >>> writer = new_output_writer('./ds_data_2023_01_31_12_00_00', 50, get_uobg_lookup())
+        >>> write_layers(writer, one_file_type1('test\\\\deal summary.xlsb'), 'test\\\\deal summary.xlsb')
+        >>> flush_output(writer)
+        './ds_data_2023_01_31_12_00_00\\\\part-00000.parquet'
+    """
+    # the parquet files need pyarrow, so check for it before anything is parsed
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError('pyarrow is needed to write the output folder {} (pip install pyarrow), '
+                          'or run `all_files` without `output` to return the table instead'.format(folder))
+
+    os.makedirs(folder, exist_ok=True)
+    return(dict(folder=folder, files_per_group=files_per_group, uobg_lookup=uobg_lookup,
+                buffer=new_layer_buffer(), n_files=0, n_parts=0))
+
+### add one parsed deal sheet to the dataset
+def write_layers(writer : dict = None, table : dict = None, file : str = None) -> None:
+    """
+    # Description
+        Append one parsed deal sheet (the output of `parsed_to_table`) to the
+        current group, writing the group out once it has `files_per_group` files
+    # Inputs
+        writer: dict, the writer (see `new_output_writer`), updated in place
+            default: None
+        table: dict, the parsed deal sheet
+            default: None
+        file: string, the deal sheet the data came from
+            default: None
+    # Outputs
+        None
+    """
+    append_layers(writer['buffer'], table, filename=file)
+    writer['n_files'] = writer['n_files'] + 1
+    if writer['n_files'] >= writer['files_per_group']:
+        flush_output(writer)
+
+### write the current group of parsed deal sheets to the dataset
+def flush_output(writer : dict = None) -> str:
+    """
+    # Description
+        Write the deal sheets in the current group to the next parquet file in
+        the dataset folder, and start a new group. The UOBG descriptions are
+        joined on, and missing values are left missing (`read_output` recodes them).
+        Parquet needs one type per column, so a column with a mix of types (e.g.
+        numbers and 'N/A') is written as text. The file is written under a temporary
+        name and then renamed, so a reader never sees half a file
+    # Inputs
+        writer: dict, the writer (see `new_output_writer`), updated in place
+            default: None
+    # Outputs
+        out: string, the file written (None if the group was empty)
+    # Imports
+        import pandas as pd
+        import os
+        import pyarrow (used by `pd.DataFrame.to_parquet`)
+    """
+    if writer['buffer']['n'] == 0:
+        return(None)
+
+    df = layer_buffer_to_df(writer['buffer'])
+    df = join_uobg_desc(df, writer['uobg_lookup'])
+
+    # one type per column
+    for c in df.columns[df.dtypes == object]:
+        if pd.api.types.infer_dtype(df[c], skipna=True) not in ['string', 'boolean', 'empty']:
+            df[c] = df[c].where(df[c].isna(), df[c].astype(str))
+
+    out = os.path.join(writer['folder'], 'part-{:05d}.parquet'.format(writer['n_parts']))
+    df.to_parquet(out + '.tmp', engine='pyarrow', index=False)
+    os.replace(out + '.tmp', out)
+
+    writer['buffer'] = new_layer_buffer()
+    writer['n_files'], writer['n_parts'] = 0, writer['n_parts'] + 1
+    return(out)
+
+### read a dataset folder written by the output writer
+def read_output(folder : str = None) -> pd.DataFrame:
+    """
+    # Description
+        Read every file in a dataset folder (see `new_output_writer`) into one
+        table, with 'N/A' for missing values, in the same layout as the `all_files`
+        output. This works while the run is still writing the folder, and gives
+        the groups finished so far
+    # Inputs
+        folder: string, the dataset folder
+            default: None
+    # Outputs
+        df: pandas DataFrame, the parsed deal sheets
+    # Imports
+        import pandas as pd
+        import os
+        import pyarrow (used by `pd.read_parquet`)
+    # Example
+        >>> df = read_output('./ds_data_2023_01_31_12_00_00')
+        >>> df.to_excel('./ds_data_2023_01_31_12_00_00.xlsx')
+    """
+    parts = [os.path.join(folder, f) for f in sorted(os.listdir(folder)) if f.endswith('.parquet')]
+    df = pd.concat([pd.read_parquet(f, engine='pyarrow') for f in parts]).reset_index(drop=True)
+    return(recode_missing(df))
+
+def all_files(files, show_every=5, dedupe=True, max_workers=None, chunk_size=8, timeout=None, cache=None, checkpoint=None,
+              output=None, files_per_group=50, uobg_lookup=None, sizes=None, reparse=False):
+    buffer = new_layer_buffer()
+    others = []
+    failures = []
+
+    ## the uobg descriptions joined on at the end
+    if uobg_lookup is None:
+        uobg_lookup = get_uobg_lookup()
+
+    ## with an `output` folder, each deal sheet is written out as soon as it is parsed
+    ## (in groups of `files_per_group`, see `new_output_writer`), instead of being kept
+    ## for one table at the end
+    writer = None if output is None else new_output_writer(output, files_per_group, uobg_lookup)
+
+    ## byte-identical copies of a deal sheet are only parsed once
+    ## (keyed by size & content hash, see `fingerprint_files`, with the sizes
+    ## from the crawl if they are given)
+    keys = fingerprint_files(files, sizes) if dedupe else [('path', f) for f in files]
+    to_parse = {}
+    for f, k in zip(files, keys):
+        to_parse.setdefault(k, f)
+    n = len(to_parse)
+    if n < len(files):
+        print('{} files, {} distinct ({} copies will not be parsed again)'.format(len(files), n, len(files) - n))
+
+    ## every file with the same contents gets the same result
+    copies = {}
+    for f, k in zip(files, keys):
+        copies.setdefault(k, []).append(f)
+
+    ## keep a result for the table at the end, or, with an `output` folder, write out
+    ## each file as soon as it and every file before it are finished, so the output
+    ## is in the order of `files` whichever file finishes first
+    ## (a result is only held until its last copy is written)
+    results = {}
+    remaining = {k: len(fs) for k, fs in copies.items()}
+    n_written = 0
+    def keep(k, temp):
+        nonlocal n_written
+        results[k] = temp
+        if writer is None:
+            return(None)
+        while n_written < len(files) and keys[n_written] in results:
+            f, kf = files[n_written], keys[n_written]
+            if not isinstance(results[kf], (dict, pd.DataFrame)):
+                others.append(f)
+                failures.append(failure_record(f, results[kf]))
+            else:
+                write_layers(writer, results[kf], f)
+            remaining[kf] = remaining[kf] - 1
+            if remaining[kf] == 0:
+                del results[kf]
+            n_written = n_written + 1
+
+    ## the parser version, so the cache and the checkpoint are only used
+    ## for files parsed by the current parser
+    version = parser_version()
+
+    ## files that have not changed since they were last parsed (by the
+    ## current parser) are read from the parse cache instead
+    ## (unless `reparse`, e.g. when retrying failures: every file is parsed
+    ## again, and the new results replace the ones in the cache)
+    if cache is not None and not reparse:
+        for k, f in list(to_parse.items()):
+            found, temp = read_parse_cache(f, cache, version)
+            if found:
+                keep(k, temp)
+                del to_parse[k]
+        print('{} files read from the parse cache, {} to parse'.format(n - len(to_parse), len(to_parse)))
+        n = len(to_parse)
+
+    ## files already finished by an interrupted run are not parsed again
+    if checkpoint is not None:
+        done = load_checkpoint(checkpoint, version)
+        for k, f in list(to_parse.items()):
+            if f in done:
+                keep(k, done[f])
+                del to_parse[k]
+        if n > len(to_parse):
+            print('resuming: {} files already finished, {} to parse'.format(n - len(to_parse), len(to_parse)))
+        n = len(to_parse)
+
+    ## keep each result as soon as it is finished
+    ## (saved to the cache & the checkpoint straight away, so nothing is lost if the run stops)
+    counter=1
+    def finish(k, temp):
+        keep(k, temp)
+        if cache is not None:
+            write_parse_cache(to_parse[k], temp, cache, version)
+        if checkpoint is not None:
+            save_checkpoint(to_parse[k], temp, checkpoint, version)
+    
+    ## loop through the distinct files, reading one by one
+    start_time = datetime.now()
+    if max_workers is None:
+        for k, f in to_parse.items():
+            if (counter % show_every == 0) or (counter == n):
+                m, s, sofar = calc_remaining_time(counter / n, start_time)
+                print('{} / {} ({}%) complete -- est. {}m{}s remaining'.format(counter, n, round(100 * (counter / n), 1), int(m), int(s)))
+            finish(k, parse_with_timeout(f, timeout))
+            counter = counter + 1
+
+    ## or spread the files over a pool of processes, in chunks of `chunk_size` files
+    ## (the results are put back by key, so the output order does not depend on
+    ## which chunk finishes first, and progress is reported here in the parent)
+    ## (with a `timeout`, each process parses one chunk and is then replaced, so a
+    ## parse that timed out, which cannot be stopped, does not keep running
+    ## alongside the next chunks, see `parse_with_timeout`)
+    else:
+        keys_to_parse = list(to_parse.keys())
+        chunks = [keys_to_parse[j:j + chunk_size] for j in range(0, n, chunk_size)]
+        pool_options = dict(max_tasks_per_child=1) if timeout is not None else {}
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, **pool_options) as executor:
+            futures = {executor.submit(parse_chunk, [to_parse[k] for k in chunk], timeout): chunk for chunk in chunks}
+            for future in concurrent.futures.as_completed(futures):
+                chunk = futures[future]
+                try:
+                    chunk_results = future.result()
+                except Exception as e:
+                    ## the worker itself failed, so every file in the chunk counts as an error
+                    print('a chunk of {} files failed ({})'.format(len(chunk), e))
+                    chunk_results = [ParseFailure(to_parse[k], 'worker', type(e).__name__, str(e), None) for k in chunk]
+                for k, temp in zip(chunk, chunk_results):
+                    finish(k, temp)
+                    if (counter % show_every == 0) or (counter == n):
+                        m, s, sofar = calc_remaining_time(counter / n, start_time)
+                        print('{} / {} ({}%) complete -- est. {}m{}s remaining'.format(counter, n, round(100 * (counter / n), 1), int(m), int(s)))
+                    counter = counter + 1
+
+    ## everything has already been written out, apart from the last group
+    ## (the data is in the `output` folder, see `read_output`)
+    if writer is not None:
+        flush_output(writer)
+        return(dict(df=None, others=others, failures=pd.DataFrame(failures, columns=ParseFailure._fields)))
+
+    ## give each file the result for its contents, in the original file order,
+    ## copying each one onto the end of a single table
+    ## (a DataFrame can still come back from a checkpoint written before the
+    ## parser returned plain columns, and is appended the same way)
+    for f, k in zip(files, keys):
+        temp = results[k]
+        if not isinstance(temp, (dict, pd.DataFrame)):
+            ## this only happens when there is an error, so add this to the list of "others"
+            ## (and record why, see `ParseFailure`)
+            others.append(f)
+            failures.append(failure_record(f, temp))
+        else:
+            append_layers(buffer, temp, filename=f)
+    df = layer_buffer_to_df(buffer)
+    
+    ## join the uobg_desc field
+    df = join_uobg_desc(df, uobg_lookup)
+    
+    ## format the columns
+    df = recode_missing(df)
+    
+    ## return a dictionary with both the data and the "others" list of files that didn't work correctly
+    ## (with a table of why each one failed)
+    out = dict(df=df, others=others, failures=pd.DataFrame(failures, columns=ParseFailure._fields))
+    return(out)
+    
+### save one deal sheet's parsed data to the deal sheet store
+def save_to_store(table : dict = None, file : str = None, store : str = None) -> str:
+    """
+    # Description
+        Save the parsed data for one deal sheet (the output of `one_file_type1`)
+        to the deal sheet store, a folder with one entry per deal sheet. Saving
+        the same deal sheet again replaces its entry, so a changed file does
+        not show up twice. The entry is written to a temporary file first and
+        then renamed, so a reader never sees half an entry
+    # Inputs
+        table: dict, the parsed data (see `parsed_to_table`)
+        file: string, the deal sheet the data came from
+        store: string, the deal sheet store folder
+    # Outputs
+        out: string, the path of the entry
+    # Imports
+        import pandas as pd
+        import os
+        import hashlib
+    # Example
+        >>> save_to_store(one_file_type1('test\\\\deal summary.xlsb'), 'test\\\\deal summary.xlsb', './ds_data_store')
+        './ds_data_store\\\\5d41402abc4b2a76b9719d911017c592.pkl'
+    """
+    os.makedirs(store, exist_ok=True)
+
+    # one entry per deal sheet path
+    out = os.path.join(store, '{}.pkl'.format(hashlib.md5(file.encode('utf-8')).hexdigest()))
+
+    # keep the source file with the data (formatted as in `all_files`)
+    buffer = new_layer_buffer(capacity=len(table['layer']))
+    append_layers(buffer, table, filename=file)
+    df = layer_buffer_to_df(buffer)
+
+    pd.to_pickle(df, out + '.tmp')
+    os.replace(out + '.tmp', out)
+    return(out)
+
+### read every deal sheet in the deal sheet store into one table
+def read_store(store : str = None) -> pd.DataFrame:
+    """
+    # Description
+        Read every entry in the deal sheet store (see `save_to_store`) into
+        one table, in the same layout as the `all_files` output before the
+        uobg descriptions are joined
+    # Inputs
+        store: string, the deal sheet store folder
+    # Outputs
+        out: pandas DataFrame, the parsed data for every deal sheet in the store
+    # Imports
+        import pandas as pd
+        import os
+    # Example
+        >>> df = read_store('./ds_data_store')
+    """
+    entries = [os.path.join(store, f) for f in sorted(os.listdir(store)) if f.endswith('.pkl')]
+    return(pd.concat([pd.read_pickle(f) for f in entries]).reset_index(drop=True))
+
+### keep watching the folder, parsing deal sheets as they are saved
+def watch(folder : str = None, catalog_file : str = None, store : str = None,
+          poll_seconds : float = 15, settle_seconds : float = 10,
+          max_workers : int = None, rules : dict = None, max_polls : int = None) -> None:
+    """
+    # Description
+        Keep polling the folder (with `refresh_catalog`, so only the folders
+        that changed are listed) and parse each new or changed deal sheet
+        (.xlsb, .xlsx or .xlsm, see `sheet_readers`) with `one_file_type1`, saving the result to the deal sheet store (see
+        `save_to_store`).
+
+        A file is only parsed once its size and modified time have stayed
+        the same for `settle_seconds`, so files that are still being written
+        or copied are not read half way through. Excel lock files ('~$...')
+        are ignored. Stop with Ctrl-C
+    # Inputs
+        folder: string, the folder to watch
+        catalog_file: string, the catalog file (see `refresh_catalog`)
+        store: string, the deal sheet store folder
+        poll_seconds: float, seconds between polls
+            default: 15
+        settle_seconds: float, seconds a file must stay unchanged before it is parsed
+            default: 10
+        max_workers: int, the number of folders to list at once
+            default: None (list one folder at a time)
+        rules: dict, include/exclude rules applied while crawling (see `compile_rules`)
+            default: None (keep every file)
+        max_polls: int, stop after this many polls
+            default: None (keep going until stopped)
+    # Outputs
+        None
+    # Imports
+        import os
+        import time
+    # Example
+        >>> watch(folder, catalog_file, './ds_data_store', rules=crawl_rules)
+        watching O:\\PARM\\Corporate Actuarial\\Reserving\\Assumed Reinsurance for new deal sheets
+        ...
+    """
+    print('watching {} for new deal sheets'.format(folder))
+
+    # files waiting to settle: {path: (size, mtime, time it last changed)}
+    pending = {}
+
+    n_polls = 0
+    try:
+        while max_polls is None or n_polls < max_polls:
+            n_polls = n_polls + 1
+
+            # new or changed deal sheets since the last poll
+            _, changed = refresh_catalog(folder, catalog_file, max_workers=max_workers, rules=rules)
+            # (any workbook type there is a reader for, see `sheet_readers`)
+            changed = changed.loc[changed.file.str.lower().str.endswith(tuple(sheet_readers)) & ~changed.file.str.startswith('~$')]
+            for f in file_paths(changed)[1]:
+                pending.setdefault(f, (None, None, time.time()))
+
+            # parse the files that have settled
+            for f, (size, mtime, since) in list(pending.items()):
+                try:
+                    st = os.stat(f)
+                except OSError:
+                    # deleted (or renamed) before it settled
+                    del pending[f]
+                    continue
+
+                # still changing, so start the clock again
+                if (st.st_size, st.st_mtime_ns) != (size, mtime):
+                    pending[f] = (st.st_size, st.st_mtime_ns, time.time())
+                    continue
+
+                if time.time() - since >= settle_seconds:
+                    del pending[f]
+                    print('parsing {}'.format(f))
+                    table = one_file_type1(f)
+                    if isinstance(table, dict):
+                        save_to_store(table, f, store)
+
+            time.sleep(poll_seconds)
+    except KeyboardInterrupt:
+        print('stopped watching {}'.format(folder))
+    
+def main(retry_failed=False):
+
+    ### with `retry_failed`, only the files that failed last time are parsed again
+    ### (e.g. after a fix to the parser), from the failures table saved by the last run
+    if retry_failed:
+        file_list = pd.read_csv(failures_file).file.drop_duplicates().tolist()
+        sizes = None
+        print('retrying {} files that failed last time (see {})'.format(len(file_list), failures_file))
+
+    else:
+        ### df with all the deal sheet files
+        ### (only the folders that changed since the last run are listed again,
+        ### and template folders, databases, etc are skipped while crawling,
+        ### see `crawl_rules` in user_inputs.py)
+        df, changed = refresh_catalog(folder, catalog_file, max_workers=crawl_workers, rules=crawl_rules)
+
+        ### flags for clues in the filename re: what type of contract
+        ### (is_final, is_xlsb, is_qs, is_cat, ... see `filename_categories`)
+        df1 = pd.concat([df, classify_filenames(df.file)], axis=1)
+
+        ### only the newest version of each deal sheet is parsed, unless
+        ### `parse_all_versions` is set in user_inputs.py
+        ### (.xlsx/.xlsm deal sheets are read too, see `sheet_readers`)
+        df1 = select_latest_versions(df1.loc[df1.is_xlsb | df1.is_xlsx | df1.is_xlsm, :], all_versions=parse_all_versions)
+
+        ### create files df that holds filenames
+        ### (with the sizes from the crawl, so finding the copies of a deal sheet
+        ### does not look every file up again)
+        files = df1['top_level_folder folder file size'.split()]
+        files['filepath'], files['filename'] = file_paths(files)
+        file_list = files.filename.tolist()
+        sizes = files['size'].tolist()
+
+    ### read in uobg lookup df
+    uobg_lookup = get_uobg_lookup()
+
+    ### output folder, named for when the run started
+    n = datetime.now()
+    yr, mth, dy, h, m, s = n.year, n.month, n.day, n.hour, n.minute, n.second
+
+    ts = '{}_{}_{}_{}_{}_{}'.format(yr,
+                                    ('0' if mth < 10 else '') + str(mth),
+                                    ('0' if dy < 10 else '') + str(dy),
+                                    ('0' if h < 10 else '') + str(h),
+                                    ('0' if m < 10 else '') + str(m),
+                                    ('0' if s < 10 else '') + str(s))
+
+    ### run process 
+    ### (finished files are saved to `checkpoint` as they go, so an interrupted run
+    ### picks up where it stopped when it is run again, and the parsed data is written
+    ### to the output folder as it goes, `files_per_group` deal sheets per file;
+    ### read it back with `read_output`)
+    ### (a retry is short, so it does not checkpoint, and leaves the checkpoint of
+    ### an interrupted full run alone; it parses the files again rather than reading
+    ### their failures back from the parse cache)
+    d = all_files(file_list, show_every=show_every, max_workers=parse_workers, timeout=parse_timeout,
+                  cache=parse_cache, checkpoint=None if retry_failed else checkpoint, output='{}_{}'.format(output, ts),
+                  files_per_group=files_per_group, uobg_lookup=uobg_lookup, sizes=sizes, reparse=retry_failed)
+
+    ### why each file failed (path, stage, exception type & message, seconds),
+    ### read by the next `--retry-failed` run
+    d['failures'].to_csv(failures_file, index=False)
+    print('{} files could not be parsed (see {})'.format(d['failures'].shape[0], failures_file))
+
+    ### the run finished, so the next run starts from the beginning
+    if not retry_failed:
+        clear_checkpoint(checkpoint)
+    
+# `python find_deal_sheets.py watch` keeps watching the folder for new deal sheets,
+# `python find_deal_sheets.py --retry-failed` parses only the files that failed last time,
+# otherwise search the whole folder once
+# (the guard keeps the worker processes in `all_files` from running this again)
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'watch':
+        watch(folder, catalog_file, store, max_workers=crawl_workers, rules=crawl_rules)
+    elif '--retry-failed' in sys.argv[1:]:
+        main(retry_failed=True)
+    else:
+        main()
\ No newline at end of file
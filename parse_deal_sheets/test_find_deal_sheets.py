@@ -0,0 +1,559 @@
+import os
+import struct
+import sys
+import threading
+import zipfile
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+import pyxlsb
+import pytest
+
+# find_deal_sheets imports user_inputs from its own folder
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import find_deal_sheets as fds
+
+MAIN = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+
+### a small deal-sheet tree: top level files, a subfolder and a sub-subfolder
+@pytest.fixture
+def tree(tmp_path):
+    top = tmp_path / 'deals'
+    for rel, size in [('Deal Summary A.xlsb', 10), ('notes.txt', 3),
+                      ('2022/Deal Summary B.xlsb', 20), ('2022/Q3/Deal Summary C.xlsx', 30)]:
+        path = top / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b'x' * size)
+    return(str(top))
+
+
+def test_file_paths_match_os_path_join():
+    df = pd.DataFrame(dict(top_level_folder=['deals', 'deals', 'deals' + os.sep],
+                           folder=['', os.path.join('2022', 'Q3'), '2022'],
+                           file=['a.xlsb', 'b.xlsb', 'c.xlsb']))
+    filepath, filename = fds.file_paths(df)
+    assert filepath.tolist() == [os.path.join(*x) for x in df[['top_level_folder', 'folder']].values]
+    assert filename.tolist() == [os.path.join(*x) for x in df[['top_level_folder', 'folder', 'file']].values]
+
+
+def test_get_all_files_walks_the_tree_once_in_order(tree):
+    df = fds.get_all_files(tree)
+    assert df.folder.tolist() == ['', '', '2022', os.path.join('2022', 'Q3')]
+    assert sorted(df.file[:2]) == ['Deal Summary A.xlsb', 'notes.txt']
+    assert df['size'].tolist() == [os.path.getsize(x) for x in fds.file_paths(df)[1]]
+    assert fds.file_paths(df)[1].map(os.path.exists).all()
+
+
+### point main at the tree, with every file it writes under tmp_path
+@pytest.fixture
+def run_main(tree, tmp_path, monkeypatch):
+    for name, value in dict(folder=tree, catalog_file=str(tmp_path / 'catalog.pkl'), crawl_workers=None,
+                            parse_workers=None, parse_cache=str(tmp_path / 'cache'),
+                            checkpoint=str(tmp_path / 'checkpoint'), output=str(tmp_path / 'ds_data'),
+                            failures_file=str(tmp_path / 'failures.csv'), show_every=100).items():
+        monkeypatch.setattr(fds, name, value)
+    monkeypatch.setattr(fds, 'get_uobg_lookup', lambda: pd.DataFrame(dict(uobg=[1.0], uobg_desc=['Property'])))
+    return(fds.main)
+
+
+def test_main_hands_every_deal_sheet_in_the_tree_to_the_parser(tree, tmp_path, run_main):
+    run_main()
+    failures = pd.read_csv(tmp_path / 'failures.csv')
+    assert sorted(failures.file) == sorted(os.path.join(tree, x) for x in
+                                           ['Deal Summary A.xlsb', os.path.join('2022', 'Deal Summary B.xlsb'),
+                                            os.path.join('2022', 'Q3', 'Deal Summary C.xlsx')])
+
+
+def test_parallel_crawl_matches_the_sequential_crawl(tree):
+    for sub in 'abcdefgh':
+        os.makedirs(os.path.join(tree, '2023', sub, 'inner'))
+        open(os.path.join(tree, '2023', sub, 'inner', 'Deal Summary {}.xlsb'.format(sub)), 'w').close()
+    assert fds.crawl_folders(tree, max_workers=4) == fds.crawl_folders(tree)
+    pd.testing.assert_frame_equal(fds.get_all_files(tree, max_workers=4), fds.get_all_files(tree))
+
+
+def test_crawl_treats_an_unreadable_folder_as_empty(tree, monkeypatch):
+    scan_folder = fds.scan_folder
+    def fail_on_2022(fold):
+        if os.path.basename(fold) == '2022':
+            raise PermissionError('access denied')
+        return(scan_folder(fold))
+    monkeypatch.setattr(fds, 'scan_folder', fail_on_2022)
+    df = fds.get_all_files(tree, max_workers=2)
+    assert df.folder.tolist() == ['', '']
+
+
+### save a file the way Excel does: write a new file and rename it over the old one
+def save_as_excel(path, data):
+    with open(path + '.tmp', 'wb') as f:
+        f.write(data)
+    os.replace(path + '.tmp', path)
+    # (the folder's mtime can tick more coarsely than the test runs)
+    st = os.stat(os.path.dirname(path))
+    os.utime(os.path.dirname(path), ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+
+def test_refresh_catalog_only_lists_changed_folders(tree, tmp_path, monkeypatch):
+    catalog_file = str(tmp_path / 'catalog.pkl')
+    df, changed = fds.refresh_catalog(tree, catalog_file)
+    assert changed.status.eq('new').all() and changed.shape[0] == df.shape[0] == 4
+
+    listed = []
+    scan_folder = fds.scan_folder
+    monkeypatch.setattr(fds, 'scan_folder', lambda fold: listed.append(fold) or scan_folder(fold))
+    df, changed = fds.refresh_catalog(tree, catalog_file)
+    assert listed == [] and changed.empty and df.shape[0] == 4
+
+    save_as_excel(os.path.join(tree, '2022', 'Deal Summary B.xlsb'), b'y' * 25)
+    save_as_excel(os.path.join(tree, '2022', 'Deal Summary D.xlsb'), b'y')
+    df, changed = fds.refresh_catalog(tree, catalog_file)
+    assert listed == [os.path.join(tree, '2022')]
+    assert dict(zip(changed.file, changed.status)) == {'Deal Summary B.xlsb': 'modified', 'Deal Summary D.xlsb': 'new'}
+
+
+def test_refresh_catalog_after_the_rules_change(tree, tmp_path):
+    catalog_file = str(tmp_path / 'catalog.pkl')
+    strict = dict(exclude_folders=['q3'], extensions=['.xlsb'])
+    df, changed = fds.refresh_catalog(tree, catalog_file, rules=strict)
+    assert sorted(df.file) == ['Deal Summary A.xlsb', 'Deal Summary B.xlsb']
+
+    # the folder and the file the old rules skipped are crawled, and reported, as new
+    df, changed = fds.refresh_catalog(tree, catalog_file, rules=dict(extensions=['.xlsb', '.xlsx']))
+    assert changed.status.eq('new').all()
+    assert sorted(changed.file) == ['Deal Summary A.xlsb', 'Deal Summary B.xlsb', 'Deal Summary C.xlsx']
+
+
+def test_classify_filenames_matches_testing_each_keyword():
+    x = pd.Series(['2022 CAT XOL Deal Summary FINAL.xlsb', 'Catastrophe QS.XLSX', 'Per Risk (PPR) Retro.xlsm',
+                   'Fannie CIRT agg.pdf', 'workers comp SS.xlsb', 'Quota Share Prop.xlsb'] * 2)
+    lower = x.str.lower()
+    expected = pd.DataFrame({c: pd.concat([lower.str.contains(k, regex=False) for k in keywords], axis=1).any(axis=1)
+                             for c, keywords in fds.filename_categories.items()})
+    pd.testing.assert_frame_equal(fds.classify_filenames(x), expected)
+    packed = fds.classify_filenames(x, packed=True)
+    assert packed.tolist() == [sum(int(v) << j for j, v in enumerate(row)) for row in expected.values]
+
+
+def test_watch_parses_every_workbook_type_once_it_settles(tree, tmp_path, monkeypatch):
+    for name in ['Deal Summary E.xlsm', '~$Deal Summary A.xlsb', 'Deal Summary F.pdf']:
+        open(os.path.join(tree, '2022', name), 'w').close()
+    parsed = []
+    monkeypatch.setattr(fds, 'one_file_type1', lambda f: parsed.append(f))
+    fds.watch(tree, str(tmp_path / 'catalog.pkl'), str(tmp_path / 'store'),
+              poll_seconds=0, settle_seconds=0, max_polls=2)
+    assert sorted(parsed) == sorted(os.path.join(tree, x) for x in
+                                    ['Deal Summary A.xlsb', os.path.join('2022', 'Deal Summary B.xlsb'),
+                                     os.path.join('2022', 'Deal Summary E.xlsm'),
+                                     os.path.join('2022', 'Q3', 'Deal Summary C.xlsx')])
+
+
+def test_fingerprint_files_uses_the_sizes_from_the_crawl(tree, monkeypatch):
+    copy = os.path.join(tree, '2022', 'Copy of Deal Summary A.xlsb')
+    with open(copy, 'wb') as f:
+        f.write(b'x' * 10)
+    df = fds.get_all_files(tree, rules=dict(extensions=['.xlsb']))
+    files = fds.file_paths(df)[1].tolist()
+    expected = fds.fingerprint_files(files)
+
+    def no_stat(f):
+        raise AssertionError('looked up {} again'.format(f))
+    monkeypatch.setattr(os.path, 'getsize', no_stat)
+    keys = fds.fingerprint_files(files, df['size'].tolist())
+    assert keys == expected
+    assert keys[files.index(copy)] == keys[files.index(os.path.join(tree, 'Deal Summary A.xlsb'))]
+    assert len(set(keys)) == 2
+
+
+def test_normalize_filename_strips_dates_joined_by_underscores():
+    x = pd.Series(['2022 Cat XOL Deal Summary v3 FINAL.xlsb', 'Copy of 2022 Cat XOL Deal Summary_7.27.22.xlsb',
+                   '2022 Cat XOL Deal Summary_7_27_22.xlsb', 'Copy_of_2022_Cat_XOL_Deal_Summary_v3_7_27_22.xlsb',
+                   '2022 Cat XOL Deal Summary (2).xlsb', '2022 Cat XOL Deal Summary 20220727 rev1.xlsm'])
+    assert fds.normalize_filename(x).eq('2022 cat xol deal summary').all()
+    # years and contract type words are kept
+    assert fds.normalize_filename(pd.Series(['2021 Cat XOL Deal Summary.xlsb', 'Prop QS Final.xlsb'])).tolist() == \
+        ['2021 cat xol deal summary', 'prop qs']
+
+
+def test_parse_with_timeout_gives_up_on_a_slow_parse(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(fds, 'one_file_type1', lambda f: release.wait(5) and 'done')
+    out = fds.parse_with_timeout('slow.xlsb', timeout=0.1)
+    release.set()
+    assert isinstance(out, fds.ParseFailure) and out.stage == 'timeout' and out.file == 'slow.xlsb'
+    assert fds.parse_with_timeout('slow.xlsb', timeout=1) == 'done'
+
+
+def test_parallel_parse_with_a_timeout_matches_the_sequential_parse(tree, tmp_path):
+    files = fds.file_paths(fds.get_all_files(tree))[1].tolist()
+    lookup = pd.DataFrame(dict(uobg=[1.0], uobg_desc=['Property']))
+    one = fds.all_files(files, show_every=100, timeout=30, uobg_lookup=lookup)
+    pool = fds.all_files(files, show_every=100, timeout=30, uobg_lookup=lookup, max_workers=2, chunk_size=1)
+    pd.testing.assert_frame_equal(pool['failures'].drop(columns='seconds'), one['failures'].drop(columns='seconds'))
+    assert pool['others'] == one['others'] == files
+
+
+### the rows of a Contract Summary sheet with one layer per premium
+def contract_summary(premiums, crm_id=10001.0):
+    economics = ['Ult. CIN Re Premium']
+    for p in premiums + [0.0] * (8 - len(premiums)):
+        economics += [p, 0.1]
+    return([['Key Contract Terms'],
+            ['ABC Insurance', 'CRM ID:', crm_id, '', 'Casualty XOL', '', 'MGA', '', 'Broker'],
+            ['Summary Economics'],
+            economics + [sum(premiums)],
+            ['Ult Loss Ratio (1:1)'] + [0.65] * 8,
+            ['Subject Business UOBG'],
+            ['Prop'] + [1.0] * 8,
+            ['Deposit Prem Schedule'],
+            ['never read']])
+
+
+### parse each deal sheet in the tree as a contract summary with a layer per 10 bytes, counting the parses
+@pytest.fixture
+def fake_parser(monkeypatch):
+    parsed = []
+    def parse(f):
+        parsed.append(f)
+        page = contract_summary([100.0] * max(1, os.path.getsize(f) // 10))
+        return(fds.parsed_to_table(fds.parse_contract_summary(iter(page))))
+    monkeypatch.setattr(fds, 'one_file_type1', parse)
+    return(parsed)
+
+
+def test_parse_cache_only_parses_changed_files(tree, tmp_path, fake_parser, monkeypatch):
+    files = fds.file_paths(fds.get_all_files(tree, rules=dict(extensions=['.xlsb', '.xlsx'])))[1].tolist()
+    lookup = pd.DataFrame(dict(uobg=[1.0], uobg_desc=['Property']))
+    run = lambda: fds.all_files(files, show_every=100, cache=str(tmp_path / 'cache'), uobg_lookup=lookup)
+
+    first = run()
+    assert sorted(fake_parser) == sorted(files) and first['df'].shape[0] == 1 + 2 + 3
+    del fake_parser[:]
+    pd.testing.assert_frame_equal(run()['df'], first['df'])
+    assert fake_parser == []
+
+    # a re-saved file, and then a new parser, are parsed again
+    save_as_excel(files[1], b'y' * 40)
+    assert run()['df'].shape[0] == 1 + 4 + 3 and fake_parser == [files[1]]
+    monkeypatch.setattr(fds, 'parser_version', lambda: 'changed')
+    run()
+    assert len(fake_parser) == 1 + len(files)
+
+
+def test_checkpoint_resumes_only_for_the_same_parser(tree, tmp_path, fake_parser, monkeypatch):
+    files = fds.file_paths(fds.get_all_files(tree, rules=dict(extensions=['.xlsb', '.xlsx'])))[1].tolist()
+    lookup = pd.DataFrame(dict(uobg=[1.0], uobg_desc=['Property']))
+    run = lambda: fds.all_files(files, show_every=100, checkpoint=str(tmp_path / 'checkpoint'), uobg_lookup=lookup)
+    # (the version hashes the source of one_file_type1, which the test replaces)
+    monkeypatch.setattr(fds, 'parser_version', lambda: 'first')
+
+    # stop the run part way through the last file
+    parse = fds.one_file_type1
+    def stop_at_the_last_file(f):
+        if f == files[-1]:
+            raise SystemExit('stopped')
+        return(parse(f))
+    monkeypatch.setattr(fds, 'one_file_type1', stop_at_the_last_file)
+    with pytest.raises(SystemExit):
+        run()
+    monkeypatch.setattr(fds, 'one_file_type1', parse)
+    manifest = pd.read_csv(tmp_path / 'checkpoint' / 'manifest.csv')
+    assert manifest.file.tolist() == files[:-1] and manifest.version.eq('first').all()
+
+    del fake_parser[:]
+    assert run()['df'].shape[0] == 1 + 2 + 3 and fake_parser == files[-1:]
+
+    # a checkpoint from another parser is not used
+    del fake_parser[:]
+    monkeypatch.setattr(fds, 'parser_version', lambda: 'second')
+    run()
+    assert fake_parser == files
+
+
+### a hand-made workbook with an empty first sheet and the given rows (lists of str, float,
+### bool or None for a blank cell, each row starting in column A) on the Contract Summary,
+### saved as .xlsb (BIFF12 records) or as .xlsx/.xlsm (XML), with the text in shared strings
+def write_workbook(path, rows, sheet='Contract Summary'):
+    strings = {}
+    for row in rows:
+        for v in row:
+            if isinstance(v, str):
+                strings.setdefault(v, len(strings))
+    sheets = ['Inputs', sheet]
+    rels = ''.join('<Relationship Id="rId{}" Type="{}/worksheet" Target="worksheets/sheet{}.{{0}}"/>'.format(j + 1, REL, j + 1)
+                   for j in range(2)) + '<Relationship Id="rId9" Type="{}/sharedStrings" Target="sharedStrings.{{0}}"/>'.format(REL)
+    rels = '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">{}</Relationships>'.format(rels)
+
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as z:
+        if path.endswith('.xlsb'):
+            def rec(rid, data=b''):
+                n, size = len(data), b''
+                while True:
+                    size += bytes([(n & 0x7F) | (0x80 if n > 0x7F else 0)])
+                    n >>= 7
+                    if n == 0:
+                        break
+                return((bytes([rid]) if rid < 0x80 else struct.pack('<H', rid)) + size + data)
+            wide = lambda s: struct.pack('<I', len(s)) + s.encode('utf-16-le')
+
+            def sheet_bin(rows):
+                out = rec(0x0181) + rec(0x0194, struct.pack('<4I', 0, max(len(rows) - 1, 0), 0, max([len(row) - 1 for row in rows] + [0]))) + rec(0x0191)
+                for r, row in enumerate(rows):
+                    out += rec(0x0000, struct.pack('<IIHHI', r, 0, 300, 0, 0))
+                    for c, v in enumerate(row):
+                        cell = struct.pack('<II', c, 0)
+                        if v is None:
+                            out += rec(0x01, cell)
+                        elif isinstance(v, bool):
+                            out += rec(0x04, cell + bytes([v]))
+                        elif isinstance(v, str):
+                            out += rec(0x07, cell + struct.pack('<I', strings[v]))
+                        else:
+                            out += rec(0x05, cell + struct.pack('<d', v))
+                return(out + rec(0x0192) + rec(0x0182))
+
+            book = rec(0x0183) + rec(0x018F) + b''.join(
+                rec(0x019C, struct.pack('<II', 0, j + 1) + wide('rId{}'.format(j + 1)) + wide(name)) for j, name in enumerate(sheets))
+            z.writestr('xl/workbook.bin', book + rec(0x0190) + rec(0x0184))
+            z.writestr('xl/_rels/workbook.bin.rels', rels.format('bin'))
+            z.writestr('xl/sharedStrings.bin', rec(0x019F, struct.pack('<II', len(strings), len(strings)))
+                       + b''.join(rec(0x13, b'\x00' + wide(s)) for s in strings) + rec(0x01A0))
+            z.writestr('xl/worksheets/sheet1.bin', sheet_bin([]))
+            z.writestr('xl/worksheets/sheet2.bin', sheet_bin(rows))
+        else:
+            def column(c):
+                return(column(c // 26 - 1) + chr(65 + c % 26) if c >= 26 else chr(65 + c))
+            def cell(r, c, v):
+                ref = '{}{}'.format(column(c), r + 1)
+                if v is None:
+                    return('<c r="{}"/>'.format(ref))
+                if isinstance(v, bool):
+                    return('<c r="{}" t="b"><v>{:d}</v></c>'.format(ref, v))
+                if isinstance(v, str):
+                    return('<c r="{}" t="s"><v>{}</v></c>'.format(ref, strings[v]))
+                return('<c r="{}"><v>{!r}</v></c>'.format(ref, v))
+            def sheet_xml(rows):
+                data = ''.join('<row r="{}">{}</row>'.format(r + 1, ''.join(cell(r, c, v) for c, v in enumerate(row)))
+                               for r, row in enumerate(rows))
+                return('<worksheet xmlns="{}"><sheetData>{}</sheetData></worksheet>'.format(MAIN, data))
+
+            z.writestr('xl/workbook.xml', '<workbook xmlns="{}" xmlns:r="{}"><sheets>{}</sheets></workbook>'.format(
+                MAIN, REL, ''.join('<sheet name="{}" sheetId="{}" r:id="rId{}"/>'.format(escape(name), j + 1, j + 1)
+                                   for j, name in enumerate(sheets))))
+            z.writestr('xl/_rels/workbook.xml.rels', rels.format('xml'))
+            z.writestr('xl/sharedStrings.xml', '<sst xmlns="{}">{}</sst>'.format(
+                MAIN, ''.join('<si><t xml:space="preserve">{}</t></si>'.format(escape(s)) for s in strings)))
+            z.writestr('xl/worksheets/sheet1.xml', sheet_xml([]))
+            z.writestr('xl/worksheets/sheet2.xml', sheet_xml(rows))
+    return(path)
+
+
+def test_iter_page_stops_at_the_last_needed_row_and_column(tmp_path):
+    rows = contract_summary([100.0, 50.0]) + [['after', 1.0]]
+    rows[1] = rows[1] + [None] * 30 + ['far right']
+    wb = pyxlsb.open_workbook(write_workbook(str(tmp_path / 'deal.xlsb'), rows))
+    page = fds.get_page(wb.get_sheet('Contract Summary'))
+    assert page[-1] == ['Deposit Prem Schedule'] and len(page) == len(rows) - 2
+    assert page[1] == [v for v in rows[1][:31] if v is not None]
+    assert fds.get_page(wb.get_sheet('Contract Summary'), max_columns=3)[1] == ['ABC Insurance', 'CRM ID:']
+    everything = fds.get_page(wb.get_sheet('Contract Summary'), max_columns=64, stop=None)
+    assert everything[-1] == ['after', 1.0] and everything[1][-1] == 'far right'
+
+
+def test_parse_contract_summary_reads_the_rows_once_without_changing_them():
+    rows = contract_summary([100.0, 50.0])
+    rows.insert(5, ['Something New', 1.0, 2.0])
+    before = [list(row) for row in rows]
+    read = []
+    def reader():
+        for row in rows:
+            read.append(row[0])
+            yield row
+
+    parsed = fds.parse_contract_summary(reader())
+    assert read == [row[0] for row in before[:-1]]
+    assert rows == before
+    assert parsed['dat']['crm_id'] == 10001.0 and parsed['dat']['ult_cin_re_premium'][:3] == [100.0, 50.0, 0.0]
+    assert parsed['totals']['ult_cin_re_premium'] == {'combined': 150.0}
+    assert parsed['others'] == [['Something New', 1.0, 2.0]]
+    assert fds.parse_contract_summary(iter(before)) == parsed
+
+
+def test_layer_buffer_matches_concatenating_a_frame_per_file():
+    tables = [fds.parsed_to_table(fds.parse_contract_summary(iter(contract_summary(p, crm_id=c))))
+              for p, c in [([100.0, 50.0], 1.0), ([10.0, 20.0, 30.0], 2.0), ([5.0], 3.0)]]
+    tables[1]['new_term'] = ['a', 'b', 'c']
+    del tables[2]['mga']
+
+    buffer = fds.new_layer_buffer(capacity=2)
+    for j, table in enumerate(tables):
+        fds.append_layers(buffer, table, filename='deal {}.xlsb'.format(j))
+    assert buffer['n'] == 6 and buffer['capacity'] >= 6
+
+    expected = pd.concat([pd.DataFrame(table).assign(filename='deal {}.xlsb'.format(j)) for j, table in enumerate(tables)],
+                         ignore_index=True)
+    df = fds.layer_buffer_to_df(buffer, raw_columns=expected.columns.tolist())
+    pd.testing.assert_frame_equal(df, expected[df.columns].infer_objects())
+    assert df.columns.tolist() == list(tables[0]) + ['filename', 'new_term']
+
+
+@pytest.mark.parametrize('shape, label', [
+    ('term', 'Cedant Retention (%)'), ('term_range', 'Effective / Expire Date'),
+    ('term_pair', 'Brok on R/I Prem (%)'), ('term_pair', 'Line of Business'),
+    ('economics', 'Ult Loss Ratio (1:1)'), ('economics_pair', 'Ult. CIN Re Premium'),
+    ('economics_pair', 'Risk Limit Share / ROL'), ('economics_pair', 'Ceding Commission'), ('uobg', 3)])
+def test_label_columns_caches_the_renamed_label_keys(shape, label, monkeypatch):
+    monkeypatch.setattr(fds, 'label_map', {})
+    names = fds.label_columns(shape, label)
+    assert names == tuple(fds.rename_column(c) for c in fds.label_keys(shape, label))
+    assert fds.label_columns(shape, label) is names and list(fds.label_map) == [(shape, label)]
+    assert all(sys.intern(c) is c for c in names)
+
+
+def test_format_ds_values_matches_formatting_each_value():
+    rng = np.random.default_rng(0)
+    halves = [(k + 0.5) / 10 ** d for k in range(-50, 50) for d in (3, 4)]
+    values = ['0x7', '', ' a ', 'b\t', '0x2a', True, 3, None, 0.0, -0.0, 1.0, 0.99995, 2.0005, 1e300,
+              float('nan'), float('inf'), -float('inf')] + halves + rng.normal(0, 100, 500).tolist()
+    out = fds.format_ds_values(np.array(values, dtype=object))
+    expected = [fds.format_ds_data(v) for v in values]
+    assert [(type(v), repr(v)) for v in out] == [(type(v), repr(v)) for v in expected]
+
+
+def test_output_folder_round_trip(tmp_path):
+    lookup = pd.DataFrame(dict(uobg=[1.0], uobg_desc=['Property']))
+    tables = [fds.parsed_to_table(fds.parse_contract_summary(iter(contract_summary([100.0 + j] * (1 + j % 3), crm_id=j))))
+              for j in range(7)]
+    writer = fds.new_output_writer(str(tmp_path / 'ds_data'), 3, lookup)
+    buffer = fds.new_layer_buffer()
+    for j, table in enumerate(tables):
+        fds.write_layers(writer, table, 'deal {}.xlsb'.format(j))
+        fds.append_layers(buffer, table, filename='deal {}.xlsb'.format(j))
+    assert fds.flush_output(writer).endswith('part-00002.parquet') and fds.flush_output(writer) is None
+
+    expected = fds.recode_missing(fds.join_uobg_desc(fds.layer_buffer_to_df(buffer), lookup))
+    pd.testing.assert_frame_equal(fds.read_output(str(tmp_path / 'ds_data')), expected)
+
+
+def test_output_folder_is_in_file_order_whichever_file_finishes_first(tree, tmp_path, fake_parser):
+    files = fds.file_paths(fds.get_all_files(tree, rules=dict(extensions=['.xlsb', '.xlsx'])))[1].tolist()
+    lookup = pd.DataFrame(dict(uobg=[1.0], uobg_desc=['Property']))
+    cache = str(tmp_path / 'cache')
+
+    # the last file comes from the cache, so it is finished before the others are parsed
+    fds.all_files(files[-1:], show_every=100, cache=cache, uobg_lookup=lookup)
+    out = fds.all_files(files, show_every=100, cache=cache, uobg_lookup=lookup, output=str(tmp_path / 'ds_data'),
+                        files_per_group=2)
+    assert out['df'] is None and out['others'] == []
+    in_memory = fds.all_files(files, show_every=100, uobg_lookup=lookup)['df']
+    pd.testing.assert_frame_equal(fds.read_output(str(tmp_path / 'ds_data')), in_memory)
+
+
+def test_output_folder_needs_pyarrow(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)
+    with pytest.raises(ImportError, match='pyarrow'):
+        fds.new_output_writer(str(tmp_path / 'ds_data'))
+    assert not os.path.exists(tmp_path / 'ds_data')
+
+
+def test_transient_failures_are_not_cached(tree, tmp_path):
+    cache, file = str(tmp_path / 'cache'), os.path.join(tree, 'Deal Summary A.xlsb')
+    for stage in fds.transient_stages:
+        fds.write_parse_cache(file, fds.ParseFailure(file, stage, 'OSError', 'network dropped', 1.0), cache, 'v1')
+        assert fds.read_parse_cache(file, cache, 'v1') == (False, None)
+    failure = fds.ParseFailure(file, 'sheet', 'KeyError', 'Contract Summary', 0.1)
+    fds.write_parse_cache(file, failure, cache, 'v1')
+    assert fds.read_parse_cache(file, cache, 'v1') == (True, failure)
+
+
+def test_retry_failed_parses_the_failures_again(tree, tmp_path, run_main, fake_parser, monkeypatch):
+    monkeypatch.setattr(fds, 'parser_version', lambda: 'v1')
+    parse = fds.one_file_type1
+    monkeypatch.setattr(fds, 'one_file_type1', lambda f: fds.ParseFailure(f, 'parse', 'ValueError', 'bad row', 0.1))
+    run_main()
+    failed = pd.read_csv(tmp_path / 'failures.csv').file.tolist()
+    assert len(failed) == 3
+
+    # the parser is fixed, so the retry parses them rather than reading the failures from the cache
+    monkeypatch.setattr(fds, 'one_file_type1', parse)
+    run_main(retry_failed=True)
+    assert pd.read_csv(tmp_path / 'failures.csv').empty and sorted(fake_parser) == sorted(failed)
+
+
+@pytest.mark.parametrize('xml, value', [
+    ('<c r="A1"><v>1.5</v></c>', 1.5), ('<c r="A1"><v/></c>', None), ('<c r="A1"/>', None),
+    ('<c r="A1" t="s"><v></v></c>', None), ('<c r="A1" t="b"><v/></c>', None), ('<c r="A1" t="b"><v>1</v></c>', True),
+    ('<c r="A1" t="str"><f>A2</f><v/></c>', ''), ('<c r="A1" t="str"><f>A2</f></c>', ''),
+    ('<c r="A1" t="e"><v>#DIV/0!</v></c>', '0x7'), ('<c r="A1" t="inlineStr"><is><t>x</t></is></c>', 'x')])
+def test_ooxml_value_of_empty_and_filled_cells(xml, value):
+    c = fds.ET.fromstring('<worksheet xmlns="{}">{}</worksheet>'.format(MAIN, xml))[0]
+    assert fds.ooxml_value(c, None) == value and type(fds.ooxml_value(c, None)) is type(value)
+
+
+def test_xlsx_deal_sheet_parses_the_same_as_xlsb(tmp_path):
+    rows = contract_summary([100.0, 50.0, 25.0])
+    rows.insert(2, ['Line of Business', None, '', True, 0.5])
+    tables = [fds.one_file_type1(write_workbook(str(tmp_path / ('deal' + ext)), rows)) for ext in ['.xlsb', '.xlsx', '.xlsm']]
+    assert all(isinstance(t, dict) for t in tables)
+    for t in tables[1:]:
+        assert {c: list(v) for c, v in t.items()} == {c: list(v) for c, v in tables[0].items()}
+
+
+@pytest.mark.parametrize('mapped', [True, False])
+def test_xlsb_reader_matches_pyxlsb(tmp_path, monkeypatch, mapped):
+    rows = contract_summary([100.0, 50.0]) + [['after', 2.0]]
+    rows.insert(2, ['Line of Business', None, '', True, -0.25, None, 'x'])
+    rows[1] = rows[1] + [None] * 25 + ['far right', 1.0]
+    path = write_workbook(str(tmp_path / 'deal.xlsb'), rows)
+    monkeypatch.setattr(fds, 'is_local_file', lambda f: mapped)
+
+    for max_columns, stop in [(32, fds.last_needed_row), (3, fds.last_needed_row), (64, None)]:
+        with pyxlsb.open_workbook(path) as book, book.get_sheet('Contract Summary') as sht:
+            expected = fds.get_page(sht, max_columns, stop)
+        with fds.open_xlsb(path) as wb:
+            assert (wb['map'] is not None) == mapped
+            page = list(fds.iter_xlsb_page(fds.get_xlsb_sheet(wb, 'Contract Summary'), max_columns, stop))
+        assert page == expected and [list(map(type, r)) for r in page] == [list(map(type, r)) for r in expected]
+        assert wb['file'].closed and (wb['map'] is None or wb['map'].closed)
+
+
+### keeps each workbook and sheet `one_file_type1` opens, to check they are closed afterwards
+def keep_workbooks(monkeypatch, ext):
+    opened, sheets = [], []
+    open_workbook, get_sheet, read_rows = fds.sheet_readers[ext]
+    def open_and_keep(file):
+        opened.append(open_workbook(file))
+        return(opened[-1])
+    def get_and_keep(wb, name):
+        sheets.append(get_sheet(wb, name))
+        return(sheets[-1])
+    monkeypatch.setitem(fds.sheet_readers, ext, (open_and_keep, get_and_keep, read_rows))
+    return(opened, sheets)
+
+
+@pytest.mark.parametrize('sheet', ['Contract Summary', 'Inputs only'])
+def test_xlsb_workbook_is_closed_after_parsing(tmp_path, monkeypatch, sheet):
+    path = write_workbook(str(tmp_path / 'deal.xlsb'), contract_summary([100.0, 50.0]), sheet=sheet)
+    monkeypatch.setattr(fds, 'is_local_file', lambda f: True)
+    opened, sheets = keep_workbooks(monkeypatch, '.xlsb')
+
+    result = fds.one_file_type1(path)
+
+    # parsed (or failed to find the sheet), and the zip, the map and the file are all closed
+    assert isinstance(result, dict) == (sheet == 'Contract Summary')
+    assert opened[0]['zip'].fp is None and opened[0]['map'].closed and opened[0]['file'].closed
+
+
+@pytest.mark.parametrize('ext', ['.xlsx', '.xlsm'])
+def test_ooxml_workbook_and_shared_strings_are_closed_after_parsing(tmp_path, monkeypatch, ext):
+    path = write_workbook(str(tmp_path / ('deal' + ext)), contract_summary([100.0, 50.0]))
+    opened, sheets = keep_workbooks(monkeypatch, ext)
+
+    assert isinstance(fds.one_file_type1(path), dict)
+
+    # the shared strings were only read part of the way, and are closed along with the zip
+    assert len(sheets[0]['strings']['strings']) > 0 and sheets[0]['strings']['items'].gi_frame is None
+    assert opened[0].fp is None
@@ -1,41 +1,299 @@
-# this is the folder that is searched for deal sheets
-folder = r'O:\PARM\Corporate Actuarial\Reserving\Assumed Reinsurance'
-# folder = 'M:/Clients'
-
-# this is the number of deal sheets to show each refresh
-# (keeps the screen from getting too cluttered)
-show_every=5
-
-def get_folder():
-    """
-    # Description:
-        Returns the folder to search for deal sheets
-    # Inputs:
-        None
-    # Outputs:
-        folder: the folder to search for deal sheets
-                the folder is given above in the user_inputs.py file
-    # Example:
-        >>> folder = get_folder()
-        >>> # expect that this will be the folder above (O:\PARM\Corporate Actuarial\Reserving\Assumed Reinsurance)
-        >>> print(folder)
-        O:\PARM\Corporate Actuarial\Reserving\Assumed Reinsurance
-    """
-    return(folder)
-    
-def get_show_every():
-    """
-    # Description:
-        Returns the number of deal sheets to show each refresh
-    # Inputs:
-        None
-    # Outputs:
-        show_every: the number of deal sheets to show each refresh
-                    the number is given above in the user_inputs.py file
-    # Example:
-        >>> show_every = get_show_every()
-        >>> # expect that this will be the number above (5)
-        >>> print(show_every)
-        5
-    """
-    return(show_every)
\ No newline at end of file
+# this is the folder that is searched for deal sheets
+folder = r'O:\PARM\Corporate Actuarial\Reserving\Assumed Reinsurance'
+# folder = 'M:/Clients'
+
+# this is the number of deal sheets to show each refresh
+# (keeps the screen from getting too cluttered)
+show_every=5
+
+# this is the number of folders listed at once when searching for deal sheets
+# (set to None to list one folder at a time)
+crawl_workers=16
+
+# this is the file where the list of files found is saved, so that the next
+# search only needs to look in the folders that have changed
+catalog_file='./deal_sheet_catalog.pkl'
+
+# these are the rules for which folders and files are searched for deal sheets
+# (all ignore case):
+#   exclude_folders: folders whose name contains any of these are skipped
+#   extensions: only files with one of these extensions are kept
+#   include_files: only files whose name contains all of these are kept
+#   exclude_files: files whose name contains any of these are skipped
+crawl_rules=dict(exclude_folders=['template'],
+                 extensions=['.xls', '.xlsx', '.xlsm', '.xlsb'],
+                 include_files=['deal', 'summary'],
+                 exclude_files=['database', 'db', 'template'])
+
+# this is the folder where watch mode saves the data for each deal sheet
+# (one file per deal sheet, see `save_to_store` in find_deal_sheets.py)
+store='./ds_data_store'
+
+# set this to True to parse every version of each deal sheet,
+# instead of only the newest one (see `select_latest_versions` in find_deal_sheets.py)
+parse_all_versions=False
+
+# this is the number of processes that parse deal sheets at the same time
+# (set to None to parse one deal sheet at a time)
+parse_workers=4
+
+# this is the number of seconds to wait for one deal sheet to parse before skipping it
+# (set to None to wait as long as it takes)
+parse_timeout=300
+
+# this is the folder where parsed deal sheets are cached, so a deal sheet is only
+# parsed again if it (or the parsing code) has changed
+# (set to None to parse every deal sheet every time)
+parse_cache='./ds_parse_cache'
+
+# this is the folder where a run saves each finished deal sheet as it goes, so that
+# an interrupted run carries on where it stopped (it is removed when a run finishes)
+checkpoint='./ds_checkpoint'
+
+# this is where the parsed data is written: each run writes a dataset folder named
+# this plus a timestamp (e.g. ./ds_data_2023_01_31_12_00_00), one parquet file per
+# `files_per_group` deal sheets, written as the run goes
+output='./ds_data'
+files_per_group=50
+
+# this is the table of deal sheets that could not be parsed in the last run, with the
+# stage each one failed at and why (`python find_deal_sheets.py --retry-failed` parses
+# just these files again)
+failures_file='./ds_failures.csv'
+
+def get_folder():
+    """
+    # Description:
+        Returns the folder to search for deal sheets
+    # Inputs:
+        None
+    # Outputs:
+        folder: the folder to search for deal sheets
+                the folder is given above in the user_inputs.py file
+    # Example:
+        >>> folder = get_folder()
+        >>> # expect that this will be the folder above (O:\PARM\Corporate Actuarial\Reserving\Assumed Reinsurance)
+        >>> print(folder)
+        O:\PARM\Corporate Actuarial\Reserving\Assumed Reinsurance
+    """
+    return(folder)
+    
+def get_show_every():
+    """
+    # Description:
+        Returns the number of deal sheets to show each refresh
+    # Inputs:
+        None
+    # Outputs:
+        show_every: the number of deal sheets to show each refresh
+                    the number is given above in the user_inputs.py file
+    # Example:
+        >>> show_every = get_show_every()
+        >>> # expect that this will be the number above (5)
+        >>> print(show_every)
+        5
+    """
+    return(show_every)
+
+def get_crawl_workers():
+    """
+    # Description:
+        Returns the number of folders to list at once when searching for deal sheets
+    # Inputs:
+        None
+    # Outputs:
+        crawl_workers: the number of folders to list at once
+                       the number is given above in the user_inputs.py file
+    # Example:
+        >>> crawl_workers = get_crawl_workers()
+        >>> # expect that this will be the number above (16)
+        >>> print(crawl_workers)
+        16
+    """
+    return(crawl_workers)
+
+def get_catalog_file():
+    """
+    # Description:
+        Returns the file where the list of files found is saved
+    # Inputs:
+        None
+    # Outputs:
+        catalog_file: the file where the list of files found is saved
+                      the file is given above in the user_inputs.py file
+    # Example:
+        >>> catalog_file = get_catalog_file()
+        >>> # expect that this will be the file above (./deal_sheet_catalog.pkl)
+        >>> print(catalog_file)
+        ./deal_sheet_catalog.pkl
+    """
+    return(catalog_file)
+
+def get_crawl_rules():
+    """
+    # Description:
+        Returns the rules for which folders and files are searched for deal sheets
+    # Inputs:
+        None
+    # Outputs:
+        crawl_rules: dict of the rules
+                     the rules are given above in the user_inputs.py file
+    # Example:
+        >>> crawl_rules = get_crawl_rules()
+        >>> print(crawl_rules['exclude_folders'])
+        ['template']
+    """
+    return(crawl_rules)
+
+def get_store():
+    """
+    # Description:
+        Returns the folder where watch mode saves the data for each deal sheet
+    # Inputs:
+        None
+    # Outputs:
+        store: the deal sheet store folder
+               the folder is given above in the user_inputs.py file
+    # Example:
+        >>> store = get_store()
+        >>> # expect that this will be the folder above (./ds_data_store)
+        >>> print(store)
+        ./ds_data_store
+    """
+    return(store)
+
+def get_parse_all_versions():
+    """
+    # Description:
+        Returns whether to parse every version of each deal sheet
+    # Inputs:
+        None
+    # Outputs:
+        parse_all_versions: True to parse every version, False for only the newest
+                            the value is given above in the user_inputs.py file
+    # Example:
+        >>> parse_all_versions = get_parse_all_versions()
+        >>> # expect that this will be the value above (False)
+        >>> print(parse_all_versions)
+        False
+    """
+    return(parse_all_versions)
+
+def get_parse_workers():
+    """
+    # Description:
+        Returns the number of processes that parse deal sheets at the same time
+    # Inputs:
+        None
+    # Outputs:
+        parse_workers: the number of processes
+                       the number is given above in the user_inputs.py file
+    # Example:
+        >>> parse_workers = get_parse_workers()
+        >>> # expect that this will be the number above (4)
+        >>> print(parse_workers)
+        4
+    """
+    return(parse_workers)
+
+def get_parse_timeout():
+    """
+    # Description:
+        Returns the number of seconds to wait for one deal sheet to parse
+    # Inputs:
+        None
+    # Outputs:
+        parse_timeout: the number of seconds
+                       the number is given above in the user_inputs.py file
+    # Example:
+        >>> parse_timeout = get_parse_timeout()
+        >>> # expect that this will be the number above (300)
+        >>> print(parse_timeout)
+        300
+    """
+    return(parse_timeout)
+
+def get_parse_cache():
+    """
+    # Description:
+        Returns the folder where parsed deal sheets are cached
+    # Inputs:
+        None
+    # Outputs:
+        parse_cache: the parse cache folder
+                     the folder is given above in the user_inputs.py file
+    # Example:
+        >>> parse_cache = get_parse_cache()
+        >>> # expect that this will be the folder above (./ds_parse_cache)
+        >>> print(parse_cache)
+        ./ds_parse_cache
+    """
+    return(parse_cache)
+
+def get_checkpoint():
+    """
+    # Description:
+        Returns the folder where a run saves each finished deal sheet as it goes
+    # Inputs:
+        None
+    # Outputs:
+        checkpoint: the checkpoint folder
+                    the folder is given above in the user_inputs.py file
+    # Example:
+        >>> checkpoint = get_checkpoint()
+        >>> # expect that this will be the folder above (./ds_checkpoint)
+        >>> print(checkpoint)
+        ./ds_checkpoint
+    """
+    return(checkpoint)
+
+def get_output():
+    """
+    # Description:
+        Returns the start of the name of the dataset folder each run writes
+    # Inputs:
+        None
+    # Outputs:
+        output: the start of the dataset folder name
+                the name is given above in the user_inputs.py file
+    # Example:
+        >>> output = get_output()
+        >>> # expect that this will be the name above (./ds_data)
+        >>> print(output)
+        ./ds_data
+    """
+    return(output)
+
+def get_files_per_group():
+    """
+    # Description:
+        Returns the number of deal sheets written to each file of the dataset
+    # Inputs:
+        None
+    # Outputs:
+        files_per_group: the number of deal sheets
+                         the number is given above in the user_inputs.py file
+    # Example:
+        >>> files_per_group = get_files_per_group()
+        >>> # expect that this will be the number above (50)
+        >>> print(files_per_group)
+        50
+    """
+    return(files_per_group)
+
+def get_failures_file():
+    """
+    # Description:
+        Returns the file where the deal sheets that could not be parsed are saved
+    # Inputs:
+        None
+    # Outputs:
+        failures_file: the failures file
+                       the file is given above in the user_inputs.py file
+    # Example:
+        >>> failures_file = get_failures_file()
+        >>> # expect that this will be the file above (./ds_failures.csv)
+        >>> print(failures_file)
+        ./ds_failures.csv
+    """
+    return(failures_file)
\ No newline at end of file
@@ -0,0 +1,373 @@
+"""
+Tests for build_contract_layer_tables, run with `python -m pytest` from this folder.
+
+The source databases are stood in for by in-memory SQLite databases holding a
+handful of made-up contracts, so the real readers and joins are exercised.
+"""
+import datetime
+import itertools
+import sqlite3
+import sys
+import types
+
+import pandas as pd
+import pytest
+
+try:
+    import pyodbc
+except ImportError:
+    # the ODBC driver manager is not installed everywhere the tests run, and
+    # the tests never connect through pyodbc, so a bare stand-in is enough
+    pyodbc = types.ModuleType('pyodbc')
+    pyodbc.Connection = pyodbc.Cursor = object
+    sys.modules['pyodbc'] = pyodbc
+
+import build_contract_layer_tables as credat
+
+
+# column names of the source tables, in table order
+lc_contract_cols = ('CrmGroupID Account MgtRptLine Description Program Inception Expiration TreatyBasis '
+    'AlaeBasis LossEvalDate Status CatModelVersion Note UserID LastUpdated Region Currency SourceFile').split()
+lc_layer_cols = ('CrmGroupID CrmID Layer SubjectPremium RiskLimit RiskRetention OccLimit ReinstStrg Aad AggLimit '
+    'LossCorrStart LossCorrStop Brokerage RpBrokerage Rate SwingMinRate SwingMaxRate SwingLoad UlaeRatio ProfitComm '
+    'MaxPc ReinsExpLoad Comm SsLrMin SsSlide1 SsLrMid SsSlide2 SsLrMax ReinsPremium100 NonCatAvgLossAlae '
+    'MdlCatAvgLossAlae MdlHuEqCatAvgLossAlae MdlAOCatAvgLossAlae NmdCatAvgLossAlae RawNonCatCV NonCatParmRisk '
+    'NonCatCV RawNmdCatCV NmdCatParmRisk NmdCatCV InterestRate Bound AuthorizedShare FotRate QuoteRate SignedShare '
+    'CreProPrem CreDepPrem CreUltPrem CreCedComm CreBrokExp CreAoExp CreUw CreNpvUw ClashType ClashCoverage '
+    'CyberSublimit TerrorCoverage TerrorSublimit CatCoverageType CatExperienceLoad CyberCoverage Placement EcoXpl '
+    'DJ TrapValExpLim MarginalTvar50 MarginalTvar250 LayerMinCapital CurrencyByLayer TotCasAggLim PricingType '
+    'OccRet GrNetAggRet GrNetAggLim Maol').split()
+ds_contract_cols = ('CinReId CRMID ClientName Reassured Inception Expiration ContractName DominantType MGA Broker '
+    'BrokerNum TreatyCategory Line UltCinRePrem ExpectedLoss ExpenseRatio TechUWRatio UWProfit NPVUWProfit '
+    'ChgRateAdequacy ROEChange RateChange ProgramRateChange StandaloneTVaR250 StandaloneROC250 DiversifiedTVaR250 '
+    'DiversifiedROC250 LossCV Status SourceFile SharePointFile Note LastUpdated CyberExposure CyberAggLimit Subline '
+    'CompanyID DepositPrem ModelExpectedLoss AnnualValues').split()
+ds_layer_cols = ('CinReId LayerID LayerName NewRenew Inception Expiration SAPTreaty SAPSection ContractType '
+    'DominantType Territory UWArea Limit Retention Reinstatements MaxPolicyLimit AggLimit AggRetention Currency '
+    'Trigger ReportRemit ALAE Placement Rate ROL AuthorizedLine SignedLine UltCinRePrem ExpectedLoss TechUWRatio '
+    'UWProfit NPVUWProfit TVaR250 ROE250 RateChange DepositPrem CyberExposure CyberAggLimit CatDBLayerID Note '
+    'MinimumPrem DepPremSchedule LossCostDBLayerID PNOC OrgInception OrgExpiration SubjectPrem SubjectBase '
+    'Brokerage RPBrokerage').split()
+ds_sap_cols = 'CinReId CRMID Inception Expiration TreatyCategory SAPTreaty SAPSection Line'.split()
+sap_treaty_cols = [
+    'Company Code', 'Deal Number', 'Contract Number', 'CRM Submission ID', 'Treaty Text', 'Cedent',
+    'Cedent Name', 'Underwriter for Treaty', 'Nature of Treaty', 'Treaty Category', 'Accounting Freq# No#',
+    'Account Level', 'Cancel Date', 'End of Acctg Year', 'Spec# Retro Allowed', 'Specific Retro Treaty',
+    'Effective Date', 'Expiration Date', 'Contract Status', 'Renewal', 'Exposure Territory',
+    'Retro Treaty Number', 'Retro Section Number', 'Cession Percentage', 'Reported Data Placement %',
+    'CinciRe Share/participation', 'Section', 'Text for Section', 'Contract Type', 'Layer', 'UW Area',
+    'Business Type Number', 'Contract Trigger', 'Cancel Type', 'Days Runoff', 'XPL Limit', 'ECO Limit',
+    'Peril', 'COB(UOBG)', 'CoB (UOBG) %', 'Segment', 'Subsegment', 'Quota Share %', 'Maximum Liability',
+    'Retained Line', 'No# of Lines', 'Limit', 'Retention', 'Cat Occurrence Retention', 'Cat Occurrence Limit',
+    'Terror Occurrence Limit', 'AAD', 'AAL', 'Loss Corridor Floor', 'Loss Corridor Ceiling', 'ALAE Treatment',
+    'Protected Share', 'Subject Premium', 'Base Rate', 'Min Rate for swing', 'Max Rate for swing',
+    'Deposit Premium', 'Reinstatement Cover %', 'Reinstatem# Time %', 'Flat Commission%',
+    'Provisional Commission%', 'Overriding Commission%', 'Brokerage%', 'Provisional Loss Ratio', 'Dev Pattern',
+    'LR at Min Commission', 'LR at Max Commission', 'Commission at Min', 'Commission at Max',
+    'Profit Commission %', 'Profit Commission Expense', 'End of Acct Period']
+air_contract_cols = ('ClientName ClientID Inception Expiration Program CinReGroupID2 WrittenPrem OccLimit AggLimit '
+    'Status Region Note LastUpdated HasPC UserName FileLocation Broker ExecutiveSummary Currency CRMID FxRateID '
+    'TemplateAltered CinReGroupID TemplateSource').split()
+air_layer_cols = ('CRMID CinReID Name Program Inception Expiration Status Broker Region Currency LayerType Rol '
+    'OccLimit OccRetention Franchise ReinstatementNumber ReinstatementRate ReinstatementStr AggLimit AggRetention '
+    'Participation Components SharesPriced SharesAuthorized SharesSigned Brokerage RpBrokerage LayerId RppRefRol '
+    'Comments PricingRegistry CinReGroupID Lc_AppliesAgg Lc_RatioToAgg').split()
+
+# made-up contracts: (crm_gp_id, crm_id, line, program, eff_date, exp_date, number of layers)
+# the last one is outside treaty year 2021
+contracts = [
+    (10001, 'C10001', 'Casualty', 'Per Occurrence XOL', '2021-01-01', '2021-12-31', 2),
+    (10002, 'P10002', 'Property', 'Per Risk XOL', '2021-07-01', '2022-06-30', 1),
+    (10003, 'C10003', 'Casualty', 'Per Occurrence XOL', '2020-03-01', '2021-02-28', 1),
+]
+
+
+def write_table(conn, name, columns, rows):
+    """write `rows` (dicts of only the columns that matter) as table `name`, with 0 in every other column"""
+    df = pd.DataFrame([{**dict.fromkeys(columns, 0), **r} for r in rows], columns=columns)
+    df.to_sql(name, conn, index=False)
+
+
+# numbers the in-memory databases, so each test gets its own
+test_run = itertools.count()
+
+
+@pytest.fixture
+def source_uris():
+    """URI of a shared in-memory SQLite database for each source database, keyed as in `credat.db_list`"""
+    run = next(test_run)
+    return ({name: 'file:{}_{}?mode=memory&cache=shared'.format(name, run) for name in credat.db_list[:4]})
+
+
+@pytest.fixture
+def source_dbs(source_uris):
+    """one in-memory SQLite database per source database, filled with `contracts`"""
+    dbs = {name: sqlite3.connect(uri, uri=True) for name, uri in source_uris.items()}
+    lc, ds, sap, air = (dbs[name] for name in credat.db_list[:4])
+
+    write_table(lc, 'Contract', lc_contract_cols, [
+        dict(CrmGroupID=gp, Account='Client ' + crm, MgtRptLine=line, Description=program, Program=program,
+             Inception=eff, Expiration=exp, TreatyBasis='Losses Occurring', AlaeBasis='Pro Rata',
+             LossEvalDate=eff, Status='Bound', LastUpdated='2021-02-01', Region='US', Currency='USD')
+        for gp, crm, line, program, eff, exp, n in contracts])
+    write_table(lc, 'LayerTerms', lc_layer_cols, [
+        dict(CrmGroupID=gp, CrmID=crm, Layer=k, OccLimit=1e6 * k, OccRet=1e6, RiskLimit=1e6 * k,
+             CreUltPrem=100.0 * k, Brokerage=0.1, Comm=0.05, Placement=1.0)
+        for gp, crm, line, program, eff, exp, n in contracts for k in range(1, n + 1)])
+
+    write_table(ds, 'Contract', ds_contract_cols, [
+        dict(CinReId=gp, CRMID=crm, ClientName='Client ' + crm, Inception=eff, Expiration=exp,
+             ContractName=program, Broker='Broker', TreatyCategory='Assumed', Line=line, Status='Bound',
+             LastUpdated='2021-03-01', Subline=line)
+        for gp, crm, line, program, eff, exp, n in contracts])
+    write_table(ds, 'Layer', ds_layer_cols, [
+        dict(CinReId=gp, LayerID=k, LayerName='Layer {}'.format(k), Inception=eff, Expiration=exp,
+             SAPTreaty=5000 + k, SAPSection=k, ContractType=program, Territory='US', Currency='USD',
+             Trigger='Losses Occurring', Placement=1.0, UltCinRePrem=100.0 * k, ExpectedLoss=60.0 * k,
+             UWProfit=10.0 * k, LossCostDBLayerID=k)
+        for gp, crm, line, program, eff, exp, n in contracts for k in range(1, n + 1)])
+    write_table(ds, 'CRMIDforSAP', ds_sap_cols, [
+        dict(CinReId=gp, CRMID=crm, Inception=eff, Expiration=exp, TreatyCategory='Assumed',
+             SAPTreaty=5000 + k, SAPSection=k, Line=line)
+        for gp, crm, line, program, eff, exp, n in contracts for k in range(1, n + 1)])
+
+    write_table(sap, 'Treaty$', sap_treaty_cols, [
+        {'CRM Submission ID': crm, 'Effective Date': eff, 'Expiration Date': exp, 'Cancel Date': exp,
+         'End of Acct Period': exp, 'Peril': 'All'}
+        for gp, crm, line, program, eff, exp, n in contracts])
+
+    write_table(air, 'Contract_New', air_contract_cols, [
+        dict(ClientName='Client ' + crm, Inception=eff, Expiration=exp, Program=program, Status='Bound',
+             Region='US', LastUpdated='2021-01-15', Broker='Broker', Currency='USD', CRMID=crm, CinReGroupID=gp)
+        for gp, crm, line, program, eff, exp, n in contracts])
+    write_table(air, 'Layer_New', air_layer_cols, [
+        dict(CRMID=crm, CinReID=gp, Inception=eff, Expiration=exp, LayerId=k, CinReGroupID=gp, Franchise=0)
+        for gp, crm, line, program, eff, exp, n in contracts for k in range(1, n + 1)])
+
+    yield dbs
+
+    for conn in dbs.values():
+        conn.close()
+
+
+def test_build_treaty_year_on_stubbed_tables(source_dbs, monkeypatch):
+    monkeypatch.setattr(credat, 'connect_to_dbs', lambda *names: {name: source_dbs[name] for name in names})
+
+    df = credat.build_treaty_year(2021)
+
+    # one row per 2021 layer, the 2020 contract is left out
+    assert sorted(zip(df.crm_id, df.layer_id)) == [('C10001', 1), ('C10001', 2), ('P10002', 1)]
+    assert df.treaty_year.eq(2021).all()
+    assert df.sap_treaty.tolist() == [5001, 5002, 5001]
+    assert df.reserving_line.tolist() == ['casualty_np', 'casualty_np', 'property_per_risk']
+
+
+@pytest.fixture
+def server(source_dbs, source_uris):
+    """one connection with every source database attached under its own name, like the SQL Server instance"""
+    conn = sqlite3.connect(':memory:')
+    for name, uri in source_uris.items():
+        conn.execute('ATTACH DATABASE ? AS [{}]'.format(name), (uri,))
+
+    yield conn
+
+    conn.close()
+
+
+def test_pushdown_contracts_match_pandas_join(source_dbs, server):
+    # a second SAP row for the same treaty, differing only in a column that
+    # `cinre_sap_contract` keeps, so the treaty's contract rows are repeated
+    sap = pd.read_sql_query('select * from [Treaty$]', source_dbs['CINRE_SAP'])
+    sap.iloc[[0]].assign(Peril='Cat').to_sql('Treaty$', source_dbs['CINRE_SAP'], index=False, if_exists='append')
+    # and one differing only in a dropped column, which does not repeat them
+    sap.iloc[[0]].assign(Limit=5).to_sql('Treaty$', source_dbs['CINRE_SAP'], index=False, if_exists='append')
+    source_dbs['CINRE_SAP'].commit()
+
+    dates = dict(earliest_inception='2021-01-01', latest_inception='2022-01-01')
+    lc, ds, sap, air = (source_dbs[name] for name in credat.db_list[:4])
+    in_pandas = credat.raw_contracts(lc, ds, sap, air, **dates)
+    on_server = credat.raw_contracts(server, server, server, server, pushdown=True, dialect='sqlite', **dates)
+
+    def tidy(df):
+        return (df.drop(columns='timestamp').sort_values('crm_id eff_date'.split()).reset_index(drop=True))
+
+    assert in_pandas.crm_id.tolist().count('C10001') == 2
+    pd.testing.assert_frame_equal(tidy(on_server), tidy(in_pandas), check_dtype=False)
+
+
+def test_excluded_statuses_match_in_any_case(source_dbs, server):
+    lc, ds, sap, air = (source_dbs[name] for name in credat.db_list[:4])
+    lc.execute("update Contract set Status = 'DECLINED' where CrmGroupID = 10002")
+    lc.execute("update Contract set Status = NULL where CrmGroupID = 10003")
+    air.execute("update Contract_New set Status = 'not Bound' where CRMID = 'C10001'")
+    lc.commit()
+    air.commit()
+
+    dates = dict(earliest_inception='2020-01-01', latest_inception='2022-01-01')
+    assert credat.cinre_lc_contract(lc, **dates).crm_gp_id_lc.tolist() == [10001, 10003]
+    assert credat.cinre_air_contract(air, **dates).crm_id_air.tolist() == ['P10002', 'C10003']
+
+    in_pandas = credat.raw_contracts(lc, ds, sap, air, **dates)
+    on_server = credat.raw_contracts(server, server, server, server, pushdown=True, dialect='sqlite', **dates)
+    for df in (in_pandas, on_server):
+        df = df.sort_values('crm_id').set_index('crm_id')
+        assert df.alae_basis_lc.isna().tolist() == [False, False, True]
+        assert df.user_name_air.isna().tolist() == [True, False, False]
+
+
+def test_pushdown_layers_match_pandas_join(source_dbs, server):
+    dates = dict(earliest_eff_date='2021-01-01', latest_eff_date='2022-01-01')
+    lc, ds, sap, air = (source_dbs[name] for name in credat.db_list[:4])
+    in_pandas = credat.raw_layers(lc, ds, sap, air, 'Layer_New', **dates)
+    on_server = credat.raw_layers(server, server, server, server, 'Layer_New', pushdown=True, dialect='sqlite', **dates)
+
+    def tidy(df):
+        return (df.drop(columns=[c for c in df.columns if 'timestamp' in c])
+                .sort_values('crm_id layer_id'.split()).reset_index(drop=True))
+
+    assert sorted(zip(in_pandas.crm_id, in_pandas.layer_id)) == [('C10001', 1), ('C10001', 2), ('P10002', 1)]
+    pd.testing.assert_frame_equal(tidy(on_server), tidy(in_pandas), check_dtype=False)
+
+
+def test_all4hierarchy_provenance():
+    ds = pd.Series([1, None, None, None], name='risk_limit_ds')
+    lc = pd.Series([9, 2, None, None], name='risk_limit_lc')
+    air = pd.Series([9, 9, 3, None], name='risk_limit_air')
+
+    value, code = credat.all4hierarchy(ds=ds, lc=lc, air=air, sap=[0, 0, 0, 0], provenance=True)
+
+    assert value.tolist() == [1, 2, 3, 0]
+    assert credat.provenance_labels(code).tolist() == ['ds', 'lc', 'air', 'none']
+
+    # the suffix of the series name wins over the keyword it is passed as
+    value, code = credat.all4hierarchy(ds=lc, lc=ds, provenance=True)
+    assert credat.provenance_labels(code).tolist() == ['lc', 'lc', 'none', 'none']
+
+
+def test_feed_provenance_columns(source_dbs, monkeypatch):
+    monkeypatch.setattr(credat, 'connect_to_dbs', lambda *names: {name: source_dbs[name] for name in names})
+
+    df = credat.build_treaty_year(2021)
+
+    # keys & contract names come from the deal sheet, the layer limits from loss cost
+    assert credat.provenance_labels(df.crm_id_src).eq('ds').all()
+    assert credat.provenance_labels(df.contract_name_src).eq('ds').all()
+    assert credat.provenance_labels(df.occ_limit_src_layer).eq('lc').all()
+
+
+def test_zero_risk_limit_falls_back_to_lc_only_where_there_is_one(source_dbs):
+    # the deal sheet limits are all 0, and one layer has no loss cost limit
+    lc, ds, sap, air = (source_dbs[name] for name in credat.db_list[:4])
+    lc.execute("update LayerTerms set RiskLimit = NULL where CrmID = 'P10002'")
+    lc.commit()
+
+    layer = credat.raw_layers(lc, ds, sap, air, 'Layer_New', '2021-01-01', '2022-01-01')
+    layer = layer.sort_values('crm_id layer_id'.split())
+
+    assert layer.risk_limit_layer.tolist() == [1e6, 2e6, 0]
+    assert credat.provenance_labels(layer.risk_limit_src_layer).tolist() == ['lc', 'lc', 'ds']
+
+
+def test_validate_feed(source_dbs, monkeypatch):
+    monkeypatch.setattr(credat, 'connect_to_dbs', lambda *names: {name: source_dbs[name] for name in names})
+    df = credat.build_treaty_year(2021)
+
+    exceptions, counts = credat.validate_feed(df)
+    assert counts.n_rows.sum() == 0 and exceptions.empty
+
+    # break one rule on each of three rows
+    df = pd.concat([df, df.iloc[[0]]], ignore_index=True)
+    df.loc[1, 'ultimate_prem_layer'] = -1.0
+    df.loc[2, 'sap_section'] = None
+
+    exceptions, counts = credat.validate_feed(df)
+    assert counts.n_rows.to_dict() == dict(duplicate_key=2, inf_expected_loss_ratio=0, negative_premium=1,
+                                           unmatched_sap_section=1, default_crm_gp_id=0)
+    assert exceptions.loc[exceptions.rule.eq('duplicate_key'), 'row'].tolist() == [0, 3]
+
+
+class SwapFailsCursor:
+    """cursor that fails when the staging table is renamed to the live table"""
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def execute(self, qry, *args):
+        if qry == 'ALTER TABLE cre_data_feed_staging RENAME TO cre_data_feed':
+            raise sqlite3.OperationalError('swap failed')
+        self.cursor.execute(qry, *args)
+        return (self)
+
+    def executemany(self, qry, rows):
+        self.cursor.executemany(qry, rows)
+
+    def fetchone(self):
+        return (self.cursor.fetchone())
+
+
+class SwapFailsConnection:
+    """connection handing out `SwapFailsCursor`s"""
+    def __init__(self, conn):
+        self.conn = conn
+
+    def cursor(self):
+        return (SwapFailsCursor(self.conn.cursor()))
+
+    def commit(self):
+        self.conn.commit()
+
+
+def feed_frame(n):
+    return (pd.DataFrame(dict(crm_id=['C{}'.format(k) for k in range(n)],
+                              eff_date=pd.Timestamp('2021-01-01'),
+                              ultimate_prem=[100.0 * k for k in range(n)],
+                              layer_count=1)))
+
+
+def test_load_feed_replaces_the_live_table():
+    conn = sqlite3.connect(':memory:')
+
+    assert credat.load_feed(feed_frame(3), conn, batch_size=2, dialect='sqlite') == 3
+    assert credat.load_feed(feed_frame(5), conn, batch_size=2, dialect='sqlite') == 5
+
+    live = pd.read_sql_query('select * from cre_data_feed', conn)
+    assert live.crm_id.tolist() == ['C0', 'C1', 'C2', 'C3', 'C4']
+    assert live.eff_date.eq('2021-01-01 00:00:00').all()
+    tables = pd.read_sql_query("select name from sqlite_master where type = 'table'", conn).name.tolist()
+    assert tables == ['cre_data_feed']
+
+
+def test_load_feed_keeps_the_live_table_when_the_swap_fails():
+    conn = sqlite3.connect(':memory:')
+    credat.load_feed(feed_frame(3), conn, dialect='sqlite')
+
+    with pytest.raises(sqlite3.OperationalError, match='swap failed'):
+        credat.load_feed(feed_frame(5), SwapFailsConnection(conn), dialect='sqlite')
+
+    live = pd.read_sql_query('select * from cre_data_feed', conn)
+    assert live.crm_id.tolist() == ['C0', 'C1', 'C2']
+
+
+def treaty_year_shard(treaty_year, pushdown=False, layer_table_name='Layer_New'):
+    """stands in for `build_treaty_year` in the worker processes (module level, so it can be pickled)"""
+    return (pd.DataFrame(dict(eff_date=pd.to_datetime(['{}-07-01'.format(treaty_year), '{}-01-01'.format(treaty_year)] * 2),
+                              reserving_line=['property_cat', 'property_cat', 'casualty_np', 'casualty_np'],
+                              crm_id=['P{}'.format(treaty_year), 'P{}'.format(treaty_year), 'C1', 'C2'],
+                              layer_id=[2, 1, 1, 1], treaty_year=treaty_year, layer_table=layer_table_name,
+                              timestamp=pd.Timestamp('2001-01-01 00:00') + pd.Timedelta(days=treaty_year % 100))))
+
+
+@pytest.mark.parametrize('max_workers', [None, 2])
+def test_build_feed_by_treaty_year_matches_a_single_process_build(monkeypatch, max_workers):
+    timestamp = datetime.datetime(2027, 3, 2, 10, 0)
+    monkeypatch.setattr(credat, 'build_timestamp', lambda: timestamp)
+    monkeypatch.setattr(credat, 'build_treaty_year', treaty_year_shard)
+    treaty_years = [2022, 2020, 2021]
+
+    df = credat.build_feed_by_treaty_year(treaty_years, max_workers=max_workers, layer_table_name='Layer_Test')
+
+    expected = pd.concat([treaty_year_shard(ty, layer_table_name='Layer_Test') for ty in treaty_years])
+    expected['timestamp'] = timestamp
+    expected = expected.sort_values('eff_date reserving_line crm_id layer_id'.split()).reset_index(drop=True)
+    pd.testing.assert_frame_equal(df, expected)
+    assert df.timestamp.nunique() == 1 and df.layer_table.eq('Layer_Test').all()
+    assert df.eff_date.is_monotonic_increasing and df.treaty_year.tolist()[:4] == [2020] * 4